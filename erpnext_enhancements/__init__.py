@@ -1 +1 @@
-__version__ = "1.344.3"
+__version__ = "1.369.0"
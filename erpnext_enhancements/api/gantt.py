@@ -698,6 +698,11 @@ def get_gantt_data(config):
 				client renders a collapsed caret and fetches that root's
 				children only when the user expands it.
 
+			``critical_path`` (bool, optional): stamp Task rows with
+				``ee_total_float`` / ``ee_free_float`` / ``ee_critical`` from
+				their project's cached CPM schedule, and add
+				``meta.critical_path`` (``{project: finish date}``).
+
 		Composite mode (``group_by``/``children`` present) prefixes every id
 		(``G::``/``P::``/``C::``) and adds ``ref_doctype``/``ref_name`` per
 		row; a root ``parent`` mapping is not supported there.
@@ -748,27 +753,70 @@ def get_gantt_data(config):
 	)
 
 	if composite:
-		return _build_composite(doctype, meta, field_map, rows, cfg, group_field, extra_fields)
+		payload = _build_composite(doctype, meta, field_map, rows, cfg, group_field, extra_fields)
+	else:
+		tasks, unscheduled = _shape_tasks(rows, field_map)
+		if extra_fields:
+			by_name = {row.name: row for row in rows}
+			for task in tasks:
+				_add_extra_fields(task, by_name[task["id"]], extra_fields)
+
+		links = []
+		if cfg.get("dependencies"):
+			links = _fetch_links(meta, cfg["dependencies"], [t["id"] for t in tasks])
+
+		payload = {
+			"tasks": tasks,
+			"links": links,
+			"meta": {
+				"total_rows": len(rows),
+				"unscheduled": unscheduled,
+				"can_write": _writable_doctypes(doctype, None),
+			},
+		}
 
-	tasks, unscheduled = _shape_tasks(rows, field_map)
-	if extra_fields:
-		by_name = {row.name: row for row in rows}
-		for task in tasks:
-			_add_extra_fields(task, by_name[task["id"]], extra_fields)
+	if cint(cfg.get("critical_path")):
+		payload["meta"]["critical_path"] = _add_critical_path(payload["tasks"], doctype)
+	return payload
 
-	links = []
-	if cfg.get("dependencies"):
-		links = _fetch_links(meta, cfg["dependencies"], [t["id"] for t in tasks])
 
-	return {
-		"tasks": tasks,
-		"links": links,
-		"meta": {
-			"total_rows": len(rows),
-			"unscheduled": unscheduled,
-			"can_write": _writable_doctypes(doctype, None),
-		},
+def _add_critical_path(tasks, doctype):
+	"""Stamp each emitted Task row with float from its project's schedule.
+
+	Adds ``ee_total_float`` / ``ee_free_float`` (working days) and ``ee_critical``
+	to rows whose source document is a Task. Returns ``{project: finish}`` for the
+	projects involved. The schedules come from
+	``project_enhancements.critical_path`` and are cached per project. They are
+	computed over the WHOLE project, because float is a property of the network,
+	but they are only attached to rows the permission-checked queries already
+	returned.
+	"""
+	# Imported here: the project package is only needed when a config asks for it.
+	from erpnext_enhancements.project_enhancements import critical_path
+
+	by_name = {}
+	for task in tasks:
+		if (task.get("ref_doctype") or doctype) == "Task":
+			by_name.setdefault(task.get("ref_name") or task["id"], []).append(task)
+	if not by_name:
+		return {}
+
+	projects = {
+		row.name: row.project
+		for row in frappe.get_all("Task", filters={"name": ["in", list(by_name)]}, fields=["name", "project"])
+		if row.project
 	}
+	schedules = critical_path.get_schedules(sorted(set(projects.values())))
+	for name, rows in by_name.items():
+		schedule = schedules.get(projects.get(name))
+		entry = schedule["tasks"].get(name) if schedule else None
+		if not entry:
+			continue
+		for task in rows:
+			task["ee_total_float"] = entry["total_float"]
+			task["ee_free_float"] = entry["free_float"]
+			task["ee_critical"] = entry["critical"]
+	return {project: cstr(schedule["finish"] or "") or None for project, schedule in schedules.items()}
 
 
 # ---------------------------------------------------------------------------
@@ -47,6 +47,7 @@ from twilio.jwt.access_token.grants import VoiceGrant
 from twilio.request_validator import RequestValidator
 
 from erpnext_enhancements import email_style
+from erpnext_enhancements.crm_enhancements import phone_index
 
 
 @frappe.whitelist(allow_guest=True)
@@ -162,10 +163,12 @@ def get_caller_info(phone_number, twilio_caller_name=None, create_if_missing=Tru
     Guest endpoint guarded by ``@validate_webhook_secret``; also used as an
     internal helper by other functions in this module.
 
-    Matching: normalises to digits and fuzzy-matches the last 10 digits via a
-    REGEXP over ``Contact.custom_phone_number`` then
-    ``Customer.custom_accounts_phone_number`` (the ``.*``-joined regex tolerates
-    formatting differences). If neither is found, AUTO-CREATES a Residential
+    Matching: an exact, indexed match of the caller's last 10 digits through
+    ``phone_index.lookup`` -- Contacts first (``custom_phone_number`` and the
+    ``phone_nos`` table), then Customers (``custom_accounts_phone_number`` and
+    ``mobile_no``). Only a doctype with no exact hit falls back to the old
+    ``.*``-joined REGEXP over its one legacy column, which tolerates formatting
+    the index cannot key. If neither is found, AUTO-CREATES a Residential
     Customer + primary Contact (with ``ignore_permissions``) named from the
     Twilio caller id or "Unknown Caller" — unless ``create_if_missing`` is
     falsy (missed-call ingestion passes False so robocalls don't mint junk
@@ -207,6 +210,10 @@ def _get_caller_info(phone_number, twilio_caller_name=None, create_if_missing=Tr
     webhook (``receive_mms`` → ``locate_customer``) threw "Missing or Invalid
     Authorization Header". Runs as the CURRENT user — callers that need the
     Triton service user set it themselves.
+
+    The number is resolved through ``crm_enhancements.phone_index.lookup``:
+    Contact first, then a Customer linked to it, then a Customer holding the
+    number itself. Each is one indexed query unless nothing matches exactly.
     """
     if isinstance(create_if_missing, str):
         create_if_missing = create_if_missing.strip().lower() not in ("0", "false", "no", "")
@@ -214,34 +221,27 @@ def _get_caller_info(phone_number, twilio_caller_name=None, create_if_missing=Tr
     if not phone_number:
         return {"customer": None, "contact": None, "display_name": twilio_caller_name or "Unknown Caller", "context": []}
 
-    clean_number = re.sub(r'\D', '', phone_number)
-    match_suffix = clean_number[-10:] if len(clean_number) >= 10 else clean_number
-    fuzzy_regex = ".*".join(list(match_suffix))
-
     contact_name = None
     customer_name = None
     display_name = None
 
-    contacts = frappe.db.sql("""
-        SELECT name, first_name, last_name FROM `tabContact`
-        WHERE custom_phone_number REGEXP %s 
-        LIMIT 1""", (fuzzy_regex,), as_dict=True)
+    # Indexed exact match on the last 10 digits first; the old fuzzy REGEXP runs
+    # only when a doctype has no exact hit (crm_enhancements/phone_index.py).
+    contacts = phone_index.lookup(phone_number, ["Contact"])
 
     if contacts:
         contact_name = contacts[0].name
-        display_name = f"{contacts[0].first_name or ''} {contacts[0].last_name or ''}".strip()
+        first, last = frappe.db.get_value("Contact", contact_name, ["first_name", "last_name"]) or (None, None)
+        display_name = f"{first or ''} {last or ''}".strip()
         links = frappe.get_all("Dynamic Link", filters={"parent": contact_name, "parenttype": "Contact", "link_doctype": "Customer"}, fields=["link_name"])
         if links:
             customer_name = links[0].link_name
 
     if not customer_name:
-        customers = frappe.db.sql("""
-            SELECT name, customer_name FROM `tabCustomer` 
-            WHERE custom_accounts_phone_number REGEXP %s 
-            LIMIT 1""", (fuzzy_regex,), as_dict=True)
+        customers = phone_index.lookup(phone_number, ["Customer"])
         if customers:
             customer_name = customers[0].name
-            display_name = customers[0].customer_name
+            display_name = frappe.db.get_value("Customer", customer_name, "customer_name")
 
     if not customer_name and not contact_name and create_if_missing:
         fallback_name = twilio_caller_name if twilio_caller_name else f"Unknown Caller - {phone_number}"
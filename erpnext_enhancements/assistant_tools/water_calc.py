@@ -30,6 +30,7 @@ _CALCS = (
     "pipe_pressure_check",
     "total_dynamic_head",
     "select_pump",
+    "optimise_design",
     "chlorinator_feed",
     "chemistry_targets",
     "ozone_sidestream",
@@ -78,7 +79,10 @@ class WaterCalc(BaseTool):
             "for; PVC derates 73->110F to half); pipe_pressure_check {material, nominal_size, "
             "system_psi, temp_f} (is the pipe rated for the pressure? value = psi margin); "
             "total_dynamic_head {segments:[...], static_lift_ft}; select_pump "
-            "{flow_gpm, tdh_ft, candidates:[...]}. Orifice nozzle_flow {nozzle_profile, "
+            "{flow_gpm, tdh_ft, candidates:[...]}; optimise_design {segments:[...], flow_gpm, "
+            "static_lift_ft, candidates:[{...select_pump keys, price}], pipe_costs:{material:{size:$/ft}}, "
+            "years} (every size-per-segment x pump x material; options = the Pareto front of first "
+            "cost vs years of energy cost). Orifice nozzle_flow {nozzle_profile, "
             "supply_head_ft} computes Q=Cd*A*sqrt(2gh) from a Nozzle Profile's "
             "coefficients (or rated GPM @ head); without a profile use nozzle_array_flow "
             "with a rated GPM, or a weir. "
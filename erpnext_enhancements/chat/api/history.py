@@ -125,7 +125,7 @@ def _page(
 	endpoint that reads a transcript without recording it.
 	"""
 	size = page_size(limit)
-	scope = permissions.membership_filter_sql("`m`.`room`", seq_column="`m`.`seq`")
+	scope = permissions.membership_filter_sql("`m`.`room`", seq_column="`m`.`seq`", materialise=True)
 
 	params: dict[str, Any] = {"room": name, "limit": size}
 	where = [f"`m`.`room` = %(room)s", scope]
@@ -255,7 +255,7 @@ def get_message_context(message: str, limit: Any = None) -> dict[str, Any]:
 	# queries rather than one with a BETWEEN, because the room may have gaps (deleted rows
 	# keep their seq) and "50 rows either side" is what the client's scroll needs, not
 	# "seq ± 25".
-	scope = permissions.membership_filter_sql("`m`.`room`", seq_column="`m`.`seq`")
+	scope = permissions.membership_filter_sql("`m`.`room`", seq_column="`m`.`seq`", materialise=True)
 	thread_clause = (
 		"`m`.`thread_root` = %(thread)s" if thread_root else "`m`.`thread_root` is null"
 	)
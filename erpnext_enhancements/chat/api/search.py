@@ -9,14 +9,29 @@ one path the permission stack does not cover: ``permission_query_conditions`` is
 :func:`chat.permissions.membership_filter_sql` itself, and
 ``tests/test_chat_rawsql_guard.py`` fails the build if that ever stops being true.
 
-**Why ``LIKE`` and not ``MATCH``.** ``Chat Message.text_plain`` exists and is documented as
-suitable for a FULLTEXT index, but no FULLTEXT index has been created — Phase 1 shipped the
-column, not the index. At this data volume (a fifty-person company, currently zero stored
-messages) an indexed prefix scan plus a ``LIKE '%term%'`` filter over one user's rooms is
-comfortably fast, and adding a FULLTEXT index is a migration with its own rollout. The
-choice is stated rather than left implicit, per §4.4, and the upgrade path is one patch:
-``alter table `tabChat Message` add fulltext index (text_plain)`` plus a ``MATCH … AGAINST``
-branch here. Revisit when a room passes ~100k messages.
+**``MATCH``, with ``LIKE`` only where the index cannot answer.** This used to be
+``coalesce(text_plain, '') like '%term%'``, which no index can serve: every global search read
+every row of ``tabChat Message`` and ran the correlated membership ``EXISTS`` on each, so its
+latency grew with the company's whole history. ``text_plain`` now carries a FULLTEXT index
+(``patches/add_chat_message_fulltext_index.py``, created for retrieval), and a search is
+``MATCH … AGAINST`` in boolean mode over it, built by the same operator-stripping builder
+retrieval uses (:mod:`chat.retrieval.lexical`) with every term required and prefix-truncated,
+so ``inv`` still finds ``invoice``. The index hands back only the matching rows, and the
+membership filter runs on those — as the caller's room list, read once per search
+(``materialise=True``), rather than a membership probe per matched row.
+
+Two things the index cannot do are handled rather than ignored:
+
+* **Terms shorter than the indexed minimum** (``PO``, ``Q4``) are not in the index at all. A
+  query with some longer terms keeps the short ones as a ``LIKE`` over the rows the index
+  already matched, which is cheap. A query made only of short terms has nothing to ask the
+  index, and takes the old ``LIKE`` scan.
+* **A FULLTEXT index sees committed rows only**, so a message sent in the last instant is
+  found a moment later rather than at once. Nobody searches for what they just typed.
+
+Results are ranked by relevance, newest first among equals, and keyset-paged on that same
+order: the cursor is ``(before_score, before_seq)``, which the response returns as
+``next_cursor``. The unranked ``LIKE`` path pages on ``seq`` alone, as it always did.
 
 **The oversight read is audited.** Decision #12 lets a configured role read conversations it
 is not a participant in. ``membership_filter_sql`` returns ``"1 = 1"`` for that role — which
@@ -30,7 +45,8 @@ Indentation is tabs, per ``CLAUDE.md``.
 
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Sequence
+from typing import Any, NamedTuple
 
 import frappe
 from frappe.utils import cint
@@ -45,12 +61,18 @@ from erpnext_enhancements.chat.api._common import (
 	require_session,
 )
 from erpnext_enhancements.chat.links import build_chat_route
+from erpnext_enhancements.chat.retrieval import lexical
 
 #: Below this many characters a query matches so much that the result list is noise and the
 #: scan is a table scan. Two characters is the shortest useful search ("SO", "PO", a set of
 #: initials); one is not a search.
 MIN_QUERY_CHARS = 2
 
+#: Decimal places a relevance score is rounded to, in the query and in the cursor alike. The
+#: cursor compares ``score = before_score``; rounding both sides the same way is what makes
+#: that equality hold after a float has made a round trip through JSON.
+SCORE_PRECISION = 6
+
 #: Characters either side of the match in the returned snippet. Enough to read the sentence,
 #: short enough that fifty results are not a transcript.
 SNIPPET_RADIUS = 90
@@ -62,11 +84,17 @@ def search_messages(
 	room: str | None = None,
 	limit: Any = None,
 	before_seq: Any = None,
+	before_score: Any = None,
 ) -> dict[str, Any]:
 	"""Search the caller's readable history. Room-scoped when ``room`` is given.
 
-	Results are newest-first and keyset-paged on ``seq`` exactly like the transcript, so
-	"more results" costs the same at any depth.
+	Results are ranked by relevance, newest-first among equal scores, and keyset-paged on
+	that order: pass the previous page's ``next_cursor`` back as ``before_score`` and
+	``before_seq``, so "more results" costs the same at any depth. A ``before_seq`` sent
+	alone (the cursor from before results were ranked) gets the next matching rows
+	newest-first, ``ranked`` False, since a seq cursor cannot page a score order. A query the index cannot
+	answer (only terms under its minimum length) comes back unranked, newest-first and paged
+	on ``before_seq`` alone, exactly like the transcript; ``ranked`` says which.
 
 	Each result carries the deep link that opens it in context — built by
 	:func:`chat.links.build_chat_route`, the **one** builder this repo has, shared with
@@ -89,45 +117,17 @@ def search_messages(
 	else:
 		scoped_room = None
 
-	scope = permissions.membership_filter_sql("`m`.`room`", user, seq_column="`m`.`seq`")
-	privileged = scope == "1 = 1"
-
-	where = [
-		"coalesce(`m`.`is_deleted`, 0) = 0",
-		"coalesce(`m`.`text_plain`, '') like %(pattern)s",
-		scope,
-	]
-	params: dict[str, Any] = {
-		# escape() the term's own wildcards so a user searching for "100%" does not match
-		# every message in the company.
-		"pattern": "%" + term.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_") + "%",
-		"limit": size,
-	}
-	if scoped_room:
-		where.append("`m`.`room` = %(room)s")
-		params["room"] = scoped_room
-	if before_seq not in (None, ""):
-		where.append("`m`.`seq` < %(before_seq)s")
-		params["before_seq"] = cint(before_seq)
-
-	rows = frappe.db.sql(
-		f"""select
-				`m`.`name`, `m`.`room`, `m`.`seq`, `m`.`sender`, `m`.`sender_email`,
-				`m`.`sender_kind`, `m`.`text_plain`, `m`.`thread_root`, `m`.`creation`,
-				`r`.`title` as `room_title`, `r`.`room_type`,
-				`r`.`dm_user_1`, `r`.`dm_user_2`,
-				`u`.`full_name` as `sender_name`
-			from `tabChat Message` `m`
-			join `tabChat Room` `r` on `r`.`name` = `m`.`room`
-			left join `tabUser` `u` on `u`.`name` = `m`.`sender`
-			where {" and ".join(where)}
-			order by `m`.`seq` desc
-			limit %(limit)s""",
-		params,
-		as_dict=True,
+	page = _search_rows(
+		user,
+		term,
+		room=scoped_room,
+		size=size,
+		before_seq=before_seq,
+		before_score=before_score,
 	)
+	rows = page.rows
 
-	if privileged:
+	if page.scope == "1 = 1":
 		# **Unrestricted means the oversight role (or Administrator): a read of conversations
 		# this person is not in.** Recorded HERE rather than before the query, because before
 		# the query the rooms and the message ranges are not known yet, and "somebody
@@ -147,18 +147,161 @@ def search_messages(
 			message_count=len(rows),
 		)
 
-	results = [_result(row, term, user) for row in rows]
+	tokens = lexical.tokenize(term)
+	results = [_result(row, term, user, tokens) for row in rows]
+	has_more = len(rows) >= size
 	return {
 		"query": term,
 		"room": scoped_room,
 		"results": results,
-		"has_more": len(rows) >= size,
+		"has_more": has_more,
+		"ranked": page.ranked,
+		"next_cursor": _next_cursor(rows, page.ranked) if has_more else None,
 	}
 
 
-def _result(row: dict[str, Any], term: str, viewer: str) -> dict[str, Any]:
+class _Page(NamedTuple):
+	rows: list[dict[str, Any]]
+	ranked: bool
+	#: The membership fragment the query ran under; ``"1 = 1"`` is the unrestricted read.
+	scope: str
+
+
+def _search_rows(
+	user: str,
+	term: str,
+	*,
+	room: str | None,
+	size: int,
+	before_seq: Any = None,
+	before_score: Any = None,
+	ranked: bool | None = None,
+) -> _Page:
+	"""One page of matching rows the caller may read. The one place search touches SQL.
+
+	``ranked=None`` picks the FULLTEXT path whenever the query has a term the index holds;
+	``False`` forces the ``LIKE`` scan (``chat/bench_search.py`` times one against the other).
+	"""
+	scope = permissions.membership_filter_sql(
+		"`m`.`room`", user, seq_column="`m`.`seq`", materialise=True
+	)
+	expression = lexical.build_boolean_query(term, prefix=True)
+	if ranked is None:
+		ranked = bool(expression)
+	elif ranked and not expression:
+		return _Page([], True, scope)
+
+	where = ["coalesce(`m`.`is_deleted`, 0) = 0", scope]
+	params: dict[str, Any] = {"limit": size}
+	if room:
+		where.append("`m`.`room` = %(room)s")
+		params["room"] = room
+
+	if not ranked:
+		where.append("coalesce(`m`.`text_plain`, '') like %(pattern)s")
+		params["pattern"] = _like_pattern(term)
+		if before_seq not in (None, ""):
+			where.append("`m`.`seq` < %(before_seq)s")
+			params["before_seq"] = cint(before_seq)
+		rows = frappe.db.sql(
+			f"""select
+					`m`.`name`, `m`.`room`, `m`.`seq`, `m`.`sender`, `m`.`sender_email`,
+					`m`.`sender_kind`, `m`.`text_plain`, `m`.`thread_root`, `m`.`creation`,
+					`r`.`title` as `room_title`, `r`.`room_type`,
+					`r`.`dm_user_1`, `r`.`dm_user_2`,
+					`u`.`full_name` as `sender_name`
+				from `tabChat Message` `m`
+				join `tabChat Room` `r` on `r`.`name` = `m`.`room`
+				left join `tabUser` `u` on `u`.`name` = `m`.`sender`
+				where {" and ".join(where)}
+				order by `m`.`seq` desc
+				limit %(limit)s""",
+			params,
+			as_dict=True,
+		)
+		return _Page(rows, False, scope)
+
+	params["expression"] = expression
+	# Terms under the index's minimum length are not in it; they narrow the rows it matched.
+	for i, short in enumerate(lexical.dropped_terms(term)):
+		where.append(f"coalesce(`m`.`text_plain`, '') like %(short_{i})s")
+		params[f"short_{i}"] = _like_pattern(short)
+	having = ""
+	cursor_score = _score(before_score)
+	if cursor_score is not None and before_seq not in (None, ""):
+		having = (
+			"having `score` < %(before_score)s"
+			" or (`score` = %(before_score)s and `seq` < %(before_seq)s)"
+		)
+		params["before_score"] = cursor_score
+		params["before_seq"] = cint(before_seq)
+	# A seq-only cursor is the paging contract that predates ranking, and the unranked path
+	# above still takes it. Keyset-paging on seq is only sound in seq order, so that page is
+	# chronological (same MATCH filter, ``ranked`` False); in score order it would repeat
+	# rows page 1 served and skip lower-scored newer ones.
+	chronological = not having and before_score in (None, "") and before_seq not in (None, "")
+	if chronological:
+		where.append("`m`.`seq` < %(before_seq)s")
+		params["before_seq"] = cint(before_seq)
+	order = "`m`.`seq` desc" if chronological else "`score` desc, `m`.`seq` desc"
+	rows = frappe.db.sql(
+		f"""select
+				`m`.`name`, `m`.`room`, `m`.`seq`, `m`.`sender`, `m`.`sender_email`,
+				`m`.`sender_kind`, `m`.`text_plain`, `m`.`thread_root`, `m`.`creation`,
+				`r`.`title` as `room_title`, `r`.`room_type`,
+				`r`.`dm_user_1`, `r`.`dm_user_2`,
+				`u`.`full_name` as `sender_name`,
+				round(match(`text_plain`) against (%(expression)s in boolean mode), {SCORE_PRECISION})
+					as `score`
+			from `tabChat Message` `m`
+			join `tabChat Room` `r` on `r`.`name` = `m`.`room`
+			left join `tabUser` `u` on `u`.`name` = `m`.`sender`
+			where match(`text_plain`) against (%(expression)s in boolean mode)
+				and {" and ".join(where)}
+			{having}
+			order by {order}
+			limit %(limit)s""",
+		params,
+		as_dict=True,
+	)
+	return _Page(rows, not chronological, scope)
+
+
+def _like_pattern(term: str) -> str:
+	# escape() the term's own wildcards so a user searching for "100%" does not match every
+	# message in the company.
+	return "%" + term.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_") + "%"
+
+
+def _next_cursor(rows: list[dict[str, Any]], ranked: bool) -> dict[str, Any] | None:
+	"""Where the next page starts: the last row's ``seq``, and its score when ranked."""
+	if not rows:
+		return None
+	last = rows[-1]
+	cursor: dict[str, Any] = {"before_seq": cint(last.get("seq"))}
+	if ranked:
+		cursor["before_score"] = _score(last.get("score"))
+	return cursor
+
+
+def _score(value: Any) -> float | None:
+	"""A relevance score at :data:`SCORE_PRECISION`, or None for a missing or malformed one."""
+	if value in (None, ""):
+		return None
+	try:
+		return round(float(value), SCORE_PRECISION)
+	except (TypeError, ValueError):
+		return None
+
+
+def _result(
+	row: dict[str, Any], term: str, viewer: str, tokens: Sequence[str] = ()
+) -> dict[str, Any]:
 	"""One search hit, with a snippet and the shared deep link.
 
+	The snippet centres on the whole query where the body contains it, else on the first of
+	its ``tokens`` that it does — a ranked hit matches the words, not necessarily the phrase.
+
 	The snippet carries ``match_start``/``match_length`` rather than pre-wrapped ``<mark>``
 	HTML. Message bodies are user-authored, and handing the client a string of HTML to
 	``innerHTML`` is a stored-XSS vector with a straight path from any employee to every
@@ -177,12 +320,17 @@ def _result(row: dict[str, Any], term: str, viewer: str) -> dict[str, Any]:
 	"""
 	text = row.get("text_plain") or ""
 	lowered = text.lower()
-	index = lowered.find(term.lower())
+	index, needle = -1, term
+	for candidate in (term, *tokens):
+		index = lowered.find(candidate.lower())
+		if index >= 0:
+			needle = candidate
+			break
 	if index < 0:
 		snippet, offset = text[: SNIPPET_RADIUS * 2], -1
 	else:
 		start = max(0, index - SNIPPET_RADIUS)
-		end = min(len(text), index + len(term) + SNIPPET_RADIUS)
+		end = min(len(text), index + len(needle) + SNIPPET_RADIUS)
 		snippet = ("…" if start > 0 else "") + text[start:end] + ("…" if end < len(text) else "")
 		offset = index - start + (1 if start > 0 else 0)
 
@@ -204,7 +352,7 @@ def _result(row: dict[str, Any], term: str, viewer: str) -> dict[str, Any]:
 		"creation": row.get("creation") and str(row["creation"]) or None,
 		"snippet": snippet,
 		"match_start": offset,
-		"match_length": len(term) if offset >= 0 else 0,
+		"match_length": len(needle) if offset >= 0 else 0,
 		"thread": row.get("thread_root") or None,
 		"route": build_chat_route(
 			row["room"], message=row["name"], thread=row.get("thread_root") or None
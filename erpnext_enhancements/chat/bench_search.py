@@ -0,0 +1,226 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""Message search latency against history size: the ``LIKE`` scan beside the FULLTEXT path.
+
+    bench --site <site> execute erpnext_enhancements.chat.bench_search.run
+    bench --site <site> execute erpnext_enhancements.chat.bench_search.run \\
+        --kwargs "{'sizes': [10000, 100000]}"
+
+``search_messages`` used to be ``like '%term%'`` over every row of ``tabChat Message``, so a
+global search got slower with every message the company ever sent. It is now ``MATCH …
+AGAINST`` over the ``text_plain`` FULLTEXT index (see :mod:`chat.api.search`). The claim worth
+checking is the *shape*: the ``LIKE`` column should grow with the corpus, the ``MATCH``
+column with the number of hits, and nothing else.
+
+This grows one synthetic corpus through the checkpoints in ``sizes`` (1,000,000 messages by
+default) and, at each, times :func:`chat.api.search._search_rows` both ways — ``ranked=False``
+forces the old scan — for a rare term, a common one and a two-word query. Timings are the
+median of ``_REPEATS`` runs of one first page, in milliseconds.
+
+It runs on a bench through ``bench execute``, like :mod:`chat.bench_verify`, and takes the
+same precautions, through the same code: it refuses to start unless every chat table is empty
+and chat is dormant, tags its room with the run id, and removes everything in a ``finally``
+with :func:`chat.bench_verify._cleanup`, which then proves the tables are empty again. Rows
+are written with ``frappe.db.bulk_insert``, one commit per ``_BATCH``, so a million messages
+take minutes rather than the hours a ``Document.insert`` each would.
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+import time
+import traceback
+from typing import Any
+
+import frappe
+from frappe.utils import now_datetime
+
+from erpnext_enhancements.chat.api import search
+from erpnext_enhancements.chat.bench_verify import _cleanup, _refuse_reasons
+
+#: Corpus sizes at which the queries are timed. The corpus grows; it is not rebuilt.
+SIZES: tuple[int, ...] = (10_000, 100_000, 1_000_000)
+
+#: Rows per ``bulk_insert`` and per commit.
+_BATCH: int = 10_000
+
+#: Timed runs per query per checkpoint; the median is reported.
+_REPEATS: int = 5
+
+#: One message in this many carries the rare term; one in ``_COMMON_EVERY`` the common one.
+_RARE_EVERY: int = 10_000
+_COMMON_EVERY: int = 10
+
+_RARE_TERM = "zeolite"
+_COMMON_TERM = "pump"
+
+#: What is searched at every checkpoint: label, query.
+_QUERIES: tuple[tuple[str, str], ...] = (
+	("rare word", _RARE_TERM),
+	("common word", _COMMON_TERM),
+	("two words", f"{_COMMON_TERM} {_RARE_TERM}"),
+)
+
+#: Filler vocabulary. Neither search term is in it, so the hit counts are exactly the planted ones.
+_WORDS: tuple[str, ...] = (
+	"the", "fountain", "basin", "install", "crew", "schedule", "tomorrow", "client", "quote",
+	"invoice", "approved", "nozzle", "lighting", "order", "delivery", "site", "visit", "tile",
+	"coping", "filter", "electrical", "permit", "drawing", "revision", "weekend", "photos",
+	"concrete", "liner", "leak", "test", "pressure", "valve", "manifold", "return", "drain",
+)
+
+_MESSAGE_COLUMNS: tuple[str, ...] = (
+	"name",
+	"creation",
+	"modified",
+	"modified_by",
+	"owner",
+	"docstatus",
+	"room",
+	"seq",
+	"sender",
+	"sender_kind",
+	"message_type",
+	"text",
+	"text_plain",
+	"client_message_id",
+	"sync_state",
+	"sync_origin",
+	"is_deleted",
+)
+
+
+def run(sizes: list[int] | tuple[int, ...] = SIZES, cleanup: bool = True) -> list[dict[str, Any]]:
+	"""Grow the corpus through ``sizes``, time both search paths at each, print a table.
+
+	Returns the measurements, one dict per checkpoint and query, so a caller can keep them.
+	"""
+	print("=" * 96)
+	print("chat bench_search — message search latency against history size")
+	print("=" * 96)
+
+	refusals = _refuse_reasons()
+	if refusals:
+		print("\nREFUSING TO RUN:\n")
+		for reason in refusals:
+			print(f"  - {reason}")
+		print("\nNothing was created.")
+		return []
+
+	run_id = frappe.generate_hash(length=8).lower()
+	user = frappe.session.user
+	room: str | None = None
+	measurements: list[dict[str, Any]] = []
+
+	print(f"\nsite    : {frappe.local.site}")
+	print(f"run id  : {run_id}   (the scratch room's title carries it)")
+	print(f"user    : {user}   (searches as this member of the scratch room)\n")
+
+	try:
+		room = _scratch_room(run_id, user)
+		rng = random.Random(run_id)
+		written = 0
+		for size in sorted(set(sizes)):
+			while written < size:
+				batch = min(_BATCH, size - written)
+				_insert_messages(room, user, written, batch, rng)
+				written += batch
+				frappe.db.commit()
+			frappe.db.set_value("Chat Room", room, "seq_high_water", written, update_modified=False)
+			frappe.db.commit()
+			for label, query in _QUERIES:
+				measurements.append(_measure(user, size, label, query))
+	except Exception:
+		print(traceback.format_exc())
+	finally:
+		removed = _cleanup(room, run_id) if cleanup else "SKIPPED (cleanup=False)"
+
+	print(f"{'messages':>10}  {'query':<12} {'rows':>6}  {'LIKE ms':>9}  {'MATCH ms':>9}  {'speed-up':>8}")
+	for row in measurements:
+		speedup = row["like_ms"] / row["match_ms"] if row["match_ms"] else float("inf")
+		print(
+			f"{row['messages']:>10,}  {row['query']:<12} {row['hits']:>6}  "
+			f"{row['like_ms']:>9.1f}  {row['match_ms']:>9.1f}  {speedup:>7.1f}x"
+		)
+	print("-" * 96)
+	print(f"cleanup : {removed}")
+	return measurements
+
+
+def _scratch_room(run_id: str, user: str) -> str:
+	doc = frappe.new_doc("Chat Room")
+	doc.room_type = "Group"
+	doc.title = f"bench_search probe {run_id}"
+	doc.provisioning_mode = "Not Mirrored"
+	doc.insert(ignore_permissions=True)
+
+	member = frappe.new_doc("Chat Room Member")
+	member.room = doc.name
+	member.user = user
+	member.role = "Manager"
+	member.is_active = 1
+	member.sync_state = "Not Mirrored"
+	member.insert(ignore_permissions=True)
+	frappe.db.commit()
+	return doc.name
+
+
+def _insert_messages(room: str, user: str, start: int, count: int, rng: random.Random) -> None:
+	"""``count`` synthetic messages with ``seq`` from ``start + 1``, planted terms included."""
+	now = now_datetime()
+	values = []
+	for seq in range(start + 1, start + count + 1):
+		words = rng.choices(_WORDS, k=rng.randint(6, 24))
+		if seq % _COMMON_EVERY == 0:
+			words.insert(rng.randrange(len(words)), _COMMON_TERM)
+		if seq % _RARE_EVERY == 0:
+			words.insert(rng.randrange(len(words)), _RARE_TERM)
+		text = " ".join(words)
+		values.append(
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				user,
+				user,
+				0,
+				room,
+				seq,
+				user,
+				"Human",
+				"Text",
+				text,
+				text,
+				f"bench-search-{seq}",
+				"Not Mirrored",
+				"ERPNext",
+				0,
+			)
+		)
+	frappe.db.bulk_insert("Chat Message", _MESSAGE_COLUMNS, values)
+
+
+def _measure(user: str, size: int, label: str, query: str) -> dict[str, Any]:
+	"""Median first-page time of a global search for ``query``, scan then index.
+
+	``hits`` is the first page's row count, so it tops out at the page size.
+	"""
+	timings: dict[bool, float] = {}
+	hits = 0
+	for ranked in (False, True):
+		samples = []
+		for _ in range(_REPEATS):
+			started = time.perf_counter()
+			page = search._search_rows(user, query, room=None, size=25, ranked=ranked)
+			samples.append((time.perf_counter() - started) * 1000)
+		timings[ranked] = statistics.median(samples)
+		hits = max(hits, len(page.rows))
+	return {
+		"messages": size,
+		"query": label,
+		"hits": hits,
+		"like_ms": timings[False],
+		"match_ms": timings[True],
+	}
@@ -178,6 +178,10 @@ class ChatSettings(Document):
 			context_token_ceiling=cint(self.get("context_token_ceiling")),
 			semantic_tier_enabled=bool(cint(self.get("semantic_tier_enabled"))),
 			lexical_tier_enabled=bool(cint(self.get("lexical_tier_enabled"))),
+			semantic_index=self.get("semantic_index") or "Exact",
+			ann_nprobe=cint(self.get("ann_nprobe")),
+			ann_rerank_depth=cint(self.get("ann_rerank_depth")),
+			embed_concurrency=cint(self.get("embed_concurrency")),
 		)
 
 	def _retention_errors(self) -> list[str]:
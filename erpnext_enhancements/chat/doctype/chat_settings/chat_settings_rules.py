@@ -41,6 +41,10 @@ ADR_BUDGET_T2_CROSS: int = 14_000
 ADR_BUDGET_T3_AUTHORED: int = 6_000
 ADR_BUDGET_RESERVE: int = 2_000
 
+# The embedding sweep's in-flight ceiling. chat/indexing/embed_plan.MAX_CONCURRENCY is the
+# same number, restated because this module imports nothing; the budget test pins the two.
+MAX_EMBED_CONCURRENCY: int = 16
+
 # Anything matching one of these in an identifier field is a credential somebody pasted
 # into the wrong box. ADR §F.13's whole point is that Chat Settings holds no secret, and a
 # Data field is exactly where a service-account JSON goes when a human is in a hurry.
@@ -203,6 +207,10 @@ def validate_retrieval(
 	context_token_ceiling: float,
 	semantic_tier_enabled: bool,
 	lexical_tier_enabled: bool,
+	semantic_index: str = "Exact",
+	ann_nprobe: float = 0,
+	ann_rerank_depth: float = 0,
+	embed_concurrency: float = 1,
 ) -> list[str]:
 	"""Check the Phase 5 retrieval and indexing dials. Returns error strings.
 
@@ -282,6 +290,31 @@ def validate_retrieval(
 				"alert nobody reads, which is worse than not having one."
 			)
 
+	if not 1 <= embed_concurrency <= MAX_EMBED_CONCURRENCY:
+		errors.append(
+			f"Embed Concurrency must be between 1 and {MAX_EMBED_CONCURRENCY} (got "
+			f"{embed_concurrency}). Zero would stop the embedding sweep outright, and past the "
+			"ceiling the provider's quota answers with 429s rather than with vectors."
+		)
+
+	if semantic_index == "Approximate":
+		if ann_nprobe <= 0:
+			errors.append(
+				f"ANN Lists Probed must be greater than zero (got {ann_nprobe}). Probing no list "
+				"scores nothing, and the semantic tier would return nothing while switched on."
+			)
+		if ann_rerank_depth > 0 and retrieval_top_k > 0 and ann_rerank_depth < retrieval_top_k:
+			errors.append(
+				f"ANN Rerank Depth ({ann_rerank_depth}) is below Retrieval Top K "
+				f"({retrieval_top_k}). The approximate index hands fusion a semantic ranking "
+				"only that long, so the semantic tier could never fill the top-K it is asked for."
+			)
+		elif ann_rerank_depth <= 0:
+			errors.append(
+				f"ANN Rerank Depth must be greater than zero (got {ann_rerank_depth}). It is the "
+				"length of the semantic ranking; zero makes the approximate tier rank nothing."
+			)
+
 	if not semantic_tier_enabled and not lexical_tier_enabled:
 		errors.append(
 			"Both the Semantic Tier and the Lexical Tier are switched off. Retrieval would "
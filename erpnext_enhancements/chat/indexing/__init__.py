@@ -17,5 +17,6 @@ here is reachable from a document event, and every entry point is a scheduler jo
 |---|---|
 | ``chunker`` | **pure.** Where a chunk ends, and the tail that is deliberately not indexed |
 | ``embed`` | the Vertex AI REST client. No SDK — the host cannot install one |
+| ``embed_plan`` | **pure.** How an embedding pass dedupes bodies, batches them and runs requests concurrently |
 | ``digest`` | the scheduler-driven batch summariser and its invalidation |
 """
@@ -0,0 +1,294 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""The writer half of the approximate semantic index: its columns, its codebook, its codes.
+
+:mod:`chat.retrieval.ann` explains the structure. This module keeps the stored half of it
+current, and nothing it writes is load-bearing for correctness — the gate encodes any row
+whose code is missing or was written under another codebook when it packs the room. What it
+buys is that the gate normally does not have to: a room packs from ``ann_code`` alone, and the
+6 KiB vector column stays on disk.
+
+--------------------------------------------------------------------------------------
+The columns
+--------------------------------------------------------------------------------------
+
+``ann_version`` (the codebook a code was written under), ``ann_list`` and ``ann_code`` on
+``Chat Context Chunk``, by raw DDL, for the reason ``embedding_column`` gives for
+``embedding_f32``: ``ann_code`` is binary and no fieldtype maps to a binary column. The other
+two go with it so that the three are added, and if ``bench trim-tables`` is ever run, lost,
+together.
+
+--------------------------------------------------------------------------------------
+The codebook
+--------------------------------------------------------------------------------------
+
+Trained once the corpus reaches :data:`ann.MIN_TRAIN_ROWS` embedded chunks, on a sample of at
+most :data:`TRAIN_SAMPLE` of them ordered by ``crc32(name)`` — deterministic, and spread over
+the whole table rather than its newest corner. Written to the site's private files
+(:data:`ann.CODEBOOK_FILE`), which every container of a bench shares.
+
+It is **derived from conversation**, in the way a digest is, though far more weakly: each
+centroid is the mean of a few hundred chunk vectors, and no centroid is any one chunk.
+Retired chunks are excluded from the sample for that reason. It is never retrained
+automatically, because a retrain makes every stored code stale at once and the next question
+in every room then pays the encode; :func:`train_ann_codebook` is the deliberate, operator-run
+way to do it after the corpus has changed shape.
+
+--------------------------------------------------------------------------------------
+The sweep
+--------------------------------------------------------------------------------------
+
+:func:`sweep_ann_codes` trains when there is no codebook and there is enough to train on, then
+encodes a bounded number of rows whose code is missing or stale. ``sweep_embeddings`` codes
+new vectors as it writes them, so in steady state this finds nothing; it exists for the
+backlog after the first train, after a retrain, and for rows embedded while the approximate
+index was switched off. It pages by ``name`` within a pass so an unreadable row is passed over
+rather than re-read forever.
+
+No-ops unless chat is enabled, the semantic tier is on and ``Chat Settings.semantic_index`` is
+``Approximate``.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import frappe
+from frappe.utils import cint
+
+from erpnext_enhancements.chat.retrieval import ann
+
+CHUNK_DOCTYPE = "Chat Context Chunk"
+ROOM_DOCTYPE = "Chat Room"
+
+#: ``(column, definition)`` — added after ``embedding_f32`` in this order. Not DocFields; see
+#: the module docstring.
+ANN_COLUMNS: tuple[tuple[str, str], ...] = (
+	("ann_version", "varchar(32) null"),
+	("ann_list", "int null"),
+	("ann_code", "blob null"),
+)
+
+#: Vectors read to train a codebook. Enough for 256 sub-centroids per sub-space many times
+#: over; more buys little and costs the training job minutes.
+TRAIN_SAMPLE: int = 20_000
+
+#: Rows coded per committed batch, and batches per pass — the bound every sweep in this
+#: package has, so a pass over a large backlog is not one a deploy kills halfway.
+ENCODE_BATCH: int = 1_000
+ENCODE_BATCHES_PER_PASS: int = 10
+
+
+def ensure_ann_columns() -> bool:
+	"""Add any missing ANN column. ``after_migrate`` / ``after_install``. Never raises.
+
+	Returns whether all three exist afterwards.
+	"""
+	try:
+		if not frappe.db.table_exists(CHUNK_DOCTYPE, cached=False):
+			return False
+		previous = "embedding_f32"
+		for column, definition in ANN_COLUMNS:
+			if not _has_column(column):
+				frappe.db.sql_ddl(
+					f"alter table `tab{CHUNK_DOCTYPE}` add column `{column}` {definition} after `{previous}`"
+				)
+			previous = column
+		return all(_has_column(column) for column, _definition in ANN_COLUMNS)
+	except Exception as exc:
+		_note(f"could not add the ANN columns: {exc.__class__.__name__}")
+		return False
+
+
+def sweep_ann_codes() -> dict[str, int]:
+	"""Scheduler job, hourly. Train if there is no codebook yet, then code a bounded backlog."""
+	counts = {"trained": 0, "encoded": 0, "unreadable": 0}
+	if not _enabled() or not _approximate() or not ensure_ann_columns():
+		return counts
+
+	codebook = ann.load_codebook(_codebook_path())
+	if codebook is None:
+		if _embedded_count() < ann.MIN_TRAIN_ROWS:
+			return counts
+		codebook = _train(TRAIN_SAMPLE)
+		if codebook is None:
+			return counts
+		counts["trained"] = 1
+
+	after = ""
+	for _batch in range(ENCODE_BATCHES_PER_PASS):
+		rows = _uncoded_rows(codebook, after=after, limit=ENCODE_BATCH)
+		if not rows:
+			break
+		after = rows[-1][0]
+		encoded, unreadable = _encode_and_store(codebook, rows)
+		counts["encoded"] += encoded
+		counts["unreadable"] += unreadable
+		frappe.db.commit()
+	return counts
+
+
+def train_ann_codebook(sample_size: int = TRAIN_SAMPLE) -> dict[str, Any]:
+	"""Operator-run retrain, ``bench execute`` only. Replaces the codebook whatever the mode.
+
+	Every stored code becomes stale the moment the new file lands; the gate encodes per room
+	until :func:`sweep_ann_codes` has caught up. Returns sizes and the new version — never a
+	chunk name and never a vector.
+	"""
+	if not ensure_ann_columns():
+		return {"trained": 0}
+	started = time.monotonic()
+	codebook = _train(max(cint(sample_size), ann.KSUB))
+	if codebook is None:
+		return {"trained": 0}
+	return {
+		"trained": 1,
+		"version": codebook.version,
+		"nlist": codebook.nlist,
+		"m": codebook.m,
+		"seconds": round(time.monotonic() - started, 1),
+	}
+
+
+# ------------------------------------------------------------------------------ internals
+
+
+def _train(sample_size: int) -> ann.Codebook | None:
+	from erpnext_enhancements.chat.retrieval import vectors
+
+	dim = cint(_setting("embedding_dim"))
+	sample = []
+	for stored in _training_rows(dim=dim, limit=sample_size):
+		try:
+			sample.append(vectors.decode_vector(stored, expected_dim=dim or None))
+		except vectors.VectorBackendError:
+			continue
+	if len(sample) < ann.KSUB:
+		_note(f"ANN codebook not trained: {len(sample)} readable vectors, {ann.KSUB} needed")
+		return None
+	numpy = vectors._numpy()
+	codebook = ann.train_codebook(numpy.vstack(sample), nlist=ann.default_nlist(_embedded_count()))
+	ann.save_codebook(codebook, _codebook_path())
+	return codebook
+
+
+def _encode_and_store(codebook: ann.Codebook, rows: list[tuple[str, Any]]) -> tuple[int, int]:
+	from erpnext_enhancements.chat.retrieval import vectors
+
+	names: list[str] = []
+	decoded: list[Any] = []
+	unreadable = 0
+	for name, stored in rows:
+		try:
+			decoded.append(vectors.normalise(vectors.decode_vector(stored, expected_dim=codebook.dim)))
+		except vectors.VectorBackendError:
+			unreadable += 1
+			continue
+		names.append(name)
+	if not names:
+		return 0, unreadable
+	lists, codes = codebook.encode(vectors._numpy().vstack(decoded))
+	for name, ann_list, code in zip(names, lists.tolist(), codes, strict=True):
+		frappe.db.sql(
+			f"""
+			update `tab{CHUNK_DOCTYPE}`
+			set `ann_version` = %(version)s, `ann_list` = %(ann_list)s, `ann_code` = %(code)s
+			where `name` = %(name)s
+			""",
+			{"name": name, "version": codebook.version, "ann_list": ann_list, "code": code.tobytes()},
+		)
+	return len(names), unreadable
+
+
+def _uncoded_rows(codebook: ann.Codebook, *, after: str, limit: int) -> list[tuple[str, Any]]:
+	"""Embedded rows after ``after`` by name whose code is missing or from another codebook."""
+	return [
+		(row[0], row[1] if row[1] is not None else row[2])
+		for row in frappe.db.sql(
+			f"""
+			select `name`, `embedding_f32`, `embedding`
+			from `tab{CHUNK_DOCTYPE}`
+			where `name` > %(after)s
+				and `sealed` = 1
+				and `is_stale` = 0
+				and (`embedding_f32` is not null or (`embedding` is not null and `embedding` != ''))
+				and (`ann_version` is null or `ann_version` != %(version)s)
+			order by `name`
+			limit %(limit)s
+			""",
+			{"after": after, "version": codebook.version, "limit": max(cint(limit), 1)},
+		)
+		or []
+	]
+
+
+def _training_rows(*, dim: int, limit: int) -> list[Any]:
+	"""Stored vectors of the training sample: current dimension, not stale, not retired."""
+	return [
+		row[0] if row[0] is not None else row[1]
+		for row in frappe.db.sql(
+			f"""
+			select `embedding_f32`, `embedding`
+			from `tab{CHUNK_DOCTYPE}` chunk
+			where chunk.`sealed` = 1
+				and chunk.`is_stale` = 0
+				and chunk.`embedding_dim` = %(dim)s
+				and (chunk.`embedding_f32` is not null or (chunk.`embedding` is not null and chunk.`embedding` != ''))
+				and chunk.`first_seq` > coalesce(
+					(select `retired_below_seq` from `tab{ROOM_DOCTYPE}` where `name` = chunk.`room`), 0
+				)
+			order by crc32(chunk.`name`)
+			limit %(limit)s
+			""",
+			{"dim": dim, "limit": max(cint(limit), 1)},
+		)
+		or []
+	]
+
+
+def _embedded_count() -> int:
+	rows = frappe.db.sql(
+		f"""
+		select count(*)
+		from `tab{CHUNK_DOCTYPE}`
+		where `sealed` = 1
+			and `is_stale` = 0
+			and (`embedding_f32` is not null or (`embedding` is not null and `embedding` != ''))
+		"""
+	)
+	return cint(rows[0][0]) if rows else 0
+
+
+def _has_column(column: str) -> bool:
+	try:
+		return bool(frappe.db.sql(f"show columns from `tab{CHUNK_DOCTYPE}` like %s", (column,)))
+	except Exception:
+		return False
+
+
+def _codebook_path() -> str:
+	return frappe.get_site_path(*ann.CODEBOOK_FILE)
+
+
+def _enabled() -> bool:
+	return bool(cint(_setting("enabled"))) and bool(cint(_setting("semantic_tier_enabled")))
+
+
+def _approximate() -> bool:
+	return (_setting("semantic_index") or "") == ann.MODE_APPROXIMATE
+
+
+def _setting(fieldname: str) -> Any:
+	try:
+		return frappe.db.get_single_value("Chat Settings", fieldname)
+	except Exception:
+		return None
+
+
+def _note(message: str) -> None:
+	try:
+		frappe.log_error(message, "Chat Indexing")
+	except Exception:
+		pass
@@ -49,6 +49,7 @@ that way once.
 from __future__ import annotations
 
 import hashlib
+from collections.abc import Callable
 from typing import Any
 
 import frappe
@@ -137,9 +138,32 @@ def embed_documents(texts: list[str]) -> list[list[float]]:
 	return _embed(texts, task_type=TASK_DOCUMENT)
 
 
+def document_embedder() -> Callable[[list[str]], list[list[float]]]:
+	"""A ``texts -> vectors`` callable for one indexing pass, safe to call from pool threads.
+
+	Settings and the access token are read **here**, on the calling thread, once; the callable
+	returned does HTTP and nothing else, because Frappe's database connection is thread-local
+	and a pool thread has none (see :mod:`chat.indexing.embed_plan`). A token outlives any
+	bounded pass by a wide margin, so one per pass is enough. Raises
+	:class:`EmbeddingError` from here when the provider cannot be reached at all, and from the
+	callable per request, exactly as :func:`embed_documents` does.
+	"""
+	request = _prepare(TASK_DOCUMENT)
+
+	def post(texts: list[str]) -> list[list[float]]:
+		if len(texts) > MAX_BATCH:
+			raise EmbeddingError(f"{len(texts)} texts exceeds the per-request cap of {MAX_BATCH}.")
+		return _post(request, texts)
+
+	return post
+
+
 def _embed(texts: list[str], *, task_type: str) -> list[list[float]]:
-	import requests
+	return _post(_prepare(task_type), texts)
+
 
+def _prepare(task_type: str) -> dict[str, Any]:
+	"""Everything a request needs that comes from the site: URL, headers, dimension, timeout."""
 	from erpnext_enhancements.chat.gchat import auth
 
 	model, dim = _model_and_dim()
@@ -148,22 +172,38 @@ def _embed(texts: list[str], *, task_type: str) -> list[list[float]]:
 		raise EmbeddingError("Chat Settings has no Google project id, so Vertex AI cannot be reached.")
 
 	timeout = cint(_setting("http_timeout_seconds")) or 30
-	url = (
-		f"https://{DEFAULT_LOCATION}-aiplatform.googleapis.com/v1/projects/{project}"
-		f"/locations/{DEFAULT_LOCATION}/publishers/google/models/{model}:predict"
-	)
+	try:
+		token = auth.get_vm_access_token(timeout)
+	except Exception as exc:
+		# `from None` deliberately: the frames above hold the Authorization header.
+		raise EmbeddingError(f"Vertex AI embedding request failed: {exc.__class__.__name__}") from None
+	return {
+		"url": (
+			f"https://{DEFAULT_LOCATION}-aiplatform.googleapis.com/v1/projects/{project}"
+			f"/locations/{DEFAULT_LOCATION}/publishers/google/models/{model}:predict"
+		),
+		"headers": {"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+		"dim": dim,
+		"task_type": task_type,
+		"timeout": timeout,
+	}
+
+
+def _post(request: dict[str, Any], texts: list[str]) -> list[list[float]]:
+	"""One ``:predict`` call. Touches no Frappe state, so it may run on any thread."""
+	import requests
+
 	payload: dict[str, Any] = {
-		"instances": [{"content": text, "task_type": task_type} for text in texts],
-		"parameters": {"outputDimensionality": dim},
+		"instances": [{"content": text, "task_type": request["task_type"]} for text in texts],
+		"parameters": {"outputDimensionality": request["dim"]},
 	}
 
 	try:
-		token = auth.get_vm_access_token(timeout)
 		response = requests.post(
-			url,
+			request["url"],
 			json=payload,
-			headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
-			timeout=timeout,
+			headers=request["headers"],
+			timeout=request["timeout"],
 		)
 	except Exception as exc:
 		# `from None` deliberately: the frames above hold the Authorization header.
@@ -0,0 +1,145 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""How an embedding pass is cut into requests, and how those requests are run. **Pure — stdlib only.**
+
+:func:`chat.indexing.indexer.sweep_embeddings` used to send one request of twenty chunks per
+ten-minute tick, so switching semantic search on for a busy site left a backlog that took
+days to drain. A pass now reads many requests' worth of rows and this module decides what to
+send and how:
+
+1. **Dedupe by content hash.** Two chunk rows with the same body get the same vector, so the
+   body is sent once and the vector is written to both. ``content_hash`` is already on the
+   row (sha256 of the sealed body); a row without one is hashed here, the same way.
+2. **Batch to the provider's cap.** Unique bodies are packed into requests of at most
+   :data:`chat.indexing.embed.MAX_BATCH`, in the order the rows were read, so the most recent
+   history is embedded first, as before.
+3. **Run a bounded number at once.** :func:`dispatch` keeps at most ``concurrency`` requests
+   in flight on a thread pool and yields each result *as it completes*, so the caller writes
+   one batch to the database while the next ones are still on the wire.
+
+--------------------------------------------------------------------------------------
+What runs on the pool threads, and what must not
+--------------------------------------------------------------------------------------
+
+Only the ``post`` callable. Frappe's database connection and request state are thread-local
+to the worker's main thread, so a pool thread that touched ``frappe.db`` would get no
+connection or another request's. The caller therefore resolves settings and the access token
+first and hands :func:`dispatch` a closure that does nothing but HTTP; every read and write
+stays on the main thread, in the generator's consumer.
+
+A failed request is **yielded, not raised**: one batch hitting a 429 must not discard the
+twenty that succeeded beside it, and the failure belongs to that batch's rows only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+#: The most requests a pass keeps in flight, whatever ``Chat Settings.embed_concurrency``
+#: says. Each one holds a socket and up to ``MAX_BATCH`` bodies' worth of JSON; past a
+#: handful the provider's per-project quota, not this worker, is the limit.
+MAX_CONCURRENCY: int = 16
+
+
+@dataclass(frozen=True)
+class Batch:
+	"""One request: unique bodies, and the content hash each one stands for."""
+
+	hashes: tuple[str, ...]
+	texts: tuple[str, ...]
+
+
+@dataclass
+class EmbedPlan:
+	"""A pass, cut up. ``rows_by_hash`` is every chunk row a hash's vector must be written to."""
+
+	batches: list[Batch] = field(default_factory=list)
+	rows_by_hash: dict[str, list[str]] = field(default_factory=dict)
+
+	@property
+	def rows(self) -> int:
+		return sum(len(names) for names in self.rows_by_hash.values())
+
+	@property
+	def unique(self) -> int:
+		return len(self.rows_by_hash)
+
+
+def body_hash(body: str) -> str:
+	"""sha256 of a body — the same function ``Chat Context Chunk.content_hash`` stores."""
+	return hashlib.sha256((body or "").encode("utf-8")).hexdigest()
+
+
+def plan(
+	rows: Iterable[tuple[str, str, str | None]],
+	*,
+	batch_size: int,
+	skip_hashes: frozenset[str] = frozenset(),
+) -> EmbedPlan:
+	"""Cut ``(name, body, content_hash)`` rows into deduplicated requests of ``batch_size``.
+
+	A hash in ``skip_hashes`` is still recorded in ``rows_by_hash`` — its rows still need the
+	vector — but is not sent: the caller already has a vector for it.
+	"""
+	size = max(int(batch_size), 1)
+	result = EmbedPlan()
+	texts: dict[str, str] = {}
+	for name, body, stored_hash in rows:
+		digest = (stored_hash or "").strip() or body_hash(body)
+		names = result.rows_by_hash.setdefault(digest, [])
+		names.append(name)
+		if len(names) == 1 and digest not in skip_hashes:
+			texts[digest] = body or ""
+	pending = list(texts.items())
+	for start in range(0, len(pending), size):
+		chunk = pending[start : start + size]
+		result.batches.append(
+			Batch(hashes=tuple(digest for digest, _ in chunk), texts=tuple(text for _, text in chunk))
+		)
+	return result
+
+
+def dispatch(
+	batches: Sequence[Batch],
+	post: Callable[[list[str]], list[list[float]]],
+	*,
+	concurrency: int,
+) -> Iterator[tuple[Batch, list[list[float]] | Exception]]:
+	"""Run ``post`` over ``batches`` with at most ``concurrency`` in flight, yielding as each ends.
+
+	Yields ``(batch, vectors)`` or ``(batch, exception)``. Completion order, not submission
+	order — the caller keys on the batch. A consumer that stops early leaves the in-flight
+	requests to finish and discards their results; nothing further is submitted.
+	"""
+	if not batches:
+		return
+	workers = min(max(int(concurrency), 1), MAX_CONCURRENCY, len(batches))
+	if workers == 1:
+		for batch in batches:
+			yield batch, _call(post, batch)
+		return
+
+	queue = list(reversed(batches))
+	with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat-embed") as pool:
+		running: dict[Future, Batch] = {}
+		while queue or running:
+			while queue and len(running) < workers:
+				batch = queue.pop()
+				running[pool.submit(_call, post, batch)] = batch
+			done, _pending = wait(running, return_when=FIRST_COMPLETED)
+			for future in done:
+				yield running.pop(future), future.result()
+
+
+def _call(post: Callable[[list[str]], list[list[float]]], batch: Batch) -> list[list[float]] | Exception:
+	try:
+		vectors = post(list(batch.texts))
+	except Exception as exc:
+		return exc
+	if len(vectors) != len(batch.texts):
+		return ValueError(f"{len(vectors)} vectors for {len(batch.texts)} texts")
+	return vectors
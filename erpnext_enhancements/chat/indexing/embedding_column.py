@@ -0,0 +1,155 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""The binary embedding column on ``Chat Context Chunk``, and the backfill that fills it.
+
+``Chat Context Chunk.embedding`` was a ``Long Text`` of base64 over raw ``float32`` bytes,
+because Frappe has no BLOB fieldtype. That cost a third again in storage and in every row the
+gate read, and a base64 decode per vector on the retrieval path. ``embedding_f32`` is the raw
+``longblob`` the original decision recorded as the deferred optimisation.
+
+--------------------------------------------------------------------------------------
+Why the column is DDL and not a DocField
+--------------------------------------------------------------------------------------
+
+There is no fieldtype that maps to a binary column. Declaring the nearest one (``Long Text``)
+and altering the column afterwards does not work: schema sync compares the column against the
+DocField on every migrate and alters it back to ``longtext``, and a charset conversion over
+arbitrary bytes is silent corruption rather than an error. So the column is added here, by
+raw DDL, from both a patch and an ``after_migrate``/``after_install`` backstop, exactly as the
+Phase 5 FULLTEXT index is.
+
+The one operation that removes it is ``bench trim-tables``, which drops columns no DocField
+declares. That is survivable rather than safe: the backstop re-adds the column empty on the
+next migrate, and :func:`chat.indexing.indexer.sweep_embeddings` re-embeds every chunk with no
+vector in either column — at the embedding provider's price. Do not trim this table.
+
+--------------------------------------------------------------------------------------
+The backfill
+--------------------------------------------------------------------------------------
+
+:func:`backfill_embedding_column` walks the legacy rows in primary-key order, a bounded batch
+at a time, converts each base64 string to bytes, writes the bytes and clears the base64 in the
+same statement, and commits per batch. Keyset paging on ``name`` rather than ``offset``, so a
+batch costs the same at the end of the table as at the start, and a rerun after a kill resumes
+where it stopped because converted rows no longer match. ``embedded_at`` is left alone: the
+vector is the same vector, and the gate's fingerprint must not treat a change of storage as a
+change of content.
+
+A row whose base64 does not decode is left exactly as it is and counted. It was unreadable
+before and stays unreadable; converting it to garbage bytes would hide that.
+"""
+
+from __future__ import annotations
+
+import frappe
+from frappe.utils import cint
+
+CHUNK_DOCTYPE = "Chat Context Chunk"
+
+#: The binary column. Not a DocField — see the module docstring.
+BLOB_COLUMN = "embedding_f32"
+
+#: Legacy rows converted per committed batch. Bounded for the reason every sweep in this
+#: package is: a migrate step whose duration scales with the table is one a deploy kills.
+BACKFILL_BATCH: int = 500
+
+
+def ensure_embedding_column() -> bool:
+	"""Add ``embedding_f32`` if it is missing. ``after_migrate`` / ``after_install``. Never raises.
+
+	Returns whether the column exists afterwards, so the patch can refuse to backfill into a
+	column that is not there.
+	"""
+	try:
+		if not frappe.db.table_exists(CHUNK_DOCTYPE, cached=False):
+			return False
+		if _has_blob_column():
+			return True
+		frappe.db.sql_ddl(
+			f"alter table `tab{CHUNK_DOCTYPE}` add column `{BLOB_COLUMN}` longblob null after `embedding`"
+		)
+		return _has_blob_column()
+	except Exception as exc:
+		_note(f"could not add {BLOB_COLUMN}: {exc.__class__.__name__}")
+		return False
+
+
+def backfill_embedding_column(batch_size: int = BACKFILL_BATCH, max_batches: int = 0) -> dict[str, int]:
+	"""Convert legacy base64 vectors to the binary column, one committed batch at a time.
+
+	``max_batches`` of 0 runs to the end of the table. Returns counts only — never a chunk
+	name and never a vector — so ``bench execute`` on this reads as a report.
+	"""
+	from erpnext_enhancements.chat.retrieval import vectors
+
+	counts = {"batches": 0, "converted": 0, "unreadable": 0}
+	if not ensure_embedding_column():
+		return counts
+
+	size = max(cint(batch_size), 1)
+	after = ""
+	while not max_batches or counts["batches"] < max_batches:
+		rows = _legacy_rows(after=after, limit=size)
+		if not rows:
+			break
+		for name, encoded, dim in rows:
+			try:
+				raw = vectors.decode_vector(encoded, expected_dim=cint(dim) or None).tobytes()
+			except vectors.VectorBackendError:
+				counts["unreadable"] += 1
+				continue
+			_store_binary(name, raw)
+			counts["converted"] += 1
+		after = rows[-1][0]
+		counts["batches"] += 1
+		frappe.db.commit()
+	return counts
+
+
+def _legacy_rows(*, after: str, limit: int) -> list[tuple[str, str, int]]:
+	"""The next batch of rows still holding only the base64 form, after ``after`` by name."""
+	return [
+		(row[0], row[1], cint(row[2]))
+		for row in frappe.db.sql(
+			f"""
+			select `name`, `embedding`, `embedding_dim`
+			from `tab{CHUNK_DOCTYPE}`
+			where `name` > %(after)s
+				and `embedding_f32` is null
+				and `embedding` is not null
+				and `embedding` != ''
+			order by `name`
+			limit %(limit)s
+			""",
+			{"after": after, "limit": limit},
+		)
+		or []
+	]
+
+
+def _store_binary(name: str, raw: bytes) -> None:
+	frappe.db.sql(
+		f"""
+		update `tab{CHUNK_DOCTYPE}`
+		set `embedding_f32` = %(raw)s, `embedding` = null
+		where `name` = %(name)s
+		""",
+		{"name": name, "raw": raw},
+	)
+
+
+def _has_blob_column() -> bool:
+	"""Asked of the server every time, not of ``frappe.db.has_column``, whose column list is
+	cached and would still say no straight after the ``alter`` that added it."""
+	try:
+		return bool(frappe.db.sql(f"show columns from `tab{CHUNK_DOCTYPE}` like %s", (BLOB_COLUMN,)))
+	except Exception:
+		return False
+
+
+def _note(message: str) -> None:
+	try:
+		frappe.log_error(message, "Chat Indexing")
+	except Exception:
+		pass
@@ -54,6 +54,7 @@ package.
 
 from __future__ import annotations
 
+import time
 from typing import Any
 
 import frappe
@@ -80,11 +81,14 @@ ASSISTANT_SENDER_KIND = "Triton"
 #: room with two years of history must not be one statement that loads it all into a worker.
 MESSAGES_PER_PASS: int = 2_000
 
-#: Rooms per pass, and chunks embedded per pass. Both bounded for the same reason the relay's
-#: sweeper is: a job whose duration scales with the backlog is a job that gets killed by the
-#: next deploy exactly when the backlog is largest.
+#: Rooms per pass, and embedding requests per pass. Both bounded for the same reason the
+#: relay's sweeper is: a job whose duration scales with the backlog is a job that gets killed
+#: by the next deploy exactly when the backlog is largest. A pass reads
+#: ``embed_concurrency × embed.MAX_BATCH × EMBED_REQUESTS_PER_SLOT`` chunks — at the shipped
+#: concurrency of 4, 400 — so the bound still scales with what the operator allowed in flight
+#: rather than with the backlog.
 ROOMS_PER_PASS: int = 25
-EMBED_BATCH: int = 20
+EMBED_REQUESTS_PER_SLOT: int = 4
 
 
 def sweep_chunks() -> dict[str, int]:
@@ -113,60 +117,91 @@ def sweep_chunks() -> dict[str, int]:
 	return {"rooms": len(rooms), "chunks": built, "skipped": skipped}
 
 
-def sweep_embeddings() -> dict[str, int]:
+def sweep_embeddings() -> dict[str, Any]:
 	"""Embed sealed chunks that have no vector yet.
 
 	Separate from :func:`sweep_chunks` so an embedding outage cannot stop the index
 	advancing — see the module docstring. A chunk that keeps failing stops being retried at
 	``max_embed_failures`` and stays lexically searchable.
+
+	Reads ``EMBED_REQUESTS_PER_SLOT`` full requests per unit of ``embed_concurrency``, sends
+	each distinct body once (a body some chunk already has a vector for is not sent at all),
+	keeps ``embed_concurrency`` requests in flight, and writes each request's vectors in one
+	statement as it lands — :mod:`chat.indexing.embed_plan` has the detail. So a backlog
+	drains ``embed_concurrency`` times as fast as it did one request per pass, and the count
+	returned includes ``chunks_per_second`` to show it.
 	"""
+	counts: dict[str, Any] = {"attempted": 0, "embedded": 0, "failed": 0, "reused": 0, "requests": 0}
 	if not _enabled() or not _semantic_enabled():
-		return {"attempted": 0, "embedded": 0, "failed": 0}
+		return counts
 
-	rows = _chunks_awaiting_embedding(limit=EMBED_BATCH)
-	if not rows:
-		return {"attempted": 0, "embedded": 0, "failed": 0}
+	from erpnext_enhancements.chat.indexing import embed, embed_plan
 
-	from erpnext_enhancements.chat.indexing import embed
+	started = time.monotonic()
+	concurrency = min(max(cint(_setting("embed_concurrency")) or 1, 1), embed_plan.MAX_CONCURRENCY)
+	rows = _chunks_awaiting_embedding(limit=concurrency * embed.MAX_BATCH * EMBED_REQUESTS_PER_SLOT)
+	if not rows:
+		return counts
+	counts["attempted"] = len(rows)
+
+	known = _vectors_by_hash({(row.get("content_hash") or "").strip() for row in rows} - {""})
+	plan = embed_plan.plan(
+		((row["name"], row["body"] or "", row.get("content_hash")) for row in rows),
+		batch_size=embed.MAX_BATCH,
+		skip_hashes=frozenset(known),
+	)
 
-	try:
-		vectors = embed.embed_documents([row["body"] or "" for row in rows])
-	except Exception as exc:
-		# One failure fails the batch, not the row: the provider is down or the request was
-		# malformed, and blaming an individual chunk would burn its retry budget for
-		# something that was never about it.
-		for row in rows:
-			_record_embed_failure(row["name"], exc.__class__.__name__)
+	codebook = _ann_codebook()
+	if known:
+		reused = [
+			(name, raw, dim, ann)
+			for digest, (raw, dim, ann) in known.items()
+			for name in plan.rows_by_hash.get(digest, [])
+		]
+		_store_embeddings(reused)
 		frappe.db.commit()
-		return {"attempted": len(rows), "embedded": 0, "failed": len(rows)}
+		counts["reused"] = counts["embedded"] = len(reused)
 
-	from erpnext_enhancements.chat.retrieval import vectors as vector_store
-
-	embedded = 0
-	for row, vector in zip(rows, vectors, strict=False):
+	if plan.batches:
 		try:
-			frappe.db.set_value(
-				CHUNK_DOCTYPE,
-				row["name"],
-				{
-					"embedding": vector_store.encode_vector(vector),
-					"embedding_dim": len(vector),
-					"embedding_model": _setting("embedding_model") or "",
-					"embedding_version": cint(_setting("embedding_version")) or 1,
-					"embedded_at": now_datetime(),
-					"embed_failures": 0,
-					"last_error": None,
-				},
-				update_modified=False,
-			)
-			embedded += 1
+			post = embed.document_embedder()
 		except Exception as exc:
-			_record_embed_failure(row["name"], exc.__class__.__name__)
-
-	# Committed explicitly: InnoDB FULLTEXT sees COMMITTED rows only, and the next pass's
-	# watermark read has to see what this one wrote.
-	frappe.db.commit()
-	return {"attempted": len(rows), "embedded": embedded, "failed": len(rows) - embedded}
+			# Nothing was sent, so no chunk is to blame: the provider is unconfigured or the
+			# token could not be had. Every pending row carries the failure, as one failed
+			# request always has.
+			_fail_rows([name for batch in plan.batches for name in _batch_rows(plan, batch)], exc)
+			frappe.db.commit()
+			counts["failed"] = counts["attempted"] - counts["embedded"]
+			return _with_rate(counts, started)
+
+		from erpnext_enhancements.chat.retrieval import vectors as vector_store
+
+		for batch, result in embed_plan.dispatch(plan.batches, post, concurrency=concurrency):
+			counts["requests"] += 1
+			names_per_hash = [plan.rows_by_hash[digest] for digest in batch.hashes]
+			if isinstance(result, Exception):
+				# One failure fails the request, not the row: the provider is down or the
+				# request was malformed, and blaming an individual chunk would burn its retry
+				# budget for something that was never about it.
+				_fail_rows([name for names in names_per_hash for name in names], result)
+			else:
+				entries = []
+				for names, vector in zip(names_per_hash, result, strict=True):
+					raw = vector_store.encode_vector(vector)
+					ann = _ann_code(codebook, vector)
+					entries.extend((name, raw, len(vector), ann) for name in names)
+				try:
+					_store_embeddings(entries)
+					counts["embedded"] += len(entries)
+				except Exception as exc:
+					frappe.db.rollback()
+					_fail_rows([name for name, *_rest in entries], exc)
+			# Committed per request: InnoDB FULLTEXT sees COMMITTED rows only, the next pass's
+			# read has to see what this one wrote, and a pass killed mid-way keeps what landed.
+			frappe.db.commit()
+
+	counts["failed"] = counts["attempted"] - counts["embedded"]
+	return _with_rate(counts, started)
 
 
 # ------------------------------------------------------------------------------ one room
@@ -392,15 +427,153 @@ def _messages_after(room: str, watermark: int, *, limit: int) -> list[dict[str,
 	)
 
 
+def _store_embeddings(entries: list[tuple[str, bytes, int, tuple[int, bytes, str] | None]]) -> None:
+	"""Write ``(name, raw, dim, ann)`` vectors in one statement, clearing any legacy base64.
+
+	Raw SQL rather than ``frappe.db.set_value`` because ``embedding_f32`` is not a DocField —
+	see :mod:`chat.indexing.embedding_column` — and ``set_value`` only writes fields the meta
+	declares. One ``update … case `name` when …`` per request's worth of rows rather than one
+	statement per row: the per-statement round trip was most of the write time once requests
+	ran concurrently. ``modified`` is left alone, as the ``update_modified=False`` it replaces
+	did.
+
+	``ann`` is the approximate index's ``(list, code, codebook_version)`` for a vector, or
+	``None`` when there is no codebook — in which case any code already on the row is cleared,
+	because it described the vector this one replaces.
+	"""
+	if not entries:
+		return
+	values: dict[str, Any] = {
+		"model": _setting("embedding_model") or "",
+		"version": cint(_setting("embedding_version")) or 1,
+		"embedded_at": now_datetime(),
+	}
+	cases: dict[str, list[str]] = {"raw": [], "dim": [], "ann_version": [], "ann_list": [], "ann_code": []}
+	names: list[str] = []
+	for i, (name, raw, dim, ann) in enumerate(entries):
+		ann_list, ann_code, ann_version = ann if ann is not None else (None, None, None)
+		values.update(
+			{
+				f"n{i}": name,
+				f"raw{i}": raw,
+				f"dim{i}": dim,
+				f"ann_version{i}": ann_version,
+				f"ann_list{i}": ann_list,
+				f"ann_code{i}": ann_code,
+			}
+		)
+		for key in cases:
+			cases[key].append(f"when %(n{i})s then %({key}{i})s")
+		names.append(f"%(n{i})s")
+
+	def case(key: str) -> str:
+		return f"case `name` {' '.join(cases[key])} end"
+
+	frappe.db.sql(
+		f"""
+		update `tab{CHUNK_DOCTYPE}`
+		set `embedding_f32` = {case("raw")},
+			`embedding` = null,
+			`ann_version` = {case("ann_version")},
+			`ann_list` = {case("ann_list")},
+			`ann_code` = {case("ann_code")},
+			`embedding_dim` = {case("dim")},
+			`embedding_model` = %(model)s,
+			`embedding_version` = %(version)s,
+			`embedded_at` = %(embedded_at)s,
+			`embed_failures` = 0,
+			`last_error` = null
+		where `name` in ({", ".join(names)})
+		""",
+		values,
+	)
+
+
+def _vectors_by_hash(hashes: set[str]) -> dict[str, tuple[bytes, int, tuple[int, bytes, str] | None]]:
+	"""Vectors already stored for any of ``hashes`` under the current model, dimension and
+	version — a body some chunk has been embedded for is not sent again.
+
+	The stored vector is exactly what the provider would return for the same text (the model
+	is deterministic over identical input), so copying it is not an approximation. Its ANN
+	code is copied with it when it was written under the current codebook.
+	"""
+	if not hashes:
+		return {}
+	codebook = _ann_codebook()
+	found: dict[str, tuple[bytes, int, tuple[int, bytes, str] | None]] = {}
+	for digest, raw, dim, ann_version, ann_list, ann_code in frappe.db.sql(
+		f"""
+		select `content_hash`, `embedding_f32`, `embedding_dim`, `ann_version`, `ann_list`, `ann_code`
+		from `tab{CHUNK_DOCTYPE}`
+		where `content_hash` in %(hashes)s
+			and `embedding_f32` is not null
+			and `embedding_model` = %(model)s
+			and `embedding_dim` = %(dim)s
+			and `embedding_version` = %(version)s
+		""",
+		{
+			"hashes": tuple(sorted(hashes)),
+			"model": _setting("embedding_model") or "",
+			"dim": cint(_setting("embedding_dim")),
+			"version": cint(_setting("embedding_version")) or 1,
+		},
+	) or []:
+		if digest in found:
+			continue
+		current = codebook is not None and ann_version == codebook.version and ann_code is not None
+		found[digest] = (bytes(raw), cint(dim), (cint(ann_list), bytes(ann_code), ann_version) if current else None)
+	return found
+
+
+def _batch_rows(plan: Any, batch: Any) -> list[str]:
+	return [name for digest in batch.hashes for name in plan.rows_by_hash[digest]]
+
+
+def _fail_rows(names: list[str], exc: Exception) -> None:
+	for name in names:
+		_record_embed_failure(name, exc.__class__.__name__)
+
+
+def _with_rate(counts: dict[str, Any], started: float) -> dict[str, Any]:
+	elapsed = max(time.monotonic() - started, 1e-6)
+	counts["seconds"] = round(elapsed, 3)
+	counts["chunks_per_second"] = round(counts["embedded"] / elapsed, 1)
+	return counts
+
+
+def _ann_codebook() -> Any:
+	"""The approximate index's codebook if one has been trained, else ``None``.
+
+	Read whatever ``semantic_index`` says: codes written while the exact tier is selected are
+	what let the approximate one start warm when it is switched on.
+	"""
+	from erpnext_enhancements.chat.retrieval import ann
+
+	try:
+		return ann.load_codebook(frappe.get_site_path(*ann.CODEBOOK_FILE))
+	except Exception:
+		return None
+
+
+def _ann_code(codebook: Any, vector: list[float]) -> tuple[int, bytes, str] | None:
+	if codebook is None or len(vector) != codebook.dim:
+		return None
+	from erpnext_enhancements.chat.retrieval import vectors as vector_store
+
+	lists, codes = codebook.encode(vector_store.normalise(vector)[None, :])
+	return int(lists[0]), codes[0].tobytes(), codebook.version
+
+
 def _chunks_awaiting_embedding(*, limit: int) -> list[dict[str, Any]]:
 	"""Sealed, non-stale chunks with no vector and retry budget left."""
 	return (
 		frappe.db.sql(
 			f"""
-		select `name`, `body`
+		select `name`, `body`, `content_hash`
 		from `tab{CHUNK_DOCTYPE}`
 		where `sealed` = 1
 			and `is_stale` = 0
+			and `embedding_f32` is null
 			and (`embedding` is null or `embedding` = '')
 			and coalesce(`embed_failures`, 0) < %(max_failures)s
 		order by `last_message_at` desc
@@ -44,6 +44,16 @@ what it is replacing.
 **Never raises.** It is called from the delete path, and raising would abort the delete —
 leaving the message live *and* the digest stale, which is the exact pair of outcomes the seam
 exists to prevent.
+
+--------------------------------------------------------------------------------------
+The packed vector index
+--------------------------------------------------------------------------------------
+
+A room whose chunks were just marked is also dropped from this worker's packed vector index
+(:func:`chat.retrieval.vectors.forget_rooms`), so the next search here rebuilds it without
+waiting to notice. Other workers notice through the fingerprint the gate reads per request —
+the ``is_stale`` flip changes it — which is the mechanism that is actually relied on; this is
+the cheap half that saves the worker that did the write one wasted comparison.
 """
 
 from __future__ import annotations
@@ -73,11 +83,14 @@ def invalidate_span(room: str, from_seq: int, to_seq: int) -> dict[str, int]:
 		low, high = high, low
 
 	stamp = now_datetime()
-	return {
+	counts = {
 		"chunks": _mark_chunks(room_name, low, high, stamp),
 		"room_digests": _mark_room_digests(room_name, low, high, stamp),
 		"thread_digests": _mark_thread_digests(room_name, low, high, stamp),
 	}
+	if counts["chunks"]:
+		_forget_packed_vectors(room_name)
+	return counts
 
 
 def _mark_chunks(room: str, low: int, high: int, stamp) -> int:
@@ -146,6 +159,16 @@ def _mark_thread_digests(room: str, low: int, high: int, stamp) -> int:
 		return 0
 
 
+def _forget_packed_vectors(room: str) -> None:
+	"""Drop the room from this worker's packed vector index. Never raises."""
+	try:
+		from erpnext_enhancements.chat.retrieval import vectors
+
+		vectors.forget_rooms([room])
+	except Exception:
+		pass
+
+
 def _rows_affected() -> int:
 	"""How many rows the statement above changed.
 
@@ -166,6 +166,6 @@ def _is_muted(user: str, room: str) -> bool:
 
 
 def _notifications_enabled(user: str) -> bool:
-	from erpnext_enhancements.chat.notifications.fanout import _notifications_enabled as rule
+	from erpnext_enhancements.chat.notifications.fanout import _notifications_enabled_for as rule
 
-	return rule(user)
+	return rule([user]).get(user, True)
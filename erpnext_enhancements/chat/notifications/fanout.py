@@ -52,6 +52,7 @@ Indentation is tabs, per ``CLAUDE.md`` and the Frappe convention this package fo
 
 from __future__ import annotations
 
+import time
 from typing import Any
 
 import frappe
@@ -96,22 +97,45 @@ def run_fanout(message: str) -> dict[str, Any]:
 
 	Returns a summary — counts and reason codes, never content — so that a manual
 	``bench execute`` during an incident answers "what did it decide and for whom" without
-	anybody having to read the code.
+	anybody having to read the code. ``duration_ms`` is the whole job, and it is also logged
+	once per message, so a slow fan-out can be found without reproducing it.
 	"""
-	summary: dict[str, Any] = {"message": message, "recipients": 0, "bell": 0, "push": 0, "reasons": {}}
+	started = time.perf_counter()
+	summary: dict[str, Any] = {
+		"message": message,
+		"recipients": 0,
+		"bell": 0,
+		"push": 0,
+		"reasons": {},
+		"duration_ms": 0.0,
+	}
+	_fan_out(message, summary)
+	summary["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+	_log_summary(summary)
+	return summary
+
 
+def _fan_out(message: str, summary: dict[str, Any]) -> None:
+	"""The decisions and the actions, filling ``summary`` in place.
+
+	Everything that can be asked of the whole room at once is asked once, before the loop:
+	the members' notification switches in one query, their presence in one Redis pipeline.
+	The loop then decides per member and writes the bell rows, and the pushes go out
+	together at the end, concurrently (:func:`_send_push`). A 100-member room used to cost a
+	settings read, a presence read and a serial round of HTTPS POSTs *per member*.
+	"""
 	row = _message_row(message)
 	if not row:
-		return summary
+		return
 	if cint(row.get("is_deleted")):
 		# Born deleted, or deleted before the job ran. Announcing it would notify somebody
 		# about a tombstone, and the same rule already governs the realtime publish.
-		return summary
+		return
 
 	room = (row.get("room") or "").strip()
 	sender = (row.get("sender") or "").strip()
 	if not room:
-		return summary
+		return
 
 	tuning = notification_settings.load()
 	now = presence_store.now_epoch()
@@ -119,20 +143,20 @@ def run_fanout(message: str) -> dict[str, Any]:
 	sender_label = _sender_label(row)
 	mentioned = _mentioned_users(message)
 
-	for member in _members(room):
-		user = (member.get("user") or "").strip()
-		if not user:
-			continue
+	members = [member for member in _members(room) if (member.get("user") or "").strip()]
+	users = [member["user"].strip() for member in members]
+	enabled = _notifications_enabled_for(users)
+	presence = presence_store.clients_for_many(users, now=now, ttl_seconds=tuning.presence_ttl_seconds)
+	push_to: list[str] = []
 
+	for member, user in zip(members, users, strict=True):
 		recipient = policy.Recipient(
 			is_author=bool(sender) and user == sender,
 			is_mentioned=user in mentioned,
 			is_muted=_is_muted(member),
-			notifications_enabled=_notifications_enabled(user),
-		)
-		clients, store_available = presence_store.clients_for(
-			user, now=now, ttl_seconds=tuning.presence_ttl_seconds
+			notifications_enabled=enabled.get(user, True),
 		)
+		clients, store_available = presence.get(user, ([], False))
 		decision = policy.decide_for(
 			recipient=recipient,
 			clients=clients,
@@ -173,10 +197,12 @@ def run_fanout(message: str) -> dict[str, Any]:
 			if wrote:
 				summary["bell"] += 1
 
-		if decision.push and _send_push(user, room=room, room_label=room_label, message=message, sender_label=sender_label):
-			summary["push"] += 1
+		if decision.push:
+			push_to.append(user)
 
-	return summary
+	if push_to:
+		pushed = _send_push(push_to, room=room, room_label=room_label, message=message, sender_label=sender_label)
+		summary["push"] = len(pushed)
 
 
 # --------------------------------------------------------------------------- inputs
@@ -265,22 +291,34 @@ def _is_muted(member: dict[str, Any]) -> bool:
 		return False
 
 
-def _notifications_enabled(user: str) -> bool:
-	"""Frappe's own per-user kill switch, consulted so the reason code can be honest.
+def _notifications_enabled_for(users: list[str]) -> dict[str, bool]:
+	"""Frappe's own per-user kill switch for every member, consulted so the reason code can be honest.
 
 	The framework drops the row for these people regardless of what this module decides, so
 	not checking would not send them anything — it would just mean the debug output claimed a
-	bell row was written when none was. Defaults to True: an unreadable settings row must not
-	silence somebody.
+	bell row was written when none was.
+
+	One query for the room rather than Frappe's ``is_notifications_enabled`` per member, with
+	the same answer: the settings row is named after ``User.email`` (the trap
+	:func:`bell.resolve_email` exists for, and the same fallback to the docname), and no row
+	means enabled. A user missing from the result is enabled too, and so is everybody when the
+	query fails: an unreadable settings row must not silence somebody.
 	"""
+	wanted = sorted({user for user in users if user})
+	if not wanted:
+		return {}
 	try:
-		from frappe.desk.doctype.notification_settings.notification_settings import (
-			is_notifications_enabled,
+		rows = frappe.db.sql(
+			"""select `u`.`name`, `s`.`enabled`
+				from `tabUser` `u`
+				left join `tabNotification Settings` `s`
+					on `s`.`name` = coalesce(nullif(`u`.`email`, ''), `u`.`name`)
+				where `u`.`name` in %(users)s""",
+			{"users": wanted},
 		)
-
-		return bool(is_notifications_enabled(bell.resolve_email(user)))
 	except Exception:
-		return True
+		return {}
+	return {name: enabled is None or bool(cint(enabled)) for name, enabled in rows}
 
 
 # --------------------------------------------------------------------------- outputs
@@ -310,9 +348,13 @@ def _auto_read(room: str, user: str, seq: int, *, skip: bool) -> None:
 
 
 def _send_push(
-	user: str, *, room: str, room_label: str, message: str, sender_label: str
-) -> bool:
-	"""Hand off to Web Push. Isolated so a push outage cannot cost anybody their bell row.
+	users: list[str], *, room: str, room_label: str, message: str, sender_label: str
+) -> dict[str, int]:
+	"""Hand off to Web Push, once for everybody. Isolated so a push outage cannot cost anybody
+	their bell row — the bells were written before this is called.
+
+	Returns ``{user: accepted}`` for the people at least one device accepted. The POSTs run
+	concurrently inside ``sender.push_to_users``; the status handling is ``send_one``'s.
 
 	Imported inside the function on purpose: the push package reaches for ``cryptography``
 	and ``requests``, and a module-scope import would drag both into every process that ever
@@ -321,20 +363,18 @@ def _send_push(
 	try:
 		from erpnext_enhancements.chat.notifications.webpush import sender
 
-		return bool(
-			sender.push_to_user(
-				user,
-				room=room,
-				room_label=room_label,
-				message=message,
-				sender_label=sender_label,
-			)
+		return sender.push_to_users(
+			users,
+			room=room,
+			room_label=room_label,
+			message=message,
+			sender_label=sender_label,
 		)
 	except Exception:
 		frappe.log_error(
-			title="chat web push failed", message=f"user={user} room={room} message={message}"
+			title="chat web push failed", message=f"users={len(users)} room={room} message={message}"
 		)
-		return False
+		return {}
 
 
 # --------------------------------------------------------------------------- labels
@@ -398,3 +438,23 @@ def _log(message: str, room: str, user: str, decision: policy.Decision) -> None:
 		decision.push,
 		decision.auto_read,
 	)
+
+
+def _log_summary(summary: dict[str, Any]) -> None:
+	"""One line per message: how many were decided for, what was sent, and how long it took.
+
+	``info`` rather than ``debug``: it is one line per message rather than per member, and the
+	duration is only worth recording if somebody can read it when a room feels slow.
+	"""
+	try:
+		log = frappe.logger("chat")
+	except Exception:
+		return
+	log.info(
+		"chat fanout message=%s recipients=%s bell=%s push=%s duration_ms=%s",
+		summary["message"],
+		summary["recipients"],
+		summary["bell"],
+		summary["push"],
+		summary["duration_ms"],
+	)
@@ -56,6 +56,7 @@ Indentation is tabs, per ``CLAUDE.md`` and the Frappe convention this package fo
 from __future__ import annotations
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Final, NamedTuple
 
 import frappe
@@ -85,6 +86,11 @@ TERMINAL_STATUSES: Final[frozenset[int]] = frozenset({404, 410})
 #: app, not a way to read the conversation from the lock screen.
 PREVIEW_LIMIT: Final[int] = 120
 
+#: POSTs in flight at once when a fan-out pushes to a whole room. Each one is mostly waiting
+#: on a push service, so a handful of threads turns a room's worth of sequential round trips
+#: into roughly one; more than this buys little and looks like a burst to the service.
+PUSH_CONCURRENCY: Final[int] = 8
+
 #: The alert kind raised when a push service rate-limits us. See :func:`_alert_rate_limited`
 #: for why this exists at all rather than another debug line.
 RATE_LIMITED_KIND: Final[str] = "push_rate_limited"
@@ -108,6 +114,21 @@ class PostOutcome(NamedTuple):
 	#: The service's ``Retry-After``, verbatim and unparsed. It is either a delta-seconds
 	#: integer or an HTTP-date, and this code does not act on it — it reports it.
 	retry_after: str | None = None
+	#: The HTTP status, so the rejection can be logged by the caller. :func:`_post` may run on
+	#: a pool thread, which has no site context to log from.
+	status: int = 0
+
+
+class PushRequest(NamedTuple):
+	"""One encrypted, signed POST, ready to send. Built on the job's thread by :func:`_prepare`.
+
+	Everything that touches site config or the database — the VAPID key, the signature — is
+	done before this exists, so sending it needs nothing but the network.
+	"""
+
+	endpoint: str
+	body: bytes
+	headers: dict[str, str]
 
 
 def push_to_user(
@@ -153,6 +174,76 @@ def push_to_user(
 	return delivered
 
 
+def push_to_users(
+	users: list[str],
+	*,
+	room: str,
+	room_label: str,
+	message: str,
+	sender_label: str,
+	preview: str | None = None,
+) -> dict[str, int]:
+	""":func:`push_to_user` for everybody a fan-out decided to push to, concurrently.
+
+	Returns ``{user: accepted}`` for the users with at least one accepted push. The decisions
+	are :func:`send_one`'s, subscription by subscription — accepted, terminal, one retry
+	without the preview on 413, the 429 folded into **one** alert for the whole fan-out. What
+	changes is the waiting: every subscription is read in one query, and the POSTs run on at
+	most :data:`PUSH_CONCURRENCY` threads instead of one after another.
+
+	Only the POST leaves this thread. Encryption and signing happen here (:func:`_prepare`),
+	and so does every bookkeeping write, because the database connection belongs to this job
+	and is not safe to share.
+	"""
+	if not users or not _push_enabled():
+		return {}
+	if not vapid.is_configured():
+		frappe.logger("chat").debug("chat push skipped: no VAPID keypair in site_config")
+		return {}
+
+	payload = build_payload(
+		room=room,
+		room_label=room_label,
+		message=message,
+		sender_label=sender_label,
+		preview=preview,
+	)
+
+	delivered: dict[str, int] = {}
+	outcomes: dict[str, Any] = {"rate_limited": 0, "origins": set(), "retry_after": None}
+	signatures: dict[str, str] = {}
+	rows = [row for row in subscriptions.active_for_users(users) if (row.get("endpoint") or "").strip()]
+
+	retry: list[dict[str, Any]] = []
+	for row, result in _post_all(rows, payload, signatures):
+		if isinstance(result, Exception):
+			frappe.log_error(title="chat push request failed", message=f"subscription={row.get('name')}")
+			subscriptions.note_failure(str(row.get("name")), terminal=False)
+			continue
+		_observe(outcomes, result, row)
+		if result.accepted:
+			subscriptions.note_success(str(row.get("name")))
+			delivered[row.get("user")] = delivered.get(row.get("user"), 0) + 1
+		elif result.retry_without_preview and payload.get("body"):
+			retry.append(row)
+		else:
+			subscriptions.note_failure(str(row.get("name")), terminal=result.terminal)
+
+	# The 413s, once more without the preview, as one second round rather than one by one.
+	for row, result in _post_all(retry, dict(payload, body=""), signatures):
+		if isinstance(result, Exception):
+			result = PostOutcome(False, False, False)
+		_observe(outcomes, result, row)
+		if result.accepted:
+			subscriptions.note_success(str(row.get("name")))
+			delivered[row.get("user")] = delivered.get(row.get("user"), 0) + 1
+		else:
+			subscriptions.note_failure(str(row.get("name")), terminal=result.terminal)
+
+	_alert_rate_limited(outcomes)
+	return delivered
+
+
 def build_payload(
 	*,
 	room: str,
@@ -214,13 +305,13 @@ def send_one(
 		return False
 
 	try:
-		result = _post(endpoint, subscription, payload)
+		result = _post(_prepare(endpoint, subscription, payload))
 	except Exception:
 		frappe.log_error(title="chat push request failed", message=f"subscription={name}")
 		subscriptions.note_failure(str(name), terminal=False)
 		return False
 
-	_accumulate(outcomes, result, endpoint)
+	_observe(outcomes, result, subscription)
 
 	if result.accepted:
 		subscriptions.note_success(str(name))
@@ -232,10 +323,10 @@ def send_one(
 		# worth far more than none at all.
 		stripped = dict(payload, body="")
 		try:
-			result = _post(endpoint, subscription, stripped)
+			result = _post(_prepare(endpoint, subscription, stripped))
 		except Exception:
 			result = PostOutcome(False, False, False)
-		_accumulate(outcomes, result, endpoint)
+		_observe(outcomes, result, subscription)
 		if result.accepted:
 			subscriptions.note_success(str(name))
 			return True
@@ -244,6 +335,54 @@ def send_one(
 	return False
 
 
+def _post_all(
+	rows: list[dict[str, Any]], payload: dict[str, Any], signatures: dict[str, str]
+) -> list[tuple[dict[str, Any], PostOutcome | Exception]]:
+	"""Prepare every row here, POST them on at most :data:`PUSH_CONCURRENCY` threads.
+
+	Returns ``(row, outcome)`` or ``(row, exception)`` in ``rows`` order; nothing raises. A
+	row that cannot be prepared — a malformed key — fails alone, before any thread is
+	involved.
+	"""
+	prepared: list[tuple[dict[str, Any], PushRequest | Exception]] = []
+	for row in rows:
+		try:
+			prepared.append((row, _prepare(row["endpoint"].strip(), row, payload, signatures=signatures)))
+		except Exception as exc:
+			prepared.append((row, exc))
+
+	ready = [request for _row, request in prepared if isinstance(request, PushRequest)]
+	workers = min(PUSH_CONCURRENCY, len(ready))
+	if workers > 1:
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat-push") as pool:
+			results = list(pool.map(_post_caught, ready))
+	else:
+		results = [_post_caught(request) for request in ready]
+	sent = iter(results)
+	return [
+		(row, next(sent) if isinstance(request, PushRequest) else request) for row, request in prepared
+	]
+
+
+def _post_caught(request: PushRequest) -> PostOutcome | Exception:
+	try:
+		return _post(request)
+	except Exception as exc:
+		return exc
+
+
+def _observe(outcomes: dict[str, Any] | None, result: PostOutcome, subscription: dict[str, Any]) -> None:
+	"""Log an unexplained rejection, and fold the rate-limit signal into ``outcomes``."""
+	endpoint = (subscription.get("endpoint") or "").strip()
+	if result.status and not (
+		result.accepted or result.terminal or result.retry_without_preview or result.rate_limited
+	):
+		frappe.logger("chat").debug(
+			"chat push rejected status=%s endpoint=%s", result.status, _origin(endpoint)
+		)
+	_accumulate(outcomes, result, endpoint)
+
+
 def _accumulate(outcomes: dict[str, Any] | None, result: PostOutcome, endpoint: str) -> None:
 	"""Fold one POST's rate-limit signal into the fan-out's accumulator."""
 	if outcomes is None or result.retry_after is None and not result.rate_limited:
@@ -254,17 +393,19 @@ def _accumulate(outcomes: dict[str, Any] | None, result: PostOutcome, endpoint:
 		outcomes["retry_after"] = result.retry_after
 
 
-def _post(
-	endpoint: str, subscription: dict[str, Any], payload: dict[str, Any]
-) -> tuple[bool, bool, bool]:
-	"""One HTTPS POST. Returns ``(accepted, terminal, retry_without_preview)``.
+def _prepare(
+	endpoint: str,
+	subscription: dict[str, Any],
+	payload: dict[str, Any],
+	*,
+	signatures: dict[str, str] | None = None,
+) -> PushRequest:
+	"""Encrypt the payload for one subscription and sign the request for its service.
 
-	``requests`` is imported inside the function for the same reason the transport client does
-	it: the bench-free test tier deliberately runs with ``requests`` absent, and a module-scope
-	import would make this file unimportable there.
+	``signatures`` caches the VAPID ``Authorization`` header per push-service origin for one
+	fan-out. The token's audience *is* the origin and it lives for hours, so signing it once
+	per service rather than once per device changes nothing the service can see.
 	"""
-	import requests
-
 	body = encrypt.encrypt(
 		json.dumps(payload, separators=(",", ":")).encode("utf-8"),
 		ua_public=encrypt.b64u_decode(subscription["p256dh"]),
@@ -272,11 +413,18 @@ def _post(
 		record_size=RECORD_SIZE,
 	)
 
-	response = requests.post(
-		endpoint,
-		data=body,
+	if signatures is None:
+		authorization = vapid.authorization_header(endpoint)
+	else:
+		origin = vapid.audience(endpoint)
+		authorization = signatures.get(origin) or vapid.authorization_header(endpoint)
+		signatures[origin] = authorization
+
+	return PushRequest(
+		endpoint=endpoint,
+		body=body,
 		headers={
-			"Authorization": vapid.authorization_header(endpoint),
+			"Authorization": authorization,
 			"Content-Encoding": "aes128gcm",
 			"Content-Type": "application/octet-stream",
 			"TTL": str(TTL_SECONDS),
@@ -288,21 +436,40 @@ def _post(
 			# coalescing that happens off our infrastructure entirely.
 			"Topic": _topic(payload),
 		},
+	)
+
+
+def _post(request: PushRequest) -> PostOutcome:
+	"""One HTTPS POST, and what its status means for the subscription.
+
+	Touches nothing but the network, so it is safe on a pool thread — :func:`_prepare` has
+	already done everything that reads the site.
+
+	``requests`` is imported inside the function for the same reason the transport client does
+	it: the bench-free test tier deliberately runs with ``requests`` absent, and a module-scope
+	import would make this file unimportable there.
+	"""
+	import requests
+
+	response = requests.post(
+		request.endpoint,
+		data=request.body,
+		headers=request.headers,
 		timeout=HTTP_TIMEOUT_SECONDS,
 	)
 
 	status = cint(response.status_code)
 	if status in (200, 201, 202):
-		return PostOutcome(True, False, False)
+		return PostOutcome(True, False, False, status=status)
 	if status in TERMINAL_STATUSES:
-		return PostOutcome(False, True, False)
+		return PostOutcome(False, True, False, status=status)
 	if status == 413:
-		return PostOutcome(False, False, True)
+		return PostOutcome(False, False, True, status=status)
 	if status == 429:
-		return PostOutcome(False, False, False, rate_limited=True, retry_after=_retry_after(response))
-
-	frappe.logger("chat").debug("chat push rejected status=%s endpoint=%s", status, _origin(endpoint))
-	return PostOutcome(False, False, False)
+		return PostOutcome(
+			False, False, False, rate_limited=True, retry_after=_retry_after(response), status=status
+		)
+	return PostOutcome(False, False, False, status=status)
 
 
 def _topic(payload: dict[str, Any]) -> str:
@@ -145,6 +145,23 @@ def active_for(user: str) -> list[dict[str, Any]]:
 	return [row for row in rows if not vapid.public_key_changed_since(row.get("vapid_public_key"))]
 
 
+def active_for_users(users: list[str]) -> list[dict[str, Any]]:
+	""":func:`active_for` for several people in one query, each row carrying its ``user``.
+
+	The fan-out pushes to a whole room at once; one ``get_all`` per member was a round trip
+	per person before a single request left the building.
+	"""
+	wanted = sorted({user for user in users if user})
+	if not wanted:
+		return []
+	rows = frappe.get_all(
+		DOCTYPE,
+		filters={"user": ("in", wanted), "is_active": 1},
+		fields=["name", "user", "endpoint", "p256dh", "auth", "vapid_public_key", "failure_count"],
+	)
+	return [row for row in rows if not vapid.public_key_changed_since(row.get("vapid_public_key"))]
+
+
 def note_success(name: str) -> None:
 	"""Record a delivery. Clears the failure count so a recovered device is not retired."""
 	try:
@@ -179,6 +179,11 @@ _MESSAGE_TABLE = "`tabChat Message`"
 #: room, not a private one.
 _NEVER_A_MEMBER = frozenset({"", "Guest"})
 
+#: The most rooms :func:`membership_filter_sql` will spell out as a ``room in (…)`` list when
+#: asked to ``materialise``. Past this the list is a statement-size problem of its own, and
+#: the correlated ``EXISTS`` — one indexed probe per candidate row — is used instead.
+MATERIALISED_ROOM_LIMIT: Final[int] = 500
+
 
 # --------------------------------------------------------------------------- helpers
 
@@ -349,6 +354,7 @@ def membership_filter_sql(
 	seq_column: str | None = None,
 	*,
 	allow_oversight: bool = False,
+	materialise: bool = False,
 ) -> str:
 	"""The membership filter, for the raw SQL that these hooks do **not** protect.
 
@@ -384,6 +390,14 @@ def membership_filter_sql(
 			the same fragment, and the column is not read.
 		allow_oversight: whether this call site is one of the two doors. Keyword-only, so it
 			can never be passed by accident in the ``seq_column`` position.
+		materialise: read the user's room set once, through :func:`visible_room_names`, and
+			return ``room_column in (…)`` instead of the correlated ``EXISTS``. The ``EXISTS``
+			is one membership probe per candidate row, so a query that scans many rows — a
+			global search, a long transcript page — pays for the filter once per row; the list
+			is one indexed read per call, whatever the scan. Same rule (active membership),
+			same fail-closed answers: no rooms is ``"1 = 0"``, and more than
+			:data:`MATERIALISED_ROOM_LIMIT` falls back to the ``EXISTS``. **Read, never
+			cached** — a room removal takes effect on the next call, as everywhere else here.
 
 	Returns:
 		A SQL boolean expression. Unlike a ``permission_query_conditions`` hook this
@@ -398,11 +412,23 @@ def membership_filter_sql(
 	if allow_oversight and (user == "Administrator" or _has_oversight(user)):
 		note_privileged_read("Chat Message", None, user, "read")
 		return "1 = 1"
+	if materialise:
+		rooms = visible_room_names(user)
+		if not rooms:
+			return "1 = 0"
+		if len(rooms) <= MATERIALISED_ROOM_LIMIT:
+			return _room_list_sql(room_column, rooms)
 	if seq_column:
 		return _message_scope_sql(room_column, seq_column, user)
 	return _active_member_sql(room_column, user)
 
 
+def _room_list_sql(room_column: str, rooms: list[str]) -> str:
+	"""``room_column in (…)`` over an already-derived room set, every name escaped."""
+	names = ", ".join(frappe.db.escape(room) for room in sorted(set(rooms)))
+	return f"{room_column} in ({names})"
+
+
 def visible_room_names(user: str | None = None) -> list[str]:
 	"""Rooms ``user`` is an **active** member of — the Python-side twin of the filter.
 
@@ -26,6 +26,7 @@ The submodules are:
 | ``assemble`` | **pure.** S0–S5 in prompt-cache order. No clock read above S5 |
 | ``lexical`` | **pure.** The BOOLEAN MODE query builder and its input stripping |
 | ``vectors`` | the ``VectorBackend`` adapter and the numpy cosine implementation |
+| ``ann`` | the optional approximate (IVF-PQ) index, its codebook, and the exact re-rank |
 | ``citations`` | the manifest, and server-side URL resolution |
 
 Five of the seven are pure and import nothing but the stdlib, which is not tidiness: this repo
@@ -0,0 +1,533 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""Approximate nearest-neighbour search: an inverted file over product-quantised residuals.
+
+The exact tier in :mod:`chat.retrieval.vectors` scores every candidate, and so it has to be
+capped: past ``max_candidate_chunks`` only the most recent chunks are scored at all, which
+makes older history unreachable by meaning however well it matches. This module is the
+optional alternative that removes the cap rather than raising it. Switched on by
+``Chat Settings.semantic_index``; off, nothing here runs.
+
+Pure ``numpy``, for the reason :mod:`chat.retrieval.vectors` gives: the production bench has
+it and the deploy pipeline has no ``pip install`` step, so FAISS and friends are not
+available. No SQL and no ``frappe`` — the gate reads, this scores.
+
+--------------------------------------------------------------------------------------
+The structure, in the order a query meets it
+--------------------------------------------------------------------------------------
+
+* **Coarse quantiser (IVF).** ``nlist`` centroids from k-means over a sample of stored
+  vectors. Every chunk is filed under its nearest centroid, and a query scores only the
+  chunks filed under its ``nprobe`` nearest — a few percent of the corpus at the defaults.
+* **Product quantiser (PQ) over the residual.** What is left after subtracting the centroid
+  is split into ``m`` sub-vectors, and each is replaced by the index of its nearest of 256
+  sub-centroids: one byte. At 1,536 dimensions that is 192 bytes a chunk instead of 6 KiB,
+  which is what lets a worker hold every chunk of every busy room rather than a capped
+  recent slice of each.
+* **Asymmetric distance.** The query is never quantised. Its inner product with each of the
+  ``m × 256`` sub-centroids is one small table, and a chunk's approximate score is its
+  centroid's score plus ``m`` lookups in that table.
+* **Exact re-rank.** The approximate ranking is only trusted to *find* candidates. The gate
+  reloads the best ``rerank_depth`` of them at full precision and ranks those with
+  :class:`vectors.NumpyVectorBackend`, so every similarity the ranker sees is exact and the
+  only approximation left is which chunks made the short list. That is the number
+  ``chat.testing.ann_bench`` reports as recall@k.
+
+--------------------------------------------------------------------------------------
+Codes are a pure function of the vector and the codebook
+--------------------------------------------------------------------------------------
+
+``chat/indexing/ann_codes.py`` trains the codebook on the scheduler, and
+``indexer.sweep_embeddings`` stores each new vector's list and code beside it. The gate does
+not *depend* on either having happened: a row whose stored code was written under another
+codebook version, or not written at all, is encoded from its vector when its room is packed.
+Because :meth:`Codebook.encode` is deterministic, a code computed in a web worker is the same
+bytes the sweep would have stored — so the stored codes are an optimisation of the load, never
+a second source of truth that can disagree with the first.
+
+The permission rule is unchanged: rooms outside ``allowed_rooms`` are never packed and never
+scanned, and a room is served only on a fingerprint the gate read under the membership filter
+for this request. The per-room packing is what makes that a post-filter by construction —
+there is no shared cross-room list for a probe to wander into.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import math
+import os
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from erpnext_enhancements.chat.retrieval import vectors
+
+#: ``Chat Settings.semantic_index`` values. Anything but the second is the exact tier.
+MODE_EXACT: str = "Exact"
+MODE_APPROXIMATE: str = "Approximate"
+
+#: Where the trained codebook lives, relative to the site directory. A private-files path
+#: because that is the directory every web and worker container of a bench already shares,
+#: and it is not served over HTTP.
+CODEBOOK_FILE: tuple[str, ...] = ("private", "chat_ann", "codebook.npz")
+
+#: Coarse lists scanned per query. At ``nlist`` ≈ 2·√n that is a few percent of the corpus.
+DEFAULT_NPROBE: int = 16
+
+#: Approximate candidates reloaded at full precision and ranked exactly.
+DEFAULT_RERANK_DEPTH: int = 400
+
+#: Below this many embedded chunks there is nothing to gain: the exact tier scores the whole
+#: corpus in a few milliseconds, and a codebook trained on fewer rows than it has
+#: sub-centroids is mostly noise.
+MIN_TRAIN_ROWS: int = 4096
+
+#: Sub-vector width the default ``m`` aims for. Eight dimensions a byte.
+TARGET_SUBSPACE_DIM: int = 8
+
+#: Sub-centroids per sub-quantiser. 256 so a code is one ``uint8`` per sub-vector.
+KSUB: int = 256
+
+#: Rows an ANN room is packed from: ``(chunk_name, room, ann_version, ann_list, ann_code,
+#: stored_vector, embedding_dim, last_seq)``. ``stored_vector`` may be ``None`` when the code
+#: is current — the gate does not ship a vector it will not use.
+AnnRow = tuple[str, str, str | None, int | None, bytes | None, bytes | str | None, int, int]
+
+#: ``(chunk_name, ann_list, code_bytes, codebook_version)``.
+CodeWriter = Callable[[str, int, bytes, str], None]
+
+
+@dataclass(frozen=True)
+class Codebook:
+	"""A trained coarse quantiser and residual product quantiser. Immutable once built."""
+
+	version: str
+	centroids: Any  #: ``(nlist, dim)`` ``float32``
+	subspaces: Any  #: ``(m, ksub, dsub)`` ``float32``
+
+	@property
+	def dim(self) -> int:
+		return int(self.centroids.shape[1])
+
+	@property
+	def nlist(self) -> int:
+		return int(self.centroids.shape[0])
+
+	@property
+	def m(self) -> int:
+		return int(self.subspaces.shape[0])
+
+	@property
+	def dsub(self) -> int:
+		return int(self.subspaces.shape[2])
+
+	def encode(self, matrix: Any) -> tuple[Any, Any]:
+		"""``(lists, codes)`` for unit rows: ``int32`` list per row, ``uint8`` ``(n, m)`` codes."""
+		numpy = vectors._numpy()
+		matrix = numpy.asarray(matrix, dtype="<f4").reshape(-1, self.dim)
+		lists = _nearest(matrix, self.centroids)
+		residuals = matrix - self.centroids[lists]
+		codes = numpy.empty((matrix.shape[0], self.m), dtype=numpy.uint8)
+		for j in range(self.m):
+			codes[:, j] = _nearest(residuals[:, j * self.dsub : (j + 1) * self.dsub], self.subspaces[j])
+		return lists.astype(numpy.int32), codes
+
+	def probe(self, query: Any, nprobe: int) -> Any:
+		"""The ``nprobe`` lists nearest the query, nearest first."""
+		numpy = vectors._numpy()
+		distance = (self.centroids * self.centroids).sum(axis=1) - 2.0 * (self.centroids @ query)
+		nprobe = min(max(int(nprobe), 1), self.nlist)
+		nearest = numpy.argpartition(distance, nprobe - 1)[:nprobe]
+		return nearest[numpy.argsort(distance[nearest], kind="stable")]
+
+	def lookup_table(self, query: Any) -> Any:
+		"""``(m, ksub)`` inner products of each query sub-vector with each sub-centroid."""
+		numpy = vectors._numpy()
+		return numpy.einsum("mkd,md->mk", self.subspaces, query.reshape(self.m, self.dsub))
+
+	def to_bytes(self) -> bytes:
+		numpy = vectors._numpy()
+		buffer = io.BytesIO()
+		numpy.savez(
+			buffer,
+			version=numpy.asarray(self.version),
+			centroids=self.centroids,
+			subspaces=self.subspaces,
+		)
+		return buffer.getvalue()
+
+	@classmethod
+	def from_bytes(cls, raw: bytes) -> Codebook:
+		numpy = vectors._numpy()
+		try:
+			with numpy.load(io.BytesIO(raw), allow_pickle=False) as archive:
+				codebook = cls(
+					version=str(archive["version"]),
+					centroids=numpy.ascontiguousarray(archive["centroids"], dtype="<f4"),
+					subspaces=numpy.ascontiguousarray(archive["subspaces"], dtype="<f4"),
+				)
+		except Exception as exc:
+			raise vectors.VectorBackendError(f"codebook is unreadable ({exc.__class__.__name__})") from None
+		if codebook.subspaces.ndim != 3 or codebook.m * codebook.dsub != codebook.dim:
+			raise vectors.VectorBackendError("codebook sub-quantisers do not tile its dimension")
+		return codebook
+
+
+def default_nlist(rows: int) -> int:
+	"""≈ 2·√n coarse lists, within ``[8, 4096]`` and never more than the rows."""
+	return max(1, min(max(8, round(2 * math.sqrt(max(rows, 0)))), 4096, max(rows, 1)))
+
+
+def default_m(dim: int) -> int:
+	"""The largest divisor of ``dim`` that gives sub-vectors of at least
+	:data:`TARGET_SUBSPACE_DIM` dimensions."""
+	target = max(1, dim // TARGET_SUBSPACE_DIM)
+	return max(m for m in range(1, target + 1) if dim % m == 0)
+
+
+def train_codebook(
+	sample: Any,
+	*,
+	nlist: int = 0,
+	m: int = 0,
+	iterations: int = 12,
+	seed: int = 0,
+) -> Codebook:
+	"""k-means for the coarse lists, then k-means per residual sub-space.
+
+	``sample`` is normalised here rather than trusted, for the reason
+	:func:`vectors.normalise` exists. Seeded, so the same sample gives the same codebook — and
+	the same version, which is a hash of the arrays rather than a timestamp.
+	"""
+	numpy = vectors._numpy()
+	matrix = numpy.asarray(sample, dtype="<f4")
+	if matrix.ndim != 2 or not matrix.shape[0]:
+		raise vectors.VectorBackendError("cannot train a codebook on an empty sample")
+	norms = numpy.linalg.norm(matrix, axis=1, keepdims=True)
+	matrix = matrix / numpy.where(norms == 0.0, 1.0, norms)
+	rows, dim = matrix.shape
+	m = int(m or default_m(dim))
+	if dim % m:
+		raise vectors.VectorBackendError(f"{m} sub-quantisers do not divide {dim} dimensions")
+	rng = numpy.random.default_rng(seed)
+
+	centroids = _kmeans(matrix, int(nlist or default_nlist(rows)), iterations, rng)
+	residuals = matrix - centroids[_nearest(matrix, centroids)]
+	dsub = dim // m
+	subspaces = numpy.stack(
+		[
+			_kmeans(residuals[:, j * dsub : (j + 1) * dsub], KSUB, iterations, rng, pad_to=KSUB)
+			for j in range(m)
+		]
+	)
+	digest = hashlib.sha1(centroids.tobytes() + subspaces.tobytes()).hexdigest()[:16]
+	return Codebook(version=digest, centroids=centroids, subspaces=subspaces)
+
+
+def save_codebook(codebook: Codebook, path: str) -> None:
+	"""Write atomically: a reader sees the old file or the new one, never half of either."""
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	partial = f"{path}.{os.getpid()}.partial"
+	with open(partial, "wb") as handle:
+		handle.write(codebook.to_bytes())
+	os.replace(partial, path)
+
+
+_CODEBOOK_CACHE: dict[str, tuple[tuple[int, int], Codebook]] = {}
+_CODEBOOK_LOCK = threading.Lock()
+
+
+def load_codebook(path: str) -> Codebook | None:
+	"""The codebook at ``path``, or ``None`` if there is none. Cached per worker on the file's
+	modification time and size, so a retrain is picked up on the next question without a
+	restart and an unchanged file is read once."""
+	try:
+		stat = os.stat(path)
+	except OSError:
+		return None
+	key = (stat.st_mtime_ns, stat.st_size)
+	with _CODEBOOK_LOCK:
+		cached = _CODEBOOK_CACHE.get(path)
+		if cached is not None and cached[0] == key:
+			return cached[1]
+	try:
+		with open(path, "rb") as handle:
+			codebook = Codebook.from_bytes(handle.read())
+	except (OSError, vectors.VectorBackendError):
+		return None
+	with _CODEBOOK_LOCK:
+		_CODEBOOK_CACHE[path] = (key, codebook)
+	return codebook
+
+
+@dataclass(frozen=True)
+class RoomCodes:
+	"""One room's chunks as IVF lists and PQ codes, sorted by list so a probe is a slice.
+
+	``offsets[l]:offsets[l + 1]`` is list ``l``'s rows. ``fingerprint`` is the gate's room
+	fingerprint with the codebook version appended, so a retrain makes every entry stale
+	without a separate invalidation.
+	"""
+
+	room: str
+	fingerprint: tuple
+	names: Any
+	last_seq: Any
+	lists: Any
+	offsets: Any
+	codes: Any
+	skipped: tuple[str, ...] = ()
+
+	@property
+	def nbytes(self) -> int:
+		return int(
+			self.codes.nbytes + self.lists.nbytes + self.offsets.nbytes + self.last_seq.nbytes + self.names.nbytes
+		)
+
+	def __len__(self) -> int:
+		return int(self.codes.shape[0])
+
+
+def pack_room_codes(
+	room: str,
+	rows: Iterable[AnnRow],
+	*,
+	fingerprint: tuple,
+	codebook: Codebook,
+) -> RoomCodes:
+	"""Collect one room's codes, encoding from the vector wherever the stored code is missing
+	or belongs to another codebook. Rows filed under any other room are ignored, as
+	:func:`vectors.pack_room` ignores them."""
+	numpy = vectors._numpy()
+	names: list[str] = []
+	seqs: list[int] = []
+	lists: list[int] = []
+	codes: list[Any] = []
+	pending: list[tuple[str, int, Any]] = []
+	skipped: list[str] = []
+	for chunk, row_room, version, ann_list, code, stored, _dim, last_seq in rows:
+		if row_room != room:
+			continue
+		if (
+			version == codebook.version
+			and code is not None
+			and len(code) == codebook.m
+			and ann_list is not None
+			and 0 <= int(ann_list) < codebook.nlist
+		):
+			names.append(chunk)
+			seqs.append(int(last_seq or 0))
+			lists.append(int(ann_list))
+			codes.append(numpy.frombuffer(bytes(code), dtype=numpy.uint8))
+			continue
+		try:
+			vector = vectors.decode_vector(stored, expected_dim=codebook.dim)
+		except vectors.VectorBackendError as exc:
+			skipped.append(f"{chunk}: {exc}")
+			continue
+		pending.append((chunk, int(last_seq or 0), vectors.normalise(vector)))
+
+	if pending:
+		fresh_lists, fresh_codes = codebook.encode(numpy.vstack([vector for _c, _s, vector in pending]))
+		for (chunk, last_seq, _vector), ann_list, code in zip(pending, fresh_lists, fresh_codes, strict=True):
+			names.append(chunk)
+			seqs.append(last_seq)
+			lists.append(int(ann_list))
+			codes.append(code)
+
+	order = numpy.lexsort((numpy.asarray(names, dtype=str), numpy.asarray(lists, dtype=numpy.int32)))
+	sorted_lists = numpy.asarray(lists, dtype=numpy.int32)[order]
+	return RoomCodes(
+		room=room,
+		fingerprint=tuple(fingerprint),
+		names=numpy.asarray(names, dtype=str)[order],
+		last_seq=numpy.asarray(seqs, dtype="<i8")[order],
+		lists=sorted_lists,
+		offsets=numpy.searchsorted(sorted_lists, numpy.arange(codebook.nlist + 1)).astype(numpy.int64),
+		codes=(numpy.vstack(codes)[order] if codes else numpy.zeros((0, codebook.m), dtype=numpy.uint8)),
+		skipped=tuple(skipped),
+	)
+
+
+class RoomCodeIndex(vectors.RoomMatrixIndex):
+	"""Packed per-room codes, with the same byte-bounded LRU and fingerprint rule as the
+	exact index — an entry only needs ``room``, ``fingerprint`` and ``nbytes`` for those."""
+
+	def search(  # type: ignore[override]
+		self,
+		allowed_rooms: frozenset[str],
+		query_vector: Sequence[float],
+		limit: int,
+		*,
+		fingerprints: dict[str, tuple],
+		codebook: Codebook,
+		nprobe: int = DEFAULT_NPROBE,
+	) -> tuple[list[vectors.Hit], int]:
+		"""``(approximate hits, codes scanned)`` over the allowed, fingerprint-current rooms.
+
+		The similarities are estimates: good enough to choose a short list, not to rank it.
+		"""
+		numpy = vectors._numpy()
+		query = vectors.normalise(query_vector)
+		if float(numpy.linalg.norm(query)) == 0.0 or query.shape[0] != codebook.dim:
+			return [], 0
+
+		with self._lock:
+			entries = []
+			for room in sorted(allowed_rooms):
+				entry = self._rooms.get(room)
+				if entry is None or room not in fingerprints or entry.fingerprint != tuple(fingerprints[room]):
+					continue
+				if not len(entry):
+					continue
+				self._rooms.move_to_end(room)
+				entries.append(entry)
+		if not entries:
+			return [], 0
+
+		probed = codebook.probe(query, nprobe)
+		coarse = codebook.centroids @ query
+		table = codebook.lookup_table(query)
+		columns = numpy.arange(codebook.m)
+
+		scores: list[Any] = []
+		names: list[Any] = []
+		rooms: list[Any] = []
+		for entry in entries:
+			rows = numpy.concatenate(
+				[numpy.arange(entry.offsets[l], entry.offsets[l + 1]) for l in probed.tolist()]
+			)
+			if not rows.shape[0]:
+				continue
+			scores.append(coarse[entry.lists[rows]] + table[columns, entry.codes[rows]].sum(axis=1))
+			names.append(entry.names[rows])
+			rooms.append(numpy.full(rows.shape[0], entry.room, dtype=object))
+		if not scores:
+			return [], 0
+		score_array = numpy.concatenate(scores).astype("<f4", copy=False)
+		hits = vectors.ranked_hits(score_array, numpy.concatenate(names), numpy.concatenate(rooms), limit)
+		return hits, int(score_array.shape[0])
+
+
+class IvfPqBackend:
+	"""The ANN index behind the two-method :class:`vectors.VectorBackend` adapter.
+
+	Takes the same ``candidate_loader`` :class:`vectors.NumpyVectorBackend` does and packs
+	what it returns once, on the first search; :meth:`refresh` drops that so the next search
+	reloads. ``search`` re-ranks the approximate short list exactly, so its similarities are
+	the exact backend's. The gate does not use this class — it packs per room from its own
+	reads and re-ranks with a second scoped query — but the benchmark and the tests do, which
+	is what keeps the two paths honest with each other.
+	"""
+
+	def __init__(
+		self,
+		*,
+		codebook: Codebook,
+		candidate_loader: vectors.CandidateLoader,
+		writer: CodeWriter | None = None,
+		nprobe: int = DEFAULT_NPROBE,
+		rerank_depth: int = DEFAULT_RERANK_DEPTH,
+	) -> None:
+		self._codebook = codebook
+		self._load = candidate_loader
+		self._write = writer
+		self._nprobe = nprobe
+		self._rerank_depth = rerank_depth
+		self._index: RoomCodeIndex | None = None
+		self._rows: dict[str, vectors.CandidateRow] = {}
+		self._fingerprints: dict[str, tuple] = {}
+
+	def upsert(self, chunk_id: str, vector: Sequence[float]) -> None:
+		if self._write is None:
+			raise vectors.VectorBackendError("this backend was constructed read-only (no writer)")
+		lists, codes = self._codebook.encode(vectors.normalise(vector)[None, :])
+		self._write(chunk_id, int(lists[0]), codes[0].tobytes(), self._codebook.version)
+
+	def refresh(self) -> None:
+		self._index = None
+
+	def search(
+		self,
+		allowed_rooms: frozenset[str],
+		query_vector: Sequence[float],
+		limit: int,
+	) -> list[vectors.Hit]:
+		index = self._packed()
+		short, _considered = index.search(
+			allowed_rooms,
+			query_vector,
+			max(self._rerank_depth, limit, 1),
+			fingerprints=self._fingerprints,
+			codebook=self._codebook,
+			nprobe=self._nprobe,
+		)
+		rows = [self._rows[hit.chunk] for hit in short]
+		return vectors.NumpyVectorBackend(
+			candidate_loader=lambda: rows, expected_dim=self._codebook.dim
+		).search(allowed_rooms, query_vector, limit)
+
+	def _packed(self) -> RoomCodeIndex:
+		if self._index is not None:
+			return self._index
+		by_room: dict[str, list[AnnRow]] = {}
+		self._rows = {}
+		for row in self._load():
+			chunk, room, stored, dim = row
+			self._rows[chunk] = row
+			by_room.setdefault(room, []).append((chunk, room, None, None, None, stored, dim, 0))
+		index = RoomCodeIndex(max_bytes=0)
+		self._fingerprints = {room: (len(rows), self._codebook.version) for room, rows in by_room.items()}
+		for room, rows in by_room.items():
+			index.put(pack_room_codes(room, rows, fingerprint=self._fingerprints[room], codebook=self._codebook))
+		self._index = index
+		return index
+
+
+_CODE_INDEX: RoomCodeIndex | None = None
+_CODE_INDEX_LOCK = threading.Lock()
+
+
+def code_index() -> RoomCodeIndex:
+	"""The worker's one :class:`RoomCodeIndex`, created on first use."""
+	global _CODE_INDEX
+	if _CODE_INDEX is None:
+		with _CODE_INDEX_LOCK:
+			if _CODE_INDEX is None:
+				_CODE_INDEX = RoomCodeIndex()
+	return _CODE_INDEX
+
+
+def _nearest(data: Any, centroids: Any, *, block: int = 8192) -> Any:
+	"""Index of the nearest centroid to each row, by squared L2, in bounded blocks."""
+	numpy = vectors._numpy()
+	squared = (centroids * centroids).sum(axis=1)
+	out = numpy.empty(data.shape[0], dtype=numpy.int64)
+	for start in range(0, data.shape[0], block):
+		part = data[start : start + block]
+		out[start : start + block] = numpy.argmin(squared[None, :] - 2.0 * (part @ centroids.T), axis=1)
+	return out
+
+
+def _kmeans(data: Any, k: int, iterations: int, rng: Any, *, pad_to: int = 0) -> Any:
+	"""Lloyd's k-means from a random sample of rows. An emptied cluster is re-seeded from a
+	random row rather than left at a centroid nothing is near. ``pad_to`` repeats centroids
+	when there are fewer rows than ``k``, so every sub-quantiser has the same shape."""
+	numpy = vectors._numpy()
+	rows = data.shape[0]
+	k = max(1, min(int(k), rows))
+	centroids = data[rng.choice(rows, size=k, replace=False)].astype("<f4", copy=True)
+	for _ in range(max(int(iterations), 1)):
+		labels = _nearest(data, centroids)
+		order = numpy.argsort(labels, kind="stable")
+		present, starts, counts = numpy.unique(labels[order], return_index=True, return_counts=True)
+		centroids[present] = numpy.add.reduceat(data[order], starts, axis=0) / counts[:, None]
+		empty = numpy.setdiff1d(numpy.arange(k), present)
+		if empty.shape[0]:
+			centroids[empty] = data[rng.choice(rows, size=empty.shape[0], replace=empty.shape[0] > rows)]
+	if pad_to and k < pad_to:
+		centroids = numpy.concatenate([centroids, centroids[numpy.arange(pad_to - k) % k]])
+	return numpy.ascontiguousarray(centroids, dtype="<f4")
@@ -70,7 +70,7 @@ import frappe
 from frappe.utils import cint, get_datetime, now_datetime
 
 from erpnext_enhancements.chat import audit, permissions
-from erpnext_enhancements.chat.retrieval import assemble, budget, citations, lexical, rank, vectors
+from erpnext_enhancements.chat.retrieval import ann, assemble, budget, citations, lexical, rank, vectors
 
 __all__ = ["retrieve", "retrieve_for_oversight", "retrieve_transcript", "search_transcripts"]
 
@@ -259,39 +259,146 @@ def _room_list_sql(allowed_rooms: frozenset[str]) -> str:
 # tests/test_chat_gate_source_scan.py and tests/test_chat_rawsql_guard.py respectively.
 
 
-def _semantic_candidate_rows(
-	allowed_rooms: frozenset[str],
-	*,
-	limit: int,
-) -> list[tuple[str, str, str, int]]:
-	"""``(chunk, room, embedding, embedding_dim)`` for embeddable chunks in scope.
+#: The candidate predicate the semantic tier reads under, one copy shared by the fingerprint
+#: and the row load. The two must select the same rows or a packed matrix is tagged with a
+#: fingerprint that does not describe it — and then it is served, or rebuilt, for the wrong
+#: reason every time. Sealed, not stale, carrying a vector: the **unsealed tail is excluded by
+#: design** — see ``Chat Context Chunk``'s controller for why, and for what covers it instead.
+#: A vector is either the raw ``embedding_f32`` bytes or, for a row the backfill in
+#: ``chat.indexing.embedding_column`` has not reached yet, the legacy base64 ``embedding``.
+_EMBEDDED_CHUNK_SQL = (
+	f"{_CHUNK_TABLE}.`sealed` = 1"
+	f" and {_CHUNK_TABLE}.`is_stale` = 0"
+	f" and ({_CHUNK_TABLE}.`embedding_f32` is not null"
+	f" or ({_CHUNK_TABLE}.`embedding` is not null and {_CHUNK_TABLE}.`embedding` != ''))"
+)
+
 
-	Sealed, not stale, and carrying a vector. The **unsealed tail is excluded by design** —
-	see ``Chat Context Chunk``'s controller for why, and for what covers it instead.
+def _semantic_room_fingerprints(allowed_rooms: frozenset[str]) -> dict[str, vectors.Fingerprint]:
+	"""``{room: (rows, name_checksum, newest_embedded_at)}`` for rooms with embeddable chunks.
 
-	Ordered by ``last_seq desc`` so that when the cap bites it keeps the *recent* history
-	rather than an arbitrary slice. An arbitrary slice is the worse failure: retrieval would
-	work perfectly for old conversations and mysteriously not for this morning's.
+	One aggregate row per room and **no vector column**, which is what lets the packed index
+	in :mod:`chat.retrieval.vectors` skip the load it used to pay on every question. The
+	checksum is ``sum(crc32(name))`` — order-independent, so it moves when one chunk goes stale
+	and another is embedded in the same interval, which a bare count would not see.
+	``embedded_at`` is there for a re-embed in place (new model, same rows), which changes
+	neither.
+
+	A room absent from the result has nothing to score, and the index will not serve it
+	whatever it holds.
 	"""
 	scope = permissions.membership_filter_sql(f"{_CHUNK_TABLE}.`room`", _acting_user(), allow_oversight=True)
 	rooms = _room_list_sql(allowed_rooms)
 	rows = frappe.db.sql(
 		f"""
-		select `name`, `room`, `embedding`, `embedding_dim`
+		select `room`, count(*), coalesce(sum(crc32(`name`)), 0), coalesce(max(`embedded_at`), '')
 		from {_CHUNK_TABLE}
 		where `room` in {rooms}
 			and {scope}
 			and {_RETIRED_CHUNK_SQL}
-			and `sealed` = 1
-			and `is_stale` = 0
-			and `embedding` is not null
-			and `embedding` != ''
-		order by `last_seq` desc
-		limit %(limit)s
+			and {_EMBEDDED_CHUNK_SQL}
+		group by `room`
+		"""
+	)
+	return {row[0]: (cint(row[1]), cint(row[2]), str(row[3] or "")) for row in rows or []}
+
+
+def _semantic_index_rows(allowed_rooms: frozenset[str]) -> list[vectors.IndexRow]:
+	"""``(chunk, room, embedding, embedding_dim, last_seq)`` for every embeddable chunk in scope.
+
+	Called only for the rooms whose packed matrix is missing or out of date, so the vector
+	column crosses the wire once per room per change rather than once per question. No
+	``limit``: the ``max_candidate_chunks`` recency cap is applied in memory over the packed
+	``last_seq``, which keeps its meaning — the most recent chunks across the allowed rooms —
+	without a room's cached matrix depending on which other rooms it was loaded alongside.
+
+	Both vector columns are selected and the non-null one is kept here, not with a
+	``coalesce`` — a coalesce of a ``longblob`` and a ``longtext`` is one type, and a legacy
+	row would arrive as base64 *bytes* that :func:`vectors.decode_vector` would take for raw
+	``float32``.
+	"""
+	scope = permissions.membership_filter_sql(f"{_CHUNK_TABLE}.`room`", _acting_user(), allow_oversight=True)
+	rooms = _room_list_sql(allowed_rooms)
+	rows = frappe.db.sql(
+		f"""
+		select `name`, `room`, `embedding_f32`, `embedding`, `embedding_dim`, `last_seq`
+		from {_CHUNK_TABLE}
+		where `room` in {rooms}
+			and {scope}
+			and {_RETIRED_CHUNK_SQL}
+			and {_EMBEDDED_CHUNK_SQL}
+		order by `room`, `name`
+		"""
+	)
+	return [
+		(row[0], row[1], row[2] if row[2] is not None else row[3], cint(row[4]), cint(row[5]))
+		for row in rows or []
+	]
+
+
+def _semantic_code_rows(allowed_rooms: frozenset[str], *, version: str) -> list[ann.AnnRow]:
+	"""``ann.AnnRow`` for every embeddable chunk in scope, for the approximate index.
+
+	The same ``WHERE`` as :func:`_semantic_index_rows`, so a packed room holds exactly the
+	chunks its fingerprint counted. A vector column is shipped only for a row whose stored code
+	is missing or was written under another codebook — the ``case`` returns ``null`` for the
+	rest, and a room the sweep has caught up on packs from 192-byte codes alone.
+	"""
+	scope = permissions.membership_filter_sql(f"{_CHUNK_TABLE}.`room`", _acting_user(), allow_oversight=True)
+	rooms = _room_list_sql(allowed_rooms)
+	rows = frappe.db.sql(
+		f"""
+		select `name`, `room`, `ann_version`, `ann_list`, `ann_code`,
+			case when `ann_version` = %(version)s and `ann_code` is not null then null else `embedding_f32` end,
+			case when `ann_version` = %(version)s and `ann_code` is not null then null else `embedding` end,
+			`embedding_dim`, `last_seq`
+		from {_CHUNK_TABLE}
+		where `room` in {rooms}
+			and {scope}
+			and {_RETIRED_CHUNK_SQL}
+			and {_EMBEDDED_CHUNK_SQL}
 		""",
-		{"limit": max(cint(limit), 0)},
+		{"version": version},
 	)
-	return [(row[0], row[1], row[2], cint(row[3])) for row in rows or []]
+	return [
+		(
+			row[0],
+			row[1],
+			row[2],
+			None if row[3] is None else cint(row[3]),
+			row[4],
+			row[5] if row[5] is not None else row[6],
+			cint(row[7]),
+			cint(row[8]),
+		)
+		for row in rows or []
+	]
+
+
+def _semantic_rerank_rows(allowed_rooms: frozenset[str], *, names: list[str]) -> list[vectors.CandidateRow]:
+	"""Full-precision vectors for the approximate index's short list.
+
+	Re-filtered on the room set and the candidate predicate, as :func:`_chunk_rows` re-filters:
+	the names have come back out of an in-worker index, and "this list was already filtered" is
+	the assumption that rule exists to refuse.
+	"""
+	if not names:
+		return []
+	scope = permissions.membership_filter_sql(f"{_CHUNK_TABLE}.`room`", _acting_user(), allow_oversight=True)
+	rooms = _room_list_sql(allowed_rooms)
+	placeholders = ", ".join(frappe.db.escape(name) for name in names)
+	rows = frappe.db.sql(
+		f"""
+		select `name`, `room`, `embedding_f32`, `embedding`, `embedding_dim`
+		from {_CHUNK_TABLE}
+		where `name` in ({placeholders})
+			and `room` in {rooms}
+			and {scope}
+			and {_RETIRED_CHUNK_SQL}
+			and {_EMBEDDED_CHUNK_SQL}
+		"""
+	)
+	return [(row[0], row[1], row[2] if row[2] is not None else row[3], cint(row[4])) for row in rows or []]
 
 
 def _lexical_chunk_order(
@@ -1261,12 +1368,11 @@ def _run(
 
 	# --- fetch, already filtered -------------------------------------------------------
 	semantic_order: list[str] = []
-	candidate_rows: list[tuple[str, str, str, int]] = []
+	semantic_considered = 0
 	if _truthy(settings.get("semantic_tier_enabled"), default=True):
-		candidate_rows = _semantic_candidate_rows(
-			allowed_rooms, limit=cint(settings.get("max_candidate_chunks")) or 8_000
+		semantic_order, semantic_considered = _score_semantic(
+			allowed_rooms, query=query, candidate_cap=cint(settings.get("max_candidate_chunks")) or 8_000
 		)
-		semantic_order = _score_semantic(allowed_rooms, query=query, rows=candidate_rows)
 
 	lexical_order: list[str] = []
 	if _truthy(settings.get("lexical_tier_enabled"), default=True):
@@ -1382,7 +1488,7 @@ def _run(
 		manifest=manifest,
 		plan=fitted,
 		rooms_searched=tuple(sorted(allowed_rooms)),
-		chunks_considered=len(candidate_rows) or len(chunk_rows),
+		chunks_considered=semantic_considered or len(chunk_rows),
 		chunks_returned=len([item for item in fitted.kept if item.tier == budget.TIER_T2]),
 		digests_used=len(digest_rows),
 		context_tokens=fitted.total_tokens,
@@ -1401,39 +1507,128 @@ def _score_semantic(
 	allowed_rooms: frozenset[str],
 	*,
 	query: str,
-	rows: list[tuple[str, str, str, int]],
-) -> list[str]:
-	"""Chunk names in cosine order, or ``[]`` when the semantic tier cannot run.
-
-	The vector backend is constructed with a loader over rows this module already fetched and
-	filtered, which is why no SQL lives in :mod:`chat.retrieval.vectors`. It re-checks the
-	room of every row anyway, because from that module's point of view "the caller filtered"
-	is an assumption rather than a fact.
+	candidate_cap: int,
+) -> tuple[list[str], int]:
+	"""``(chunk names in cosine order, candidates considered)``, or ``([], 0)`` when the
+	semantic tier cannot run.
+
+	The fingerprint read comes first and is cheap; the query is embedded only when some room
+	has something to score; and the vector column is read only for rooms whose packed matrix
+	in :func:`vectors.room_index` is missing or no longer matches. Every read is this module's,
+	under the membership filter — :mod:`chat.retrieval.vectors` still runs no SQL, and still
+	re-checks ``allowed_rooms`` itself, because from that module's point of view "the caller
+	filtered" is an assumption rather than a fact.
+
+	With ``Chat Settings.semantic_index`` set to ``Approximate`` and a codebook trained, the
+	scoring is :func:`_score_semantic_approximate` instead, and ``candidate_cap`` does not
+	apply. Anything that stops that path falls back to the exact one here, never to nothing.
 
 	A failure here degrades to the lexical tier rather than failing the turn: an answer from
 	exact matches beats no answer, and the embedding provider being unavailable is an
 	operational event rather than a security one.
 	"""
-	if not rows:
-		return []
+	if not allowed_rooms:
+		return [], 0
+	fingerprints = _semantic_room_fingerprints(allowed_rooms)
+	if not fingerprints:
+		return [], 0
 	try:
 		from erpnext_enhancements.chat.indexing import embed
 
 		query_vector = embed.embed_query(query)
 	except Exception:
-		return []
+		return [], 0
 	if not query_vector:
-		return []
+		return [], 0
+
+	if (_setting("semantic_index") or "") == ann.MODE_APPROXIMATE:
+		codebook = _ann_codebook()
+		if codebook is not None and codebook.dim == len(query_vector):
+			try:
+				return _score_semantic_approximate(
+					allowed_rooms, query_vector=query_vector, fingerprints=fingerprints, codebook=codebook
+				)
+			except Exception:
+				# Missing ANN columns, a codebook that will not load, anything: the exact
+				# tier below is always correct, and a question is not the place to find out.
+				pass
 
-	backend = vectors.NumpyVectorBackend(
-		candidate_loader=lambda: rows,
-		expected_dim=len(query_vector),
-	)
+	index = vectors.room_index()
 	try:
-		hits = backend.search(allowed_rooms, query_vector, limit=len(rows))
+		stale = frozenset(index.stale_rooms(fingerprints)) & allowed_rooms
+		if stale:
+			rows_by_room: dict[str, list[vectors.IndexRow]] = {room: [] for room in stale}
+			for row in _semantic_index_rows(stale):
+				rows_by_room.setdefault(row[1], []).append(row)
+			for room in sorted(stale):
+				index.put(
+					vectors.pack_room(
+						room,
+						rows_by_room.get(room, []),
+						fingerprint=fingerprints[room],
+						expected_dim=len(query_vector),
+					)
+				)
+		hits, considered = index.search(
+			allowed_rooms, query_vector, 0, fingerprints=fingerprints, candidate_cap=max(candidate_cap, 0)
+		)
 	except vectors.VectorBackendError:
-		return []
-	return [hit.chunk for hit in hits]
+		return [], 0
+	return [hit.chunk for hit in hits], considered
+
+
+def _score_semantic_approximate(
+	allowed_rooms: frozenset[str],
+	*,
+	query_vector: list[float],
+	fingerprints: dict[str, vectors.Fingerprint],
+	codebook: ann.Codebook,
+) -> tuple[list[str], int]:
+	"""The ``semantic_index = Approximate`` half of :func:`_score_semantic`. **No recency cap.**
+
+	Every embedded chunk in every allowed room is a candidate; the inverted file scans the
+	``ann_nprobe`` nearest lists of each, and the best ``ann_rerank_depth`` are reloaded at
+	full precision and ranked by :class:`vectors.NumpyVectorBackend`. So the similarities are
+	exact, the order is the exact order *of the short list*, and RRF sees a semantic ranking
+	``ann_rerank_depth`` long rather than the whole candidate set — a chunk below that has no
+	semantic rank, as one past the cap had none before. ``chat.testing.ann_bench`` measures how
+	often the short list misses one the exact tier would have ranked in the top k.
+
+	Keyed on the room fingerprint plus the codebook version, so a retrain repacks every room.
+	"""
+	keyed = {room: (*fingerprint, codebook.version) for room, fingerprint in fingerprints.items()}
+	index = ann.code_index()
+	stale = frozenset(index.stale_rooms(keyed)) & allowed_rooms
+	if stale:
+		rows_by_room: dict[str, list[ann.AnnRow]] = {room: [] for room in stale}
+		for row in _semantic_code_rows(stale, version=codebook.version):
+			rows_by_room.setdefault(row[1], []).append(row)
+		for room in sorted(stale):
+			index.put(
+				ann.pack_room_codes(room, rows_by_room.get(room, []), fingerprint=keyed[room], codebook=codebook)
+			)
+	short, considered = index.search(
+		allowed_rooms,
+		query_vector,
+		cint(_setting("ann_rerank_depth")) or ann.DEFAULT_RERANK_DEPTH,
+		fingerprints=keyed,
+		codebook=codebook,
+		nprobe=cint(_setting("ann_nprobe")) or ann.DEFAULT_NPROBE,
+	)
+	if not short:
+		return [], considered
+	rows = _semantic_rerank_rows(allowed_rooms, names=[hit.chunk for hit in short])
+	hits = vectors.NumpyVectorBackend(candidate_loader=lambda: rows, expected_dim=len(query_vector)).search(
+		allowed_rooms, query_vector, 0
+	)
+	return [hit.chunk for hit in hits], considered
+
+
+def _ann_codebook() -> ann.Codebook | None:
+	try:
+		return ann.load_codebook(frappe.get_site_path(*ann.CODEBOOK_FILE))
+	except Exception:
+		return None
 
 
 def _fused_keys(
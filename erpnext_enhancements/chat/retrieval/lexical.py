@@ -85,7 +85,7 @@ def dropped_terms(query: str) -> list[str]:
 	return [token for token in tokenize(query) if len(token) < MIN_TOKEN_SIZE]
 
 
-def build_boolean_query(query: str) -> str:
+def build_boolean_query(query: str, *, prefix: bool = False) -> str:
 	"""The ``AGAINST(... IN BOOLEAN MODE)`` expression, or ``""`` when nothing is searchable.
 
 	Every term is ``+``-required, which makes the search a conjunction. That is the right
@@ -93,6 +93,10 @@ def build_boolean_query(query: str) -> str:
 	words returns most of the room. A caller wanting recall should fall back to the semantic
 	tier, which is what it is for.
 
+	``prefix`` truncates every term (``+term*``), so ``inv`` finds ``invoice``. That is what a
+	search box typed into needs — message search, where the old ``LIKE '%term%'`` matched
+	partial words — and not what retrieval wants, where an exact identifier must stay exact.
+
 	Returns the empty string when no term survives. **The caller must treat that as "run no
 	lexical query"** — never as an expression to pass through, because an empty ``AGAINST``
 	is a full scan wearing a search's clothes.
@@ -100,4 +104,5 @@ def build_boolean_query(query: str) -> str:
 	terms = [token for token in tokenize(query) if len(token) >= MIN_TOKEN_SIZE][:MAX_TERMS]
 	if not terms:
 		return ""
-	return " ".join(f"+{term}" for term in terms)
+	suffix = "*" if prefix else ""
+	return " ".join(f"+{term}{suffix}" for term in terms)
@@ -16,14 +16,20 @@ of a hundred thousand chunks would be visible in a web worker's profile, while a
 is microseconds. The revisit triggers are therefore written against the *filtered* count.
 
 --------------------------------------------------------------------------------------
-Why the storage is base64 rather than a BLOB
+Why the storage is a raw column outside the DocType
 --------------------------------------------------------------------------------------
 
-The decision's word is "BLOB" and **Frappe has no BLOB fieldtype**. The column is a
-``Long Text`` holding base64 of the raw ``float32`` bytes: a measured 33% storage overhead,
-with a raw ``longblob`` by patch recorded as the optimisation if volume ever justifies it.
-That satisfies the intent exactly — the vector is opaque bytes the database never interprets —
-without inventing a fieldtype.
+The decision's word is "BLOB" and **Frappe has no BLOB fieldtype**. The first cut stored a
+``Long Text`` holding base64 of the raw ``float32`` bytes — a measured 33% storage and
+row-transfer overhead, plus a base64 decode on the retrieval path — and recorded a raw
+``longblob`` by patch as the optimisation if volume ever justified it. It did:
+``embedding_f32`` is that column, added by DDL in ``chat/indexing/embedding_column.py`` rather
+than declared on the DocType, because a DocField would be synced back to ``longtext`` on the
+next migrate and a charset conversion over binary is silent corruption.
+
+:func:`encode_vector` therefore returns the raw little-endian bytes, and :func:`decode_vector`
+reads them with ``numpy.frombuffer`` — no copy, no decode. It still accepts the legacy base64
+string, so rows the backfill has not reached yet score exactly as before.
 
 --------------------------------------------------------------------------------------
 The normalisation rule that silently corrupts everything if skipped
@@ -53,21 +59,64 @@ The consequence is stated rather than hidden: a future MariaDB-native vector bac
 simply be dropped in behind this interface — its query belongs in the gate too, or that rule
 gets revisited deliberately. The adapter still buys what it was for, which is that the
 *scoring* implementation is one file.
+
+--------------------------------------------------------------------------------------
+The packed per-room index, and why it is keyed on a fingerprint rather than a TTL
+--------------------------------------------------------------------------------------
+
+:class:`NumpyVectorBackend` decodes every candidate row, re-checks its norm and runs one
+``numpy.dot`` per chunk in a Python loop — and the gate had to ship every ``embedding`` column
+over the wire to feed it. On a room with tens of thousands of sealed chunks that is a
+multi-hundred-millisecond stall in a web worker, per question.
+
+:class:`RoomMatrixIndex` does the decode once per room and keeps the result: a contiguous
+``(n, dim)`` ``float32`` matrix of unit rows, the chunk names in the same order, and each
+chunk's ``last_seq``. A search is one matrix-vector product per allowed room and an
+``argpartition``. Rooms outside ``allowed_rooms`` are never touched, so the permission rule is
+the same one :class:`NumpyVectorBackend` applies — by construction rather than by a ``continue``.
+
+Each entry carries the **fingerprint** the gate computed for that room — row count, an
+order-independent checksum of the chunk names, and the newest ``embedded_at`` — under the same
+``WHERE`` as the candidate read. An entry is served only when its fingerprint matches the one
+read *for this request*, so a chunk sealed, embedded, invalidated, retired or purged by another
+worker changes the fingerprint and the room is rebuilt; nothing here trusts its own age. The
+in-worker :func:`forget_rooms` that ``chat/indexing/invalidate.py`` calls is the fast path for
+the worker that did the write, not the correctness mechanism.
+
+No vector is cached for a room the reader cannot see: the index is only ever asked about rooms
+whose fingerprint the gate just read under the membership filter, and the per-room contents do
+not depend on who is asking.
 """
 
 from __future__ import annotations
 
 import base64
+import threading
+from collections import OrderedDict
 from collections.abc import Callable, Iterable, Sequence
 from dataclasses import dataclass
 from typing import Any, Protocol
 
-#: Rows the gate hands over: ``(chunk_name, room, embedding_b64, embedding_dim)``.
-CandidateRow = tuple[str, str, str, int]
+#: Rows the gate hands over: ``(chunk_name, room, stored_vector, embedding_dim)``, where the
+#: stored vector is raw bytes from the binary column or a legacy base64 string.
+CandidateRow = tuple[str, str, bytes | str, int]
 
 #: ``() -> iterable of CandidateRow``. Supplied by the gate, already permission-filtered.
 CandidateLoader = Callable[[], Iterable[CandidateRow]]
 
+#: Rows the gate hands over to build a room's packed matrix:
+#: ``(chunk_name, room, stored_vector, embedding_dim, last_seq)``.
+IndexRow = tuple[str, str, bytes | str, int, int]
+
+#: What the gate read about one room, under the candidate filter, to decide whether a packed
+#: matrix is still current: ``(row_count, name_checksum, newest_embedded_at)``.
+Fingerprint = tuple[int, int, str]
+
+#: The in-worker ceiling on packed vectors, in bytes. At the default 1,536 dimensions a chunk
+#: is 6 KiB, so this holds roughly forty thousand chunks per worker — the busy rooms, which
+#: are the ones the stall was about. Least-recently-searched rooms are evicted past it.
+DEFAULT_INDEX_MAX_BYTES: int = 256 * 1024 * 1024
+
 
 class VectorBackendError(Exception):
 	"""Raised for a malformed stored vector. Never carries the vector."""
@@ -80,8 +129,8 @@ class Hit:
 	similarity: float
 
 
-def encode_vector(values: Sequence[float]) -> str:
-	"""``float32`` little-endian, base64. The one on-disk representation.
+def encode_vector(values: Sequence[float]) -> bytes:
+	"""``float32`` little-endian, raw bytes. The one on-disk representation.
 
 	``float32`` rather than ``float64`` halves the storage for a precision loss that is
 	irrelevant to a similarity ranking — the difference between two chunks' scores is orders
@@ -90,24 +139,42 @@ def encode_vector(values: Sequence[float]) -> str:
 	be readable on another.
 	"""
 	numpy = _numpy()
-	array = numpy.asarray(list(values), dtype="<f4")
-	return base64.b64encode(array.tobytes()).decode("ascii")
+	return numpy.asarray(list(values), dtype="<f4").tobytes()
 
 
-def decode_vector(encoded: str, expected_dim: int | None = None) -> Any:
-	"""Base64 → ``numpy`` ``float32`` array.
+def encode_vector_base64(values: Sequence[float]) -> str:
+	"""The legacy ``Long Text`` form: base64 of :func:`encode_vector`'s bytes.
+
+	Nothing writes it any more. It is kept so the decode path for rows the backfill has not
+	reached yet is tested against the same encoder that wrote them.
+	"""
+	return base64.b64encode(encode_vector(values)).decode("ascii")
+
+
+def decode_vector(stored: Any, expected_dim: int | None = None) -> Any:
+	"""Stored vector → ``numpy`` ``float32`` array.
+
+	Raw bytes (``bytes``, ``bytearray``, ``memoryview``) are the binary column and are wrapped
+	with ``numpy.frombuffer`` — a view over the driver's buffer, not a copy. A ``str`` is the
+	legacy base64 column and is decoded first.
 
 	``expected_dim`` is checked rather than trusted. A dimension mismatch means the row was
 	written by a different embedding configuration, and scoring it against the current query
 	vector produces a number with no meaning that looks exactly like a number with meaning.
 	"""
 	numpy = _numpy()
-	try:
-		raw = base64.b64decode(encoded or "", validate=True)
-	except Exception as exc:
-		raise VectorBackendError(f"stored vector is not valid base64 ({exc.__class__.__name__})") from None
-	if not raw or len(raw) % 4:
-		raise VectorBackendError(f"stored vector is {len(raw)} bytes, not a whole number of float32")
+	if isinstance(stored, bytes | bytearray | memoryview):
+		raw = stored
+	else:
+		try:
+			raw = base64.b64decode(stored or "", validate=True)
+		except Exception as exc:
+			raise VectorBackendError(
+				f"stored vector is not valid base64 ({exc.__class__.__name__})"
+			) from None
+	size = len(raw) if not isinstance(raw, memoryview) else raw.nbytes
+	if not size or size % 4:
+		raise VectorBackendError(f"stored vector is {size} bytes, not a whole number of float32")
 	array = numpy.frombuffer(raw, dtype="<f4")
 	if expected_dim is not None and array.shape[0] != expected_dim:
 		raise VectorBackendError(f"stored vector has {array.shape[0]} dimensions, expected {expected_dim}")
@@ -173,7 +240,7 @@ class NumpyVectorBackend:
 		self,
 		*,
 		candidate_loader: CandidateLoader,
-		writer: Callable[[str, str, int], None] | None = None,
+		writer: Callable[[str, bytes, int], None] | None = None,
 		expected_dim: int | None = None,
 	) -> None:
 		self._load = candidate_loader
@@ -230,6 +297,249 @@ class NumpyVectorBackend:
 		return hits[: max(limit, 0)] if limit else hits
 
 
+@dataclass(frozen=True)
+class RoomMatrix:
+	"""One room's sealed, embedded chunks, decoded once and packed.
+
+	``matrix`` rows are unit length, line up with ``names`` and ``last_seq``, and are ordered
+	newest first — so the recency cap is a prefix of each room and is scored without copying
+	a row. ``skipped`` records the rows that could not be packed, for the same reason
+	:attr:`NumpyVectorBackend.skipped` exists.
+	"""
+
+	room: str
+	fingerprint: Fingerprint
+	dim: int
+	names: Any
+	last_seq: Any
+	matrix: Any
+	skipped: tuple[str, ...] = ()
+
+	@property
+	def nbytes(self) -> int:
+		return int(self.matrix.nbytes + self.last_seq.nbytes + self.names.nbytes)
+
+	def __len__(self) -> int:
+		return int(self.matrix.shape[0])
+
+
+def pack_room(
+	room: str,
+	rows: Iterable[IndexRow],
+	*,
+	fingerprint: Fingerprint,
+	expected_dim: int | None = None,
+) -> RoomMatrix:
+	"""Decode, check and normalise one room's rows into a :class:`RoomMatrix`.
+
+	The per-row work :class:`NumpyVectorBackend` does on every search happens here, once per
+	room per change. Rows for any other room are ignored rather than trusted — the caller is
+	outside this module, and a row filed under the wrong room is exactly the kind of thing a
+	packed matrix would otherwise serve to the wrong reader for as long as it stayed cached.
+	"""
+	numpy = _numpy()
+	names: list[str] = []
+	seqs: list[int] = []
+	packed: list[Any] = []
+	skipped: list[str] = []
+	dim = int(expected_dim or 0)
+	own = sorted((row for row in rows if row[1] == room), key=lambda row: (-int(row[4] or 0), row[0]))
+	for chunk, _room, encoded, row_dim, last_seq in own:
+		try:
+			vector = decode_vector(encoded, expected_dim=expected_dim or row_dim or None)
+		except VectorBackendError as exc:
+			skipped.append(f"{chunk}: {exc}")
+			continue
+		if not dim:
+			dim = int(vector.shape[0])
+		elif vector.shape[0] != dim:
+			skipped.append(f"{chunk}: {vector.shape[0]} dimensions against a {dim}-dimension room")
+			continue
+		if not is_normalised(vector):
+			vector = normalise(vector)
+		names.append(chunk)
+		seqs.append(int(last_seq or 0))
+		packed.append(vector)
+
+	matrix = numpy.vstack(packed).astype("<f4", copy=False) if packed else numpy.zeros((0, dim), dtype="<f4")
+	return RoomMatrix(
+		room=room,
+		fingerprint=tuple(fingerprint),
+		dim=dim,
+		names=numpy.asarray(names, dtype=str),
+		last_seq=numpy.asarray(seqs, dtype="<i8"),
+		matrix=numpy.ascontiguousarray(matrix),
+		skipped=tuple(skipped),
+	)
+
+
+class RoomMatrixIndex:
+	"""Packed per-room matrices, LRU-bounded by bytes, served only on a fingerprint match.
+
+	Thread-safe for the gunicorn-threads case: the dictionary is guarded, and a
+	:class:`RoomMatrix` is immutable once built, so a search holding one while another thread
+	replaces it is reading a consistent, merely superseded, snapshot.
+	"""
+
+	def __init__(self, *, max_bytes: int = DEFAULT_INDEX_MAX_BYTES) -> None:
+		self._max_bytes = max(int(max_bytes), 0)
+		self._rooms: OrderedDict[str, RoomMatrix] = OrderedDict()
+		self._bytes = 0
+		self._lock = threading.Lock()
+
+	@property
+	def nbytes(self) -> int:
+		return self._bytes
+
+	def rooms(self) -> tuple[str, ...]:
+		with self._lock:
+			return tuple(self._rooms)
+
+	def stale_rooms(self, fingerprints: dict[str, Fingerprint]) -> list[str]:
+		"""Rooms whose packed matrix is missing or was built from a different fingerprint."""
+		with self._lock:
+			return sorted(
+				room
+				for room, fingerprint in fingerprints.items()
+				if room not in self._rooms or self._rooms[room].fingerprint != tuple(fingerprint)
+			)
+
+	def put(self, entry: RoomMatrix) -> None:
+		with self._lock:
+			previous = self._rooms.pop(entry.room, None)
+			if previous is not None:
+				self._bytes -= previous.nbytes
+			self._rooms[entry.room] = entry
+			self._bytes += entry.nbytes
+			self._evict()
+
+	def forget(self, rooms: Iterable[str]) -> int:
+		"""Drop rooms. Returns how many were held."""
+		dropped = 0
+		with self._lock:
+			for room in rooms:
+				previous = self._rooms.pop(room, None)
+				if previous is not None:
+					self._bytes -= previous.nbytes
+					dropped += 1
+		return dropped
+
+	def clear(self) -> None:
+		with self._lock:
+			self._rooms.clear()
+			self._bytes = 0
+
+	def search(
+		self,
+		allowed_rooms: frozenset[str],
+		query_vector: Sequence[float],
+		limit: int,
+		*,
+		fingerprints: dict[str, Fingerprint],
+		candidate_cap: int = 0,
+	) -> tuple[list[Hit], int]:
+		"""``(hits, candidates_considered)`` over the rooms in both ``allowed_rooms`` and
+		``fingerprints`` whose packed matrix matches.
+
+		``candidate_cap`` keeps the same contract the gate's ``max_candidate_chunks`` always
+		had: past it, only the most recent chunks by ``last_seq`` are scored. ``limit`` of 0
+		returns the whole ranking, which is what reciprocal rank fusion needs — a lexical hit's
+		semantic rank counts even when it is far down the list.
+
+		Ties break on the chunk name, exactly as :meth:`NumpyVectorBackend.search` does, so the
+		two backends agree on order and not merely on membership.
+		"""
+		numpy = _numpy()
+		query = normalise(query_vector)
+		if float(numpy.linalg.norm(query)) == 0.0:
+			return [], 0
+
+		with self._lock:
+			entries = []
+			for room in sorted(allowed_rooms):
+				entry = self._rooms.get(room)
+				if entry is None or room not in fingerprints or entry.fingerprint != tuple(fingerprints[room]):
+					continue
+				if not len(entry) or entry.dim != query.shape[0]:
+					continue
+				self._rooms.move_to_end(room)
+				entries.append(entry)
+		if not entries:
+			return [], 0
+
+		take = [len(entry) for entry in entries]
+		if candidate_cap and sum(take) > candidate_cap:
+			# The newest `candidate_cap` across every room. Each room is packed newest first,
+			# so whatever a room contributes is a prefix of it — counted here, then sliced
+			# below as a view rather than gathered as a copy.
+			seqs = numpy.concatenate([entry.last_seq for entry in entries])
+			recent = numpy.argpartition(-seqs, candidate_cap - 1)[:candidate_cap]
+			owner = numpy.searchsorted(numpy.cumsum(take), recent, side="right")
+			take = numpy.bincount(owner, minlength=len(entries)).tolist()
+
+		used = [(entry, count) for entry, count in zip(entries, take, strict=True) if count]
+		scores = numpy.concatenate([entry.matrix[:count] @ query for entry, count in used])
+		names = numpy.concatenate([entry.names[:count] for entry, count in used])
+		rooms = numpy.concatenate([numpy.full(count, entry.room, dtype=object) for entry, count in used])
+		return ranked_hits(scores, names, rooms, limit), int(scores.shape[0])
+
+	def _evict(self) -> None:
+		"""Least-recently-searched first, never the entry just written."""
+		while self._max_bytes and self._bytes > self._max_bytes and len(self._rooms) > 1:
+			_room, entry = self._rooms.popitem(last=False)
+			self._bytes -= entry.nbytes
+
+
+def ranked_hits(scores: Any, names: Any, rooms: Any, limit: int) -> list[Hit]:
+	"""Parallel score, name and room arrays → :class:`Hit` list, best first, cut at ``limit``.
+
+	Ties break on the chunk name, exactly as :meth:`NumpyVectorBackend.search` does. ``limit``
+	of 0 keeps everything. Shared with :mod:`chat.retrieval.ann`, whose approximate scores are
+	cut the same way so the two indexes differ only in what they score.
+	"""
+	numpy = _numpy()
+	considered = int(scores.shape[0])
+	keep = considered if not limit or limit >= considered else max(int(limit), 0)
+	if not keep:
+		return []
+	if keep < considered:
+		# Everything scoring at least the keep-th best, ties included, so the name tie-break
+		# below decides the cut rather than partition's arbitrary pick among equals.
+		floor = numpy.partition(scores, considered - keep)[considered - keep]
+		top = numpy.flatnonzero(scores >= floor)
+		scores, names, rooms = scores[top], names[top], rooms[top]
+
+	order = numpy.lexsort((names, -scores))[:keep]
+	return [
+		Hit(chunk=chunk, room=room, similarity=similarity)
+		for chunk, room, similarity in zip(
+			names[order].tolist(), rooms[order].tolist(), scores[order].tolist(), strict=True
+		)
+	]
+
+
+_ROOM_INDEX: RoomMatrixIndex | None = None
+_ROOM_INDEX_LOCK = threading.Lock()
+
+
+def room_index() -> RoomMatrixIndex:
+	"""The worker's one :class:`RoomMatrixIndex`, created on first use."""
+	global _ROOM_INDEX
+	if _ROOM_INDEX is None:
+		with _ROOM_INDEX_LOCK:
+			if _ROOM_INDEX is None:
+				_ROOM_INDEX = RoomMatrixIndex()
+	return _ROOM_INDEX
+
+
+def forget_rooms(rooms: Iterable[str]) -> int:
+	"""Drop rooms from this worker's packed index. Never raises; called from the delete path."""
+	try:
+		return room_index().forget(rooms)
+	except Exception:
+		return 0
+
+
 def _numpy() -> Any:
 	"""Import ``numpy`` at call time, with a legible failure.
 
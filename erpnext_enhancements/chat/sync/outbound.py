@@ -32,6 +32,17 @@ the other nine find the head claimed and exit immediately. The alternative — o
 job, each deferring on Rule 1 — is correct but leaves nine messages waiting for the next
 five-minute sweep, which is not chat.
 
+With ``Chat Settings.relay_batch_size`` above 1 the same worker claims the room's due head
+*run* rather than its head: up to that many ``Pending`` rows in ``job_seq`` order, locked in
+one ``SELECT … FOR UPDATE`` and moved to ``In Progress`` in one ``UPDATE`` under one lease
+sized for all of them (:func:`claim_batch`). They are then sent in order, paced by the same
+space bucket, and every write they make is committed once at the end of the batch
+(:func:`execute_claimed_batch`). A burst of ten drains at the space's one write per second
+without paying ten claim cycles and twenty commits. The price is stated where the setting is
+read: a worker killed mid-batch holds the whole batch until its longer lease runs out, and
+the rows it had already sent are sent again — which the request ids make harmless, but which
+is why the default is still one.
+
 --------------------------------------------------------------------------------------
 ``lease_expires_at`` is one field doing two jobs, and cleanup is never a ``finally``
 --------------------------------------------------------------------------------------
@@ -171,6 +182,11 @@ LEASE_MAX_SECONDS: Final[int] = 1800
 MAX_JOBS_PER_RUN: Final[int] = 200
 MAX_RUN_SECONDS: Final[float] = 240.0
 
+#: Ceiling on ``Chat Settings.relay_batch_size``. At one write per second per space a batch of
+#: ten is ten seconds of sending, and the lease arithmetic usually caps it lower anyway — see
+#: :func:`batch_limit`.
+MAX_RELAY_BATCH: Final[int] = 10
+
 #: The queue the relay runs on. ``short`` is where latency-sensitive work belongs, and the
 #: run bound above is set under its 300-second timeout on purpose.
 RELAY_QUEUE: Final[str] = "short"
@@ -328,8 +344,9 @@ def lease_seconds(
 	block_seconds: float = ratelimit.DEFAULT_MAX_BLOCK_MS / 1000.0,
 	margin: float = LEASE_MARGIN_SECONDS,
 	ceiling: float = LEASE_MAX_SECONDS,
+	jobs: int = 1,
 ) -> float:
-	"""Worst-case wall clock for one relay job, plus margin. Pure, total, and clamped.
+	"""Worst-case wall clock for ``jobs`` relay jobs in a row, plus margin. Pure, total, and clamped.
 
 	**This is deliberately not ``http_timeout + margin``**, which is the obvious formula and
 	the wrong one. One job is not one HTTP call: ``GoogleChatClient._execute`` retries
@@ -345,6 +362,9 @@ def lease_seconds(
 	so this is an upper bound rather than an expectation. ``ceiling`` then clamps the whole
 	thing: a lease is a promise nobody else will touch the row, and an arithmetic accident in
 	the settings must not be able to strand a message for a day.
+
+	``jobs`` is a claimed batch: every job in it can hit its own worst case, so the per-job
+	figure is multiplied and the margin, which covers the claim and the commit, is not.
 	"""
 	attempts = max(int(max_attempts), 1)
 	timeout = max(float(http_timeout), 0.0)
@@ -355,10 +375,42 @@ def lease_seconds(
 	for attempt in range(attempts - 1):
 		sleeps += min(cap, base * float(2 ** min(attempt, 30)))
 
-	total = max(float(block_seconds), 0.0) + attempts * timeout + sleeps + max(float(margin), 0.0)
+	per_job = max(float(block_seconds), 0.0) + attempts * timeout + sleeps
+	total = max(int(jobs), 1) * per_job + max(float(margin), 0.0)
 	return min(total, max(float(ceiling), 1.0))
 
 
+def batch_limit(
+	wanted: int,
+	*,
+	http_timeout: float,
+	max_attempts: int,
+	backoff_base: float,
+	backoff_cap: float,
+	ceiling: float = LEASE_MAX_SECONDS,
+) -> int:
+	"""The largest batch, up to ``wanted``, whose worst case fits under ``ceiling``. At least 1.
+
+	Pure. A batch whose lease :func:`lease_seconds` would have to clamp is a batch the sweeper
+	could reap while it is still sending, so it is made smaller instead. With the shipped
+	settings (30-second timeout, five attempts) that is nine jobs.
+	"""
+	size = min(max(int(wanted), 1), MAX_RELAY_BATCH)
+	while size > 1:
+		needed = lease_seconds(
+			http_timeout=http_timeout,
+			max_attempts=max_attempts,
+			backoff_base=backoff_base,
+			backoff_cap=backoff_cap,
+			ceiling=float("inf"),
+			jobs=size,
+		)
+		if needed <= ceiling:
+			break
+		size -= 1
+	return size
+
+
 def blocking_predecessor(open_rows: Sequence[Mapping[str, Any]], job_name: str) -> Mapping[str, Any] | None:
 	"""Rule 1 as a pure function: the earlier live job that stops ``job_name`` running, if any.
 
@@ -677,6 +729,33 @@ def transition(job: dict[str, Any], target: RelayState, *, fields: Mapping[str,
 	return job
 
 
+def transition_many(
+	jobs: list[dict[str, Any]], target: RelayState, *, fields: Mapping[str, Any] | None = None
+) -> list[dict[str, Any]]:
+	""":func:`transition` for a claimed batch: the same gate for every row, **one** ``UPDATE``.
+
+	Every job is checked by ``assert_transition`` before anything is written, so one illegal
+	row refuses the whole write rather than leaving the batch half moved. The projection onto
+	``Chat Message`` is still per job — each message row is its own write either way.
+	"""
+	if not jobs:
+		return jobs
+	destination = target
+	for job in jobs:
+		destination = assert_transition(job.get("status") or "", target)
+
+	payload: dict[str, Any] = dict(fields or {})
+	if "last_error" in payload:
+		payload["last_error"] = scrub_and_truncate(payload["last_error"])
+	payload["status"] = destination.value
+
+	frappe.db.set_value(RELAY_JOB, {"name": ("in", [job["name"] for job in jobs])}, payload)
+	for job in jobs:
+		job.update(payload)
+		_project_message_state(job, destination)
+	return jobs
+
+
 def _project_message_state(job: Mapping[str, Any], state: RelayState) -> None:
 	"""Write the ``Chat Message.sync_state`` this relay state implies, or nothing at all.
 
@@ -785,16 +864,41 @@ def _release(job: dict[str, Any], *, seconds: int, reason: str) -> dict[str, Any
 	)
 
 
-def _lease_until(settings: Any) -> Any:
+def _release_many(jobs: list[dict[str, Any]], *, reason: str) -> None:
+	"""Hand the unsent tail of a claimed batch back, in one write. Due at once, attempts untouched.
+
+	Due immediately rather than deferred: whatever stopped the batch is in front of these rows
+	in the FIFO, and Rule 1 keeps them waiting behind it without a second clock.
+	"""
+	transition_many(
+		jobs,
+		RelayState.PENDING,
+		fields={"available_at": now_datetime(), "lease_expires_at": None, "last_error": f"Released: {reason}"},
+	)
+
+
+def _lease_until(settings: Any, *, jobs: int = 1) -> Any:
 	seconds = lease_seconds(
 		http_timeout=_setting_int(settings, "http_timeout_seconds", 30),
 		max_attempts=_setting_int(settings, "relay_max_attempts", 5),
 		backoff_base=_setting_int(settings, "relay_initial_backoff_seconds", 2),
 		backoff_cap=_setting_int(settings, "backoff_cap_seconds", 32),
+		jobs=jobs,
 	)
 	return add_to_date(now_datetime(), seconds=int(seconds))
 
 
+def relay_batch_size(settings: Any) -> int:
+	"""``Chat Settings.relay_batch_size``, cut down by :func:`batch_limit`. 1 means one job at a time."""
+	return batch_limit(
+		_setting_int(settings, "relay_batch_size", 1),
+		http_timeout=_setting_int(settings, "http_timeout_seconds", 30),
+		max_attempts=_setting_int(settings, "relay_max_attempts", 5),
+		backoff_base=_setting_int(settings, "relay_initial_backoff_seconds", 2),
+		backoff_cap=_setting_int(settings, "backoff_cap_seconds", 32),
+	)
+
+
 def _try_claim(job_name: str, *, settings: Any) -> dict[str, Any] | None:
 	"""Take the lease on one row, atomically. ``None`` means somebody else got there first.
 
@@ -863,6 +967,62 @@ def claim_next_job(room: str, *, settings: Any | None = None) -> dict[str, Any]
 	return _try_claim(str(candidate["name"]), settings=config)
 
 
+def claim_batch(room: str, *, limit: int, settings: Any | None = None) -> list[dict[str, Any]]:
+	"""Claim the due run at the head of ``room``'s FIFO, up to ``limit`` jobs, under one lease.
+
+	The run is the head and every row after it that is also ``Pending`` and due, stopping at
+	the first that is not — a row behind an ``In Progress`` or deferred one is blocked by
+	Rule 1, so the batch is a prefix of the FIFO or it is nothing. :func:`claim_next_job` is
+	the one-row case of this and keeps all of its reasons for returning nothing.
+
+	Two statements where one-at-a-time claiming took four per row: the candidates are locked
+	and loaded in one ``SELECT … FOR UPDATE``, re-checked inside the lock exactly as
+	:func:`_try_claim` re-checks its row, and moved to ``In Progress`` in one ``UPDATE``
+	(:func:`transition_many`). Then one commit, for the same reason ``_try_claim`` commits: a
+	claim nobody else can see is not a claim.
+	"""
+	config = settings if settings is not None else _settings()
+	now = now_datetime()
+	candidates: list[str] = []
+	for row in open_jobs(room, limit=limit):
+		available_at = row.get("available_at")
+		if str(row.get("status") or "") != RelayState.PENDING.value:
+			break
+		if available_at and get_datetime(available_at) > now:
+			break
+		candidates.append(str(row["name"]))
+	if not candidates:
+		return []
+
+	locked = {
+		str(row["name"]): dict(row)
+		for row in frappe.db.get_values(
+			RELAY_JOB,
+			{"name": ("in", candidates), "status": RelayState.PENDING.value},
+			list(_JOB_FIELDS),
+			as_dict=True,
+			for_update=True,
+		)
+	}
+	jobs: list[dict[str, Any]] = []
+	for name in candidates:
+		job = locked.get(name)
+		if job is None:
+			break
+		available_at = job.get("available_at")
+		if available_at and get_datetime(available_at) > now_datetime():
+			break
+		jobs.append(job)
+	if not jobs:
+		return []
+
+	transition_many(
+		jobs, RelayState.IN_PROGRESS, fields={"lease_expires_at": _lease_until(config, jobs=len(jobs))}
+	)
+	frappe.db.commit()
+	return jobs
+
+
 # --------------------------------------------------------------------------------------
 # The dependency gate
 # --------------------------------------------------------------------------------------
@@ -2016,6 +2176,48 @@ def execute_claimed_job(job: dict[str, Any], *, settings: Any) -> str:
 	return "done"
 
 
+def execute_claimed_batch(
+	jobs: list[dict[str, Any]], *, settings: Any, deadline: float | None = None
+) -> tuple[list[str], str]:
+	"""Run a claimed batch in ``job_seq`` order. Returns each job's outcome, and why it stopped early.
+
+	Each job is :func:`execute_claimed_job`, unchanged — its handler charges the space bucket,
+	so the sends are paced at one per second inside the one lease. What is *not* done here is
+	commit: the caller commits once, after the batch.
+
+	Before every job after the first come the same three checks :func:`drain_room` makes
+	before every claim — the kill switch, the breaker, the run-time bound — so pausing
+	mid-batch still stops the next write. A job that does not finish (``deferred``, or
+	``failed`` and due again later) blocks everything behind it under Rule 1. Either way the
+	unsent tail is released in one write (:func:`_release_many`). A job that went ``Dead``
+	blocks nothing, so the batch carries on past it.
+	"""
+	outcomes: list[str] = []
+	for index, job in enumerate(jobs):
+		if index:
+			settings = _settings()
+			stop = ""
+			paused = outbound_pause_reason(settings)
+			if paused:
+				stop = f"paused: {paused}"
+			elif _circuit_state(settings).open:
+				stop = "circuit breaker open"
+			elif deadline is not None and time.monotonic() > deadline:
+				stop = "run time bound"
+			if stop:
+				_release_many(jobs[index:], reason=f"batch stopped: {stop}")
+				return outcomes, stop
+
+		outcome = execute_claimed_job(job, settings=settings)
+		outcomes.append(outcome)
+		if outcome == "deferred" or (outcome == "failed" and job.get("status") != RelayState.DEAD.value):
+			rest = jobs[index + 1 :]
+			if rest:
+				_release_many(rest, reason=f"job_seq {job.get('job_seq')} did not complete")
+			return outcomes, "head of line deferred" if outcome == "deferred" else ""
+	return outcomes, ""
+
+
 # --------------------------------------------------------------------------------------
 # Public entry points
 # --------------------------------------------------------------------------------------
@@ -2033,6 +2235,10 @@ def drain_room(room: str, *, max_jobs: int = MAX_JOBS_PER_RUN, max_seconds: floa
 	release kills it whenever it likes, so the loop stops early, commits, and re-enqueues
 	itself; a worker cut off mid-loop loses nothing but a wake-up, because every completed job
 	was committed as it finished.
+
+	With ``relay_batch_size`` above 1 each turn of the loop claims a batch (:func:`claim_batch`)
+	instead of one job and commits once after it. A batch counts against ``max_jobs`` by its
+	size, and the kill switch is still read before every job inside it.
 	"""
 	started = time.monotonic()
 	summary = {"room": room, "claimed": 0, "done": 0, "failed": 0, "deferred": 0, "skipped": 0, "stopped": ""}
@@ -2055,6 +2261,28 @@ def drain_room(room: str, *, max_jobs: int = MAX_JOBS_PER_RUN, max_seconds: floa
 			enqueue_room(room)
 			break
 
+		batch = min(relay_batch_size(settings), int(max_jobs) - summary["claimed"])
+		if batch > 1:
+			jobs = claim_batch(room, limit=batch, settings=settings)
+			if not jobs:
+				summary["stopped"] = summary["stopped"] or "nothing claimable"
+				break
+			summary["claimed"] += len(jobs)
+			outcomes, stopped = execute_claimed_batch(
+				jobs, settings=settings, deadline=started + float(max_seconds)
+			)
+			for outcome in outcomes:
+				summary[outcome if outcome in summary else "done"] += 1
+			frappe.db.commit()
+			if stopped == "circuit breaker open":
+				_defer_due_jobs(room, seconds=_circuit_state(_settings()).retry_after_seconds, reason=stopped)
+			elif stopped == "run time bound":
+				enqueue_room(room)
+			if stopped:
+				summary["stopped"] = stopped
+				break
+			continue
+
 		job = claim_next_job(room, settings=settings)
 		if job is None:
 			summary["stopped"] = summary["stopped"] or "nothing claimable"
@@ -0,0 +1,163 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""Recall and latency of the approximate chat index against the exact one, on the same rows.
+
+    bench execute erpnext_enhancements.chat.testing.ann_bench.run
+    bench execute erpnext_enhancements.chat.testing.ann_bench.run --kwargs "{'rooms': 100}"
+
+No database and no site: the corpus is :func:`chat.testing.fixtures.synthetic_embedding_corpus`,
+so the numbers are comparable between machines and between commits, and the one thing they
+cannot tell you is how the real corpus behaves. ``bench execute`` is only the convenient way to
+get the bench's ``numpy``; a plain ``python -c`` with the app on the path works the same.
+
+What is reported, per run
+-------------------------
+* **recall@k** — of the exact :class:`vectors.NumpyVectorBackend`'s top ``k``, the fraction
+  :class:`ann.IvfPqBackend` also returned, averaged over the queries. Both rank exactly in the
+  end, so this is purely "did the short list contain it".
+* **p50 / p99 latency** for three backends: the exact per-row loop, the packed exact
+  :class:`vectors.RoomMatrixIndex` the gate serves from when the approximate index is off, and
+  the approximate index. Index builds are outside the timed region for the two packed
+  backends, as they are outside a question in the gate.
+
+What it does not do is pass or fail. A threshold belongs in ``tests/test_chat_ann_index.py``,
+at a corpus size CI can afford; this module is for choosing ``nprobe`` and ``rerank_depth``
+with numbers in front of you.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from erpnext_enhancements.chat.retrieval import ann, vectors
+from erpnext_enhancements.chat.testing import fixtures
+
+
+@dataclass(frozen=True)
+class BenchReport:
+	chunks: int
+	rooms: int
+	dim: int
+	queries: int
+	k: int
+	nlist: int
+	m: int
+	nprobe: int
+	rerank_depth: int
+	train_seconds: float
+	recall_at_k: float
+	exact_p50_ms: float
+	exact_p99_ms: float
+	packed_p50_ms: float
+	packed_p99_ms: float
+	ann_p50_ms: float
+	ann_p99_ms: float
+
+	def lines(self) -> list[str]:
+		return [
+			f"corpus        {self.chunks} chunks in {self.rooms} rooms, {self.dim} dimensions",
+			f"codebook      nlist={self.nlist} m={self.m}, trained in {self.train_seconds:.2f}s",
+			f"search        nprobe={self.nprobe} rerank_depth={self.rerank_depth}, "
+			f"{self.queries} queries, k={self.k}",
+			f"recall@{self.k:<6} {self.recall_at_k:.4f}",
+			f"exact loop    p50 {self.exact_p50_ms:8.2f} ms   p99 {self.exact_p99_ms:8.2f} ms",
+			f"exact packed  p50 {self.packed_p50_ms:8.2f} ms   p99 {self.packed_p99_ms:8.2f} ms",
+			f"approximate   p50 {self.ann_p50_ms:8.2f} ms   p99 {self.ann_p99_ms:8.2f} ms",
+		]
+
+
+def run_benchmark(
+	*,
+	rooms: int = 20,
+	chunks_per_room: int = 500,
+	dim: int = 64,
+	topics: int = 48,
+	queries: int = 50,
+	k: int = 10,
+	nlist: int = 0,
+	m: int = 0,
+	nprobe: int = ann.DEFAULT_NPROBE,
+	rerank_depth: int = ann.DEFAULT_RERANK_DEPTH,
+	seed: int = 0,
+) -> BenchReport:
+	"""Build the corpus, train on all of it, and time ``queries`` searches per backend over
+	every room."""
+	numpy = vectors._numpy()
+	corpus = fixtures.synthetic_embedding_corpus(
+		rooms=rooms, chunks_per_room=chunks_per_room, dim=dim, topics=topics, seed=seed
+	)
+	probes = fixtures.synthetic_queries(count=queries, dim=dim, topics=topics, seed=seed)
+	rows = [(name, room, vectors.encode_vector(vectors.normalise(vector)), dim) for name, room, vector, _s in corpus]
+	allowed = frozenset(room for _n, room, _v, _s in corpus)
+
+	started = time.perf_counter()
+	codebook = ann.train_codebook(numpy.asarray([vector for _n, _r, vector, _s in corpus]), nlist=nlist, m=m)
+	train_seconds = time.perf_counter() - started
+
+	exact = vectors.NumpyVectorBackend(candidate_loader=lambda: rows)
+	approximate = ann.IvfPqBackend(
+		codebook=codebook, candidate_loader=lambda: rows, nprobe=nprobe, rerank_depth=rerank_depth
+	)
+	approximate.search(allowed, probes[0], k)
+
+	packed = vectors.RoomMatrixIndex(max_bytes=0)
+	fingerprints: dict[str, vectors.Fingerprint] = {}
+	index_rows = [(name, room, stored, d, seq) for (name, room, stored, d), (*_x, seq) in zip(rows, corpus, strict=True)]
+	for room in sorted(allowed):
+		fingerprints[room] = (0, 0, "")
+		packed.put(vectors.pack_room(room, index_rows, fingerprint=fingerprints[room]))
+
+	exact_ms: list[float] = []
+	packed_ms: list[float] = []
+	ann_ms: list[float] = []
+	recalls: list[float] = []
+	for query in probes:
+		truth, elapsed = _timed(lambda q=query: exact.search(allowed, q, k))
+		exact_ms.append(elapsed)
+		_hits, elapsed = _timed(lambda q=query: packed.search(allowed, q, k, fingerprints=fingerprints))
+		packed_ms.append(elapsed)
+		found, elapsed = _timed(lambda q=query: approximate.search(allowed, q, k))
+		ann_ms.append(elapsed)
+		expected = {hit.chunk for hit in truth}
+		recalls.append(len(expected & {hit.chunk for hit in found}) / len(expected) if expected else 1.0)
+
+	return BenchReport(
+		chunks=len(rows),
+		rooms=len(allowed),
+		dim=dim,
+		queries=len(probes),
+		k=k,
+		nlist=codebook.nlist,
+		m=codebook.m,
+		nprobe=nprobe,
+		rerank_depth=rerank_depth,
+		train_seconds=round(train_seconds, 3),
+		recall_at_k=round(float(numpy.mean(recalls)), 4),
+		exact_p50_ms=_percentile(exact_ms, 50),
+		exact_p99_ms=_percentile(exact_ms, 99),
+		packed_p50_ms=_percentile(packed_ms, 50),
+		packed_p99_ms=_percentile(packed_ms, 99),
+		ann_p50_ms=_percentile(ann_ms, 50),
+		ann_p99_ms=_percentile(ann_ms, 99),
+	)
+
+
+def run(print_report: bool = True, **kwargs: Any) -> dict[str, Any]:
+	"""``bench execute`` entry point. Prints the report and returns it as a dict."""
+	report = run_benchmark(**kwargs)
+	if print_report:
+		print("\n".join(report.lines()))
+	return asdict(report)
+
+
+def _timed(call: Any) -> tuple[Any, float]:
+	started = time.perf_counter()
+	result = call()
+	return result, (time.perf_counter() - started) * 1000.0
+
+
+def _percentile(samples: list[float], q: float) -> float:
+	return round(float(vectors._numpy().percentile(samples, q)), 3) if samples else 0.0
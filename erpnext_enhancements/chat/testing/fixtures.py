@@ -77,6 +77,7 @@ from __future__ import annotations
 import base64
 import binascii
 import json
+import random
 from collections.abc import Callable, Mapping, Sequence
 from datetime import datetime, timedelta, timezone
 from typing import Any, Final
@@ -666,6 +667,65 @@ def malformed_events() -> list[tuple[str, dict[str, Any]]]:
 	return cases
 
 
+# --------------------------------------------------------------------------------------
+# A synthetic retrieval corpus
+# --------------------------------------------------------------------------------------
+#
+# Not a Google payload, and held to the same honesty rule: every vector below is CONSTRUCTED.
+# Real embeddings cluster by topic and this imitates only that — topic centres drawn at random,
+# chunks scattered around them, each room leaning on a few topics. It is good enough to
+# measure what ``chat.testing.ann_bench`` measures, recall and latency of an approximate index
+# against the exact one on the same rows. It says nothing about how relevant real retrieval is,
+# which only the evaluation set in ``tests/test_chat_triton_bench.py`` can.
+
+
+def _topic_centres(dim: int, topics: int, seed: int) -> list[list[float]]:
+	rng = random.Random(seed)
+	return [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(topics)]
+
+
+def synthetic_embedding_corpus(
+	*,
+	rooms: int = 20,
+	chunks_per_room: int = 500,
+	dim: int = 64,
+	topics: int = 48,
+	spread: float = 0.6,
+	seed: int = 0,
+) -> list[tuple[str, str, list[float], int]]:
+	"""``(chunk_name, room, vector, last_seq)`` rows, ``last_seq`` rising within each room.
+
+	Vectors are **not** normalised — the index under test is expected to do that itself.
+	Deterministic for a given ``seed``.
+	"""
+	centres = _topic_centres(dim, topics, seed)
+	rng = random.Random(seed + 1)
+	rows: list[tuple[str, str, list[float], int]] = []
+	for r in range(rooms):
+		room = f"room-{r:03d}"
+		leaning = rng.sample(range(topics), k=min(4, topics))
+		for c in range(chunks_per_room):
+			centre = centres[rng.choice(leaning) if rng.random() < 0.8 else rng.randrange(topics)]
+			vector = [value + rng.gauss(0.0, spread) for value in centre]
+			rows.append((f"chunk-{r:03d}-{c:05d}", room, vector, c + 1))
+	return rows
+
+
+def synthetic_queries(
+	*,
+	count: int = 50,
+	dim: int = 64,
+	topics: int = 48,
+	spread: float = 0.6,
+	seed: int = 0,
+) -> list[list[float]]:
+	"""Query vectors near the same topic centres as :func:`synthetic_embedding_corpus` with the
+	same ``dim``, ``topics`` and ``seed`` — a question about something the corpus discusses."""
+	centres = _topic_centres(dim, topics, seed)
+	rng = random.Random(seed + 2)
+	return [[value + rng.gauss(0.0, spread) for value in rng.choice(centres)] for _ in range(count)]
+
+
 # --------------------------------------------------------------------------------------
 # The catalogue
 # --------------------------------------------------------------------------------------
@@ -0,0 +1,17 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""Phone Number Index: one row per lookup key per stored phone number.
+
+Built from the numbers on Contact, Customer, Lead and Employee so an incoming
+call resolves by an indexed equality instead of a ``REGEXP`` over every stored
+number. Everything here is derivable from those records. The rows are written by
+``crm_enhancements/phone_index.py`` and can be thrown away and rebuilt at any
+time (``phone_index.rebuild``). No controller logic.
+"""
+
+from frappe.model.document import Document
+
+
+class PhoneNumberIndex(Document):
+	pass
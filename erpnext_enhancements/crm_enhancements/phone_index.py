@@ -0,0 +1,338 @@
+"""Phone Number Index: resolve a phone number to a party without scanning.
+
+``api.telephony._get_caller_info`` answers "who is calling?" while the phone is
+ringing. It used to build ``".*".join(last_10_digits)`` and run it as a
+``REGEXP`` against ``Contact.custom_phone_number``, then against
+``Customer.custom_accounts_phone_number``. No index can serve a regex, so every
+ring read every stored number, and screen-pop latency grew with the contact book.
+
+This module keeps **Phone Number Index** current: one row per lookup key per
+number on Contact (``custom_phone_number`` and the ``phone_nos`` table),
+Customer, Lead and Employee (see :data:`SOURCES`). The key (``suffix``) is a
+10-digit run of the stored number's digits:
+
+* the last 10 digits, as before;
+* every other 10-digit window, when the stored value is longer (a glued-on
+  extension "801-555-1212 x4", a country code);
+* all of the digits, when there are fewer than 10.
+
+An incoming call matches on its own last 10 digits, so :func:`lookup` is one
+indexed equality. Each key is a contiguous run of the stored digits, and so it is
+also a match for the old regex, which accepts any subsequence. An exact hit is
+therefore never a match the fuzzy search would have refused.
+
+**Fallback.** When a doctype has no exact hit, :func:`lookup` runs the old
+``REGEXP`` for that doctype (:data:`FUZZY_COLUMNS`, the two columns it always
+searched). A number keyed in as "801.555.12.12 ext 4 (cell)" still resolves, as
+does one written by a path that fires no ``doc_events``, until the nightly
+:func:`rebuild`. A miss is remembered in Redis for :data:`MISS_TTL_SECONDS` per
+doctype and number. A robocall ringing through several gateway events then
+scans once, and indexing that number clears the memo.
+
+Maintenance runs from ``doc_events`` on the four doctypes. A save that leaves
+the numbers alone is a single read. :func:`rebuild` (nightly, and the backfill
+patch) re-derives everything in committed batches.
+"""
+
+import re
+
+import frappe
+from frappe.utils import now
+
+INDEX_DOCTYPE = "Phone Number Index"
+
+# doctype -> fields holding a number. "table.field" reads every row of a child table.
+SOURCES = {
+	"Contact": ("custom_phone_number", "phone_nos.phone"),
+	"Customer": ("custom_accounts_phone_number", "mobile_no"),
+	"Lead": ("phone", "mobile_no"),
+	"Employee": ("cell_number",),
+}
+
+# The pre-index regex search, kept as the fallback: doctype -> the one column it read.
+FUZZY_COLUMNS = {
+	"Contact": "custom_phone_number",
+	"Customer": "custom_accounts_phone_number",
+}
+
+KEY_LENGTH = 10
+# Longer digit strings are not phone numbers with an extension; key only their last 10.
+MAX_WINDOWED_DIGITS = 16
+MISS_TTL_SECONDS = 300
+MISS_PREFIX = "phone_index:miss:v1:"
+BATCH_SIZE = 500
+
+_INDEX_FIELDS = ["name", "reference_doctype", "reference_name", "phone_field", "phone", "digits", "suffix"]
+
+
+# ------------------------------------------------------------------ lookup
+
+
+def lookup(phone, doctypes=None):
+	"""Records holding ``phone``, exact matches first.
+
+	Returns ``frappe._dict(doctype, name, field, exact)`` rows. Exact matches come
+	from the index, ordered by ``doctypes`` (default: :data:`SOURCES` order), then
+	a match on the stored number's last 10 digits before one on an inner window,
+	then field order. A doctype with no exact match falls back to the old fuzzy
+	search when it had one (:data:`FUZZY_COLUMNS`).
+	"""
+	key = caller_key(phone)
+	doctypes = list(doctypes or SOURCES)
+	if not key or not doctypes:
+		return []
+
+	rows = frappe.db.sql(
+		f"""
+		SELECT `reference_doctype`, `reference_name`, `phone_field`, `digits`
+		FROM `tab{INDEX_DOCTYPE}`
+		WHERE `suffix` = %s AND `reference_doctype` IN %s
+		""",
+		(key, tuple(doctypes)),
+		as_dict=True,
+	)
+	rank = {doctype: i for i, doctype in enumerate(doctypes)}
+
+	def order(row):
+		fields = SOURCES.get(row["reference_doctype"], ())
+		field = row.get("phone_field")
+		return (
+			rank[row["reference_doctype"]],
+			0 if (row.get("digits") or "").endswith(key) else 1,
+			fields.index(field) if field in fields else len(fields),
+			row["reference_name"],
+		)
+
+	matches = []
+	seen = set()
+	for row in sorted(rows, key=order):
+		ref = (row["reference_doctype"], row["reference_name"])
+		if ref not in seen:
+			seen.add(ref)
+			matches.append(_match(*ref, row.get("phone_field"), True))
+
+	found = {doctype for doctype, _name in seen}
+	for doctype in doctypes:
+		if doctype not in found and doctype in FUZZY_COLUMNS:
+			matches.extend(_fuzzy(doctype, key))
+	return matches
+
+
+def caller_key(phone):
+	"""The key an incoming number is looked up by: its last 10 digits, or all of fewer."""
+	digits = re.sub(r"\D", "", phone or "")
+	return digits[-KEY_LENGTH:]
+
+
+def index_keys(phone):
+	"""Every key a stored number is filed under (see the module docstring)."""
+	digits = re.sub(r"\D", "", phone or "")
+	if len(digits) <= KEY_LENGTH:
+		return [digits] if digits else []
+	keys = [digits[-KEY_LENGTH:]]
+	if len(digits) <= MAX_WINDOWED_DIGITS:
+		for start in range(len(digits) - KEY_LENGTH):
+			window = digits[start : start + KEY_LENGTH]
+			if window not in keys:
+				keys.append(window)
+	return keys
+
+
+def _fuzzy(doctype, key):
+	"""The pre-index search for one doctype, with misses remembered briefly."""
+	miss_key = f"{MISS_PREFIX}{doctype}:{key}"
+	column = FUZZY_COLUMNS[doctype]
+	if _cache_get(miss_key) or not frappe.db.has_column(doctype, column):
+		return []
+	rows = frappe.db.sql(
+		f"""
+		SELECT `name` FROM `tab{doctype}`
+		WHERE `{column}` REGEXP %s
+		LIMIT 1
+		""",
+		(".*".join(key),),
+	)
+	if not rows:
+		_cache_set(miss_key)
+		return []
+	return [_match(doctype, rows[0][0], column, False)]
+
+
+def _match(doctype, name, field, exact):
+	return frappe._dict(doctype=doctype, name=name, field=field, exact=exact)
+
+
+# ------------------------------------------------------------- maintenance
+
+
+def entries_for(doc):
+	"""``[(field, phone, digits, suffix)]`` for every number on ``doc``."""
+	entries = []
+	for field in SOURCES.get(doc.doctype, ()):
+		if "." in field:
+			table, child_field = field.split(".", 1)
+			values = [row.get(child_field) for row in (doc.get(table) or [])]
+		else:
+			values = [doc.get(field)]
+		for phone in values:
+			digits = re.sub(r"\D", "", phone or "")
+			for key in index_keys(phone):
+				entries.append((field, phone, digits, key))
+	return entries
+
+
+def on_party_change(doc, method=None):
+	"""Contact / Customer / Lead / Employee ``on_update``: re-file the record's numbers."""
+	_quietly(_sync, doc.doctype, doc.name, entries_for(doc))
+
+
+def on_party_delete(doc, method=None):
+	"""``after_delete``: the record's rows go with it."""
+	_quietly(_delete_refs, doc.doctype, [doc.name])
+
+
+def on_party_rename(doc, method=None, old=None, new=None, merge=False):
+	"""``after_rename``: point the rows at the new name; a merge re-files the survivor."""
+	def rename():
+		if merge:
+			_delete_refs(doc.doctype, [old])
+			_sync(doc.doctype, new, entries_for(frappe.get_doc(doc.doctype, new)))
+		else:
+			frappe.db.sql(
+				f"""
+				UPDATE `tab{INDEX_DOCTYPE}` SET `reference_name` = %s
+				WHERE `reference_doctype` = %s AND `reference_name` = %s
+				""",
+				(new, doc.doctype, old),
+			)
+
+	_quietly(rename)
+
+
+def rebuild(doctypes=None):
+	"""Re-derive every row for ``doctypes`` (default: all of :data:`SOURCES`), in committed batches.
+
+	Also drops rows whose record is gone. Safe to run at any time.
+	"""
+	if not frappe.db.exists("DocType", INDEX_DOCTYPE):
+		return {"records": 0, "numbers": 0}
+	records = numbers = 0
+	for doctype in doctypes or SOURCES:
+		frappe.db.sql(
+			f"""
+			DELETE idx FROM `tab{INDEX_DOCTYPE}` idx
+			LEFT JOIN `tab{doctype}` ref ON ref.name = idx.reference_name
+			WHERE idx.reference_doctype = %s AND ref.name IS NULL
+			""",
+			(doctype,),
+		)
+		plain = [f for f in SOURCES[doctype] if "." not in f and frappe.db.has_column(doctype, f)]
+		tables = [f.split(".", 1) for f in SOURCES[doctype] if "." in f]
+		names = frappe.get_all(doctype, pluck="name", order_by="name")
+		for start in range(0, len(names), BATCH_SIZE):
+			batch = names[start : start + BATCH_SIZE]
+			docs = {
+				row["name"]: frappe._dict(row, doctype=doctype)
+				for row in frappe.get_all(doctype, filters={"name": ["in", batch]}, fields=["name", *plain])
+			}
+			for table, child_field in tables:
+				child = frappe.get_meta(doctype).get_field(table)
+				for row in frappe.get_all(
+					child.options,
+					filters={"parent": ["in", batch], "parenttype": doctype, "parentfield": table},
+					fields=["parent", child_field],
+					order_by="idx asc",
+				):
+					docs[row["parent"]].setdefault(table, []).append(row)
+			_delete_refs(doctype, batch)
+			values = []
+			for name, doc in docs.items():
+				for entry in entries_for(doc):
+					values.append(_row(doctype, name, *entry))
+			_insert(values)
+			records += len(docs)
+			numbers += len(values)
+			frappe.db.commit()
+	return {"records": records, "numbers": numbers}
+
+
+def _sync(doctype, name, entries):
+	existing = frappe.get_all(
+		INDEX_DOCTYPE,
+		filters={"reference_doctype": doctype, "reference_name": name},
+		fields=["phone_field", "phone", "suffix"],
+	)
+	if sorted((r["phone_field"], r["phone"], r["suffix"]) for r in existing) == sorted(
+		(field, phone, key) for field, phone, _digits, key in entries
+	):
+		return
+	_delete_refs(doctype, [name])
+	_insert([_row(doctype, name, *entry) for entry in entries])
+	for key in {entry[3] for entry in entries}:
+		_cache_delete(f"{MISS_PREFIX}{doctype}:{key}")
+
+
+def _row(doctype, name, field, phone, digits, key):
+	return (frappe.generate_hash(length=10), doctype, name, field, phone, digits, key)
+
+
+def _insert(values):
+	if values:
+		stamp = now()
+		user = frappe.session.user
+		frappe.db.bulk_insert(
+			INDEX_DOCTYPE,
+			fields=[*_INDEX_FIELDS, "creation", "modified", "owner", "modified_by"],
+			values=[(*row, stamp, stamp, user, user) for row in values],
+		)
+
+
+def _delete_refs(doctype, names):
+	if names:
+		frappe.db.delete(INDEX_DOCTYPE, {"reference_doctype": doctype, "reference_name": ["in", names]})
+
+
+def _quietly(fn, *args):
+	"""A failed index write must never fail the Contact/Customer save; the nightly rebuild heals it."""
+	if not _active():
+		return
+	try:
+		fn(*args)
+	except Exception:
+		try:
+			frappe.log_error(title="Phone number index update failed", message=frappe.get_traceback())
+		except Exception:
+			pass
+
+
+def _active():
+	"""Not mid-install or migrate (the backfill patch covers those), and the table exists."""
+	flags = frappe.flags
+	if flags.in_migrate or flags.in_install or flags.in_patch:
+		return False
+	return bool(frappe.db.exists("DocType", INDEX_DOCTYPE))
+
+
+# ------------------------------------------------------------------- cache
+
+
+def _cache_get(key):
+	try:
+		return frappe.cache().get_value(key)
+	except Exception:
+		return None
+
+
+def _cache_set(key):
+	try:
+		frappe.cache().set_value(key, 1, expires_in_sec=MISS_TTL_SECONDS)
+	except Exception:
+		# Unremembered is slower, not wrong.
+		pass
+
+
+def _cache_delete(key):
+	try:
+		frappe.cache().delete_value(key)
+	except Exception:
+		pass
@@ -32,6 +32,9 @@
  *                           breakdowns (status / type / completion).
  * The toolbar also carries "New Project" / "New Master Project" quick-create buttons.
  * Table edits persist back via the same whitelisted methods.
+ * Live updates: "project_dashboard_updated" events (one per project per commit)
+ * patch just the named rows into project_data via get_project_rows; the
+ * portfolio is loaded in full only once, on render.
  */
 (function() {
     // The ColumnSelector / ColumnResizer classes live in separate assets registered
@@ -1541,6 +1544,96 @@
     $root.find('#btn-new-project').on('click', () => frappe.new_doc('Project'));
     $root.find('#btn-new-master-project').on('click', () => frappe.new_doc('Master Project'));
 
+    // ----- LIVE UPDATES -----
+
+    // The server sends one "project_dashboard_updated" per project per commit
+    // (project_enhancements/realtime.py) carrying the project name and a
+    // version, not the rows. Events are gathered for PATCH_DEBOUNCE_MS, then only
+    // those projects are fetched (get_project_rows) and patched into
+    // project_data; a burst of saves costs one small fetch, not a reload of the
+    // portfolio per save. An event at or below the version already seen for its
+    // project is a redelivery and is dropped; a fetch that resolves after a newer
+    // one for the same project is not applied.
+    const PATCH_DEBOUNCE_MS = 1500;
+    const seen_versions = {};
+    const applied_fetch = {};
+    let pending_projects = new Set();
+    let fetch_seq = 0;
+    let rerender_when_idle = false;
+
+    const flush_patches = frappe.utils.debounce(async () => {
+        const names = Array.from(pending_projects);
+        pending_projects = new Set();
+        if (!names.length || !document.body.contains(root_element)) return;
+        const seq = ++fetch_seq;
+        try {
+            const res = await api_call('get_project_rows', { projects: names });
+            if (res.message && !res.message.error) {
+                apply_project_rows(seq, res.message.rows || [], res.message.removed || []);
+            }
+        } catch (err) {
+            console.error("Projects Dashboard live update failed:", err);
+        }
+    }, PATCH_DEBOUNCE_MS);
+
+    function apply_project_rows(seq, rows, removed) {
+        const fresh = (name) => !(applied_fetch[name] > seq);
+        const gone = new Set(removed.filter(fresh));
+        const incoming = {};
+        rows.filter(row => fresh(row.name)).forEach(row => { incoming[row.name] = row; });
+        [...gone, ...Object.keys(incoming)].forEach(name => { applied_fetch[name] = seq; });
+
+        project_data = project_data
+            .filter(p => !gone.has(p.name))
+            .map(p => {
+                const row = incoming[p.name];
+                delete incoming[p.name];
+                return row || p;
+            });
+        // Newly created projects lead, as in get_project_data's creation-desc order.
+        project_data = Object.values(incoming).concat(project_data);
+
+        // The Portfolio Gantt loads its own rows; the tables re-render from project_data.
+        if (current_tab === "portfolio-gantt") return;
+        if (is_editing()) {
+            rerender_when_idle = true;
+            return;
+        }
+        render_current_tab();
+    }
+
+    // A re-render mid-edit would throw away an open priority <select>; wait for it to close.
+    function is_editing() {
+        const active = document.activeElement;
+        return !!active && $.contains($root.find('#dashboard-content')[0], active) && $(active).is('input, select, textarea');
+    }
+
+    $root.find('#dashboard-content').on('focusout', () => {
+        setTimeout(() => {
+            if (rerender_when_idle && !is_editing()) {
+                rerender_when_idle = false;
+                if (current_tab !== "portfolio-gantt") render_current_tab();
+            }
+        }, 0);
+    });
+
+    // Workspace re-renders re-run this script with a NEW root_element, so the one
+    // subscription lives on window and calls whichever render registered last.
+    const live = window.__ee_projects_dashboard = window.__ee_projects_dashboard || {};
+    live.on_update = (data) => {
+        if (!data || !data.project) return;
+        if (data.version) {
+            if (seen_versions[data.project] >= data.version) return;
+            seen_versions[data.project] = data.version;
+        }
+        pending_projects.add(data.project);
+        flush_patches();
+    };
+    if (!live.realtime_bound && frappe.realtime) {
+        live.realtime_bound = true;
+        frappe.realtime.on("project_dashboard_updated", (data) => live.on_update && live.on_update(data));
+    }
+
     // Init
     fetch_initial_data();
     }
@@ -7,8 +7,8 @@
 // lead), Overdue/At-Risk tasks, Today's tasks (with assigned technicians),
 // and today's public calendar events.
 //
-// Refresh model: realtime "project_dashboard_updated" (already published on
-// every Project/Task save by project_dashboard.publish_realtime_update),
+// Refresh model: realtime "project_dashboard_updated" (published once per
+// project per commit by project_dashboard.publish_realtime_update),
 // debounced 5s, plus a 5-minute interval as the kiosk fallback. Workspace
 // re-renders re-run this whole script with a NEW root_element, so all timers
 // and the single realtime subscription are stored on `window` and re-pointed
@@ -16,9 +16,8 @@ endpoints to surface ``LinkExistsError`` as a signal that triggers this flow.
 """
 import frappe
 from frappe import _
-from frappe.model.docstatus import DocStatus
-from frappe.model.dynamic_links import get_dynamic_link_map
-from frappe.model.rename_doc import get_link_fields
+
+from erpnext_enhancements.reference_scan import find_references
 
 
 def _resolve_doctype(doctype: str) -> str:
@@ -64,129 +63,15 @@ def discover_references(doctype, name, include_cancelled=True, respect_ignore_ho
 	``child_doctype``/``child_name``/``idx`` and dynamic links ``doctype_field``
 	(the companion "doctype" column). Callers must pass the *real* DocType name
 	(resolve route slugs via :func:`_resolve_doctype` first).
-	"""
-	links = []
-	link_fields = get_link_fields(doctype)
-	ignored_doctypes = set(frappe.get_hooks("ignore_links_on_delete")) if respect_ignore_hook else set()
-
-	# Standard Links
-	for lf in link_fields:
-		link_dt, link_field, issingle = lf["parent"], lf["fieldname"], lf["issingle"]
-		if link_dt in ignored_doctypes:
-			continue
-
-		try:
-			meta = frappe.get_meta(link_dt)
-		except Exception:
-			continue
-
-		if issingle:
-			if frappe.db.get_single_value(link_dt, link_field) == name:
-				links.append({
-					"doctype": link_dt,
-					"name": link_dt,
-					"fieldname": link_field,
-					"is_child": False,
-					"is_single": True
-				})
-			continue
-
-		fields = ["name", "docstatus"]
-		if meta.istable:
-			fields.extend(["parent", "parenttype", "idx"])
 
-		records = frappe.db.get_values(link_dt, {link_field: name}, fields, as_dict=True)
-		for rec in records:
-			# Skip if it's just a self-reference or cancelled
-			if not include_cancelled and DocStatus(rec.docstatus).is_cancelled():
-				continue
-
-			if meta.istable:
-				if rec.parenttype == doctype and rec.parent == name:
-					continue
-				links.append({
-					"doctype": rec.parenttype,
-					"name": rec.parent,
-					"child_doctype": link_dt,
-					"child_name": rec.name,
-					"fieldname": link_field,
-					"is_child": True,
-					"idx": rec.idx,
-					"docstatus": rec.docstatus
-				})
-			else:
-				if link_dt == doctype and rec.name == name:
-					continue
-				links.append({
-					"doctype": link_dt,
-					"name": rec.name,
-					"fieldname": link_field,
-					"is_child": False,
-					"docstatus": rec.docstatus
-				})
-
-	# Dynamic Links
-	for df in get_dynamic_link_map().get(doctype, []):
-		if df.parent in ignored_doctypes:
-			continue
-
-		meta = frappe.get_meta(df.parent)
-		if meta.issingle:
-			refdoc = frappe.db.get_singles_dict(df.parent)
-			if refdoc.get(df.options) == doctype and refdoc.get(df.fieldname) == name:
-				links.append({
-					"doctype": df.parent,
-					"name": df.parent,
-					"fieldname": df.fieldname,
-					"doctype_field": df.options,
-					"is_child": False,
-					"is_single": True,
-					"is_dynamic": True
-				})
-		else:
-			RefDoc = frappe.qb.DocType(df.parent)
-			fields = [RefDoc.name, RefDoc.docstatus]
-			if meta.istable:
-				fields.extend([RefDoc.parent, RefDoc.parenttype, RefDoc.idx])
-
-			query = (
-				frappe.qb.from_(RefDoc)
-				.select(*fields)
-				.where(RefDoc[df.options] == doctype)
-				.where(RefDoc[df.fieldname] == name)
-			)
-			for refdoc in query.run(as_dict=True):
-				if not include_cancelled and DocStatus(refdoc.docstatus).is_cancelled():
-					continue
-				if meta.istable:
-					if refdoc.parenttype == doctype and refdoc.parent == name:
-						continue
-					links.append({
-						"doctype": refdoc.parenttype,
-						"name": refdoc.parent,
-						"child_doctype": df.parent,
-						"child_name": refdoc.name,
-						"fieldname": df.fieldname,
-						"doctype_field": df.options,
-						"is_child": True,
-						"is_dynamic": True,
-						"idx": refdoc.idx,
-						"docstatus": refdoc.docstatus
-					})
-				else:
-					if df.parent == doctype and refdoc.name == name:
-						continue
-					links.append({
-						"doctype": df.parent,
-						"name": refdoc.name,
-						"fieldname": df.fieldname,
-						"doctype_field": df.options,
-						"is_child": False,
-						"is_dynamic": True,
-						"docstatus": refdoc.docstatus
-					})
-
-	return links
+	The scan itself is :func:`erpnext_enhancements.reference_scan.find_references`:
+	a cached per-doctype link plan run as batched ``UNION ALL`` queries, rather
+	than one query per Link field.
+	"""
+	ignored_doctypes = frappe.get_hooks("ignore_links_on_delete") if respect_ignore_hook else ()
+	return find_references(
+		doctype, [name], include_cancelled=include_cancelled, ignored_doctypes=ignored_doctypes
+	)[name]
 
 
 @frappe.whitelist()
@@ -37,7 +37,9 @@ Safety / gating:
 
 Whitelisted endpoints, called from ``public/js/merge_tool/merge_tool.js``:
 :func:`get_merge_preview` powers the diff/confirm dialog and :func:`perform_merge`
-executes (or enqueues) the merge.
+executes (or enqueues) the merge. :func:`perform_bulk_merge` folds several
+duplicates into one survivor, discovering every loser's references in a single
+batched scan (see :mod:`erpnext_enhancements.reference_scan`).
 """
 
 from __future__ import annotations
@@ -49,6 +51,7 @@ from frappe.utils import cint, cstr
 
 from erpnext_enhancements.delete_utils import discover_references
 from erpnext_enhancements.feature_flags import throw_if_document_merge_disabled
+from erpnext_enhancements.reference_scan import find_references, unindexed_link_columns
 
 # Over this many discovered references, run the merge on the background queue
 # instead of inline (keeps the request from timing out on big master-data merges).
@@ -382,8 +385,9 @@ def get_merge_preview(doctype, survivor, loser):
 	"""Read-only dry run: exactly what :func:`perform_merge` will do.
 
 	Returns the field diff (kept / backfilled), the child-table append plan, the
-	grouped reference counts (hard + soft), the manual-review flags, and whether
-	execution will run in the background.
+	grouped reference counts (hard + soft), the manual-review flags, whether
+	execution will run in the background, and the link columns pointing at this
+	doctype that have no index (each one a full table scan per merge).
 	"""
 	survivor_doc, loser_doc = _validate_pair(doctype, survivor, loser, for_write=False)
 
@@ -406,6 +410,7 @@ def get_merge_preview(doctype, survivor, loser):
 		"reference_total": reference_total,
 		"manual_review": _manual_review_flags(doctype, loser),
 		"background": reference_total > BACKGROUND_REF_THRESHOLD,
+		"unindexed_links": unindexed_link_columns(doctype),
 	}
 
 
@@ -471,6 +476,117 @@ def execute_merge_job(doctype, survivor, loser, user):
 		raise
 
 
+@frappe.whitelist()
+def perform_bulk_merge(doctype, survivor, losers):
+	"""Merge every document in ``losers`` (a list or JSON list) into ``survivor``.
+
+	Each loser passes the same guards as :func:`perform_merge`, and all their hard
+	references are discovered in one batched scan rather than one scan per loser.
+	Runs inline, or as one background job when the combined reference count
+	exceeds :data:`BACKGROUND_REF_THRESHOLD`. Each loser is still its own atomic
+	merge: one that fails rolls back alone and is reported, the rest proceed.
+	Returns ``{"merged": [summary, ...], "failed": [{"loser", "error"}, ...]}``
+	(or a "queued" marker).
+	"""
+	losers = _parse_losers(losers)
+	for loser in losers:
+		_validate_pair(doctype, survivor, loser, for_write=True)
+
+	hard_refs = find_references(doctype, losers)
+	soft_rows = {loser: _soft_reference_rows(doctype, loser) for loser in losers}
+	total = sum(len(r) for r in hard_refs.values()) + sum(len(r) for r in soft_rows.values())
+
+	if total > BACKGROUND_REF_THRESHOLD:
+		frappe.enqueue(
+			"erpnext_enhancements.document_merge.execute_bulk_merge_job",
+			queue="long",
+			timeout=3600,
+			doctype=doctype,
+			survivor=survivor,
+			losers=losers,
+			user=frappe.session.user,
+		)
+		return {
+			"queued": True,
+			"message": _(
+				"This merge touches {0} references across {1} documents and is running in "
+				"the background. You'll be notified when it finishes."
+			).format(total, len(losers)),
+		}
+
+	return _execute_bulk_merge(doctype, survivor, losers, hard_refs, soft_rows)
+
+
+def execute_bulk_merge_job(doctype, survivor, losers, user):
+	"""Background entry point (enqueued by :func:`perform_bulk_merge`). Re-runs
+	the guards and the discovery, then notifies the initiating user.
+
+	The guards run per loser: one deleted or merged since the job was queued is
+	reported as failed and the rest still merge, as they would inline. If
+	discovery or the merge loop itself raises, the user still gets a
+	``success: False`` notice, as :func:`execute_merge_job` sends.
+	"""
+	try:
+		valid, invalid = [], []
+		for loser in losers:
+			try:
+				_validate_pair(doctype, survivor, loser, for_write=True)
+			except Exception as exc:
+				invalid.append({"loser": loser, "error": cstr(exc)})
+			else:
+				valid.append(loser)
+		hard_refs = find_references(doctype, valid)
+		soft_rows = {loser: _soft_reference_rows(doctype, loser) for loser in valid}
+		result = _execute_bulk_merge(doctype, survivor, valid, hard_refs, soft_rows)
+	except Exception:
+		frappe.publish_realtime(
+			"document_merge_done",
+			{"success": False, "doctype": doctype, "survivor": survivor,
+			 "losers": losers, "failed": losers, "references": 0},
+			user=user,
+		)
+		raise
+	failed = invalid + result["failed"]
+	frappe.publish_realtime(
+		"document_merge_done",
+		{"success": not failed, "doctype": doctype, "survivor": survivor,
+		 "losers": losers, "failed": [f["loser"] for f in failed],
+		 "references": sum(m["references_repointed"] for m in result["merged"])},
+		user=user,
+	)
+
+
+def _parse_losers(losers):
+	if isinstance(losers, str):
+		losers = frappe.parse_json(losers)
+	losers = [cstr(loser) for loser in dict.fromkeys(losers or []) if loser]
+	if not losers:
+		frappe.throw(_("Choose at least one document to merge."))
+	return losers
+
+
+def _execute_bulk_merge(doctype, survivor, losers, hard_refs, soft_rows):
+	"""Merge the losers one by one from pre-discovered references.
+
+	The one-pass discovery is stale in exactly one case: a loser referenced from
+	another loser that has already been merged — its child rows now live on the
+	survivor and its own row is gone. That loser is re-scanned on its own before
+	its merge; every other loser uses the batched result as is.
+	"""
+	merged, failed, done = [], [], set()
+	for loser in losers:
+		refs = hard_refs.get(loser) or []
+		if any(r["doctype"] == doctype and r["name"] in done for r in refs):
+			refs = find_references(doctype, [loser])[loser]
+		try:
+			merged.append(_execute_merge(doctype, survivor, loser, refs, soft_rows.get(loser) or []))
+			done.add(loser)
+		except Exception as exc:
+			# _execute_merge already rolled this loser back and logged the traceback.
+			failed.append({"loser": loser, "error": cstr(exc)})
+	return {"doctype": doctype, "survivor": survivor, "merged": merged, "failed": failed}
+
+
 def _execute_merge(doctype, survivor, loser, hard_refs, soft_rows):
 	"""The actual work, shared by the inline and background paths. Assumes the
 	write guards have already run.
@@ -346,8 +346,22 @@ doc_events = {
 			"erpnext_enhancements.tasks.generate_next_task",
 			"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.publish_realtime_update",
 			"erpnext_enhancements.script_migrations.task.sync_project_dates_from_tasks",
+			# Projects Dashboard: re-count the project's row in Project Task Rollup (and
+			# the old project's, on a move). No-op unless status or project changed.
+			"erpnext_enhancements.project_enhancements.task_rollup.on_task_change",
+			# Drop the project's cached critical-path schedule when dates, project or
+			# dependencies changed. A delete always drops it.
+			"erpnext_enhancements.project_enhancements.critical_path.on_task_change",
 		],
 		"on_trash": "erpnext_enhancements.script_migrations.task.sync_project_dates_from_tasks",
+		# after_delete, not on_trash: during on_trash the row is still in tabTask and
+		# would be counted.
+		"after_delete": [
+			"erpnext_enhancements.project_enhancements.task_rollup.on_task_change",
+			"erpnext_enhancements.project_enhancements.critical_path.on_task_change",
+			# A deleted task changes its project's counts; the event goes out on commit.
+			"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.publish_realtime_update",
+		],
 		# training: warn-only certification check when a task is assigned to somebody
 		# lacking a current certification for the task type. Never blocks.
 		"validate": "erpnext_enhancements.training.compliance.warn_uncertified_assignee",
@@ -385,8 +399,28 @@ doc_events = {
 			# fires on the conversion insert AND on later saves (its idempotent file_name
 			# guard makes the repeat picks-up-late-additions safe).
 			"erpnext_enhancements.project_enhancements.sync_attachments_from_opportunity",
+			# Stamp Project Task Rollup.completed_on when is_active flips, so the
+			# dashboard never scans tabVersion for it. Writes only on a flip.
+			"erpnext_enhancements.project_enhancements.task_rollup.on_project_update",
+			# A new holiday_list / company is a new working-day calendar for the
+			# cached critical-path schedule.
+			"erpnext_enhancements.project_enhancements.critical_path.on_project_update",
 		],
 		"on_trash": "erpnext_enhancements.sync_contact.cleanup_directory_exclusions",
+		"after_delete": "erpnext_enhancements.project_enhancements.task_rollup.on_project_delete",
+		# The rollup row is named after the project, so a rename moves it.
+		"after_rename": "erpnext_enhancements.project_enhancements.task_rollup.on_project_rename",
+	},
+	# Project assignments feed the dashboard's assignee column via Project Task Rollup.
+	# Assign and un-assign both save the ToDo; the handler ignores non-Project ToDos.
+	"ToDo": {
+		"on_update": "erpnext_enhancements.project_enhancements.task_rollup.on_todo_change",
+		"after_delete": "erpnext_enhancements.project_enhancements.task_rollup.on_todo_change",
+	},
+	# Any project may schedule on this calendar: drop every cached critical path.
+	"Holiday List": {
+		"on_update": "erpnext_enhancements.project_enhancements.critical_path.on_holiday_list_change",
+		"on_trash": "erpnext_enhancements.project_enhancements.critical_path.on_holiday_list_change",
 	},
 	"Master Project": {
 		"before_validate": "erpnext_enhancements.sync_contact.sanitize_primary_address_link",
@@ -511,6 +545,15 @@ doc_events = {
 		"on_submit": "erpnext_enhancements.po_order_stage.advance_on_receipt",
 		"on_cancel": "erpnext_enhancements.po_order_stage.revert_on_receipt_cancel",
 	},
+	# water_engineering: the parsed "Pumps" catalog (Items + their Pump Curve rows) is
+	# cached so a Water Feature Design recompute doesn't re-read it on every save. These
+	# only clear that cache key, and only for an Item that is or was a pump — nothing here
+	# reads, validates or blocks an Item save (the naming advisor above stays event-free).
+	"Item": {
+		"on_update": "erpnext_enhancements.water_engineering.pump_catalog.invalidate",
+		"on_trash": "erpnext_enhancements.water_engineering.pump_catalog.invalidate",
+		"after_rename": "erpnext_enhancements.water_engineering.pump_catalog.invalidate",
+	},
 	# Lead attribution. Lead had no doc_events block at all before v1.241.0.
 	# Both handlers are inert unless the attribution Custom Fields exist on the
 	# bench (they check frappe.db.has_column), which is what keeps them safe
@@ -532,6 +575,12 @@ doc_events = {
 			# be switched off from the UI without a deploy.
 			"erpnext_enhancements.crm_enhancements.attribution.enforce_source",
 		],
+		# Phone Number Index: caller ID resolves an incoming number with one indexed
+		# lookup instead of a REGEXP scan (crm_enhancements/phone_index.py). The same
+		# three events on Contact, Customer and Employee below.
+		"on_update": "erpnext_enhancements.crm_enhancements.phone_index.on_party_change",
+		"after_delete": "erpnext_enhancements.crm_enhancements.phone_index.on_party_delete",
+		"after_rename": "erpnext_enhancements.crm_enhancements.phone_index.on_party_rename",
 	},
 	"Opportunity": {
 		"before_validate": [
@@ -603,8 +652,14 @@ doc_events = {
 			# disabled Server Script; see script_migrations/contact.py)
 			"erpnext_enhancements.script_migrations.contact.set_full_name_and_role",
 		],
-		"on_update": "erpnext_enhancements.sync_contact.sync_from_contact",
+		"on_update": [
+			"erpnext_enhancements.sync_contact.sync_from_contact",
+			# Phone Number Index (see the Lead block)
+			"erpnext_enhancements.crm_enhancements.phone_index.on_party_change",
+		],
 		"on_trash": "erpnext_enhancements.sync_contact.cleanup_directory_exclusions",
+		"after_delete": "erpnext_enhancements.crm_enhancements.phone_index.on_party_delete",
+		"after_rename": "erpnext_enhancements.crm_enhancements.phone_index.on_party_rename",
 	},
 	"Employee": {
 		# training: a new hire picks up the Training Learner role and every Required
@@ -621,7 +676,11 @@ doc_events = {
 			# appearing) — without that comparison EVERY Employee save enqueues a
 			# full rule sweep, and Employee is saved often.
 			"erpnext_enhancements.training.assignment.on_employee_update",
+			# Phone Number Index (see the Lead block)
+			"erpnext_enhancements.crm_enhancements.phone_index.on_party_change",
 		],
+		"after_delete": "erpnext_enhancements.crm_enhancements.phone_index.on_party_delete",
+		"after_rename": "erpnext_enhancements.crm_enhancements.phone_index.on_party_rename",
 	},
 	"Training Completion": {
 		# training: certificate issuance, badge awards and the "you passed" email ride the
@@ -694,10 +753,16 @@ doc_events = {
 			"erpnext_enhancements.crm_enhancements.data_quality.enforce_industry",
 		],
 		"before_save": "erpnext_enhancements.script_migrations.customer.set_last_activity",
-		"on_update": "erpnext_enhancements.sync_contact.sync_from_main_doc",
+		"on_update": [
+			"erpnext_enhancements.sync_contact.sync_from_main_doc",
+			# Phone Number Index (see the Lead block)
+			"erpnext_enhancements.crm_enhancements.phone_index.on_party_change",
+		],
 		# Drive folder per customer (Project Folder Google Drive Settings opt-in)
 		"after_insert": "erpnext_enhancements.google_drive.drive_utils.enqueue_customer_folder",
 		"on_trash": "erpnext_enhancements.sync_contact.cleanup_directory_exclusions",
+		"after_delete": "erpnext_enhancements.crm_enhancements.phone_index.on_party_delete",
+		"after_rename": "erpnext_enhancements.crm_enhancements.phone_index.on_party_rename",
 	},
 	# stripe_payments: auto-charge a saved method when an invoice for an
 	# autopay-enrolled customer is submitted (covers maintenance-generated invoices).
@@ -713,11 +778,13 @@ scheduler_events = {
 		# The handler immediately enqueues the batch onto the long queue.
 		"30 6 * * 1-5": ["erpnext_enhancements.api.briefing.scheduled_briefing_run"],
 		# KPI dashboard snapshots — nightly 05:00 (site TZ), one precomputed
-		# KPI Snapshot per department. Handler enqueues the batch onto long.
+		# KPI Snapshot per department. Handler enqueues the batch onto long, which
+		# fans out one long job per department (Executive after its inputs).
 		"0 5 * * *": ["erpnext_enhancements.kpi_dashboards.snapshots.scheduled_kpi_run"],
 		# Re-drive of the above if a deploy FLUSHDB destroyed the enqueued batch (a merge to
 		# main between the 05:00 tick and completion leaves a permanent hole in the trend
-		# data, silently). generate_all_snapshots upserts, so a re-run is idempotent.
+		# data, silently). Rebuilds only the departments missing today's snapshot or
+		# carrying a generation error, plus Executive if one of its inputs is among them.
 		"0 9 * * *": ["erpnext_enhancements.kpi_dashboards.snapshots.verify_daily_snapshots"],
 		# Morning technician dispatch digest — 06:00 site TZ (gated in Settings).
 		"0 6 * * *": ["erpnext_enhancements.api.maintenance_dispatch.send_morning_digests"],
@@ -849,6 +916,13 @@ scheduler_events = {
 		# The first symptom otherwise is somebody noticing weeks later that Triton's answers
 		# stopped mentioning anything recent.
 		"35 * * * *": ["erpnext_enhancements.chat.indexing.digest.check_digest_staleness"],
+		# The approximate semantic index's codes: trains the codebook once the corpus is big
+		# enough to train on, then codes a bounded backlog of rows the embedding sweep did not
+		# (the first train, a retrain, rows embedded while the index was off). A no-op unless
+		# Chat Settings.semantic_index is Approximate. Hourly, not with the */10 sweeps: nothing
+		# waits on it, because the gate encodes a missing code itself when it packs the room.
+		# :55 because every other minute this block uses is taken.
+		"55 * * * *": ["erpnext_enhancements.chat.indexing.ann_codes.sweep_ann_codes"],
 		# Nightly, and NIGHTLY rather than hourly on purpose: a chain break is a point in
 		# time, not a rate. Every row after it is suspect and every row before it is not, so
 		# checking twenty-four times a day finds the same break twenty-four times and tells
@@ -941,6 +1015,13 @@ scheduler_events = {
 		# learner is excluded from their own escalation email.
 		"erpnext_enhancements.training.tasks.escalate_overdue_assignments",
 		"erpnext_enhancements.project_enhancements.send_project_start_reminders",
+		# Projects Dashboard: reconcile Project Task Rollup with Task/ToDo. The doc_events
+		# keep it current; this catches writers that fire none (ERPNext's overdue sweep
+		# and other frappe.db.set_value paths on Task).
+		"erpnext_enhancements.project_enhancements.task_rollup.rebuild",
+		# Caller ID: reconcile Phone Number Index with Contact/Customer/Lead/Employee
+		# numbers written by paths that fire no doc_events (imports, db.set_value).
+		"erpnext_enhancements.crm_enhancements.phone_index.rebuild",
 		"erpnext_enhancements.tasks.predictive_maintenance_scheduling",
 		# maintenance renewal/rate engine: T-30 rate-change notices (§4.5). The
 		# auto-renew/expire step runs inside predictive_maintenance_scheduling.
@@ -1210,6 +1291,11 @@ after_install = [
 	# findable at all. frappe.db.add_index cannot create a FULLTEXT index, so that one is
 	# raw DDL and exists only if this runs.
 	"erpnext_enhancements.patches.add_chat_phase5_indexes.ensure_chat_phase5_indexes",
+	# The raw longblob vector column on Chat Context Chunk. No fieldtype maps to it, so it is
+	# DDL and exists only if this runs -- and `bench trim-tables` drops it. Never raises.
+	"erpnext_enhancements.chat.indexing.embedding_column.ensure_embedding_column",
+	# The approximate index's code columns beside it, raw DDL for the same reason. Never raises.
+	"erpnext_enhancements.chat.indexing.ann_codes.ensure_ann_columns",
 	# A `default` on a new field of a Single never reaches the row that already exists, so
 	# the Phase 5 dials read 0 on any pre-existing site and validation refused every save
 	# of the settings page. Fills missing rows only. Safe twice.
@@ -1396,6 +1482,11 @@ after_migrate = [
 	# after every deploy: exact-string matching stops working and nothing raises. Re-creating
 	# it here makes the bad answer to that question a one-migrate window instead of forever.
 	"erpnext_enhancements.patches.add_chat_phase5_indexes.ensure_chat_phase5_indexes",
+	# The raw longblob vector column on Chat Context Chunk. No fieldtype maps to it, so it is
+	# DDL and exists only if this runs -- and `bench trim-tables` drops it. Never raises.
+	"erpnext_enhancements.chat.indexing.embedding_column.ensure_embedding_column",
+	# The approximate index's code columns beside it, raw DDL for the same reason. Never raises.
+	"erpnext_enhancements.chat.indexing.ann_codes.ensure_ann_columns",
 	# A `default` on a new field of a Single never reaches the row that already exists, so
 	# the Phase 5 dials read 0 on any pre-existing site and validation refused every save
 	# of the settings page. Fills missing rows only. Safe twice.
@@ -1425,6 +1516,12 @@ after_migrate = [
 	# may never be saved again, so hanging the sync only off on_update would leave the
 	# `Logs To Clear` rows absent on every site that does not happen to edit the form.
 	"erpnext_enhancements.chat.retention.ensure_chat_log_retention",
+	# Reference-scan link plans (which tables/columns point at each doctype, and which
+	# of them are unindexed) are cached until the schema moves, and it moves here: new
+	# DocTypes, fixture Custom Fields and index patches all land in a migrate. A plan
+	# that outlived one would skip a new Link column -- a merge would then leave it
+	# pointing at the deleted loser, caught only by the final LinkExistsError. Never raises.
+	"erpnext_enhancements.reference_scan.clear_plan_cache",
 ]
 
 # Version-controlled customizations: every manually created Custom Field and
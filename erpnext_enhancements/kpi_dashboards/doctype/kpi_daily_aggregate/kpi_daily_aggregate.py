@@ -0,0 +1,13 @@
+"""KPI Daily Aggregate — one day's sum and row count for one incremental KPI series.
+
+Written in bulk by ``kpi_dashboards.partials`` when ``kpi_incremental_aggregation``
+is on, never by hand (``in_create``). The ``format:{series}-{day}`` autoname
+makes a recompute of a day replace its row. Rows older than
+``partials.HORIZON_DAYS`` are pruned by the refresh itself.
+"""
+
+from frappe.model.document import Document
+
+
+class KPIDailyAggregate(Document):
+	pass
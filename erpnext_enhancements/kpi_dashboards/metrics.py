@@ -2,12 +2,13 @@
 
 These helpers turn a raw metric value plus its target into the presentation
 fields a snapshot value carries: the Good/Watch/Bad status, the period-over-period
-trend, a human display string, and a source-staleness check. Keeping them pure
+trend, a human display string, and a source-staleness check — plus the day
+arithmetic behind incremental (daily-partial) window sums. Keeping them pure
 (deterministic, side-effect-free, ``now`` injectable) makes the grading logic
 unit-testable without a database — see ``tests/test_kpi_metrics.py``.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # A value within this fraction of its target counts as "Watch" rather than "Bad".
 WATCH_BAND = 0.10
@@ -131,3 +132,32 @@ def is_source_stale(last_sync, max_age_hours=6, now=None):
 	now = now or datetime.now()
 	age_hours = (now - dt).total_seconds() / 3600.0
 	return age_hours > max_age_hours
+
+
+# ------------------------------------------------------------------ daily partials
+
+
+def days_between(first, last):
+	"""Every date from ``first`` to ``last`` inclusive (empty if ``last < first``)."""
+	return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def days_to_compute(stored_days, dirty_days, first, last):
+	"""Days in ``[first, last]`` with no stored partial, plus the stored ones marked dirty. Sorted."""
+	stored = set(stored_days)
+	dirty = set(dirty_days)
+	return [day for day in days_between(first, last) if day not in stored or day in dirty]
+
+
+def window_total(partials, since, until):
+	"""``(total, rows)`` over the partials for days ``since <= day < until``.
+
+	``partials`` maps a date to its ``(total, rows)`` for that day.
+	"""
+	total = 0.0
+	rows = 0
+	for day, (day_total, day_rows) in partials.items():
+		if since <= day < until:
+			total += day_total or 0.0
+			rows += day_rows or 0
+	return total, rows
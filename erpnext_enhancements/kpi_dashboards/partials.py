@@ -0,0 +1,198 @@
+"""Incremental window sums for the KPI aggregators, from stored per-day partials.
+
+Revenue (30d / MTD / 90d), cash collected and lead counts were each an aggregate
+over every ``Sales Invoice`` / ``Payment Entry`` / ``Lead`` in the window, run
+again from scratch every night — so a snapshot cost grew with history, not with
+what happened yesterday. With ``kpi_incremental_aggregation`` on, each series in
+``SERIES`` keeps one **KPI Daily Aggregate** row per closed day (sum and row
+count), and a window is those rows plus one small live query for today onward:
+
+* a day is computed once, the first night it is closed, and kept for
+  ``HORIZON_DAYS`` (enough for any trailing window or quarter-to-date);
+* a closed day is recomputed when a document on it was modified since the last
+  refresh — a backdated invoice, a cancellation, a lead converted — found by
+  one query on ``modified``;
+* a deletion cannot be seen on ``modified``, so a ``Deleted Document`` for the
+  series' doctype since the last refresh recomputes the whole horizon.
+
+That is only sound when a counted document's date column does not change once
+it counts. Submitted invoices and payments cannot change ``posting_date``, and a
+lead's ``creation`` never changes; that is why the Opportunity close-date windows
+are not here (a reopened deal moves its close date, and the day it left would
+not be seen).
+
+A refresh runs inside a savepoint: if it fails, its writes are undone, the
+failure is logged, and ``load`` returns None so the aggregator uses its full
+query, exactly as with the setting off.
+"""
+
+from collections import namedtuple
+from datetime import timedelta
+
+import frappe
+from frappe.utils import add_days, cint, flt, getdate, now_datetime
+
+from erpnext_enhancements.kpi_dashboards import metrics
+
+DOCTYPE = "KPI Daily Aggregate"
+
+# Days of partials kept per series. The longest window an aggregator reads is
+# 90 days, and a quarter-to-date figure needs up to 92.
+HORIZON_DAYS = 100
+
+# A document saved just before a refresh can commit just after it. Dirty-day
+# detection looks this far behind the last refresh so that save is not missed.
+MODIFIED_LAG = timedelta(minutes=15)
+
+_COLUMNS = (
+	"name",
+	"creation",
+	"modified",
+	"modified_by",
+	"owner",
+	"docstatus",
+	"series",
+	"day",
+	"total",
+	"row_count",
+	"computed_at",
+)
+
+# ``amount`` is summed per day; ``condition`` selects the counted rows. Dirty
+# detection deliberately ignores ``condition``: a document leaving it (a cancel,
+# a status change) is exactly what must be seen.
+DailySeries = namedtuple("DailySeries", ["doctype", "date_column", "amount", "condition"])
+
+SERIES = {
+	"sales_invoice_revenue": DailySeries("Sales Invoice", "posting_date", "base_grand_total", "docstatus=1"),
+	"payments_received": DailySeries(
+		"Payment Entry", "posting_date", "base_received_amount", "docstatus=1 and payment_type='Receive'"
+	),
+	"leads_created": DailySeries("Lead", "creation", "1", "1=1"),
+	"leads_converted": DailySeries("Lead", "creation", "1", "status='Converted'"),
+}
+
+
+def enabled(settings=None):
+	settings = settings or frappe.get_cached_doc("ERPNext Enhancements Settings")
+	return bool(cint(settings.get("kpi_incremental_aggregation")))
+
+
+class DailyTotals:
+	"""One series' closed-day partials plus its live total from today onward."""
+
+	def __init__(self, first, today, partials, open_total, open_rows):
+		self.first = first
+		self.today = today
+		self.partials = partials
+		self.open_total = flt(open_total)
+		self.open_rows = cint(open_rows)
+
+	def covers(self, since):
+		return getdate(since) >= self.first
+
+	def _window(self, since):
+		total, rows = metrics.window_total(self.partials, getdate(since), self.today)
+		return total + self.open_total, rows + self.open_rows
+
+	def sum(self, since):
+		"""What ``select sum(amount) ... where date >= since`` returns: None when no row counts."""
+		total, rows = self._window(since)
+		return total if rows else None
+
+	def count(self, since):
+		"""What ``select count(*) ... where date >= since`` returns."""
+		return self._window(since)[1]
+
+
+def load(key, today=None):
+	"""Refresh series ``key`` and return its DailyTotals; None when the setting is off or the refresh fails."""
+	if not enabled():
+		return None
+	today = getdate(today or now_datetime())
+	frappe.db.savepoint("kpi_partials")
+	try:
+		return _refresh(key, SERIES[key], today)
+	except Exception:
+		frappe.db.rollback(save_point="kpi_partials")
+		frappe.log_error(frappe.get_traceback(), f"KPI partials refresh failed: {key}")
+		return None
+
+
+def _refresh(key, series, today):
+	first = add_days(today, -HORIZON_DAYS)
+	last = add_days(today, -1)
+	started = now_datetime()
+
+	stored = {}
+	watermark = None
+	for row in frappe.get_all(
+		DOCTYPE,
+		filters={"series": key, "day": (">=", first)},
+		fields=["day", "total", "row_count", "computed_at"],
+	):
+		stored[getdate(row.day)] = (flt(row.total), cint(row.row_count))
+		if row.computed_at and (watermark is None or row.computed_at > watermark):
+			watermark = row.computed_at
+
+	needed = metrics.days_to_compute(stored, _dirty_days(series, watermark, first, today), first, last)
+	if needed:
+		computed = _day_totals(series, needed[0], add_days(needed[-1], 1))
+		for day in needed:
+			stored[day] = computed.get(day, (0.0, 0))
+		_write(key, needed, stored, started)
+	frappe.db.delete(DOCTYPE, {"series": key, "day": ("<", first)})
+
+	open_total, open_rows = _open_totals(series, today)
+	return DailyTotals(first, today, stored, open_total, open_rows)
+
+
+def _dirty_days(series, watermark, first, today):
+	"""Closed days touched since ``watermark``; every day when a deletion may have hit one."""
+	if watermark is None:
+		return []
+	since = watermark - MODIFIED_LAG
+	if frappe.db.exists("Deleted Document", {"deleted_doctype": series.doctype, "creation": (">=", since)}):
+		return metrics.days_between(first, add_days(today, -1))
+	rows = frappe.db.sql(
+		f"""select distinct date(`{series.date_column}`) from `tab{series.doctype}`
+		where modified >= %(since)s
+		and `{series.date_column}` >= %(first)s and `{series.date_column}` < %(today)s""",
+		{"since": since, "first": first, "today": today},
+	)
+	return [getdate(r[0]) for r in rows if r[0]]
+
+
+def _day_totals(series, start, end):
+	"""``{day: (sum, rows)}`` for the counted documents dated ``start <= day < end``."""
+	rows = frappe.db.sql(
+		f"""select date(`{series.date_column}`), sum({series.amount}), count(*) from `tab{series.doctype}`
+		where {series.condition} and `{series.date_column}` >= %(start)s and `{series.date_column}` < %(end)s
+		group by date(`{series.date_column}`)""",
+		{"start": start, "end": end},
+	)
+	return {getdate(day): (flt(total), cint(count)) for day, total, count in rows}
+
+
+def _open_totals(series, today):
+	"""Sum and row count from today onward — the part of every window that is not closed yet."""
+	rows = frappe.db.sql(
+		f"""select sum({series.amount}), count(*) from `tab{series.doctype}`
+		where {series.condition} and `{series.date_column}` >= %(today)s""",
+		{"today": today},
+	)
+	return rows[0] if rows else (0.0, 0)
+
+
+def _write(key, days, totals, computed_at):
+	names = [f"{key}-{day}" for day in days]
+	frappe.db.delete(DOCTYPE, {"name": ("in", names)})
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		DOCTYPE,
+		_COLUMNS,
+		[
+			(name, computed_at, computed_at, user, user, 0, key, day, totals[day][0], totals[day][1], computed_at)
+			for name, day in zip(names, days, strict=True)
+		],
+	)
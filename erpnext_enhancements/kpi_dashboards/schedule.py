@@ -0,0 +1,55 @@
+"""Which departments a KPI batch builds, and in what order. **Pure — no frappe import.**
+
+The nightly batch used to build every department one after another in a single
+``long`` job, so the run took the *sum* of the aggregators' times. Departments
+do not read each other — with one exception, Executive, whose rollup re-surfaces
+the freshest Finance / Sales / Production / Operations / HR snapshots. So
+``snapshots.generate_all_snapshots`` now enqueues one job per department, and
+this module answers the two questions that fan-out raises:
+
+* **What can start now?** ``roots`` — every department in the batch none of
+  whose inputs are also in the batch.
+* **What does finishing this department unblock?** ``unblocked`` — the
+  dependents whose in-batch inputs are now all done. The job that finishes last
+  enqueues the dependent, so Executive runs once, after its inputs, and the run
+  takes roughly the time of the slowest department.
+
+``with_dependents`` widens a re-drive: rebuilding a failed Finance snapshot must
+rebuild Executive too, or the rollup keeps yesterday's Finance numbers.
+
+Kept frappe-free, like ``metrics.py``, so the ordering is unit-tested without a
+bench (``tests/test_kpi_schedule.py``).
+"""
+
+
+def roots(batch, depends_on):
+	"""Departments in ``batch`` (in its order) with no input inside the batch."""
+	members = set(batch)
+	return [dept for dept in batch if not members.intersection(depends_on.get(dept, ()))]
+
+
+def unblocked(finished, batch, depends_on, done):
+	"""Departments in ``batch`` that depend on ``finished`` and whose in-batch inputs are all in ``done``.
+
+	``done`` must already include ``finished``.
+	"""
+	members = set(batch)
+	ready = []
+	for dept in batch:
+		inputs = members.intersection(depends_on.get(dept, ()))
+		if finished in inputs and inputs <= set(done):
+			ready.append(dept)
+	return ready
+
+
+def with_dependents(departments, depends_on, order):
+	"""``departments`` plus everything that (transitively) reads them, in ``order``."""
+	wanted = set(departments)
+	grew = True
+	while grew:
+		grew = False
+		for dept, inputs in depends_on.items():
+			if dept not in wanted and wanted.intersection(inputs):
+				wanted.add(dept)
+				grew = True
+	return [dept for dept in order if dept in wanted]
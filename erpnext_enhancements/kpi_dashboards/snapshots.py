@@ -1,34 +1,45 @@
 """KPI snapshot engine — nightly precompute of department KPIs.
 
 Mirrors the Morning Briefing pattern (api/briefing.py): a cron entry checks the
-master switch and hands a batch to the ``long`` queue; the batch builds one
-**KPI Snapshot** per department, committing per-department so one slow/broken
-aggregator can't sink the rest. Each aggregator is a pure read over the same
-doctypes the dashboard catalog cites (Sales Invoice / Purchase Invoice / Payment
-Entry as the post-QBO-sync system of record, Opportunity / Lead, Sapphire
-Maintenance Record / Contract, etc.) — it never calls QBO/Stripe live; freshness
-of those syncs is recorded in ``source_freshness_json`` so a stale upstream shows
-a Watch badge instead of a silently-wrong number.
+master switch and hands a batch to the ``long`` queue; the batch fans out one
+job per department, each building and committing its own **KPI Snapshot**, so
+one slow/broken aggregator can't sink the rest and the departments run side by
+side (``DEPENDS_ON`` holds back the ones that read other snapshots). Each
+aggregator is a pure read over the same doctypes the dashboard catalog cites
+(Sales Invoice / Purchase Invoice / Payment Entry as the post-QBO-sync system of
+record, Opportunity / Lead, Sapphire Maintenance Record / Contract, etc.) — it
+never calls QBO/Stripe live; freshness of those syncs is recorded in
+``source_freshness_json`` so a stale upstream shows a Watch badge instead of a
+silently-wrong number. Each snapshot also records its aggregator's wall time and
+query count (``aggregator_seconds`` / ``aggregator_queries``).
 
 Phase 1 ships aggregators for Finance, Sales, and Operations. Adding a department
-is one entry in ``AGGREGATORS`` returning ``{"values": [...], "freshness": {...}}``.
+is one entry in ``AGGREGATORS`` returning ``{"values": [...], "freshness": {...}}``
+(plus a ``DEPENDS_ON`` entry if it reads another department's snapshot).
 
 Settings: the "KPI Dashboards" section of ERPNext Enhancements Settings —
 ``kpi_dashboards_enabled`` master switch (default off, the app's staged-rollout
 convention) and ``kpi_snapshot_retention_days``.
 """
 
+import contextlib
 import json
+import time
 
 import frappe
 from frappe import _
 from frappe.utils import add_days, add_months, cint, flt, getdate, now_datetime, nowdate
 
 from erpnext_enhancements.crm_enhancements.attribution import UNKNOWN_LEAD_SOURCE
-from erpnext_enhancements.kpi_dashboards import metrics
+from erpnext_enhancements.kpi_dashboards import metrics, partials, schedule
 
 DEFAULT_RETENTION_DAYS = 120
 
+# One background job per department (see ``generate_all_snapshots``). Each gets
+# the whole window the single batch job used to have: one department's
+# aggregator can be most of the night's work on its own.
+DEPARTMENT_JOB_TIMEOUT = 1800
+
 # Department -> aggregator. A department absent here has no snapshot yet (the
 # endpoint reports it as "not configured").
 # AGGREGATORS is defined at the bottom, once the aggregator fns exist.
@@ -66,6 +77,18 @@ def _exists(doctype):
 	return bool(frappe.db.exists("DocType", doctype))
 
 
+def _windowed(totals, since, query, params=None, count=False):
+	"""A ``date >= since`` aggregate: from daily partials when loaded, else ``query`` in full.
+
+	``totals`` is a ``partials.DailyTotals`` (None with incremental aggregation
+	off, or when its refresh failed). ``count`` picks count(*) over sum(...)
+	semantics — a sum over no rows is None, a count is 0.
+	"""
+	if totals is not None and totals.covers(since):
+		return totals.count(since) if count else totals.sum(since)
+	return _scalar(query, dict(params or {}, d=since))
+
+
 # ------------------------------------------------------------- department metrics
 
 
@@ -97,6 +120,10 @@ def _finance_metrics():
 	month_start = today.replace(day=1)
 	values, add = _collector()
 	freshness = {}
+	revenue = partials.load("sales_invoice_revenue", today)
+	revenue_sql = (
+		"select sum(base_grand_total) from `tabSales Invoice` where docstatus=1 and posting_date >= %(d)s"
+	)
 
 	add(
 		"ar_outstanding",
@@ -121,10 +148,7 @@ def _finance_metrics():
 	add(
 		"revenue_30",
 		"Revenue (30d)",
-		_scalar(
-			"select sum(base_grand_total) from `tabSales Invoice` where docstatus=1 and posting_date >= %(d)s",
-			{"d": d30},
-		),
+		_windowed(revenue, d30, revenue_sql),
 		"USD",
 		"Sales Invoice",
 		metrics.HIGHER,
@@ -132,21 +156,13 @@ def _finance_metrics():
 	add(
 		"revenue_mtd",
 		"Revenue (MTD)",
-		_scalar(
-			"select sum(base_grand_total) from `tabSales Invoice` where docstatus=1 and posting_date >= %(d)s",
-			{"d": month_start},
-		),
+		_windowed(revenue, month_start, revenue_sql),
 		"USD",
 		"Sales Invoice",
 		metrics.HIGHER,
 	)
 	# DSO = AR / (trailing-90d revenue / 90)
-	rev90 = flt(
-		_scalar(
-			"select sum(base_grand_total) from `tabSales Invoice` where docstatus=1 and posting_date >= %(d)s",
-			{"d": d90},
-		)
-	)
+	rev90 = flt(_windowed(revenue, d90, revenue_sql))
 	ar = flt(_scalar("select sum(outstanding_amount) from `tabSales Invoice` where docstatus=1 and outstanding_amount>0"))
 	dso = (ar / (rev90 / 90.0)) if rev90 else None
 	add("dso", "Days Sales Outstanding", dso, "days", "Sales Invoice", metrics.LOWER)
@@ -162,10 +178,11 @@ def _finance_metrics():
 	add(
 		"cash_collected_30",
 		"Cash Collected (30d)",
-		_scalar(
+		_windowed(
+			partials.load("payments_received", today),
+			d30,
 			"select sum(base_received_amount) from `tabPayment Entry` "
 			"where docstatus=1 and payment_type='Receive' and posting_date >= %(d)s",
-			{"d": d30},
 		),
 		"USD",
 		"Payment Entry",
@@ -432,17 +449,24 @@ def _sales_metrics():
 		metrics.HIGHER,
 	)
 
+	leads = partials.load("leads_created", today)
+	leads_sql = "select count(*) from `tabLead` where creation >= %(d)s"
 	add(
 		"new_leads_30",
 		"New Leads (30d)",
-		_scalar("select count(*) from `tabLead` where creation >= %(d)s", {"d": d30}),
+		_windowed(leads, d30, leads_sql, count=True),
 		"count",
 		"Lead",
 		metrics.HIGHER,
 	)
-	total_leads = flt(_scalar("select count(*) from `tabLead` where creation >= %(d)s", {"d": d90}))
+	total_leads = flt(_windowed(leads, d90, leads_sql, count=True))
 	converted = flt(
-		_scalar("select count(*) from `tabLead` where status='Converted' and creation >= %(d)s", {"d": d90})
+		_windowed(
+			partials.load("leads_converted", today),
+			d90,
+			"select count(*) from `tabLead` where status='Converted' and creation >= %(d)s",
+			count=True,
+		)
 	)
 	add(
 		"lead_conversion_90",
@@ -946,7 +970,7 @@ _EXEC_ROLLUP = (
 
 def _executive_metrics():
 	"""Company-wide rollup. Re-surfaces curated KPIs from the freshest department
-	snapshots (Executive is built last in the nightly batch, so it sees today's),
+	snapshots (``DEPENDS_ON`` builds Executive after those, so it sees today's),
 	plus a couple of direct exec-only computes."""
 	values, add = _collector()
 	cache = {}
@@ -1390,15 +1414,21 @@ AGGREGATORS = {
 	"Design": _design_metrics,
 	"Production": _production_metrics,
 	"Marketing": _marketing_metrics,
-	# Product is built before Executive so a future exec rollup can read it.
 	"Product": _product_metrics,
-	# HR is built before Executive so the exec rollup reads today's turnover.
 	"HR": _hr_metrics,
-	# Executive is intentionally last: the nightly batch builds it after the
-	# source departments, so its rollup reads today's fresh snapshots.
+	# Executive reads the others' snapshots: DEPENDS_ON below makes the batch
+	# build it after its source departments, so its rollup reads today's.
 	"Executive": _executive_metrics,
 }
 
+# Department -> the departments whose snapshots its aggregator reads. The batch
+# builds a department only after its inputs (``schedule.unblocked``); every
+# other department starts at once. Derived from the rollup table so the two
+# cannot drift.
+DEPENDS_ON = {
+	"Executive": tuple(dict.fromkeys(dept for _key, _label, dept, *_rest in _EXEC_ROLLUP)),
+}
+
 
 # ------------------------------------------------------------------- build/merge
 
@@ -1459,6 +1489,36 @@ def _append_value(doc, v, targets, prior, freshness):
 	)
 
 
+@contextlib.contextmanager
+def _measured():
+	"""Wall time and ``frappe.db.sql`` call count of the block, in the yielded dict.
+
+	``frappe.get_all``, ``get_value`` and the query builder all end in
+	``frappe.db.sql``, so counting there counts every statement an aggregator
+	issues. The wrapper is an instance attribute on this request's connection,
+	removed again on exit.
+	"""
+	cost = {"seconds": 0.0, "queries": 0}
+	db = frappe.db
+	shadowed = "sql" in vars(db)
+	sql = db.sql
+
+	def counted(*args, **kwargs):
+		cost["queries"] += 1
+		return sql(*args, **kwargs)
+
+	db.sql = counted
+	started = time.perf_counter()
+	try:
+		yield cost
+	finally:
+		cost["seconds"] = time.perf_counter() - started
+		if shadowed:
+			db.sql = sql
+		else:
+			del db.sql
+
+
 def build_department_snapshot(department, period="Daily", generated_by="Scheduler"):
 	"""Compute and persist one snapshot for ``department`` today (idempotent)."""
 	aggregator = AGGREGATORS.get(department)
@@ -1471,12 +1531,13 @@ def build_department_snapshot(department, period="Daily", generated_by="Schedule
 	targets = _targets(department, period)
 
 	error = None
-	try:
-		result = aggregator()
-	except Exception:
-		error = frappe.get_traceback()
-		frappe.log_error(error, f"KPI aggregator failed: {department}")
-		result = {"values": [], "freshness": {}}
+	with _measured() as cost:
+		try:
+			result = aggregator()
+		except Exception:
+			error = frappe.get_traceback()
+			frappe.log_error(error, f"KPI aggregator failed: {department}")
+			result = {"values": [], "freshness": {}}
 
 	if frappe.db.exists("KPI Snapshot", name):
 		frappe.delete_doc("KPI Snapshot", name, force=True, ignore_permissions=True)
@@ -1489,6 +1550,8 @@ def build_department_snapshot(department, period="Daily", generated_by="Schedule
 	doc.generated_at = now_datetime()
 	doc.generated_by = generated_by
 	doc.generation_error = (error or "")[:500] or None
+	doc.aggregator_seconds = round(cost["seconds"], 3)
+	doc.aggregator_queries = cost["queries"]
 	doc.source_freshness_json = json.dumps(freshness, default=str, indent=2)
 	for v in result.get("values") or []:
 		_append_value(doc, v, targets, prior, freshness)
@@ -1722,62 +1785,126 @@ def scheduled_kpi_run():
 	frappe.enqueue(
 		"erpnext_enhancements.kpi_dashboards.snapshots.generate_all_snapshots",
 		queue="long",
-		timeout=1800,
+		timeout=300,
 		period="Daily",
 	)
 
 
+def _failed_departments(period="Daily"):
+	"""Departments with no snapshot today, or whose snapshot recorded a generation error."""
+	built = {
+		row.department: row
+		for row in frappe.get_all(
+			"KPI Snapshot",
+			filters={"snapshot_date": getdate(nowdate()), "period": period},
+			fields=["department", "generation_error"],
+		)
+	}
+	return [
+		dept
+		for dept in AGGREGATORS
+		if dept not in built or (built[dept].generation_error or "").strip()
+	]
+
+
 def verify_daily_snapshots():
-	"""Later-morning re-drive if the nightly KPI batch was lost to a deploy FLUSHDB.
+	"""Later-morning re-drive of the departments the nightly KPI batch did not build cleanly.
 
 	``scheduled_kpi_run`` enqueues the batch once at 05:00; a merge to main between the cron
-	tick and completion FLUSHDBs the queue redis and destroys the job, leaving a *permanent*
-	gap in the trend data (there is no other generation path, and ``enqueue`` already reported
-	success). This runs a few hours later: if any department is missing today's snapshot,
-	re-enqueue the batch. ``build_department_snapshot`` upserts by deterministic name, so a
-	re-run is idempotent — a department that did generate is simply rebuilt in place.
+	tick and completion FLUSHDBs the queue redis and destroys the queued jobs, leaving a
+	*permanent* gap in the trend data (there is no other generation path, and ``enqueue``
+	already reported success). This runs a few hours later and rebuilds only what is missing
+	or carries a ``generation_error`` — plus anything that reads one of those (Executive), so
+	the rollup picks up the rebuilt numbers. ``build_department_snapshot`` upserts by
+	deterministic name, so a rebuild replaces the failed row in place.
 	"""
 	if not kpi_enabled():
 		return
-	from frappe.utils import getdate, nowdate
-
-	today = getdate(nowdate())
-	have = set(
-		frappe.get_all(
-			"KPI Snapshot",
-			filters={"snapshot_date": today, "period": "Daily"},
-			pluck="department",
-		)
+	failed = _failed_departments("Daily")
+	if not failed:
+		return
+	frappe.enqueue(
+		"erpnext_enhancements.kpi_dashboards.snapshots.generate_all_snapshots",
+		queue="long",
+		timeout=300,
+		period="Daily",
+		departments=schedule.with_dependents(failed, DEPENDS_ON, list(AGGREGATORS)),
 	)
-	if set(AGGREGATORS) - have:
-		frappe.enqueue(
-			"erpnext_enhancements.kpi_dashboards.snapshots.generate_all_snapshots",
-			queue="long",
-			timeout=1800,
-			period="Daily",
-		)
 
 
-def generate_all_snapshots(period="Daily"):
-	"""Build every department's snapshot; one failure never kills the batch."""
+def generate_all_snapshots(period="Daily", departments=None):
+	"""Fan a batch out as one ``long`` job per department; inputs first, then their readers.
+
+	``departments`` defaults to every department in ``AGGREGATORS``. Departments
+	with no input in the batch are enqueued now and run side by side on however
+	many long workers the site has; a department that reads others (Executive) is
+	enqueued by whichever of its inputs finishes last (``_enqueue_unblocked``).
+	The batch therefore takes about as long as its slowest department, not the
+	sum of them all. Each job commits its own snapshot, so one slow or broken
+	aggregator still cannot sink the rest.
+	"""
 	settings = _settings()
 	if not kpi_enabled(settings):
 		return
-	# Refresh the cached GA4/GSC pull first so the Marketing aggregator reads
-	# today's web numbers. Guarded — a slow/failed pull never blocks the batch.
-	try:
-		snapshot_marketing_web()
-		frappe.db.commit()
-	except Exception:
-		frappe.db.rollback()
-		frappe.log_error(frappe.get_traceback(), "KPI snapshot batch — marketing web")
-	for department in AGGREGATORS:
+	batch = [dept for dept in (departments or AGGREGATORS) if dept in AGGREGATORS]
+	started = str(now_datetime())
+	for department in schedule.roots(batch, DEPENDS_ON):
+		_enqueue_department(department, period, batch, started)
+
+
+def _enqueue_department(department, period, batch, started):
+	# Deduplicated on the department: two inputs finishing together both see
+	# Executive unblocked, and it must still run once.
+	frappe.enqueue(
+		"erpnext_enhancements.kpi_dashboards.snapshots.build_department_job",
+		queue="long",
+		timeout=DEPARTMENT_JOB_TIMEOUT,
+		job_id=f"kpi-snapshot::{period}::{department}",
+		deduplicate=True,
+		department=department,
+		period=period,
+		batch=batch,
+		started=started,
+	)
+
+
+def build_department_job(department, period="Daily", batch=None, started=None):
+	"""Worker: build one department's snapshot, commit it, then start what it unblocks."""
+	if department == "Marketing":
+		# Refresh the cached GA4/GSC pull first so the Marketing aggregator reads
+		# today's web numbers. Guarded — a slow/failed pull never blocks the snapshot.
 		try:
-			build_department_snapshot(department, period=period, generated_by="Scheduler")
+			snapshot_marketing_web()
 			frappe.db.commit()
 		except Exception:
 			frappe.db.rollback()
-			frappe.log_error(frappe.get_traceback(), f"KPI snapshot batch — {department}")
+			frappe.log_error(frappe.get_traceback(), "KPI snapshot batch — marketing web")
+	try:
+		build_department_snapshot(department, period=period, generated_by="Scheduler")
+		frappe.db.commit()
+	except Exception:
+		frappe.db.rollback()
+		frappe.log_error(frappe.get_traceback(), f"KPI snapshot batch — {department}")
+		# No snapshot, so nothing downstream can count this department as done;
+		# verify_daily_snapshots rebuilds it and its dependents later in the morning.
+		return
+	_enqueue_unblocked(department, period, batch or [department], started)
+
+
+def _enqueue_unblocked(department, period, batch, started):
+	"""Enqueue the batch's dependents of ``department`` whose inputs have all been built this batch.
+
+	Read after this job's commit, so of two inputs finishing together at least the
+	later one sees both snapshots.
+	"""
+	if not any(department in DEPENDS_ON.get(dept, ()) for dept in batch):
+		return
+	filters = {"snapshot_date": getdate(nowdate()), "period": period, "department": ("in", batch)}
+	if started:
+		filters["generated_at"] = (">=", started)
+	done = set(frappe.get_all("KPI Snapshot", filters=filters, pluck="department")) | {department}
+	for dependent in schedule.unblocked(department, batch, DEPENDS_ON, done):
+		_enqueue_department(dependent, period, batch, started)
 
 
 def purge_old_snapshots():
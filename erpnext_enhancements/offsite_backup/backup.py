@@ -14,7 +14,7 @@ Three scheduler entry points, all registered in ``hooks.py``:
 
 * :func:`run_daily_backup` — 02:00 site time, database only.
 * :func:`run_weekly_backup` — Sunday 03:00 site time, database + public files +
-  private files.
+  private files (by default as the incremental file store in ``file_store.py``).
 * :func:`watchdog` — 08:00 site time, alerts when either tier has gone stale.
 
 Plus :func:`run_backup_now`, the whitelisted endpoint behind the settings form's
@@ -69,7 +69,7 @@ from frappe.utils import (
 )
 
 from erpnext_enhancements import email_style
-from erpnext_enhancements.offsite_backup import drive
+from erpnext_enhancements.offsite_backup import drive, file_store
 
 # Matches the ``timeout`` the jobs are enqueued with. Also the basis for deciding
 # that a ``Running`` row is a corpse rather than a run.
@@ -81,12 +81,20 @@ STALE_RUN_GRACE_SECONDS = 15 * 60
 # backup does not.
 MIN_FREE_BYTES = 2 * 1024 * 1024 * 1024
 
-# Streamed in blocks — a multi-GB tarball must never be read into memory to be
-# checksummed.
-MD5_BLOCK = 8 * 1024 * 1024
+# Upload tuning, overridable on Offsite Backup Settings. The artefacts of a run
+# upload side by side; more threads than artefacts buys nothing, and the cap keeps
+# a typo from opening dozens of sessions that each hold a chunk in memory. The
+# file-store blobs use the same pool size, uncapped by the artefact count.
+DEFAULT_CHUNK_MIB = drive.CHUNK_SIZE // (1024 * 1024)
+DEFAULT_UPLOAD_CONCURRENCY = 3
+MAX_UPLOAD_CONCURRENCY = 8
 
-# Runs that include the files archives as well as the database.
+# Runs that include the files as well as the database.
 FULL_TYPES = ("Weekly", "Manual Full")
+# How a full run backs the files up (Offsite Backup Settings → File Backup Mode).
+# Blank reads as incremental: the field is newer than the Single.
+FILE_MODE_INCREMENTAL = "Incremental"
+FILE_MODE_ARCHIVES = "Full Archives"
 SCHEDULED_TYPES = ("Daily", "Weekly")
 # Everything :func:`run_backup_now` is allowed to start. It is a whitelisted
 # endpoint, so its argument is untrusted input, not a hint.
@@ -298,15 +306,35 @@ def execute_backup(backup_type="Daily"):
 
 		details["disk"] = _assert_disk_headroom()
 
-		paths = _create_backup(include_files)
+		file_mode = _file_backup_mode(settings) if include_files else None
+		details["file_backup_mode"] = file_mode
+
+		paths = _create_backup(file_mode == FILE_MODE_ARCHIVES)
+		details["transfer"] = _transfer_settings(settings, len(paths))
 		details["artifacts"] = []
-		for path in paths:
-			artefact = _upload_and_verify(service, path, folder_id)
-			details["artifacts"].append(artefact)
-			summary["files_uploaded"] += 1
-			summary["bytes_uploaded"] += artefact["bytes"]
+		try:
+			_upload_all(service, settings, paths, folder_id, details["transfer"], details["artifacts"])
+		finally:
+			# Counted from what was verified, so a run that lost one of three
+			# artefacts still reports the two that landed.
+			summary["files_uploaded"] = len(details["artifacts"])
+			summary["bytes_uploaded"] = sum(item["bytes"] for item in details["artifacts"])
+
+		if file_mode == FILE_MODE_INCREMENTAL:
+			# After the database dump has landed, so a file-store failure still
+			# leaves this run's dump in Drive (and the run marked Failed).
+			store = file_store.backup_files(
+				service,
+				_service_account_key(settings),
+				folder_id,
+				drive_id,
+				_transfer_settings(settings),
+			)
+			details["file_store"] = store
+			summary["files_uploaded"] += store["uploaded"]
+			summary["bytes_uploaded"] += store["uploaded_bytes"]
 
-		pruned, retention = _prune(service, folder_id, drive_id, settings)
+		pruned, retention = _prune(service, folder_id, drive_id, settings, collect_files=include_files)
 		summary["pruned_count"] = pruned
 		details["retention"] = retention
 
@@ -467,9 +495,18 @@ def _nearest_existing_dir(path):
 	return current or "."
 
 
+def _file_backup_mode(settings):
+	mode = (settings.get("file_backup_mode") or "").strip()
+	return FILE_MODE_ARCHIVES if mode == FILE_MODE_ARCHIVES else FILE_MODE_INCREMENTAL
+
+
 def _create_backup(include_files):
 	"""Take the local dump and return **only** the artefacts we are willing to ship.
 
+	``include_files`` is true only in the Full Archives file mode; an incremental
+	run takes a database-only dump here and ships the files through
+	:mod:`file_store`, which never builds a tarball.
+
 	``site_config.json`` is deliberately not in this list, and must never be added.
 
 	Frappe's ``backup_encryption()`` encrypts exactly three things: the database
@@ -508,17 +545,102 @@ def _create_backup(include_files):
 	return paths
 
 
-def _upload_and_verify(service, local_path, folder_id):
+def _transfer_settings(settings, artefact_count=None):
+	"""Chunk size and upload concurrency for this run, recorded in the log details.
+
+	``artefact_count`` caps the pool at one thread per artefact; ``None`` (the
+	file-store blobs, which are many) leaves only :data:`MAX_UPLOAD_CONCURRENCY`.
+
+	Blank/zero falls back to the module defaults rather than failing: both fields
+	are newer than the Single, and a ``default`` on a new field never reaches a
+	row that already exists.
+	"""
+	chunk_mib = cint(settings.get("upload_chunk_mib")) or DEFAULT_CHUNK_MIB
+	concurrency = cint(settings.get("upload_concurrency")) or DEFAULT_UPLOAD_CONCURRENCY
+	return {
+		"chunk_bytes": drive.aligned_chunk_size(chunk_mib * 1024 * 1024),
+		"concurrency": max(
+			1,
+			min(
+				concurrency,
+				MAX_UPLOAD_CONCURRENCY,
+				MAX_UPLOAD_CONCURRENCY if artefact_count is None else artefact_count or 1,
+			),
+		),
+	}
+
+
+def _upload_all(service, settings, paths, folder_id, transfer, artefacts):
+	"""Upload every artefact concurrently, then verify each on this thread.
+
+	A full run used to ship the database dump, then the public archive, then the
+	private archive — the window was the *sum* of three uploads, then a fourth
+	pass re-read every file to hash it. Now each artefact gets its own resumable
+	session on a pool of ``transfer["concurrency"]`` threads, and its MD5 is taken
+	from the very reads the upload makes, so the window is roughly the longest
+	single upload and nothing is read twice.
+
+	Only :func:`_transfer` leaves this thread, and it touches nothing but the file
+	and the network: each thread builds its own Drive client (a service object is
+	not thread-safe) and none of them has a site, a database connection or
+	``frappe.local``. Verification, the delete of an unverified object, and every
+	log write happen back here, in ``paths`` order.
+
+	Verified artefacts are appended to ``artefacts`` as they are checked. If any
+	upload or check failed, the first failure is raised after all of them have
+	been dealt with — an upload already in flight is left to finish and verified
+	rather than abandoned as a half-written object in the folder.
+	"""
+	from concurrent.futures import ThreadPoolExecutor
+
+	key = _service_account_key(settings)
+	chunk_bytes = transfer["chunk_bytes"]
+	with ThreadPoolExecutor(max_workers=transfer["concurrency"], thread_name_prefix="offsite-backup") as pool:
+		futures = [pool.submit(_transfer, key, path, folder_id, chunk_bytes) for path in paths]
+
+	failure = None
+	for path, future in zip(paths, futures, strict=True):
+		try:
+			artefact = _verified_artefact(service, path, *future.result())
+		except Exception as exc:
+			failure = failure or exc
+			continue
+		artefacts.append(artefact)
+	if failure is not None:
+		raise failure
+
+
+def _transfer(key, local_path, folder_id, chunk_bytes):
+	"""Pool-thread half of an upload: ``(remote metadata, local MD5 hex)``.
+
+	Builds its own Drive client from ``key``. No ``frappe`` in here — see
+	:func:`_upload_all`.
+	"""
+	service = drive.get_drive_service(key)
+	# usedforsecurity=False: this is an integrity comparison against Drive's own
+	# MD5, not a security primitive, and the flag keeps it working on a FIPS host.
+	digest = hashlib.md5(usedforsecurity=False)
+	remote = drive.upload_file(
+		service,
+		local_path,
+		folder_id,
+		os.path.basename(local_path),
+		chunk_size=chunk_bytes,
+		digest=digest,
+	)
+	return remote or {}, digest.hexdigest()
+
+
+def _verified_artefact(service, local_path, remote, local_md5):
 	name = os.path.basename(local_path)
 	local_bytes = os.path.getsize(local_path)
 
-	remote = drive.upload_file(service, local_path, folder_id, name) or {}
 	file_id = remote.get("id")
 	if not file_id:
 		raise RuntimeError(f"Drive accepted {name} but returned no file id.")
 
 	try:
-		verified = _verify(name, local_path, local_bytes, remote)
+		verified = drive.verify_upload(name, local_bytes, remote, local_md5)
 	except Exception:
 		# A truncated object left in the folder is worse than no object at all: it
 		# is indistinguishable from a good backup right up until somebody needs it.
@@ -542,45 +664,10 @@ def _upload_and_verify(service, local_path, folder_id):
 	}
 
 
-def _verify(name, local_path, local_bytes, remote):
-	"""Prove the bytes in Drive are the bytes on disk. Returns which checks ran."""
-	remote_size = remote.get("size")
-	if remote_size is None:
-		raise RuntimeError(f"Drive returned no size for {name}; the upload cannot be verified.")
-	if int(remote_size) != local_bytes:
-		raise RuntimeError(
-			f"Size mismatch for {name}: {local_bytes} bytes uploaded, {int(remote_size)} bytes "
-			"reported by Drive."
-		)
-
-	remote_md5 = remote.get("md5Checksum")
-	if not remote_md5:
-		# Drive omits md5Checksum for some object types. Size alone is a weaker
-		# check, so which check actually ran is recorded rather than implied.
-		return "size"
-
-	local_md5 = _local_md5(local_path)
-	if local_md5.lower() != str(remote_md5).lower():
-		raise RuntimeError(
-			f"MD5 mismatch for {name}: {local_md5} locally, {remote_md5} in Drive."
-		)
-	return "size + md5"
-
-
-def _local_md5(path):
-	# usedforsecurity=False: this is an integrity comparison against Drive's own
-	# MD5, not a security primitive, and the flag keeps it working on a FIPS host.
-	digest = hashlib.md5(usedforsecurity=False)
-	with open(path, "rb") as handle:
-		for block in iter(lambda: handle.read(MD5_BLOCK), b""):
-			digest.update(block)
-	return digest.hexdigest()
-
-
 # ----------------------------------------------------------------- retention
 
 
-def _prune(service, folder_id, drive_id, settings):
+def _prune(service, folder_id, drive_id, settings, collect_files=False):
 	"""Delete objects past ``retention_days``, behind two independent floors.
 
 	Never prune below the newest ``min_keep`` objects, and do not prune at all if
@@ -594,6 +681,10 @@ def _prune(service, folder_id, drive_id, settings):
 
 	The destination folder must be **dedicated to these backups** — this deletes
 	by age, not by filename, so anything else parked in the folder is in scope.
+	Folders are the exception: the file store's ``file-blobs`` and
+	``file-manifests`` live there, are old by construction, and are retained by
+	:func:`file_store.collect_garbage` instead — on full runs (``collect_files``),
+	under the same two floors applied to its manifests.
 	"""
 	retention_days = cint(settings.retention_days)
 	min_keep = max(1, cint(settings.min_keep))
@@ -610,6 +701,9 @@ def _prune(service, folder_id, drive_id, settings):
 		info["error"] = _redact(frappe.get_traceback())
 		frappe.log_error(info["error"], "Offsite Backup: prune listing failed")
 		return 0, info
+	# Filtered before the floor is applied, so the store's folders neither count
+	# towards min_keep nor age out with the dumps.
+	listing = [item for item in listing if item.get("mimeType") != drive.FOLDER_MIME_TYPE]
 
 	info["listed"] = len(listing)
 	if len(listing) < min_keep:
@@ -660,7 +754,15 @@ def _prune(service, folder_id, drive_id, settings):
 	info["deleted"] = deleted
 	info["delete_errors"] = errors
 	info["action"] = f"Deleted {len(deleted)} object(s) older than {retention_days} days."
-	return len(deleted), info
+
+	collected = 0
+	if collect_files:
+		try:
+			collected, info["file_store"] = file_store.collect_garbage(service, folder_id, drive_id, settings)
+		except Exception:
+			info["file_store"] = {"error": _redact(frappe.get_traceback())}
+			frappe.log_error(info["file_store"]["error"], "Offsite Backup: file-store collection failed")
+	return len(deleted) + collected, info
 
 
 def _parse_drive_time(value):
@@ -50,6 +50,15 @@ class OffsiteBackupSettings(Document):
 			# zero is not a floor.
 			self.min_keep = 1
 
+		from erpnext_enhancements.offsite_backup.backup import MAX_UPLOAD_CONCURRENCY
+
+		if cint(self.upload_concurrency) > MAX_UPLOAD_CONCURRENCY:
+			# Each parallel upload holds a chunk in memory on the long-queue worker,
+			# and a full run only has three files to send anyway.
+			frappe.throw(
+				_("Parallel Uploads can be at most {0}.").format(MAX_UPLOAD_CONCURRENCY)
+			)
+
 	def _has_service_account_key(self):
 		"""True when a key is set, counting one pasted in this very save.
 
@@ -26,22 +26,30 @@ Two rules that this whole file exists to enforce:
   5xx responses spread over those three hours are normal Drive behaviour, not a
   broken upload; :func:`upload_file` therefore resets its attempt counter and its
   backoff every time a chunk lands. The budget only counts *consecutive* failures.
+
+A service object is **not thread-safe** — it wraps one ``httplib2.Http``, which
+keeps a single connection per host and interleaves nothing. The backup uploads its
+artefacts concurrently, so each upload thread builds its own client from the key
+(:func:`get_drive_service` is cheap; it makes no network call).
 """
 
 import json
+import os
 import time
 
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
 
 SCOPES = ["https://www.googleapis.com/auth/drive"]
 
 # 20 MiB. Must be a multiple of 256 KiB for a resumable upload; large enough that a
 # multi-GB dump is a sane number of round trips, small enough that one retried
-# chunk is not a ten-minute setback.
+# chunk is not a ten-minute setback. The default for Offsite Backup Settings'
+# upload_chunk_mib; callers pass their own through upload_file(chunk_size=...).
 CHUNK_SIZE = 20 * 1024 * 1024
+CHUNK_ALIGNMENT = 256 * 1024
 
 # Transient by Google's own definition — everything else is a real answer and
 # retrying it just delays a failure the operator needs to see.
@@ -54,6 +62,7 @@ INITIAL_BACKOFF_SECONDS = 2
 UPLOAD_FIELDS = "id, name, size, md5Checksum, createdTime"
 LIST_FIELDS = "nextPageToken, files(id, name, size, md5Checksum, createdTime, mimeType)"
 FOLDER_FIELDS = "id, name, mimeType, driveId, capabilities"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
 
 
 # --------------------------------------------------------------------- auth
@@ -139,6 +148,32 @@ def _execute(request):
 			delay *= 2
 
 
+def _until_done(step):
+	"""Call a chunked transfer's ``step`` until it returns something truthy.
+
+	The per-stall budget from the module docstring: a failure is retried with
+	backoff, and both the attempt counter and the backoff reset every time a
+	step succeeds, finished or not.
+	"""
+	attempt = 0
+	delay = INITIAL_BACKOFF_SECONDS
+	while True:
+		try:
+			result = step()
+		except Exception as exc:
+			attempt += 1
+			if attempt >= MAX_ATTEMPTS or not _is_retryable(exc):
+				raise
+			time.sleep(delay)
+			delay *= 2
+			continue
+		if result:
+			return result
+		# Progress was made. Whatever went wrong before this point is history.
+		attempt = 0
+		delay = INITIAL_BACKOFF_SECONDS
+
+
 # --------------------------------------------------------------------- calls
 
 
@@ -163,7 +198,7 @@ def check_folder(service, folder_id):
 	)
 
 
-def upload_file(service, local_path, folder_id, remote_name):
+def upload_file(service, local_path, folder_id, remote_name, chunk_size=CHUNK_SIZE, digest=None):
 	"""Resumable-upload one local file into ``folder_id``; return its metadata.
 
 	Resumable rather than simple upload because these are multi-GB objects: a
@@ -173,17 +208,23 @@ def upload_file(service, local_path, folder_id, remote_name):
 	The retry counter and the backoff both reset after every chunk that lands.
 	See the module docstring — the budget bounds a *stall*, not the whole
 	transfer.
+
+	``digest`` (a ``hashlib`` object) is fed every byte of the file from the reads
+	the upload makes anyway, so the caller can compare Drive's ``md5Checksum``
+	without a second multi-GB pass over the disk. See :class:`_HashingReader`.
 	"""
-	# Explicit mimetype rather than letting MediaFileUpload guess from the
-	# extension: these are opaque encrypted blobs, and a failed guess is a
-	# constructor error rather than a sensible default.
-	media = MediaFileUpload(
-		local_path,
-		mimetype="application/octet-stream",
-		chunksize=CHUNK_SIZE,
-		resumable=True,
-	)
+	chunk_size = aligned_chunk_size(chunk_size)
+	# Explicit mimetype rather than letting the library guess from the extension:
+	# these are opaque encrypted blobs, and a failed guess is a constructor error
+	# rather than a sensible default.
+	reader = _HashingReader(local_path, digest)
 	try:
+		media = MediaIoBaseUpload(
+			reader,
+			mimetype="application/octet-stream",
+			chunksize=chunk_size,
+			resumable=True,
+		)
 		request = service.files().create(
 			body={"name": remote_name, "parents": [folder_id]},
 			media_body=media,
@@ -191,31 +232,154 @@ def upload_file(service, local_path, folder_id, remote_name):
 			supportsAllDrives=True,
 		)
 
-		attempt = 0
-		delay = INITIAL_BACKOFF_SECONDS
-		response = None
-		while response is None:
-			try:
-				_status, response = request.next_chunk()
-			except Exception as exc:
-				attempt += 1
-				if attempt >= MAX_ATTEMPTS or not _is_retryable(exc):
-					raise
-				time.sleep(delay)
-				delay *= 2
-				continue
-			# Progress was made. Whatever went wrong before this point is history.
-			attempt = 0
-			delay = INITIAL_BACKOFF_SECONDS
+		response = _until_done(lambda: request.next_chunk()[1])
+		reader.finish_digest()
 		return response
 	finally:
-		# MediaFileUpload holds the file open for the life of the transfer and has
-		# no public close(); a long-lived worker that leaks one descriptor per
-		# artefact per night eventually runs out.
-		try:
-			media.stream().close()
-		except Exception:
-			pass
+		# The reader holds the file open for the life of the transfer; a long-lived
+		# worker that leaks one descriptor per artefact per night eventually runs out.
+		reader.close()
+
+
+def aligned_chunk_size(chunk_size):
+	"""``chunk_size`` rounded down to the 256 KiB multiple a resumable upload
+	requires (never below one unit). A misaligned chunk is a 400 on the first
+	request, after the dump has already been taken."""
+	units = max(1, int(chunk_size or CHUNK_SIZE) // CHUNK_ALIGNMENT)
+	return units * CHUNK_ALIGNMENT
+
+
+class _HashingReader:
+	"""A read-only file that feeds each byte to ``digest`` the first time it is read.
+
+	The upload reads the file front to back in chunk-sized ``seek`` + ``read``
+	pairs. A retried chunk — or a 308 that only accepted part of one — seeks back
+	and re-reads bytes already hashed; those are skipped by tracking the high-water
+	mark. A read that starts *past* the mark (nothing the client does today) would
+	leave a hole, so the gap is read and hashed first rather than trusting the
+	pattern. :meth:`finish_digest` hashes any tail the upload never read.
+	"""
+
+	def __init__(self, path, digest=None):
+		self._handle = open(path, "rb")
+		self._digest = digest
+		self._hashed = 0
+
+	def seek(self, offset, whence=os.SEEK_SET):
+		return self._handle.seek(offset, whence)
+
+	def tell(self):
+		return self._handle.tell()
+
+	def read(self, size=-1):
+		start = self._handle.tell()
+		if self._digest is not None and start > self._hashed:
+			self._catch_up(start)
+		data = self._handle.read(size)
+		if self._digest is not None and data:
+			end = start + len(data)
+			if end > self._hashed:
+				self._digest.update(data[self._hashed - start :])
+				self._hashed = end
+		return data
+
+	def finish_digest(self):
+		if self._digest is not None:
+			position = self._handle.tell()
+			self._catch_up(os.fstat(self._handle.fileno()).st_size)
+			self._handle.seek(position)
+
+	def _catch_up(self, until):
+		self._handle.seek(self._hashed)
+		while self._hashed < until:
+			block = self._handle.read(min(CHUNK_SIZE, until - self._hashed))
+			if not block:
+				break
+			self._digest.update(block)
+			self._hashed += len(block)
+
+	def close(self):
+		self._handle.close()
+
+	@property
+	def closed(self):
+		return self._handle.closed
+
+
+def download_file(service, file_id, local_path, chunk_size=CHUNK_SIZE):
+	"""Stream one Drive object to ``local_path`` in chunks, with the same per-stall
+	retry budget as :func:`upload_file`. Used by the file-store restore and its
+	garbage collection, which reads the manifests back."""
+	request = service.files().get_media(fileId=file_id, supportsAllDrives=True)
+	with open(local_path, "wb") as handle:
+		downloader = MediaIoBaseDownload(handle, request, chunksize=aligned_chunk_size(chunk_size))
+		_until_done(lambda: downloader.next_chunk()[1])
+	return local_path
+
+
+def find_folder(service, parent_id, name, drive_id=None):
+	"""Id of the (non-trashed) folder ``name`` directly inside ``parent_id``, or
+	``None``. The oldest wins if somebody made a second one by hand."""
+	params = {
+		"q": (
+			f"'{_escape(parent_id)}' in parents and name = '{_escape(name)}' "
+			f"and mimeType = '{FOLDER_MIME_TYPE}' and trashed = false"
+		),
+		"fields": "files(id, name, createdTime)",
+		"orderBy": "createdTime",
+		"pageSize": 10,
+		"supportsAllDrives": True,
+		"includeItemsFromAllDrives": True,
+	}
+	if drive_id:
+		params["corpora"] = "drive"
+		params["driveId"] = drive_id
+	files = _execute(service.files().list(**params)).get("files") or []
+	return files[0]["id"] if files else None
+
+
+def ensure_folder(service, parent_id, name, drive_id=None):
+	""":func:`find_folder`, creating the folder when it does not exist yet."""
+	existing = find_folder(service, parent_id, name, drive_id)
+	if existing:
+		return existing
+	created = _execute(
+		service.files().create(
+			body={"name": name, "parents": [parent_id], "mimeType": FOLDER_MIME_TYPE},
+			fields="id",
+			supportsAllDrives=True,
+		)
+	)
+	return created["id"]
+
+
+def verify_upload(name, local_bytes, remote, local_md5):
+	"""Prove the bytes in Drive are the bytes that were sent. Returns which checks
+	ran (``"size"`` or ``"size + md5"``); raises on any mismatch.
+
+	``local_md5`` is the digest of the bytes the upload actually read and sent
+	(see :func:`upload_file`'s ``digest``).
+	"""
+	remote_size = remote.get("size")
+	if remote_size is None:
+		raise RuntimeError(f"Drive returned no size for {name}; the upload cannot be verified.")
+	if int(remote_size) != local_bytes:
+		raise RuntimeError(
+			f"Size mismatch for {name}: {local_bytes} bytes uploaded, {int(remote_size)} bytes "
+			"reported by Drive."
+		)
+
+	remote_md5 = remote.get("md5Checksum")
+	if not remote_md5:
+		# Drive omits md5Checksum for some object types. Size alone is a weaker
+		# check, so which check actually ran is recorded rather than implied.
+		return "size"
+
+	if local_md5.lower() != str(remote_md5).lower():
+		raise RuntimeError(
+			f"MD5 mismatch for {name}: {local_md5} locally, {remote_md5} in Drive."
+		)
+	return "size + md5"
 
 
 def list_backup_files(service, folder_id, drive_id=None):
@@ -0,0 +1,686 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""Content-addressed, incremental file tier for the weekly offsite backup.
+
+Frappe's ``new_backup(ignore_files=False)`` tars the whole public and private file
+store every Sunday, and the upload then ships every byte of it again — although
+almost every attachment in it is the one that was there last week. This tier
+replaces those two tarballs (in the default **Incremental** file backup mode):
+
+* Every file under ``public/files`` and ``private/files`` is hashed (SHA-256).
+  A **blob** named by that hash is uploaded to the ``file-blobs`` subfolder of the
+  backup folder only if no blob of that name is there already, so a week's
+  upload is that week's new or changed files.
+* A **manifest** — ``{path: {sha256, size, mtime_ns}}`` for the whole store —
+  goes to ``file-manifests`` as ``manifest-<timestamp>.json.gz``. A manifest and
+  the blobs it names *are* a file backup: :func:`restore_files` rebuilds the tree
+  from them.
+* Retention is garbage collection (:func:`collect_garbage`): manifests age out
+  under the same two floors as the top-level objects (``retention_days`` beyond
+  the newest ``min_keep``, and nothing at all from a listing shorter than
+  ``min_keep``), then any blob no surviving manifest names is deleted. If any
+  surviving manifest cannot be read back, *no* blob is deleted — an unreadable
+  manifest is not evidence that its blobs are garbage.
+
+**Encrypted exactly when Frappe encrypts its own archives** (System Settings →
+``encrypt_backup``), with the same ``backup_encryption_key`` and the same tool
+(``gpg --symmetric``), so ``gpg -d`` on a blob works the way it does on a tarball.
+Blobs and manifests then carry a ``.gpg`` suffix. The passphrase reaches gpg on a
+pipe file descriptor, never in ``argv`` (where Frappe's own call puts it, visible
+to ``ps``). Private attachments must never land in Drive in the clear on a site
+whose dumps are encrypted.
+
+**Each file is read once per upload.** The plaintext is streamed into gpg while
+it is hashed, and the ciphertext's MD5 comes from the upload's own reads
+(:func:`drive.upload_file`'s ``digest``). A file whose bytes no longer match the
+scanned hash by the time it is shipped (rewritten or deleted mid-run) is left out
+of this week's manifest rather than pointed at a blob that holds something else;
+next week picks it up.
+
+**Hashing is skipped for unchanged files.** A local index of
+``path -> (size, mtime_ns, sha256)`` from the last successful run (kept under the
+site's ``private`` folder, outside ``private/files`` and ``private/backups``) lets
+an untouched file reuse its hash — the same size+mtime test rsync makes by
+default. Losing the index costs one full re-hash, never correctness of what is
+uploaded: blob presence is always read from Drive, not from the index.
+
+Blob uploads reuse the artefact pool's rules (see ``backup._upload_all``): the
+threads touch only files, gpg and the network, each keeps its own Drive client,
+and logging happens back on the job's thread.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import frappe
+from frappe.utils import cint, now_datetime
+
+from erpnext_enhancements.offsite_backup import drive
+
+BLOB_FOLDER = "file-blobs"
+MANIFEST_FOLDER = "file-manifests"
+MANIFEST_PREFIX = "manifest-"
+MANIFEST_VERSION = 1
+GPG_SUFFIX = ".gpg"
+
+# Site-relative roots, and the prefix each contributes to a manifest path.
+FILE_ROOTS = ("public/files", "private/files")
+
+# The stat-cache. Under private/ but outside private/files (so it is not backed
+# up as an attachment) and outside private/backups (whose temp-file sweep would
+# delete it and cost a full re-hash every week).
+INDEX_FILE = ("private", "offsite-file-index.json")
+
+HASH_BLOCK = 8 * 1024 * 1024
+
+
+# ------------------------------------------------------------------- backup
+
+
+def backup_files(service, key, folder_id, drive_id, transfer):
+	"""Ship the week's new blobs and a manifest of the whole file store.
+
+	``key`` is the service-account key the pool threads build their own clients
+	from; ``transfer`` the run's chunk size / concurrency. Returns the details
+	recorded on the log row, including ``uploaded`` / ``uploaded_bytes`` for the
+	run summary. Raises if any blob or the manifest fails to upload or verify —
+	the blobs that did land are kept and, being content-addressed, are simply
+	found present next run.
+	"""
+	passphrase = _passphrase()
+	blob_folder = drive.ensure_folder(service, folder_id, BLOB_FOLDER, drive_id)
+	manifest_folder = drive.ensure_folder(service, folder_id, MANIFEST_FOLDER, drive_id)
+
+	entries, sources, hashed = _scan(_load_index())
+	present = {item.get("name") for item in drive.list_backup_files(service, blob_folder, drive_id)}
+	missing = {
+		sha: path for sha, path in sources.items() if blob_name(sha, passphrase) not in present
+	}
+
+	shipped, changed, failure = _ship_all(key, passphrase, missing, blob_folder, transfer)
+	for sha, reason in changed.items():
+		frappe.log_error(
+			f"{sources[sha]} changed or disappeared while it was being backed up ({reason}). "
+			"It is left out of this manifest and will be picked up by the next run.",
+			"Offsite Backup: file changed during backup",
+		)
+	if failure is not None:
+		raise failure
+
+	if changed:
+		entries = {path: entry for path, entry in entries.items() if entry["sha256"] not in changed}
+
+	manifest = _upload_manifest(service, manifest_folder, entries, passphrase, transfer)
+	_save_index(entries)
+
+	return {
+		"encrypted": bool(passphrase),
+		"manifest": manifest["name"],
+		"manifest_file_id": manifest["drive_file_id"],
+		"files": len(entries),
+		"bytes_in_store": sum(entry["size"] for entry in entries.values()),
+		"hashed": hashed,
+		"new_blobs": len(shipped),
+		"reused_blobs": len(sources) - len(missing),
+		"changed_during_backup": len(changed),
+		"uploaded": len(shipped) + 1,
+		"uploaded_bytes": sum(item["bytes"] for item in shipped) + manifest["bytes"],
+	}
+
+
+def blob_name(sha256, passphrase=None):
+	return sha256 + (GPG_SUFFIX if passphrase else "")
+
+
+def _passphrase():
+	"""Frappe's backup passphrase when it encrypts backups on this site, else ``None``."""
+	if not cint(frappe.get_system_settings("encrypt_backup")):
+		return None
+	from frappe.utils.backups import get_or_generate_backup_encryption_key
+
+	return get_or_generate_backup_encryption_key()
+
+
+def _scan(index):
+	"""Walk the file store. Returns ``(entries, sources, hashed)``: the manifest
+	entries by path, one absolute source path per distinct hash, and how many
+	files had to be re-hashed (the rest matched the index on size + mtime)."""
+	entries, sources, hashed = {}, {}, 0
+	for root in FILE_ROOTS:
+		base = os.path.abspath(frappe.get_site_path(*root.split("/")))
+		if not os.path.isdir(base):
+			continue
+		for dirpath, dirnames, filenames in os.walk(base):
+			dirnames.sort()
+			for filename in sorted(filenames):
+				full = os.path.join(dirpath, filename)
+				if os.path.islink(full):
+					continue
+				try:
+					stat = os.stat(full)
+				except FileNotFoundError:
+					continue
+				path = f"{root}/{os.path.relpath(full, base).replace(os.sep, '/')}"
+				cached = index.get(path) or {}
+				if cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns:
+					sha = cached["sha256"]
+				else:
+					try:
+						sha = _sha256(full)
+					except FileNotFoundError:
+						continue
+					hashed += 1
+				entries[path] = {"sha256": sha, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+				sources.setdefault(sha, full)
+	return entries, sources, hashed
+
+
+def _sha256(path):
+	digest = hashlib.sha256()
+	with open(path, "rb") as handle:
+		for block in iter(lambda: handle.read(HASH_BLOCK), b""):
+			digest.update(block)
+	return digest.hexdigest()
+
+
+def _load_index():
+	try:
+		with open(frappe.get_site_path(*INDEX_FILE), encoding="utf-8") as handle:
+			return json.load(handle).get("files") or {}
+	except (OSError, ValueError):
+		return {}
+
+
+def _save_index(entries):
+	"""Written only after the manifest has landed, and atomically: a half-written
+	index would make the next run trust hashes nobody verified."""
+	path = frappe.get_site_path(*INDEX_FILE)
+	fd, temp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+	try:
+		with os.fdopen(fd, "w", encoding="utf-8") as handle:
+			json.dump({"version": MANIFEST_VERSION, "files": entries}, handle)
+		os.replace(temp, path)
+	except Exception:
+		if os.path.exists(temp):
+			os.unlink(temp)
+		raise
+
+
+# ---------------------------------------------------------------- shipping
+
+
+class _Digests:
+	"""Feeds one stream of bytes to several hashlib objects."""
+
+	def __init__(self, *digests):
+		self.digests = digests
+
+	def update(self, data):
+		for digest in self.digests:
+			digest.update(data)
+
+
+def _ship_all(key, passphrase, missing, blob_folder, transfer):
+	"""Upload every ``{sha: source_path}`` blob on a bounded pool.
+
+	Returns ``(shipped, changed, failure)``: verified blob records, ``{sha:
+	reason}`` for sources that no longer hash to ``sha``, and the first
+	exception (or ``None``). Every blob is attempted before a failure is
+	reported, so one bad upload does not waste the rest of the week's work.
+	"""
+	if not missing:
+		return [], {}, None
+
+	local = threading.local()
+
+	def ship(sha, source):
+		if getattr(local, "service", None) is None:
+			local.service = drive.get_drive_service(key)
+		return _ship_blob(local.service, passphrase, sha, source, blob_folder, transfer["chunk_bytes"])
+
+	shipped, changed, failure = [], {}, None
+	with ThreadPoolExecutor(max_workers=transfer["concurrency"], thread_name_prefix="offsite-files") as pool:
+		futures = {sha: pool.submit(ship, sha, source) for sha, source in sorted(missing.items())}
+	for sha, future in futures.items():
+		try:
+			result = future.result()
+		except Exception as exc:
+			failure = failure or exc
+			continue
+		if result.get("changed"):
+			changed[sha] = result["changed"]
+		else:
+			shipped.append(result)
+	return shipped, changed, failure
+
+
+def _ship_blob(service, passphrase, sha, source, blob_folder, chunk_bytes):
+	"""Pool-thread half of one blob: encrypt (or not), upload, verify.
+
+	No ``frappe`` in here — see the module docstring. An object that fails
+	verification is deleted before the error propagates; a source whose bytes no
+	longer hash to ``sha`` is reported as ``{"changed": reason}`` and its object,
+	if one was written, deleted.
+	"""
+	name = blob_name(sha, passphrase)
+	md5 = hashlib.md5(usedforsecurity=False)
+	plain = hashlib.sha256()
+	workdir = tempfile.mkdtemp(prefix="offsite-blob-")
+	try:
+		if passphrase:
+			upload_path = os.path.join(workdir, name)
+			try:
+				_encrypt(source, upload_path, passphrase, plain)
+			except FileNotFoundError:
+				return {"changed": "deleted"}
+			digest = md5
+		else:
+			upload_path = source
+			digest = _Digests(md5, plain)
+
+		if passphrase and plain.hexdigest() != sha:
+			return {"changed": "content no longer matches the scanned hash"}
+
+		try:
+			remote = drive.upload_file(
+				service, upload_path, blob_folder, name, chunk_size=chunk_bytes, digest=digest
+			) or {}
+		except FileNotFoundError:
+			return {"changed": "deleted"}
+		file_id = remote.get("id")
+		if not file_id:
+			raise RuntimeError(f"Drive accepted blob {name} but returned no file id.")
+
+		try:
+			if plain.hexdigest() != sha:
+				drive.delete_file(service, file_id)
+				return {"changed": "content no longer matches the scanned hash"}
+			size = os.path.getsize(upload_path)
+			verified = drive.verify_upload(name, size, remote, md5.hexdigest())
+		except Exception:
+			# Same rule as the artefacts: an unverified object is deleted, not kept —
+			# and for a blob it would be worse than usual, because its name claims a
+			# content hash and the next run would trust it and never re-send it.
+			try:
+				drive.delete_file(service, file_id)
+			except Exception:
+				pass
+			raise
+		return {"name": name, "bytes": size, "drive_file_id": file_id, "verified": verified}
+	finally:
+		shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _upload_manifest(service, manifest_folder, entries, passphrase, transfer):
+	name = (
+		f"{MANIFEST_PREFIX}{now_datetime():%Y%m%d_%H%M%S}.json.gz"
+		+ (GPG_SUFFIX if passphrase else "")
+	)
+	document = {
+		"version": MANIFEST_VERSION,
+		"site": frappe.local.site,
+		"created": now_datetime().isoformat(),
+		"encrypted": bool(passphrase),
+		"files": entries,
+	}
+	workdir = tempfile.mkdtemp(prefix="offsite-manifest-")
+	try:
+		plain_path = os.path.join(workdir, "manifest.json.gz")
+		with gzip.open(plain_path, "wt", encoding="utf-8") as handle:
+			json.dump(document, handle)
+		upload_path = plain_path
+		if passphrase:
+			upload_path = os.path.join(workdir, name)
+			_encrypt(plain_path, upload_path, passphrase)
+
+		md5 = hashlib.md5(usedforsecurity=False)
+		remote = drive.upload_file(
+			service, upload_path, manifest_folder, name, chunk_size=transfer["chunk_bytes"], digest=md5
+		) or {}
+		file_id = remote.get("id")
+		if not file_id:
+			raise RuntimeError(f"Drive accepted manifest {name} but returned no file id.")
+		size = os.path.getsize(upload_path)
+		try:
+			drive.verify_upload(name, size, remote, md5.hexdigest())
+		except Exception:
+			# A manifest that names blobs correctly but is itself corrupt would pass
+			# for a backup until a restore — and would pin every blob it lists.
+			try:
+				drive.delete_file(service, file_id)
+			except Exception:
+				frappe.log_error(
+					f"Could not remove the unverified manifest {file_id} ({name}). Delete it by hand.",
+					"Offsite Backup",
+				)
+			raise
+		return {"name": name, "bytes": size, "drive_file_id": file_id}
+	finally:
+		shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ------------------------------------------------------------------ gpg
+
+
+def _gpg(args, passphrase, **popen):
+	"""Start gpg with the passphrase on a pipe fd — never in ``argv``."""
+	if not shutil.which("gpg"):
+		raise RuntimeError(
+			"gpg is not installed on this host, and backups are encrypted here "
+			"(System Settings: Encrypt Backups). Install gnupg or turn encryption off."
+		)
+	read_fd, write_fd = os.pipe()
+	try:
+		os.write(write_fd, passphrase.encode("utf-8"))
+	finally:
+		os.close(write_fd)
+	try:
+		return subprocess.Popen(
+			[
+				"gpg", "--batch", "--yes", "--quiet", "--pinentry-mode", "loopback",
+				"--passphrase-fd", str(read_fd), *args,
+			],
+			pass_fds=(read_fd,),
+			**popen,
+		)
+	finally:
+		os.close(read_fd)
+
+
+def _encrypt(source, target, passphrase, plain_digest=None):
+	"""``gpg --symmetric`` ``source`` into ``target``, streaming the plaintext in
+	so ``plain_digest`` sees exactly the bytes that were encrypted."""
+	with open(source, "rb") as handle, tempfile.TemporaryFile() as stderr:
+		proc = _gpg(
+			["--symmetric", "--cipher-algo", "AES256", "--output", target],
+			passphrase,
+			stdin=subprocess.PIPE,
+			stderr=stderr,
+		)
+		try:
+			for block in iter(lambda: handle.read(HASH_BLOCK), b""):
+				if plain_digest is not None:
+					plain_digest.update(block)
+				proc.stdin.write(block)
+			proc.stdin.close()
+		except BaseException:
+			proc.kill()
+			proc.wait()
+			raise
+		if proc.wait() != 0:
+			stderr.seek(0)
+			raise RuntimeError(f"gpg could not encrypt a backup blob: {stderr.read().decode(errors='replace').strip()}")
+
+
+def _decrypt(source, target, passphrase):
+	with tempfile.TemporaryFile() as stderr:
+		proc = _gpg(["--output", target, "--decrypt", source], passphrase, stderr=stderr)
+		if proc.wait() != 0:
+			stderr.seek(0)
+			raise RuntimeError(f"gpg could not decrypt {os.path.basename(source)}: {stderr.read().decode(errors='replace').strip()}")
+
+
+# ------------------------------------------------------------ manifests
+
+
+def _manifests(service, manifest_folder, drive_id):
+	return [
+		item
+		for item in drive.list_backup_files(service, manifest_folder, drive_id)
+		if (item.get("name") or "").startswith(MANIFEST_PREFIX)
+	]
+
+
+def _read_manifest(service, item):
+	"""Download and parse one manifest object. The passphrase is looked up only
+	for an encrypted one."""
+	name = item.get("name") or ""
+	workdir = tempfile.mkdtemp(prefix="offsite-manifest-")
+	try:
+		path = drive.download_file(service, item["id"], os.path.join(workdir, "manifest"))
+		if name.endswith(GPG_SUFFIX):
+			passphrase = _backup_passphrase()
+			if not passphrase:
+				raise RuntimeError(
+					f"{name} is encrypted but this site has no backup passphrase to read it with."
+				)
+			plain = os.path.join(workdir, "manifest.json.gz")
+			_decrypt(path, plain, passphrase)
+			path = plain
+		with gzip.open(path, "rt", encoding="utf-8") as handle:
+			document = json.load(handle)
+	finally:
+		shutil.rmtree(workdir, ignore_errors=True)
+	if not isinstance(document.get("files"), dict):
+		raise RuntimeError(f"{name} is not a file-store manifest.")
+	return document
+
+
+def _backup_passphrase():
+	"""The site's backup passphrase whether or not encryption is currently on —
+	manifests written while it was on must stay readable after it is turned off.
+
+	Read straight from site_config, never generated: a site that never encrypted
+	has nothing to decrypt, and reading must not write a key into its config.
+	"""
+	return frappe.conf.get("backup_encryption_key") or None
+
+
+# -------------------------------------------------------------- retention
+
+
+def collect_garbage(service, folder_id, drive_id, settings):
+	"""Retention for the file tier: age manifests out, then delete unreferenced blobs.
+
+	Best-effort like ``backup._prune``: the backup already succeeded, so a listing,
+	read or delete failure is recorded and reported, never turned into a failed
+	run. Returns ``(deleted_count, info)``.
+	"""
+	from erpnext_enhancements.offsite_backup.backup import _parse_drive_time, _redact
+
+	retention_days = cint(settings.retention_days)
+	min_keep = max(1, cint(settings.min_keep))
+	info = {"retention_days": retention_days, "min_keep": min_keep}
+
+	if retention_days <= 0:
+		info["action"] = "Retention is off (retention_days = 0). Nothing collected."
+		return 0, info
+
+	try:
+		manifest_folder = drive.find_folder(service, folder_id, MANIFEST_FOLDER, drive_id)
+		blob_folder = drive.find_folder(service, folder_id, BLOB_FOLDER, drive_id)
+		if not manifest_folder or not blob_folder:
+			info["action"] = "No incremental file store in this folder yet."
+			return 0, info
+		manifests = _manifests(service, manifest_folder, drive_id)
+	except Exception:
+		info["action"] = "Could not list the file store. Nothing collected."
+		info["error"] = _redact(frappe.get_traceback())
+		frappe.log_error(info["error"], "Offsite Backup: file-store listing failed")
+		return 0, info
+
+	info["manifests_listed"] = len(manifests)
+	if len(manifests) < min_keep:
+		# The same floor as the top-level prune, and it guards the blobs too: a
+		# short manifest listing would make the blobs of every unlisted manifest
+		# look unreferenced.
+		info["action"] = (
+			f"Only {len(manifests)} manifest(s) listed, fewer than the min_keep floor of "
+			f"{min_keep}. Nothing collected."
+		)
+		return 0, info
+
+	dated, undatable = [], []
+	for item in manifests:
+		created = _parse_drive_time(item.get("createdTime"))
+		(undatable.append(item) if created is None else dated.append((created, item)))
+	dated.sort(key=lambda pair: pair[0], reverse=True)
+	cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+	expired = [item for created, item in dated[min_keep:] if created < cutoff]
+	expired_ids = {item.get("id") for item in expired}
+	kept = [item for item in manifests if item.get("id") not in expired_ids]
+
+	referenced = set()
+	unreadable = []
+	for item in kept:
+		try:
+			document = _read_manifest(service, item)
+		except Exception:
+			unreadable.append(item.get("name"))
+			frappe.log_error(
+				f"Could not read manifest {item.get('name')} ({item.get('id')}).\n\n"
+				f"{_redact(frappe.get_traceback())}",
+				"Offsite Backup: manifest unreadable",
+			)
+			continue
+		encrypted = document.get("encrypted")
+		for entry in document["files"].values():
+			referenced.add(blob_name(entry["sha256"], encrypted))
+
+	deleted, errors = [], []
+
+	def delete(item, kind):
+		try:
+			drive.delete_file(service, item.get("id"))
+			deleted.append({"kind": kind, "name": item.get("name"), "id": item.get("id")})
+		except Exception:
+			errors.append({"kind": kind, "name": item.get("name"), "id": item.get("id")})
+			frappe.log_error(
+				f"Could not delete {kind} {item.get('id')} ({item.get('name')}).\n\n"
+				f"{_redact(frappe.get_traceback())}",
+				"Offsite Backup: prune failed",
+			)
+
+	for item in expired:
+		delete(item, "manifest")
+
+	if unreadable:
+		info["action"] = (
+			f"Expired {len(expired)} manifest(s). Blob collection skipped: "
+			f"{len(unreadable)} surviving manifest(s) could not be read, so which blobs "
+			"they need is unknown."
+		)
+		info["unreadable_manifests"] = unreadable
+	else:
+		try:
+			blobs = drive.list_backup_files(service, blob_folder, drive_id)
+		except Exception:
+			blobs = None
+			info["error"] = _redact(frappe.get_traceback())
+		if blobs is None:
+			info["action"] = f"Expired {len(expired)} manifest(s). Could not list blobs; none collected."
+		else:
+			for item in blobs:
+				if item.get("name") not in referenced:
+					delete(item, "blob")
+			info["blobs_listed"] = len(blobs)
+			info["action"] = (
+				f"Expired {len(expired)} manifest(s) older than {retention_days} days and deleted "
+				f"{sum(1 for d in deleted if d['kind'] == 'blob')} unreferenced blob(s)."
+			)
+
+	info["unparseable_created_time"] = len(undatable)
+	info["deleted"] = deleted
+	info["delete_errors"] = errors
+	return len(deleted), info
+
+
+# ---------------------------------------------------------------- restore
+
+
+def restore_files(manifest=None, target_dir=None):
+	"""Rebuild the file store from a manifest and its blobs into ``target_dir``.
+
+	Foreground only (``bench execute``, see the module README). ``manifest`` is a
+	manifest object name; the newest is used when omitted. Never writes into the
+	live site: the default ``target_dir`` is a fresh ``offsite-restore-<stamp>``
+	folder beside the site's backups, holding ``public/files`` and
+	``private/files`` to be moved into place by hand. Every restored file is
+	checked against its SHA-256. Returns a summary; missing or mismatched files
+	are listed rather than raised, so one lost blob does not cost the rest.
+	"""
+	from erpnext_enhancements.offsite_backup.backup import _service_account_key, _settings
+
+	settings = _settings()
+	if not settings or not (settings.drive_folder_id or "").strip():
+		raise RuntimeError("Offsite Backup Settings has no Drive Folder ID to restore from.")
+	folder_id = settings.drive_folder_id.strip()
+	service = drive.get_drive_service(_service_account_key(settings))
+	drive_id = (drive.check_folder(service, folder_id) or {}).get("driveId")
+
+	manifest_folder = drive.find_folder(service, folder_id, MANIFEST_FOLDER, drive_id)
+	blob_folder = drive.find_folder(service, folder_id, BLOB_FOLDER, drive_id)
+	if not manifest_folder or not blob_folder:
+		raise RuntimeError("This backup folder holds no incremental file store.")
+
+	manifests = _manifests(service, manifest_folder, drive_id)
+	if manifest:
+		chosen = [item for item in manifests if item.get("name") == manifest]
+	else:
+		chosen = sorted(manifests, key=lambda item: item.get("createdTime") or "", reverse=True)[:1]
+	if not chosen:
+		raise RuntimeError(f"Manifest {manifest or '(newest)'} not found.")
+
+	document = _read_manifest(service, chosen[0])
+	encrypted = document.get("encrypted")
+	passphrase = _backup_passphrase() if encrypted else None
+
+	if not target_dir:
+		from frappe.utils.backups import get_backup_path
+
+		target_dir = os.path.join(get_backup_path(), f"offsite-restore-{now_datetime():%Y%m%d_%H%M%S}")
+	target = os.path.abspath(target_dir)
+	blob_ids = {
+		item.get("name"): item.get("id") for item in drive.list_backup_files(service, blob_folder, drive_id)
+	}
+
+	restored, missing, mismatched = 0, [], []
+	workdir = tempfile.mkdtemp(prefix="offsite-restore-")
+	try:
+		for path, entry in sorted(document["files"].items()):
+			destination = _safe_join(target, path)
+			blob = blob_name(entry["sha256"], encrypted)
+			if not blob_ids.get(blob):
+				missing.append(path)
+				continue
+			os.makedirs(os.path.dirname(destination), exist_ok=True)
+			if encrypted:
+				downloaded = drive.download_file(service, blob_ids[blob], os.path.join(workdir, blob))
+				_decrypt(downloaded, destination, passphrase)
+				os.unlink(downloaded)
+			else:
+				drive.download_file(service, blob_ids[blob], destination)
+			if _sha256(destination) != entry["sha256"]:
+				mismatched.append(path)
+				continue
+			restored += 1
+	finally:
+		shutil.rmtree(workdir, ignore_errors=True)
+
+	return {
+		"manifest": chosen[0].get("name"),
+		"target_dir": target,
+		"files": len(document["files"]),
+		"restored": restored,
+		"missing_blobs": missing,
+		"hash_mismatches": mismatched,
+	}
+
+
+def _safe_join(target, path):
+	"""``target/path``, refusing any manifest path that would land outside it."""
+	if os.path.isabs(path) or not any(path.startswith(root + "/") for root in FILE_ROOTS):
+		raise RuntimeError(f"Refusing manifest path outside the file store: {path!r}")
+	destination = os.path.abspath(os.path.join(target, path))
+	if not destination.startswith(target + os.sep):
+		raise RuntimeError(f"Refusing manifest path outside the file store: {path!r}")
+	return destination
@@ -0,0 +1,23 @@
+"""Add the approximate semantic index's code columns to the chat chunk table.
+
+The columns live in :mod:`chat.indexing.ann_codes`, because the writer package is the one place
+outside the retrieval gate allowed to name the index tables
+(``tests/test_chat_gate_source_scan.py``). This module only runs it.
+
+Adds columns and nothing else. The codes are written by ``sweep_ann_codes`` once
+``Chat Settings.semantic_index`` is switched to ``Approximate``, and until a row has one the
+gate encodes it in-worker, so there is no backfill to do here.
+
+Refuses — raises, so the migrate stops — if the columns cannot be added; the
+``after_migrate``/``after_install`` backstop re-adds them after a ``bench trim-tables`` or on a
+fresh site. Safe to run twice.
+"""
+
+import frappe
+
+
+def execute():
+	from erpnext_enhancements.chat.indexing import ann_codes
+
+	if not ann_codes.ensure_ann_columns():
+		raise frappe.ValidationError("add_chat_chunk_ann_columns could not add the ANN code columns")
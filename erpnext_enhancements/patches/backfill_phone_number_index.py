@@ -0,0 +1,16 @@
+"""Fill Phone Number Index for every existing Contact, Customer, Lead and Employee (v1.369.0).
+
+Caller ID now answers from that table with one indexed equality, and the
+doc_events only keep it current from here on. Until this has run every lookup
+misses the index and falls back to the old REGEXP scan, which is correct but
+slow.
+
+Same callable as the nightly reconciliation. Commits per batch, so a killed
+migrate resumes on the next one. Safe twice.
+"""
+
+from erpnext_enhancements.crm_enhancements.phone_index import rebuild
+
+
+def execute():
+	rebuild()
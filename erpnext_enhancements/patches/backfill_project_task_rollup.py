@@ -0,0 +1,18 @@
+"""Fill Project Task Rollup for every existing project (v1.364.0).
+
+The dashboard now reads task counts, assignees and the "completed on" date from
+that table instead of aggregating Task and scanning Version per page load, and
+the doc_events only keep rows current from here on. This is the one-off
+backfill, and the only run of the Version ``LIKE`` scan that should ever touch
+more than a handful of projects: it dates each inactive project from its last
+``is_active`` Yes -> No flip, falling back to ``modified``.
+
+Same callable as the nightly reconciliation and the by-hand rebuild. Commits per
+batch, so a killed migrate resumes on the next one. Safe twice.
+"""
+
+from erpnext_enhancements.project_enhancements.task_rollup import rebuild
+
+
+def execute():
+	rebuild()
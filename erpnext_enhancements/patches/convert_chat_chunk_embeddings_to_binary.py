@@ -0,0 +1,37 @@
+"""Move chat chunk vectors from base64 ``Long Text`` to the raw ``embedding_f32`` column.
+
+The column and the conversion both live in :mod:`chat.indexing.embedding_column`, because the
+writer package is the one place outside the retrieval gate allowed to name the index tables
+(``tests/test_chat_gate_source_scan.py``). This module only sequences them.
+
+--------------------------------------------------------------------------------------
+Why a patch and a backstop
+--------------------------------------------------------------------------------------
+
+The column is added by raw DDL, so it exists only if something runs that DDL. The patch does
+it first and then converts; ``ensure_embedding_column`` on ``after_migrate`` and
+``after_install`` re-adds it on a fresh site (where ``install-app`` marks this patch done
+without running it) and after a ``bench trim-tables`` (which drops it).
+
+Refuses — raises, so the migrate stops — if the column cannot be added. Converting nothing and
+recording the patch as done would leave every vector in the slow form with no further attempt.
+
+Bounded per batch and committed per batch, and a converted row no longer matches, so a migrate
+killed halfway is finished by the next one, or by
+``bench execute erpnext_enhancements.chat.indexing.embedding_column.backfill_embedding_column``.
+Rows still in base64 are read correctly meanwhile: the gate decodes either form.
+
+Safe to run twice.
+"""
+
+import frappe
+
+
+def execute():
+	from erpnext_enhancements.chat.indexing import embedding_column
+
+	if not embedding_column.ensure_embedding_column():
+		raise frappe.ValidationError(
+			"convert_chat_chunk_embeddings_to_binary could not add " + embedding_column.BLOB_COLUMN
+		)
+	embedding_column.backfill_embedding_column()
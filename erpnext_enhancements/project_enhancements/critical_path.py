@@ -0,0 +1,280 @@
+"""Critical path and float for a project's tasks, computed on the server.
+
+The Gantt payloads (``api/gantt.get_gantt_data``, ``project_dashboard.
+get_project_task_tree``) carry tasks and finish-to-start links, but nothing said
+which tasks drive the end date. The client would have had to walk the graph itself
+and reimplement the working-day calendar. This module runs the classic two-pass
+CPM over ``Task`` / ``Task Depends On`` (via :class:`task_graph.TaskGraph`) and
+hands back, per task:
+
+* ``earliest_start`` / ``earliest_finish``: the forward pass. A task starts no
+  earlier than its own planned ``exp_start_date`` (the plan is a constraint, not a
+  suggestion) and no earlier than the working day after its last predecessor
+  finishes.
+* ``latest_start`` / ``latest_finish``: the backward pass from the project finish.
+* ``total_float``: working days the task can slip without moving the finish.
+  ``free_float`` is the same without delaying any successor. ``critical`` means
+  zero total float.
+
+All arithmetic is in working days on the project's calendar
+(:class:`utils.working_days.WorkingCalendar`). That is the Project's
+``holiday_list``, else its Company's ``default_holiday_list``, else weekends only.
+Durations are the working days in ``[exp_start_date, exp_end_date]``. A task with
+one date lasts that day. A task with neither date takes its start from its
+predecessors, and is left out entirely when it has no dated ancestor either.
+Tasks on a dependency cycle have no valid order and are listed under ``cyclic``.
+
+**Cached per project** in Redis for :data:`CACHE_TTL_SECONDS`. It is invalidated by
+the Task hook when a task's dates, project or dependencies change, by
+``update_task_dates_from_gantt`` after its bulk write (which fires no hooks), by a
+Project calendar change, and, for every project, by a Holiday List save. One pass
+is O(tasks + links). A Master Project portfolio of a few thousand tasks is
+a few dozen cache reads once warm.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import getdate
+
+from erpnext_enhancements.project_enhancements.task_graph import TaskGraph
+from erpnext_enhancements.utils.working_days import WorkingCalendar
+
+CACHE_PREFIX = "project_cpm:v1:"
+CACHE_TTL_SECONDS = 24 * 3600
+
+# Task fields whose change can move the schedule.
+SCHEDULE_FIELDS = ("exp_start_date", "exp_end_date", "project")
+# Project fields that pick its calendar.
+CALENDAR_FIELDS = ("holiday_list", "company")
+
+
+# ------------------------------------------------------------------ reading
+
+
+def get_schedule(project):
+	"""The CPM result for ``project``, from cache when possible.
+
+	``{"project", "holiday_list", "finish", "critical_path", "cyclic", "tasks"}``.
+	``tasks`` maps each scheduled task to its dates and floats, and
+	``critical_path`` lists the critical tasks in dependency order.
+	"""
+	return get_schedules([project]).get(project)
+
+
+def get_schedules(projects):
+	"""``{project: schedule}`` for several projects. Misses share their calendar lookups."""
+	projects = [p for p in dict.fromkeys(projects) if p]
+	out = {}
+	missing = []
+	for project in projects:
+		cached = _cache_get(project)
+		if isinstance(cached, dict) and "tasks" in cached:
+			out[project] = cached
+		else:
+			missing.append(project)
+
+	if missing:
+		holiday_lists = _holiday_lists(missing)
+		calendars = {}
+		for project in missing:
+			holiday_list = holiday_lists.get(project)
+			if holiday_list not in calendars:
+				calendars[holiday_list] = WorkingCalendar.for_holiday_list(holiday_list)
+			result = compute(TaskGraph.for_project(project), calendars[holiday_list])
+			result.update(project=project, holiday_list=holiday_list)
+			_cache_set(project, result)
+			out[project] = result
+	return out
+
+
+def float_by_task(projects):
+	"""``{task: entry}`` across ``projects``: the per-task part of each schedule."""
+	merged = {}
+	for schedule in get_schedules(projects).values():
+		merged.update(schedule["tasks"])
+	return merged
+
+
+@frappe.whitelist()
+def get_critical_path(project=None, master_project=None):
+	"""Schedules for one project, or for every project in a Master Project.
+
+	Returns ``{"projects": {project: schedule}}``. Read permission is checked on
+	the Project, or on the Master Project, whose members come through the
+	permission-checked ``get_list``.
+	"""
+	if master_project:
+		if not frappe.has_permission("Master Project", "read", doc=master_project):
+			frappe.throw(_("Not permitted to read {0}").format(master_project), frappe.PermissionError)
+		projects = frappe.get_list(
+			"Project", filters={"custom_master_project": master_project}, pluck="name", limit_page_length=0
+		)
+	elif project:
+		if not frappe.has_permission("Project", "read", doc=project):
+			frappe.throw(_("Not permitted to read {0}").format(project), frappe.PermissionError)
+		projects = [project]
+	else:
+		frappe.throw(_("Project or Master Project is required"))
+	return {"projects": get_schedules(projects)}
+
+
+# ---------------------------------------------------------------- computing
+
+
+def compute(graph, calendar):
+	"""Run both CPM passes over ``graph`` on ``calendar``. Pure: no I/O.
+
+	Works in working-day indices (see ``WorkingCalendar.index``). ``ef`` and
+	``lf`` are exclusive, so a task's successor may start at its ``ef``.
+	"""
+	ordered, cyclic = graph.topological_order()
+
+	planned = {}
+	duration = {}
+	for name in ordered:
+		row = graph.tasks[name]
+		start = row.get("exp_start_date") or row.get("exp_end_date")
+		end = row.get("exp_end_date") or start
+		if not start:
+			duration[name] = 0
+			continue
+		start, end = getdate(start), getdate(end)
+		if end < start:
+			end = start
+		planned[name] = calendar.index(start)
+		duration[name] = calendar.index(end) + (1 if calendar.is_working_day(end) else 0) - planned[name]
+
+	es, ef = {}, {}
+	for name in ordered:
+		candidates = [ef[p] for p in graph.predecessors.get(name, ()) if p in ef]
+		if name in planned:
+			candidates.append(planned[name])
+		if not candidates:
+			continue  # undated, and nothing upstream dates it
+		es[name] = max(candidates)
+		ef[name] = es[name] + duration[name]
+
+	if not ef:
+		return {"finish": None, "critical_path": [], "cyclic": cyclic, "tasks": {}}
+	finish = max(ef.values())
+
+	ls, lf = {}, {}
+	for name in reversed(ordered):
+		if name not in es:
+			continue
+		successors = [s for s in graph.successors.get(name, ()) if s in es]
+		lf[name] = min((ls[s] for s in successors), default=finish)
+		ls[name] = lf[name] - duration[name]
+
+	tasks = {}
+	for name in es:
+		successors = [s for s in graph.successors.get(name, ()) if s in es]
+		free = min((es[s] for s in successors), default=finish) - ef[name]
+		total = ls[name] - es[name]
+		tasks[name] = {
+			"earliest_start": calendar.day_at(es[name]),
+			"earliest_finish": _finish_day(calendar, es[name], ef[name]),
+			"latest_start": calendar.day_at(ls[name]),
+			"latest_finish": _finish_day(calendar, ls[name], lf[name]),
+			"duration": duration[name],
+			"total_float": total,
+			"free_float": free,
+			"critical": total <= 0,
+		}
+
+	return {
+		"finish": _finish_day(calendar, min(es.values()), finish),
+		"critical_path": [name for name in ordered if name in tasks and tasks[name]["critical"]],
+		"cyclic": cyclic,
+		"tasks": tasks,
+	}
+
+
+def _finish_day(calendar, start, end):
+	"""Inclusive finish date for the exclusive index ``end``; a zero-length task finishes where it starts."""
+	return calendar.day_at(end - 1) if end > start else calendar.day_at(start)
+
+
+def _holiday_lists(projects):
+	"""Each project's calendar: its own Holiday List, else its Company's default."""
+	rows = frappe.get_all(
+		"Project", filters={"name": ["in", projects]}, fields=["name", *CALENDAR_FIELDS]
+	)
+	out = {}
+	for row in rows:
+		holiday_list = row.get("holiday_list")
+		if not holiday_list and row.get("company"):
+			holiday_list = frappe.get_cached_value("Company", row["company"], "default_holiday_list")
+		out[row["name"]] = holiday_list or None
+	return out
+
+
+# ------------------------------------------------------------- invalidation
+
+
+def invalidate(projects):
+	for project in dict.fromkeys(projects):
+		if project:
+			try:
+				frappe.cache().delete_value(_key(project))
+			except Exception:
+				# Nothing cached to go stale if Redis is down; the TTL covers the rest.
+				pass
+
+
+def on_task_change(doc, method=None):
+	"""Task ``on_update`` / ``after_delete``: drop the cached schedule if it moved.
+
+	A save that touched neither the dates, the project nor the dependency rows
+	leaves the schedule alone (status and description edits are most saves).
+	"""
+	before = doc.get_doc_before_save() if method == "on_update" else None
+	if before is not None and not _schedule_changed(before, doc):
+		return
+	invalidate([doc.get("project"), before.get("project") if before is not None else None])
+
+
+def on_project_update(doc, method=None):
+	"""Project ``on_update``: a new calendar re-dates every task."""
+	if any(doc.has_value_changed(field) for field in CALENDAR_FIELDS):
+		invalidate([doc.name])
+
+
+def on_holiday_list_change(doc, method=None):
+	"""Holiday List ``on_update`` / ``on_trash``: any project may use it."""
+	try:
+		frappe.cache().delete_keys(CACHE_PREFIX)
+	except Exception:
+		pass
+
+
+def _schedule_changed(before, doc):
+	if any(before.get(field) != doc.get(field) for field in SCHEDULE_FIELDS):
+		return True
+	return _dependencies(before) != _dependencies(doc)
+
+
+def _dependencies(doc):
+	return sorted(row.get("task") or "" for row in (doc.get("depends_on") or []))
+
+
+# ------------------------------------------------------------------- cache
+
+
+def _key(project):
+	return f"{CACHE_PREFIX}{project}"
+
+
+def _cache_get(project):
+	try:
+		return frappe.cache().get_value(_key(project))
+	except Exception:
+		return None
+
+
+def _cache_set(project, value):
+	try:
+		frappe.cache().set_value(_key(project), value, expires_in_sec=CACHE_TTL_SECONDS)
+	except Exception:
+		# Uncached is slower, not wrong.
+		pass
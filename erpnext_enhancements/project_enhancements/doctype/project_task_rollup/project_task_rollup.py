@@ -0,0 +1,18 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""Project Task Rollup — one denormalised row per project, for the dashboard.
+
+Everything here is derivable from Task, ToDo and Project's Version history, and
+deriving it per page load was a grouped scan of Task plus a ``LIKE`` scan of
+Version — one of the largest tables on the site. So the row is maintained by
+``project_enhancements/task_rollup.py`` and read by primary key. Nothing in it is
+evidence of anything; it can be thrown away and rebuilt at any time
+(``task_rollup.rebuild``). No controller logic: the module writes the row.
+"""
+
+from frappe.model.document import Document
+
+
+class ProjectTaskRollup(Document):
+	pass
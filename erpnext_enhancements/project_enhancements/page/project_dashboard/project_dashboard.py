@@ -18,6 +18,14 @@ import frappe
 from frappe import _
 from frappe.utils import cint, flt, getdate, nowdate
 
+from erpnext_enhancements.project_enhancements import critical_path, realtime, task_tree
+from erpnext_enhancements.project_enhancements.task_graph import TaskGraph, write_task_dates
+from erpnext_enhancements.project_enhancements.task_rollup import (
+	get_rollups,
+	is_active_set_quietly,
+	refresh_quietly,
+)
+from erpnext_enhancements.script_migrations.task import sync_project_dates_from_tasks
 from erpnext_enhancements.utils.spreadsheet import build_payload
 
 # Fields the dashboard is allowed to inline-edit on a Project via
@@ -87,7 +95,7 @@ def _get_assignee_names(doctype, docname):
 
 @frappe.whitelist()
 def get_project_data(is_active=None):
-	"""Fetches and enriches project data for the dashboard using bulk queries.
+	"""Fetches and enriches project data for the dashboard from the task rollup.
 
 	Access is gated by the Project Dashboard page role via check_permission().
 	Once a user is authorised for the page, projects are fetched with
@@ -105,106 +113,89 @@ def get_project_data(is_active=None):
 		filters = {"status": ["!=", "Canceled"]}
 		if is_active:
 			filters["is_active"] = is_active
+		return _project_rows(filters)
 
-		projects = frappe.get_all(
-			"Project",
-			fields=[
-				# Note: "project_user" is intentionally NOT selected here. Project has
-				# no scalar `project_user` column (members live in the Project User
-				# child table), so selecting it raises "Unknown column 'project_user'".
-				# The value is derived from assignees and set on each project below.
-				"name", "project_name", "status", "project_type",
-				"custom_project_priority", "custom_company_priority", "is_active",
-				"percent_complete", "expected_start_date", "expected_end_date",
-				"custom_project_dollar_amount", "estimated_costing", "custom_master_project",
-				"modified",
-			],
-			filters=filters,
-			order_by="creation desc",
-		)
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Error fetching project data")
+		return {"error": "Could not fetch project data. Please check the logs."}
 
-		project_names = [p["name"] for p in projects]
-		if not project_names:
-			return projects
-
-		# 1. Bulk fetch task counts using raw SQL for reliable grouped aggregation
-		task_data = frappe.db.sql("""
-			SELECT project, status, COUNT(*) as count
-			FROM `tabTask`
-			WHERE project IN %s
-			GROUP BY project, status
-		""", (project_names,), as_dict=1)
-
-		task_map = {}
-		for td in task_data:
-			proj = td["project"]
-			if proj not in task_map:
-				task_map[proj] = {"total": 0, "completed": 0}
-			task_map[proj]["total"] += td["count"]
-			if td["status"] == "Completed":
-				task_map[proj]["completed"] += td["count"]
-
-		# 2. Bulk fetch assignees via ToDo
-		todos = frappe.get_all(
-			"ToDo",
-			filters={"reference_type": "Project", "reference_name": ["in", project_names], "status": "Open"},
-			fields=["reference_name", "allocated_to"]
-		)
 
-		user_emails = list({t["allocated_to"] for t in todos if t.get("allocated_to")})
-		users = frappe.get_all("User", filters={"email": ["in", user_emails]}, fields=["email", "full_name"])
-		user_map = {u["email"]: u["full_name"] for u in users}
+@frappe.whitelist()
+def get_project_rows(projects):
+	"""The dashboard rows for just ``projects``: the patch for a realtime event.
+
+	``project_dashboard_updated`` events name the project that changed (see
+	``realtime.py``). The dashboard fetches only those rows here instead of
+	reloading the portfolio through ``get_project_data``. Same page-role gate and
+	row shape. ``removed`` lists the requested projects that no longer qualify
+	(deleted or cancelled), for the client to drop.
+	"""
+	if not check_permission():
+		return {"error": "You do not have permission to view the Project Dashboard."}
+	if isinstance(projects, str):
+		projects = json.loads(projects)
+	projects = [p for p in dict.fromkeys(projects or []) if p]
+	if not projects:
+		return {"rows": [], "removed": []}
+	try:
+		rows = _project_rows({"status": ["!=", "Canceled"], "name": ["in", projects]})
+		found = {row["name"] for row in rows}
+		return {"rows": rows, "removed": [p for p in projects if p not in found]}
 
-		assignee_map = {}
-		for todo in todos:
-			proj = todo["reference_name"]
-			if proj not in assignee_map:
-				assignee_map[proj] = []
-			email = todo.get("allocated_to")
-			if email and email in user_map:
-				assignee_map[proj].append({"email": email, "full_name": user_map[email]})
-
-		# 3. Completion dates for inactive projects. Project.actual_end_date is not
-		# maintained in practice (empty on every inactive project), so the moment
-		# is_active last flipped Yes -> No in the Version history serves as the
-		# "completed on" date, falling back to the last-modified date for inactive
-		# projects with no recorded flip (e.g. created inactive).
-		inactive_names = [p["name"] for p in projects if p.get("is_active") == "No"]
-		completed_on_map = {}
-		if inactive_names:
-			version_rows = frappe.db.sql("""
-				SELECT docname, DATE(MAX(creation)) AS completed_on
-				FROM `tabVersion`
-				WHERE ref_doctype = 'Project'
-					AND docname IN %s
-					AND data LIKE %s
-				GROUP BY docname
-			""", (inactive_names, '%["is_active","Yes","No"]%'), as_dict=1)
-			completed_on_map = {v["docname"]: v["completed_on"] for v in version_rows}
-
-		# 4. Map data back to projects
-		for project in projects:
-			p_name = project["name"]
-			project["total_tasks"] = task_map.get(p_name, {}).get("total", 0)
-			project["completed_tasks"] = task_map.get(p_name, {}).get("completed", 0)
-
-			if project.get("is_active") == "No":
-				project["completed_on"] = completed_on_map.get(p_name) or getdate(project.get("modified"))
-			else:
-				project["completed_on"] = None
-
-			assignees = assignee_map.get(p_name, [])
-			project["assignees"] = assignees
-			if assignees:
-				project["project_user"] = ", ".join([d["full_name"] for d in assignees])
-			else:
-				project["project_user"] = "Unassigned"
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Error fetching project rows")
+		return {"error": "Could not fetch project data. Please check the logs."}
 
+
+def _project_rows(filters):
+	"""Projects matching ``filters``, enriched from the task rollup. Shared by both readers."""
+	projects = frappe.get_all(
+		"Project",
+		fields=[
+			# Note: "project_user" is intentionally NOT selected here. Project has
+			# no scalar `project_user` column (members live in the Project User
+			# child table), so selecting it raises "Unknown column 'project_user'".
+			# The value is derived from assignees and set on each project below.
+			"name", "project_name", "status", "project_type",
+			"custom_project_priority", "custom_company_priority", "is_active",
+			"percent_complete", "expected_start_date", "expected_end_date",
+			"custom_project_dollar_amount", "estimated_costing", "custom_master_project",
+			"modified",
+		],
+		filters=filters,
+		order_by="creation desc",
+	)
+
+	project_names = [p["name"] for p in projects]
+	if not project_names:
 		return projects
 
-	except Exception:
-		frappe.log_error(frappe.get_traceback(), "Error fetching project data")
-		return {"error": "Could not fetch project data. Please check the logs."}
+	# Task counts, assignees and the "completed on" date come precomputed from
+	# Project Task Rollup, one primary-key read (see task_rollup.py). Deriving them
+	# here meant a grouped scan of Task and a LIKE scan of Version on every load.
+	rollups = get_rollups(project_names)
+
+	for project in projects:
+		rollup = rollups.get(project["name"]) or {}
+		project["total_tasks"] = rollup.get("total_tasks", 0)
+		project["completed_tasks"] = rollup.get("completed_tasks", 0)
+
+		# Project.actual_end_date is not maintained in practice, so the rollup
+		# records when is_active last flipped Yes -> No. A project with no
+		# recorded flip (or no rollup row yet) falls back to its modified date.
+		if project.get("is_active") == "No":
+			project["completed_on"] = rollup.get("completed_on") or getdate(project.get("modified"))
+		else:
+			project["completed_on"] = None
+
+		assignees = rollup.get("assignees") or []
+		project["assignees"] = assignees
+		if assignees:
+			project["project_user"] = ", ".join([d["full_name"] for d in assignees])
+		else:
+			project["project_user"] = "Unassigned"
+
+	return projects
 
 
 @frappe.whitelist()
@@ -343,6 +334,8 @@ def update_task_status(task_name, status):
 		return {"status": "error", "message": "You do not have permission to modify this task."}
 	try:
 		frappe.db.set_value("Task", task_name, "status", status)
+		# db.set_value fires no doc_events, so the rollup is told directly.
+		refresh_quietly([project])
 		return {"status": "success"}
 	except Exception:
 		frappe.log_error(frappe.get_traceback(), f"Error updating task status for {task_name}")
@@ -817,15 +810,21 @@ def get_project_task_tree(project):
 	Same data as :func:`export_project_tasks` but as JSON, so the browser can
 	lay it out as a printable document. Kept separate from ``get_project_tasks``
 	because that one is deliberately lazy and per-level.
+
+	Each row also carries ``total_float`` / ``free_float`` (working days) and
+	``critical`` from the project's cached schedule (``critical_path.py``);
+	the floats are ``None`` for a task the schedule could not place.
 	"""
 	if not project:
 		frappe.throw(_("Project is required"))
 	if not frappe.has_permission("Project", "read", doc=project):
 		frappe.throw(_("Not permitted to read {0}").format(project), frappe.PermissionError)
 
+	schedule = critical_path.float_by_task([project])
 	out = []
 	for level, task in _flatten_task_tree(project):
 		assignees = _get_assignee_names("Task", task["name"])
+		cpm = schedule.get(task["name"]) or {}
 		out.append(
 			{
 				"level": level,
@@ -839,6 +838,9 @@ def get_project_task_tree(project):
 				"progress": flt(task.get("progress") or 0),
 				"expected_time": flt(task.get("expected_time") or 0),
 				"is_milestone": cint(task.get("is_milestone")),
+				"total_float": cpm.get("total_float"),
+				"free_float": cpm.get("free_float"),
+				"critical": bool(cpm.get("critical")),
 			}
 		)
 	return out
@@ -968,6 +970,7 @@ def update_task_date(task_name, field, value):
 				return {"status": "error", "message": "End date cannot be before start date."}
 
 		frappe.db.set_value("Task", task_name, field, new_date)
+		critical_path.invalidate([project])
 		return {"status": "success"}
 
 	except Exception:
@@ -1094,8 +1097,10 @@ def update_task_structure(project_name, tasks):
 	"""Updates the parent and ordering for a list of tasks.
 
 	This function is called after a drag-and-drop operation on the frontend
-	task tree. It validates permissions and ensures data integrity before
-	committing changes.
+	task tree. It validates permissions, then hands the whole tree to
+	``task_tree.reorder``. That validates it as a unit (project membership,
+	parent cycles, dependency cycles) and writes only the changed rows in bulk,
+	renumbering the nested set once. One realtime event follows.
 
 	Args:
 	    project_name (str): The name (ID) of the project being modified.
@@ -1123,48 +1128,20 @@ def update_task_structure(project_name, tasks):
 		}
 
 	try:
-		task_names = [t.get("name") for t in tasks if t.get("name")]
-
-		# Data integrity check: Verify that all tasks belong to the specified project.
-		if task_names:
-			db_task_projects = frappe.get_all(
-				"Task", filters={"name": ("in", task_names)}, fields=["name", "project"]
-			)
-			if len(db_task_projects) != len(task_names):
-				return {"status": "error", "message": "One or more tasks could not be found."}
-
-			for task in db_task_projects:
-				if task.project != project_name:
-					return {
-						"status": "error",
-						"message": f"Task {task.name} does not belong to project {project_name}.",
-					}
-
-		# Atomically update all tasks. Using doc.save() is more robust as it
-		# triggers validation and other controller hooks. This is safer than a
-		# direct `frappe.db.set_value` call, especially for complex updates
-		# involving parent-child relationships.
-		for task_data in tasks:
-			task_name = task_data.get("name")
-			if not task_name:
-				continue
-
-			# Ensure parent_task is None if it's an empty string or not provided.
-			parent_task = task_data.get("parent_task") or None
-			order = task_data.get("custom_subtask_order")
-
-			task_doc = frappe.get_doc("Task", task_name)
-			task_doc.parent_task = parent_task
-			task_doc.custom_subtask_order = order
-			# ignore_permissions is used because we already validated the user has
-			# write access to the parent project.
-			task_doc.save(ignore_permissions=True)
-
-		return {"status": "success"}
-
+		# One load, whole-tree validation and set-based writes (task_tree.py); the
+		# Task hook chain no longer runs once per submitted row.
+		changed = task_tree.reorder(project_name, tasks)
+		if changed:
+			critical_path.invalidate([project_name])
+			realtime.queue(project_name, tasks=changed)
+		return {"status": "success", "updated": len(changed)}
+
+	except frappe.ValidationError as e:
+		return {"status": "error", "message": str(e)}
 	except Exception as e:
-		# The whitelisted method runs in a transaction, which will be rolled
-		# back automatically by the Frappe framework on an exception.
+		# Returning (rather than raising) would let Frappe commit whatever part of
+		# the bulk write had gone through, so roll it back explicitly first.
+		frappe.db.rollback()
 		frappe.log_error(frappe.get_traceback(), f"Error updating task structure for {project_name}")
 		return {
 			"status": "error",
@@ -1177,8 +1154,13 @@ def update_task_structure(project_name, tasks):
 @frappe.whitelist()
 def update_task_dates_from_gantt(task_name, start_date, end_date):
 	"""
-	Updates a task's start and end dates from the Gantt chart and 
-	recursively shifts all downstream dependencies.
+	Updates a task's start and end dates from the Gantt chart and shifts every
+	downstream dependency by the same number of days.
+
+	The project's dependency graph is loaded once (``task_graph.TaskGraph``), the
+	shift is propagated in memory, and the dragged task plus all its successors
+	are written in one bulk update. The project date rollup and the realtime
+	event then run once for the whole move, not once per shifted task.
 	"""
 	if not task_name or not start_date or not end_date:
 		return {"status": "error", "message": "Task, start date, and end date are required."}
@@ -1188,60 +1170,32 @@ def update_task_dates_from_gantt(task_name, start_date, end_date):
 		if not project or not frappe.has_permission("Project", ptype="write", doc=project):
 			return {"status": "error", "message": "No permission to modify tasks for this project."}
 
-		# Calculate day difference for shifting
-		old_dates = frappe.db.get_value("Task", task_name, ["exp_start_date", "exp_end_date"], as_dict=True)
-		day_diff = 0
-		if old_dates.exp_start_date:
-			day_diff = (getdate(start_date) - getdate(old_dates.exp_start_date)).days
+		graph = TaskGraph.for_project(project)
+		old_start = graph.tasks[task_name].get("exp_start_date")
+		day_diff = (getdate(start_date) - getdate(old_start)).days if old_start else 0
 
-		# Update current task
-		frappe.db.set_value("Task", task_name, {"exp_start_date": start_date, "exp_end_date": end_date})
+		changes = {task_name: {"exp_start_date": getdate(start_date), "exp_end_date": getdate(end_date)}}
+		changes.update(graph.shifted(task_name, day_diff))
+		write_task_dates(changes)
+		critical_path.invalidate([project])
 
-		# If there's a shift, propagate it to successors
-		if day_diff != 0:
-			_shift_successors(task_name, day_diff)
+		# What the per-task saves used to trigger, once for the whole move.
+		sync_project_dates_from_tasks(frappe._dict(doctype="Task", project=project))
+		realtime.queue(project, tasks=changes)
 
-		return {"status": "success"}
+		return {
+			"status": "success",
+			"tasks": {
+				name: {field: str(value) if value else None for field, value in dates.items()}
+				for name, dates in changes.items()
+			},
+		}
 
 	except Exception as e:
 		frappe.log_error(frappe.get_traceback(), f"Error updating task dates and shifting for {task_name}")
 		return {"status": "error", "message": str(e)}
 
 
-def _shift_successors(predecessor_name, day_diff, processed=None):
-	"""Recursively shifts dates of all tasks that depend on the given task."""
-	if processed is None:
-		processed = set()
-
-	if predecessor_name in processed:
-		return
-	processed.add(predecessor_name)
-
-	# Find tasks that depend on this task
-	successors = frappe.get_all(
-		"Task Depends On",
-		filters={"task": predecessor_name},
-		fields=["parent"]
-	)
-
-	for succ in successors:
-		task_name = succ.parent
-		task_doc = frappe.get_doc("Task", task_name)
-
-		if task_doc.exp_start_date:
-			new_start = getdate(task_doc.exp_start_date) + timedelta(days=day_diff)
-			task_doc.exp_start_date = new_start.strftime("%Y-%m-%d")
-
-		if task_doc.exp_end_date:
-			new_end = getdate(task_doc.exp_end_date) + timedelta(days=day_diff)
-			task_doc.exp_end_date = new_end.strftime("%Y-%m-%d")
-
-		task_doc.save(ignore_permissions=True)
-
-		# Recursive shift for the next level
-		_shift_successors(task_name, day_diff, processed)
-
-
 @frappe.whitelist()
 def update_project_dates_from_gantt(project_name, start_date, end_date):
 	"""Updates a project's expected start/end dates from a Gantt drag.
@@ -1274,31 +1228,6 @@ def update_project_dates_from_gantt(project_name, start_date, end_date):
 		return {"status": "error", "message": str(e)}
 
 
-def _task_has_dependency_path(start_task, target_task, visited=None):
-	"""Returns True if `start_task` (transitively) depends on `target_task`.
-
-	Walks the "depends on" chain upstream from start_task. Used to reject a new
-	dependency that would introduce a cycle.
-	"""
-	if visited is None:
-		visited = set()
-	if start_task in visited:
-		return False
-	visited.add(start_task)
-
-	predecessors = frappe.get_all(
-		"Task Depends On", filters={"parent": start_task}, fields=["task"]
-	)
-	for pred in predecessors:
-		if not pred.task:
-			continue
-		if pred.task == target_task:
-			return True
-		if _task_has_dependency_path(pred.task, target_task, visited):
-			return True
-	return False
-
-
 @frappe.whitelist()
 def add_task_dependency(task_name, depends_on_task):
 	"""Creates a dependency so that `task_name` depends on `depends_on_task`.
@@ -1341,7 +1270,7 @@ def add_task_dependency(task_name, depends_on_task):
 
 		# Reject cycles: if the predecessor already depends on this task, linking
 		# them would create a loop.
-		if _task_has_dependency_path(depends_on_task, task_name):
+		if TaskGraph.for_project(task_project).depends_on(depends_on_task, task_name):
 			return {"status": "error", "message": "That link would create a circular dependency."}
 
 		task_doc.append("depends_on", {"task": depends_on_task})
@@ -1532,7 +1461,11 @@ def update_multiple_docs(project_updates, task_updates):
 		for doc_name, changes in project_updates.items():
 			if not frappe.has_permission("Project", ptype="write", doc=doc_name):
 				return {"status": "error", "message": f"No write permission for Project {doc_name}"}
+			was_active = frappe.db.get_value("Project", doc_name, "is_active") if "is_active" in changes else None
 			frappe.db.set_value("Project", doc_name, changes)
+			# db.set_value fires no doc_events, so the rollup is told directly.
+			if "is_active" in changes and changes["is_active"] != was_active:
+				is_active_set_quietly(doc_name, changes["is_active"])
 
 		for doc_name, changes in task_updates.items():
 			project = frappe.db.get_value("Task", doc_name, "project")
@@ -1542,6 +1475,11 @@ def update_multiple_docs(project_updates, task_updates):
 					"message": f"No write permission for parent Project of Task {doc_name}",
 				}
 			frappe.db.set_value("Task", doc_name, changes)
+			if set(changes) & set(critical_path.SCHEDULE_FIELDS):
+				critical_path.invalidate([project])
+			if "status" in changes or "project" in changes:
+				# A moved task recounts both projects, as on_task_change does.
+				refresh_quietly([project, changes.get("project")])
 
 		return {"status": "success"}
 	except Exception as e:
@@ -1566,10 +1504,20 @@ def delete_task(task_name):
 
 
 def publish_realtime_update(doc, method):
-	"""Publishes a real-time event when a project or task is updated."""
-	project = doc.name if doc.doctype == "Project" else getattr(doc, "project", None)
-	if project:
-		frappe.publish_realtime("project_dashboard_updated", {"project": project})
+	"""Queues a ``project_dashboard_updated`` event when a project or task changes.
+
+	Events are coalesced per project and sent after the commit (see
+	``project_enhancements/realtime.py``), so a request that saves 50 tasks sends
+	one event per project, not 50. A Task moved between projects announces both.
+	"""
+	if doc.doctype == "Project":
+		realtime.queue(doc.name, project_changed=True)
+		return
+	task = doc.get("name")
+	realtime.queue(doc.get("project"), tasks=[task])
+	before = doc.get_doc_before_save() if method == "on_update" and hasattr(doc, "get_doc_before_save") else None
+	if before is not None and before.get("project") != doc.get("project"):
+		realtime.queue(before.get("project"), tasks=[task])
 
 
 @frappe.whitelist()
@@ -90,7 +90,7 @@ class TestProjectDashboard(unittest.TestCase):
 	"""Tests for data handling functions of the Project Dashboard."""
 
 	@patch(
-		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard._get_assignee_names"
+		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.get_rollups"
 	)
 	@patch(
 		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.check_permission"
@@ -102,19 +102,20 @@ class TestProjectDashboard(unittest.TestCase):
 		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.frappe.get_all"
 	)
 	def test_get_project_data_success(
-		self, mock_get_all, mock_db_sql, mock_check_permission, mock_get_assignee_names
+		self, mock_get_all, mock_db_sql, mock_check_permission, mock_get_rollups
 	):
 		"""Test successful retrieval and enrichment of project data."""
 		mock_check_permission.return_value = True
 		mock_projects = [{"name": "PROJ-001", "project_name": "Test Project 1"}]
-		# get_all is called three times: Project, then ToDo, then User.
-		mock_get_all.side_effect = [mock_projects, [], []]
-		# Task counts come from a single bulk GROUP BY query.
-		mock_db_sql.return_value = [
-			{"project": "PROJ-001", "status": "Open", "count": 3},
-			{"project": "PROJ-001", "status": "Completed", "count": 2},
-		]
-		mock_get_assignee_names.return_value = []
+		mock_get_all.return_value = mock_projects
+		mock_get_rollups.return_value = {
+			"PROJ-001": {
+				"total_tasks": 5,
+				"completed_tasks": 2,
+				"completed_on": None,
+				"assignees": [{"email": "a@example.com", "full_name": "Ann Example"}],
+			}
+		}
 
 		result = get_project_data()
 
@@ -122,6 +123,7 @@ class TestProjectDashboard(unittest.TestCase):
 		self.assertEqual(result[0]["name"], "PROJ-001")
 		self.assertEqual(result[0]["total_tasks"], 5)
 		self.assertEqual(result[0]["completed_tasks"], 2)
+		self.assertEqual(result[0]["project_user"], "Ann Example")
 		# Projects are fetched with get_all (ignore_permissions) so the shared
 		# dashboard portfolio is gated by page role rather than silently narrowed
 		# by per-user Project permissions.
@@ -129,26 +131,25 @@ class TestProjectDashboard(unittest.TestCase):
 		self.assertEqual(projects_call.args[0], "Project")
 		self.assertEqual(projects_call.kwargs["filters"], {"status": ["!=", "Canceled"]})
 		self.assertEqual(projects_call.kwargs["order_by"], "creation desc")
+		# Everything else is one rollup read: no Task aggregation, no Version scan.
+		self.assertEqual(mock_get_all.call_count, 1)
+		mock_db_sql.assert_not_called()
+		mock_get_rollups.assert_called_once_with(["PROJ-001"])
 
 	@patch(
-		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard._get_assignee_names"
+		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.get_rollups"
 	)
 	@patch(
 		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.check_permission"
 	)
-	@patch(
-		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.frappe.db.sql"
-	)
 	@patch(
 		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.frappe.get_all"
 	)
-	def test_get_project_data_completed_on(
-		self, mock_get_all, mock_db_sql, mock_check_permission, mock_get_assignee_names
-	):
-		"""Inactive projects get a completed_on date from Version history, falling
-		back to the last-modified date; active projects get None."""
+	def test_get_project_data_completed_on(self, mock_get_all, mock_check_permission, mock_get_rollups):
+		"""Inactive projects get the rollup's completed_on date, falling back to the
+		last-modified date; active projects get None."""
 		mock_check_permission.return_value = True
-		mock_projects = [
+		mock_get_all.return_value = [
 			{
 				"name": "PROJ-001",
 				"project_name": "Done (tracked)",
@@ -157,7 +158,7 @@ class TestProjectDashboard(unittest.TestCase):
 			},
 			{
 				"name": "PROJ-002",
-				"project_name": "Done (no version row)",
+				"project_name": "Done (no recorded flip)",
 				"is_active": "No",
 				"modified": datetime(2026, 4, 2, 9, 0, 0),
 			},
@@ -168,22 +169,17 @@ class TestProjectDashboard(unittest.TestCase):
 				"modified": datetime(2026, 6, 10, 9, 0, 0),
 			},
 		]
-		mock_get_all.side_effect = [mock_projects, [], []]
-		# db.sql is called twice: task counts, then completion dates from Version.
-		mock_db_sql.side_effect = [
-			[],
-			[{"docname": "PROJ-001", "completed_on": date(2026, 5, 22)}],
-		]
-		mock_get_assignee_names.return_value = []
+		mock_get_rollups.return_value = {
+			"PROJ-001": {"total_tasks": 0, "completed_tasks": 0, "completed_on": date(2026, 5, 22), "assignees": []},
+			"PROJ-002": {"total_tasks": 0, "completed_tasks": 0, "completed_on": None, "assignees": []},
+		}
 
 		result = get_project_data()
 
 		self.assertEqual(result[0]["completed_on"], date(2026, 5, 22))
 		self.assertEqual(result[1]["completed_on"], date(2026, 4, 2))
 		self.assertIsNone(result[2]["completed_on"])
-		# The Version query is scoped to the inactive projects only.
-		version_call = mock_db_sql.call_args_list[1]
-		self.assertEqual(version_call.args[1][0], ["PROJ-001", "PROJ-002"])
+		self.assertEqual(result[2]["project_user"], "Unassigned")
 
 	@patch(
 		"erpnext_enhancements.project_enhancements.page.project_dashboard.project_dashboard.check_permission"
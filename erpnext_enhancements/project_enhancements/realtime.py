@@ -0,0 +1,96 @@
+"""Coalesced ``project_dashboard_updated`` events, one per project per commit.
+
+``project_dashboard.publish_realtime_update`` used to call ``publish_realtime`` on
+every Task and Project ``on_update``, straight away. A request that saved 50 tasks
+(a bulk import, an ``update_task_structure`` reorder) sent 50 events. Every open
+Projects Dashboard answered each one by reloading the whole portfolio, and some
+of those reloads ran before the request had committed, so they read the old rows.
+
+:func:`queue` now records the change in ``frappe.local`` and registers a
+``frappe.db.after_commit`` callback once per transaction. On commit,
+:func:`_flush` sends one event per touched project; on rollback nothing is sent.
+An event is::
+
+    {"project": "PRJ-0001", "version": 1760694000123456,
+     "tasks": ["TASK-0001", ...], "project_changed": False}
+
+``version`` is a microsecond timestamp taken at flush. A client keeps the highest
+version it has applied per project and ignores anything older, so events that
+arrive out of order across workers cannot undo a newer patch. ``tasks`` names the
+Tasks saved in the transaction, or is ``None`` when more than
+:data:`MAX_TASK_NAMES` were, which means "reload the project". Rows are not in the
+broadcast: every desk session receives it, while the rows are gated by the
+dashboard's page role. Clients fetch the changed rows through
+``project_dashboard.get_project_rows``.
+"""
+
+import time
+
+import frappe
+
+EVENT = "project_dashboard_updated"
+
+# Past this many Task names an event just says "this project changed".
+MAX_TASK_NAMES = 100
+
+_PENDING = "project_dashboard_realtime"
+
+
+def queue(project, tasks=(), project_changed=False):
+	"""Announce ``project`` (and the Task names in ``tasks``) once the transaction commits.
+
+	Outside a request with a transaction to ride on (a console, a test, an older
+	framework without ``after_commit``) the event is published straight away.
+	"""
+	if not project:
+		return
+	tasks = {t for t in tasks if t}
+	pending = getattr(frappe.local, _PENDING, None)
+	if pending is None:
+		if not _register():
+			_publish({project: {"tasks": tasks, "project_changed": bool(project_changed)}})
+			return
+		pending = {}
+		setattr(frappe.local, _PENDING, pending)
+	entry = pending.setdefault(project, {"tasks": set(), "project_changed": False})
+	entry["tasks"].update(tasks)
+	entry["project_changed"] = entry["project_changed"] or bool(project_changed)
+
+
+def _register():
+	db = getattr(frappe, "db", None)
+	after_commit = getattr(db, "after_commit", None)
+	after_rollback = getattr(db, "after_rollback", None)
+	if after_commit is None or after_rollback is None:
+		return False
+	after_commit.add(_flush)
+	after_rollback.add(_discard)
+	return True
+
+
+def _flush():
+	pending = getattr(frappe.local, _PENDING, None) or {}
+	_discard()
+	_publish(pending)
+
+
+def _discard():
+	setattr(frappe.local, _PENDING, None)
+
+
+def _publish(pending):
+	for project, entry in pending.items():
+		tasks = sorted(entry["tasks"])
+		try:
+			frappe.publish_realtime(
+				EVENT,
+				{
+					"project": project,
+					"version": time.time_ns() // 1000,
+					"tasks": tasks if len(tasks) <= MAX_TASK_NAMES else None,
+					"project_changed": entry["project_changed"],
+				},
+			)
+		except Exception:
+			# A missed event only leaves a dashboard stale until its next load.
+			frappe.log_error(frappe.get_traceback(), f"Project dashboard realtime event failed for {project}")
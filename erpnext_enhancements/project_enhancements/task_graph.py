@@ -0,0 +1,203 @@
+"""One project's task dependency graph, loaded once and walked in memory.
+
+The Gantt endpoints in ``project_dashboard`` used to walk ``Task Depends On`` a
+level at a time against the database. ``_shift_successors`` did one ``get_all``
+per task, then a full ``get_doc(...).save()`` on every successor. Each save fired
+the whole Task ``doc_events`` chain: the project date sync (a MIN/MAX over every
+task in the project), the realtime broadcast, recurring-task generation and the
+rollup. Cycle checks for a new link did the same recursive querying. Dragging one
+bar at the head of a 300-task chain meant hundreds of saves and a broadcast for
+each.
+
+:class:`TaskGraph` loads a project's tasks and links in two queries. Propagation
+and cycle detection then run in memory, and :func:`write_task_dates` writes every
+moved date back in one ``UPDATE`` per :data:`WRITE_BATCH` tasks. Callers run the
+project rollup and the realtime event once afterwards, not once per task.
+
+Edges are ``Task Depends On`` rows: the child row's ``task`` is the predecessor
+and its parent Task the successor (finish-to-start, as ERPNext draws them). The
+graph is project-scoped. A link to or from a task in another project is left out,
+because ``add_task_dependency`` refuses to create one.
+
+Legacy data can hold cycles, since ERPNext's own form only checks direct
+recursion. They are tolerated: every task is visited once, and :meth:`TaskGraph.
+topological_order` reports the tasks it could not order instead of looping.
+"""
+
+from collections import defaultdict, deque
+from datetime import timedelta
+
+import frappe
+from frappe.utils import getdate, now_datetime
+
+# Tasks per UPDATE statement in write_task_dates. Two CASE arms per task keep a
+# batch well inside max_allowed_packet.
+WRITE_BATCH = 500
+
+DATE_FIELDS = ("exp_start_date", "exp_end_date")
+
+
+class TaskGraph:
+	"""Tasks (``name`` -> row with the date fields) plus links in both directions."""
+
+	def __init__(self, tasks, links):
+		self.tasks = {row["name"]: row for row in tasks}
+		self.successors = defaultdict(list)
+		self.predecessors = defaultdict(list)
+		seen = set()
+		for predecessor, successor in links:
+			if predecessor not in self.tasks or successor not in self.tasks:
+				continue
+			if predecessor == successor or (predecessor, successor) in seen:
+				continue
+			seen.add((predecessor, successor))
+			self.successors[predecessor].append(successor)
+			self.predecessors[successor].append(predecessor)
+
+	@classmethod
+	def for_project(cls, project, fields=()):
+		"""Load ``project``'s tasks and links: two queries, whatever its size.
+
+		``fields`` adds Task columns to each row beyond ``name`` and the dates.
+		"""
+		tasks = frappe.get_all(
+			"Task",
+			filters={"project": project},
+			fields=["name", *DATE_FIELDS, *fields],
+			order_by="name asc",
+		)
+		links = frappe.db.sql(
+			"""
+			SELECT dep.task, dep.parent
+			FROM `tabTask Depends On` dep
+			INNER JOIN `tabTask` t ON t.name = dep.parent
+			WHERE dep.parenttype = 'Task' AND t.project = %s
+			""",
+			project,
+		)
+		return cls(tasks, links)
+
+	def downstream(self, origin):
+		"""Every task that (transitively) depends on ``origin``, excluding it."""
+		found = set()
+		queue = deque(self.successors.get(origin, ()))
+		while queue:
+			name = queue.popleft()
+			if name in found or name == origin:
+				continue
+			found.add(name)
+			queue.extend(self.successors.get(name, ()))
+		return found
+
+	def depends_on(self, task, target):
+		"""True if ``task`` (transitively) depends on ``target``.
+
+		This is the cycle check for a new link: ``a`` may not come to depend on
+		``b`` while ``b`` already depends on ``a``.
+		"""
+		seen = set()
+		stack = list(self.predecessors.get(task, ()))
+		while stack:
+			name = stack.pop()
+			if name == target:
+				return True
+			if name in seen:
+				continue
+			seen.add(name)
+			stack.extend(self.predecessors.get(name, ()))
+		return False
+
+	def topological_order(self, names=None):
+		"""``(ordered, cyclic)`` over ``names`` (default: every task), by Kahn.
+
+		Predecessors come before their successors. Links from outside ``names``
+		are ignored. ``cyclic`` lists the tasks on or behind a cycle, which have
+		no valid order, so a caller can still visit each task once.
+		"""
+		names = set(self.tasks if names is None else names)
+		indegree = {
+			name: sum(1 for p in self.predecessors.get(name, ()) if p in names) for name in names
+		}
+		queue = deque(sorted(name for name, degree in indegree.items() if not degree))
+		ordered = []
+		while queue:
+			name = queue.popleft()
+			ordered.append(name)
+			for successor in self.successors.get(name, ()):
+				if successor not in indegree:
+					continue
+				indegree[successor] -= 1
+				if not indegree[successor]:
+					queue.append(successor)
+		placed = set(ordered)
+		return ordered, sorted(name for name in names if name not in placed)
+
+	def shifted(self, origin, days):
+		"""New dates for everything downstream of ``origin`` moved by ``days``.
+
+		Returns ``{name: {"exp_start_date", "exp_end_date"}}`` in propagation
+		order, cycle members last. Each task is shifted exactly once and an empty
+		date stays empty. That matches what the per-task saves used to do, minus
+		re-shifting ``origin`` itself when a cycle led back to it.
+		"""
+		if not days:
+			return {}
+		ordered, cyclic = self.topological_order(self.downstream(origin))
+		delta = timedelta(days=days)
+		return {
+			name: {
+				field: (getdate(self.tasks[name][field]) + delta) if self.tasks[name].get(field) else None
+				for field in DATE_FIELDS
+			}
+			for name in ordered + cyclic
+		}
+
+
+def write_task_dates(changes):
+	"""Write ``{task: {"exp_start_date", "exp_end_date"}}`` in bulk.
+
+	One ``UPDATE ... CASE`` per :data:`WRITE_BATCH` tasks instead of a save per
+	task. ``modified`` is bumped, so a Gantt holding a stale row still gets the
+	``update_gantt_row`` conflict. No ``doc_events`` run. Callers follow up with
+	the project-level effects once (see ``update_task_dates_from_gantt``).
+	"""
+	written = write_task_fields(changes, DATE_FIELDS)
+	if written:
+		frappe.clear_document_cache("Task")
+	return written
+
+
+def write_task_fields(changes, fields, touch=True):
+	"""Write ``{task: {field: value}}`` for ``fields``, :data:`WRITE_BATCH` tasks per ``UPDATE``.
+
+	``touch`` also sets ``modified`` / ``modified_by``. Bookkeeping columns that
+	Frappe itself writes without touching (``lft`` / ``rgt``) pass ``False``, so
+	an open form on an unrelated task does not hit a timestamp conflict. The
+	caller clears the Task document cache.
+	"""
+	names = list(changes)
+	stamp = now_datetime()
+	for start in range(0, len(names), WRITE_BATCH):
+		batch = names[start : start + WRITE_BATCH]
+		values = []
+		arms = []
+		for field in fields:
+			cases = []
+			for name in batch:
+				cases.append("WHEN %s THEN %s")
+				values.extend([name, changes[name].get(field)])
+			arms.append(f"`{field}` = CASE `name` {' '.join(cases)} ELSE `{field}` END")
+		if touch:
+			arms.append("`modified` = %s")
+			arms.append("`modified_by` = %s")
+			values.extend([stamp, frappe.session.user])
+		values.append(tuple(batch))
+		frappe.db.sql(
+			f"""
+			UPDATE `tabTask`
+			SET {", ".join(arms)}
+			WHERE `name` IN %s
+			""",
+			tuple(values),
+		)
+	return len(names)
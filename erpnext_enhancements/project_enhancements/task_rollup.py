@@ -0,0 +1,391 @@
+"""Maintained per-project task summary behind the Projects Dashboard portfolio view.
+
+``get_project_data`` used to derive three things on every page load: task counts
+(``tabTask`` grouped by project and status), assignees (open ToDo rows), and, for
+every inactive project, a "completed on" date found by scanning ``tabVersion`` for
+``data LIKE '%["is_active","Yes","No"]%'``. A leading-wildcard ``LIKE`` uses no
+index, and Version is one of the largest tables on the site — so the portfolio
+view got slower with every edit anybody made to anything.
+
+Now those live in **Project Task Rollup**, one row per project named after it, and
+the dashboard reads them by primary key (:func:`get_rollups`). The cost of a page
+load no longer grows with Task or Version history.
+
+**Kept current incrementally** from ``doc_events`` (see ``hooks.py``):
+
+* Task ``on_update`` / ``after_delete`` — re-counts the task's project, and the
+  project it was moved *from* when ``project`` changed. ``after_delete``, not
+  ``on_trash``: the row is still in ``tabTask`` during ``on_trash`` and would be
+  counted.
+* Project ``on_update`` — stamps ``completed_on`` when ``is_active`` flips to No
+  (clears it on Yes). This replaces the Version scan: the flip is recorded when it
+  happens instead of searched for afterwards. ``after_delete`` / ``after_rename``
+  drop or move the row.
+* ToDo ``on_update`` / ``after_delete`` — refreshes assignees when the ToDo
+  references a Project. Assigning and un-assigning both save the ToDo.
+
+Every hook is wrapped: a dashboard summary is a garnish, and it must never fail
+the Task or Project save it decorates.
+
+**Rebuilt** by :func:`rebuild` — the backfill on install (patch
+``backfill_project_task_rollup``), the nightly reconciliation, and the command to
+run by hand::
+
+    bench --site <site> execute erpnext_enhancements.project_enhancements.task_rollup.rebuild
+
+The nightly pass exists because some writers do not fire ``doc_events`` at all —
+ERPNext's own overdue sweep and several dashboard endpoints use
+``frappe.db.set_value`` on Task. It is one grouped read of Task per batch of
+projects, which is the scan a page load no longer does. The Version scan runs
+only for inactive projects that have no ``completed_on`` yet, so after the first
+backfill it touches almost nothing.
+
+A project with no row yet (created between deploy and backfill) is measured on the
+fly by :func:`get_rollups` without writing — the dashboard endpoint is a GET.
+"""
+
+import json
+
+import frappe
+from frappe.utils import getdate, now_datetime, nowdate
+
+ROLLUP_DOCTYPE = "Project Task Rollup"
+COMPLETED_STATUS = "Completed"
+# The Version diff for an is_active Yes -> No change, as Frappe serialises it.
+INACTIVE_FLIP = '%["is_active","Yes","No"]%'
+BATCH_SIZE = 500
+
+# "Leave completed_on as it is" — distinct from None, which clears it.
+_KEEP = object()
+
+
+# ------------------------------------------------------------------ reading
+
+
+def get_rollups(projects):
+	"""``{project: {"total_tasks", "completed_tasks", "completed_on", "assignees"}}``.
+
+	One primary-key read. Projects without a row are measured in memory (counts and
+	assignees only; ``completed_on`` comes back ``None`` and the caller falls back
+	to the project's ``modified`` date, as before).
+	"""
+	projects = [p for p in dict.fromkeys(projects) if p]
+	if not projects:
+		return {}
+
+	rollups = {}
+	for row in frappe.get_all(
+		ROLLUP_DOCTYPE,
+		filters={"name": ["in", projects]},
+		fields=["name", "total_tasks", "completed_tasks", "completed_on", "assignees"],
+	):
+		rollups[row["name"]] = {
+			"total_tasks": row.get("total_tasks") or 0,
+			"completed_tasks": row.get("completed_tasks") or 0,
+			"completed_on": row.get("completed_on"),
+			"assignees": _loads(row.get("assignees"), []),
+		}
+
+	missing = [p for p in projects if p not in rollups]
+	if missing:
+		for project, measured in _measure(missing).items():
+			rollups[project] = {
+				"total_tasks": measured["total_tasks"],
+				"completed_tasks": measured["completed_tasks"],
+				"completed_on": None,
+				"assignees": measured["assignees"],
+			}
+	return rollups
+
+
+# ----------------------------------------------------------------- doc events
+
+
+def on_task_change(doc, method=None):
+	"""Task ``on_update`` / ``after_delete``.
+
+	A save that changed neither ``status`` nor ``project`` changes no count — most
+	Task saves (dates, ordering, description) — and costs nothing here.
+	"""
+	projects = [doc.get("project")]
+	before = doc.get_doc_before_save() if method == "on_update" else None
+	if before is not None:
+		if before.get("status") == doc.get("status") and before.get("project") == doc.get("project"):
+			return
+		projects.append(before.get("project"))
+	_quietly(refresh_projects, projects)
+
+
+def on_project_update(doc, method=None):
+	"""Project ``on_update``: ``completed_on`` follows ``is_active``.
+
+	Only a flip (or the insert, which Frappe also reports as a change) writes; every
+	other Project save leaves the row alone.
+	"""
+	if not doc.has_value_changed("is_active"):
+		return
+	_quietly(refresh_projects, [doc.name], completed_on=_completed_on(doc.get("is_active")))
+
+
+def on_project_delete(doc, method=None):
+	"""Project ``after_delete``: the row goes with it."""
+	_quietly(_delete_rows, [doc.name])
+
+
+def on_project_rename(doc, method=None, old=None, new=None, merge=False):
+	"""Project ``after_rename``: the row is named after the project, so move it.
+
+	The old row's ``completed_on`` is carried across unless this was a merge, where
+	the surviving project's own date stands.
+	"""
+
+	def move():
+		completed_on = _KEEP
+		if not merge:
+			stamped = frappe.db.get_value(ROLLUP_DOCTYPE, old, "completed_on")
+			if stamped:
+				completed_on = stamped
+		_delete_rows([old])
+		refresh_projects([new], completed_on=completed_on)
+
+	_quietly(move)
+
+
+def on_todo_change(doc, method=None):
+	"""ToDo ``on_update`` / ``after_delete``: only Project assignments matter here."""
+	if doc.get("reference_type") == "Project" and doc.get("reference_name"):
+		_quietly(refresh_projects, [doc.reference_name])
+
+
+def refresh_quietly(projects):
+	"""For writers that bypass ``doc_events`` (``frappe.db.set_value`` on Task)."""
+	_quietly(refresh_projects, projects)
+
+
+def is_active_set_quietly(project, is_active):
+	"""``on_project_update`` for a writer that flipped ``is_active`` with
+	``frappe.db.set_value``. The caller checks that the value actually changed."""
+	_quietly(refresh_projects, [project], completed_on=_completed_on(is_active))
+
+
+def _completed_on(is_active):
+	return getdate(nowdate()) if is_active == "No" else None
+
+
+def _quietly(fn, *args, **kwargs):
+	if not _active():
+		return
+	try:
+		fn(*args, **kwargs)
+	except Exception:
+		try:
+			frappe.log_error(title="Project task rollup refresh failed", message=frappe.get_traceback())
+		except Exception:
+			pass
+
+
+def _active():
+	"""Not mid-maintenance, and the table exists. The rebuild patch covers migrate."""
+	flags = frappe.flags
+	if flags.in_migrate or flags.in_install or flags.in_patch or flags.in_import:
+		return False
+	return bool(frappe.db.exists("DocType", ROLLUP_DOCTYPE))
+
+
+# ----------------------------------------------------------------- writing
+
+
+def refresh_projects(projects, completed_on=_KEEP):
+	"""Re-measure and write the rows for ``projects``. Returns how many were written.
+
+	``completed_on`` is left alone unless given; a project that no longer exists
+	loses its row.
+	"""
+	projects = [p for p in dict.fromkeys(projects) if p]
+	if not projects:
+		return 0
+	alive = set(frappe.get_all("Project", filters={"name": ["in", projects]}, pluck="name"))
+	_delete_rows([p for p in projects if p not in alive])
+	projects = [p for p in projects if p in alive]
+	if not projects:
+		return 0
+
+	existing = set(frappe.get_all(ROLLUP_DOCTYPE, filters={"name": ["in", projects]}, pluck="name"))
+	for project, measured in _measure(projects).items():
+		values = _row_values(measured)
+		if completed_on is not _KEEP:
+			values["completed_on"] = completed_on
+		_write(project, values, project in existing)
+	return len(projects)
+
+
+def rebuild(projects=None):
+	"""Recompute every row (or just ``projects``), in committed batches.
+
+	Counts and assignees are re-measured. ``completed_on`` is cleared on active
+	projects, kept where already stamped, and backfilled for inactive projects that
+	have none — from the last Yes -> No flip in Version, else the project's
+	``modified`` date. Rows whose project is gone are deleted. Safe to run at any
+	time, as often as you like.
+	"""
+	if not frappe.db.exists("DocType", ROLLUP_DOCTYPE):
+		return {"projects": 0, "backfilled_completed_on": 0}
+
+	if isinstance(projects, str):
+		projects = json.loads(projects) if projects.strip().startswith("[") else [projects]
+	if projects is None:
+		names = frappe.get_all("Project", pluck="name", order_by="name")
+		orphans = frappe.get_all(
+			ROLLUP_DOCTYPE, filters={"name": ["not in", names or [""]]}, pluck="name"
+		)
+		_delete_rows(orphans)
+	else:
+		names = list(dict.fromkeys(p for p in projects if p))
+
+	written = backfilled = 0
+	for start in range(0, len(names), BATCH_SIZE):
+		batch = names[start : start + BATCH_SIZE]
+		meta = {
+			row["name"]: row
+			for row in frappe.get_all(
+				"Project", filters={"name": ["in", batch]}, fields=["name", "is_active", "modified"]
+			)
+		}
+		stored = {
+			row["name"]: row.get("completed_on")
+			for row in frappe.get_all(
+				ROLLUP_DOCTYPE, filters={"name": ["in", batch]}, fields=["name", "completed_on"]
+			)
+		}
+		undated = [p for p, row in meta.items() if row.get("is_active") == "No" and not stored.get(p)]
+		flips = _completed_on_from_versions(undated)
+
+		for project, measured in _measure(list(meta)).items():
+			values = _row_values(measured)
+			if meta[project].get("is_active") == "No":
+				if project in undated:
+					values["completed_on"] = flips.get(project) or getdate(meta[project].get("modified"))
+					backfilled += 1
+			else:
+				values["completed_on"] = None
+			_write(project, values, project in stored)
+			written += 1
+		frappe.db.commit()
+
+	return {"projects": written, "backfilled_completed_on": backfilled}
+
+
+def _row_values(measured):
+	return {
+		"total_tasks": measured["total_tasks"],
+		"completed_tasks": measured["completed_tasks"],
+		"status_counts": json.dumps(measured["status_counts"], sort_keys=True),
+		"assignees": json.dumps(measured["assignees"]),
+		"refreshed_at": now_datetime(),
+	}
+
+
+def _write(project, values, exists):
+	if not exists:
+		try:
+			frappe.get_doc({"doctype": ROLLUP_DOCTYPE, "project": project, **values}).insert(
+				ignore_permissions=True
+			)
+			return
+		except frappe.DuplicateEntryError:
+			# Two saves of the same new project's tasks raced to create the row.
+			pass
+	frappe.db.set_value(ROLLUP_DOCTYPE, project, values, update_modified=False)
+
+
+def _delete_rows(projects):
+	projects = [p for p in projects if p]
+	if projects:
+		frappe.db.delete(ROLLUP_DOCTYPE, {"name": ["in", projects]})
+
+
+# ----------------------------------------------------------------- measuring
+
+
+def _measure(projects):
+	"""Counts by status and open assignees for ``projects``, from their own rows.
+
+	One grouped read of Task (indexed on ``project``), one of ToDo (indexed on the
+	reference), and one of User for the names — per call, not per project.
+	"""
+	measured = {
+		p: {"status_counts": {}, "total_tasks": 0, "completed_tasks": 0, "assignees": []} for p in projects
+	}
+	if not projects:
+		return measured
+
+	for row in frappe.db.sql(
+		"""
+		SELECT project, status, COUNT(*) AS count
+		FROM `tabTask`
+		WHERE project IN %s
+		GROUP BY project, status
+		""",
+		(projects,),
+		as_dict=1,
+	):
+		entry = measured.get(row["project"])
+		if entry is None:
+			continue
+		count = int(row["count"] or 0)
+		status = row.get("status") or ""
+		entry["status_counts"][status] = entry["status_counts"].get(status, 0) + count
+		entry["total_tasks"] += count
+		if status == COMPLETED_STATUS:
+			entry["completed_tasks"] += count
+
+	todos = frappe.get_all(
+		"ToDo",
+		filters={"reference_type": "Project", "reference_name": ["in", projects], "status": "Open"},
+		fields=["reference_name", "allocated_to"],
+		order_by="creation asc",
+	)
+	emails = list({t["allocated_to"] for t in todos if t.get("allocated_to")})
+	names = {}
+	if emails:
+		names = {
+			u["email"]: u["full_name"]
+			for u in frappe.get_all("User", filters={"email": ["in", emails]}, fields=["email", "full_name"])
+		}
+	for todo in todos:
+		email = todo.get("allocated_to")
+		entry = measured.get(todo["reference_name"])
+		if entry is None or email not in names:
+			continue
+		if any(a["email"] == email for a in entry["assignees"]):
+			continue
+		entry["assignees"].append({"email": email, "full_name": names[email]})
+	return measured
+
+
+def _completed_on_from_versions(projects):
+	"""The last is_active Yes -> No flip per project, from Version. Backfill only."""
+	if not projects:
+		return {}
+	rows = frappe.db.sql(
+		"""
+		SELECT docname, DATE(MAX(creation)) AS completed_on
+		FROM `tabVersion`
+		WHERE ref_doctype = 'Project'
+			AND docname IN %s
+			AND data LIKE %s
+		GROUP BY docname
+		""",
+		(projects, INACTIVE_FLIP),
+		as_dict=1,
+	)
+	return {row["docname"]: row["completed_on"] for row in rows}
+
+
+def _loads(value, default):
+	if not value:
+		return default
+	try:
+		return json.loads(value)
+	except (TypeError, ValueError):
+		return default
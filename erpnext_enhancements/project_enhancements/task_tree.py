@@ -0,0 +1,271 @@
+"""Bulk re-parenting and re-ordering of one project's task tree.
+
+``project_dashboard.update_task_structure`` receives the whole visible tree after
+a drag-and-drop in the Scope tab: ``[{name, parent_task, custom_subtask_order}]``
+for every loaded task. It used to ``get_doc(...).save()`` each row. A save
+rebuilds the nested set when the parent moved (range shifts across all of
+``tabTask``), promotes the parent to a group, appends the child to the parent's
+``depends_on`` (ERPNext's ``populate_depends_on``), and runs the whole Task
+``doc_events`` chain. That happened even for the many rows whose parent and order
+had not changed. Dropping one task into a 400-task tree meant 400 saves.
+
+:func:`reorder` loads the project once (``task_graph.TaskGraph``: two queries) and
+validates the submitted tree as a whole. Every task and every new parent must
+belong to the project, no task may end up under itself, and no new parent may
+already feed into its child through ``depends_on``. That last link is one
+ERPNext would add and then refuse as a circular reference. Only rows that
+actually changed are written, in batched ``UPDATE ... CASE`` statements
+(``task_graph.write_task_fields``). The nested set is then renumbered once for
+the whole project, and the missing ``depends_on`` rows go in one
+``bulk_insert``. ``doc_events`` do not run. The caller gets the changed task
+names back for its one realtime event.
+
+**Nested set.** ``lft`` / ``rgt`` are numbered across all of ``tabTask``, so a
+project's tasks do not in general occupy one contiguous range. When they do,
+meaning no task of another project has a bound inside the project's range, the
+project is renumbered in place. Otherwise its whole forest is renumbered after
+the current maximum ``rgt``. That leaves gaps, which nested-set queries
+tolerate, and every later reorder of the project is then in place. A legacy
+tree that crosses projects (a task parented into another project) cannot be
+renumbered on its own. It falls back to the per-row saves.
+"""
+
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime
+
+from erpnext_enhancements.project_enhancements.task_graph import TaskGraph, write_task_fields
+
+# Task columns read on load, beyond name and the dates.
+LOAD_FIELDS = ("subject", "parent_task", "custom_subtask_order", "is_group", "lft", "rgt")
+# Columns a reorder writes (``modified`` is bumped with them).
+TREE_FIELDS = ("parent_task", "old_parent", "custom_subtask_order")
+NESTED_SET_FIELDS = ("lft", "rgt")
+
+
+def reorder(project, rows):
+	"""Apply ``[{name, parent_task, custom_subtask_order}]`` to ``project`` in bulk.
+
+	Raises ``frappe.ValidationError`` (via ``frappe.throw``) when the tree as a
+	whole is invalid, before anything is written. Returns the names of the tasks
+	whose parent or order changed.
+	"""
+	graph = TaskGraph.for_project(project, fields=LOAD_FIELDS)
+	tasks = graph.tasks
+	changes, new_links = _validate(project, graph, rows)
+	if not changes:
+		return []
+
+	if not _self_contained(project, tasks):
+		_save_each(changes)
+		return list(changes)
+
+	parents = {name: row.get("parent_task") or None for name, row in tasks.items()}
+	order = {name: row.get("custom_subtask_order") for name, row in tasks.items()}
+	for name, change in changes.items():
+		parents[name] = change["parent_task"]
+		order[name] = change["custom_subtask_order"]
+	reparented = [name for name in changes if changes[name]["parent_task"] != (tasks[name].get("parent_task") or None)]
+
+	write_task_fields(changes, TREE_FIELDS)
+	if reparented:
+		_renumber(project, tasks, parents, order)
+		new_parents = {parents[name] for name in reparented if parents[name]}
+		_promote_to_group([p for p in new_parents if not cint(tasks[p].get("is_group"))])
+		_add_parent_dependencies(tasks, new_links)
+	frappe.clear_document_cache("Task")
+	return list(changes)
+
+
+def number_tree(parents, order):
+	"""``{name: (lft, rgt)}`` counted from 1 for the forest in ``parents`` (``{name: parent}``).
+
+	Siblings are numbered by ``order`` (``custom_subtask_order``), then name.
+	Iterative, so a deep chain cannot hit the recursion limit.
+	"""
+	children = defaultdict(list)
+	roots = []
+	for name, parent in parents.items():
+		(children[parent] if parent else roots).append(name)
+
+	def sibling_key(name):
+		return (cint(order.get(name)), name)
+
+	numbers = {}
+	counter = 0
+	stack = [(name, False) for name in sorted(roots, key=sibling_key, reverse=True)]
+	while stack:
+		name, closing = stack.pop()
+		counter += 1
+		if closing:
+			numbers[name] = (numbers[name], counter)
+			continue
+		numbers[name] = counter
+		stack.append((name, True))
+		stack.extend((child, False) for child in sorted(children[name], key=sibling_key, reverse=True))
+	return numbers
+
+
+# ---------------------------------------------------------------- validating
+
+
+def _validate(project, graph, rows):
+	"""``(changes, new_links)`` for the rows that change.
+
+	``changes`` is ``{name: {parent_task, old_parent, custom_subtask_order}}``.
+	``new_links`` lists the ``(child, parent)`` dependency rows the moves add.
+	Each is added to ``graph`` as it is checked, so two moves that only close a
+	cycle together are caught too.
+	"""
+	tasks = graph.tasks
+	seen = set()
+	changes = {}
+	for row in rows:
+		name = row.get("name")
+		if not name:
+			continue
+		if name in seen:
+			frappe.throw(_("Task {0} appears more than once.").format(name))
+		seen.add(name)
+		if name not in tasks:
+			frappe.throw(_("Task {0} does not belong to project {1}.").format(name, project))
+		parent = row.get("parent_task") or None
+		if parent and parent not in tasks:
+			frappe.throw(_("Parent task {0} does not belong to project {1}.").format(parent, project))
+		if parent == name:
+			frappe.throw(_("Task {0} cannot be its own parent.").format(name))
+		order = cint(row.get("custom_subtask_order")) if row.get("custom_subtask_order") not in (None, "") else None
+		current = tasks[name]
+		if parent != (current.get("parent_task") or None) or order != current.get("custom_subtask_order"):
+			changes[name] = {"parent_task": parent, "old_parent": parent, "custom_subtask_order": order}
+
+	parents = {name: row.get("parent_task") or None for name, row in tasks.items()}
+	parents.update({name: change["parent_task"] for name, change in changes.items()})
+	new_links = []
+	for name in changes:
+		_check_ancestry(name, parents)
+		parent = changes[name]["parent_task"]
+		if not parent or parent == (tasks[name].get("parent_task") or None):
+			continue
+		if name in graph.predecessors.get(parent, ()):
+			continue
+		if graph.depends_on(name, parent):
+			frappe.throw(
+				_("Task {0} cannot go under {1}: it already depends on {1}.").format(name, parent)
+			)
+		graph.successors[name].append(parent)
+		graph.predecessors[parent].append(name)
+		new_links.append((name, parent))
+	return changes, new_links
+
+
+def _check_ancestry(name, parents):
+	seen = {name}
+	parent = parents.get(name)
+	while parent:
+		if parent in seen:
+			frappe.throw(_("Task {0} cannot be moved under its own subtask.").format(name))
+		seen.add(parent)
+		parent = parents.get(parent)
+
+
+def _self_contained(project, tasks):
+	"""True when no task crosses between this project's tree and another's."""
+	if any(row.get("parent_task") and row["parent_task"] not in tasks for row in tasks.values()):
+		return False
+	return not frappe.db.sql(
+		"""
+		SELECT `name` FROM `tabTask`
+		WHERE `parent_task` IN %s AND IFNULL(`project`, '') != %s
+		LIMIT 1
+		""",
+		(tuple(tasks), project),
+	)
+
+
+# ------------------------------------------------------------------ writing
+
+
+def _renumber(project, tasks, parents, order):
+	"""Give the project's forest fresh ``lft`` / ``rgt`` in one pass (see module docstring)."""
+	bounds = [cint(row.get(field)) for row in tasks.values() for field in NESTED_SET_FIELDS]
+	low, high = min(bounds), max(bounds)
+	in_place = all(bounds) and high - low + 1 >= len(bounds) and not frappe.db.sql(
+		"""
+		SELECT `name` FROM `tabTask`
+		WHERE IFNULL(`project`, '') != %s
+			AND (`lft` BETWEEN %s AND %s OR `rgt` BETWEEN %s AND %s)
+		LIMIT 1
+		""",
+		(project, low, high, low, high),
+	)
+	if in_place:
+		offset = low - 1
+	else:
+		offset = cint(frappe.db.sql("SELECT MAX(`rgt`) FROM `tabTask`")[0][0])
+
+	numbers = {}
+	for name, (lft, rgt) in number_tree(parents, order).items():
+		lft, rgt = lft + offset, rgt + offset
+		if (lft, rgt) != (cint(tasks[name].get("lft")), cint(tasks[name].get("rgt"))):
+			numbers[name] = {"lft": lft, "rgt": rgt}
+	write_task_fields(numbers, NESTED_SET_FIELDS, touch=False)
+
+
+def _promote_to_group(names):
+	"""What the Task controller's ``before_save`` does for a new parent, for all of them at once."""
+	if names:
+		frappe.db.sql(
+			"""
+			UPDATE `tabTask` SET `is_group` = 1, `modified` = %s, `modified_by` = %s
+			WHERE `name` IN %s
+			""",
+			(now_datetime(), frappe.session.user, tuple(names)),
+		)
+
+
+def _add_parent_dependencies(tasks, pairs):
+	"""ERPNext's ``populate_depends_on``: a parent depends on each child, one ``bulk_insert``."""
+	if not pairs:
+		return
+	last_idx = dict(
+		frappe.db.sql(
+			"""
+			SELECT `parent`, MAX(`idx`) FROM `tabTask Depends On`
+			WHERE `parenttype` = 'Task' AND `parent` IN %s
+			GROUP BY `parent`
+			""",
+			(tuple({parent for _child, parent in pairs}),),
+		)
+	)
+	stamp = now_datetime()
+	user = frappe.session.user
+	values = []
+	for child, parent in pairs:
+		last_idx[parent] = cint(last_idx.get(parent)) + 1
+		values.append(
+			(
+				frappe.generate_hash(length=10), parent, "Task", "depends_on", last_idx[parent],
+				child, tasks[child].get("subject"), stamp, stamp, user, user, 0,
+			)
+		)
+	frappe.db.bulk_insert(
+		"Task Depends On",
+		fields=[
+			"name", "parent", "parenttype", "parentfield", "idx",
+			"task", "subject", "creation", "modified", "owner", "modified_by", "docstatus",
+		],
+		values=values,
+	)
+
+
+def _save_each(changes):
+	"""The per-row path, for legacy trees that cross projects. Every Task hook runs."""
+	for name, change in changes.items():
+		task_doc = frappe.get_doc("Task", name)
+		task_doc.parent_task = change["parent_task"]
+		task_doc.custom_subtask_order = change["custom_subtask_order"]
+		# ignore_permissions: the caller checked write access on the project.
+		task_doc.save(ignore_permissions=True)
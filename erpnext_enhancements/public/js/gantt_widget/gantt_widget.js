@@ -69,6 +69,10 @@
  *     group_by: "custom_master_project",    // optional: composite grouping
  *                                           //   (or a list: first non-empty wins)
  *     extra_fields: ["project_type"],       // optional: raw values per row
+ *     critical_path: true,                  // optional (Task rows): the server
+ *                                           //   stamps CPM float per row; zero-
+ *                                           //   float bars and the links between
+ *                                           //   them are drawn as the critical path
  *     children: { doctype, link_field, fields, ..., lazy: true },
  *     lazy_children: true,                  // pair with children.lazy: draws a
  *                                           //   caret per branch and defers load
@@ -462,7 +466,15 @@ frappe.provide("erpnext_enhancements.gantt");
 					const dates = `${g.templates.tooltip_date_format(start)} – ${g.templates.tooltip_date_format(end)}`;
 					const progress =
 						task.progress != null ? `<br/>${Math.round(task.progress * 100)}%` : "";
-					return `<b>${esc(task.text || "")}</b><br/>${dates}${progress}`;
+					const slack =
+						task.ee_total_float != null
+							? `<br/>${
+									task.ee_critical
+										? __("Critical path")
+										: __("Float: {0} working days", [task.ee_total_float])
+							  }`
+							: "";
+					return `<b>${esc(task.text || "")}</b><br/>${dates}${progress}${slack}`;
 				};
 			}
 			// LABELS. A bar only a few pixels wide (a one-day task in Month
@@ -486,6 +498,15 @@ frappe.provide("erpnext_enhancements.gantt");
 			// does, so its HTML sanitising policy still applies.
 			g.templates.task_text = (start, end, task) =>
 				label_fits(start, end, task) ? task.text : "";
+			if (this.config.critical_path) {
+				// Flags come from the server's CPM pass (critical_path.py), so the
+				// client never walks the dependency graph itself. A link is
+				// critical only when both of its ends are.
+				const is_critical = (id) => g.isTaskExists(id) && !!g.getTask(id).ee_critical;
+				g.templates.task_class = (start, end, task) => (task.ee_critical ? "ee-gantt-critical" : "");
+				g.templates.link_class = (link) =>
+					is_critical(link.source) && is_critical(link.target) ? "ee-gantt-critical-link" : "";
+			}
 			g.templates.rightside_text = (start, end, task) =>
 				label_fits(start, end, task) ? "" : task.text;
 
@@ -1189,6 +1210,7 @@ frappe.provide("erpnext_enhancements.gantt");
 				group_by: c.group_by || null,
 				children: c.children || null,
 				extra_fields: c.extra_fields || null,
+				critical_path: c.critical_path ? 1 : 0,
 			};
 		}
 
@@ -161,6 +161,9 @@ frappe.ui.form.on("Project", {
 				},
 				filters: { project: docname },
 				dependencies: "depends_on",
+				// Outline the tasks that drive the project's end date. Float is
+				// computed server-side (critical_path.py), per project, cached.
+				critical_path: true,
 				// Drag to reschedule / resize / set progress. Per-row default-deny:
 				// only rows the server reports writable become draggable, and the
 				// write endpoint re-checks the specific Task.
@@ -0,0 +1,201 @@
+"""Buffered, batch-inserted ``QuickBooks Raw Payload`` archive for sync runs.
+
+Every record a batch run fetches is archived before it is upserted. That was a
+``frappe.new_doc(...).insert()`` per record -- the full document lifecycle
+(naming-series lock, validate, hooks, one INSERT) thousands of times per
+import, for an append-only audit row nothing validates. Inside
+``archiving(settings)`` ``sync.store_raw_payload`` instead appends to an
+in-memory buffer, and ``flush`` writes the buffer with ``frappe.db.bulk_insert``
+(multi-row INSERTs). The sync loops flush at each ``QBO_COMMIT_EVERY``
+checkpoint, just before they commit, and ``finish_log``/``fail_log`` flush the
+tail, so what is committed is the same as before -- only the statement count
+changes.
+
+Reading back
+------------
+Payloads are stored in the same ``payload`` column, either as plain JSON or --
+with ``Settings.compress_raw_payloads`` on -- as ``COMPRESSED_PREFIX`` + base64
+of zlib-compressed JSON, typically a quarter of the size. Raw Payload is the
+largest table the integration creates, and nothing queries inside a payload.
+Every reader goes through ``load_payload``, which accepts both forms, so rows
+written before this change and rows written by either setting read the same.
+
+A payload archived earlier in the same run but not yet flushed is still
+visible: ``pending`` returns it, and ``mapping._latest_raw_payload`` asks it
+first (a QBO job resolves its parent Customer's payload that way, often within
+the same page).
+
+Names
+-----
+Raw Payload names are random hashes (``autoname: hash``), not the old
+``QBO-RAW-{YYYY}-{#####}`` series: a multi-row insert cannot take one series
+number at a time, and the series row is shared with every other
+``{#####}`` doctype on the site (see ``sync.QBO_COMMIT_EVERY``). Rows are
+ordered by ``creation``, which ``flush`` keeps strictly increasing within a
+run so ``run_resync`` replays in archive order.
+"""
+
+from __future__ import annotations
+
+import base64
+import contextlib
+import contextvars
+import zlib
+from datetime import timedelta
+
+import frappe
+from frappe.utils import now_datetime
+
+from erpnext_enhancements.quickbooks_online.core.utils import json_dumps, json_loads
+
+# Marks a payload stored as base64(zlib(json)). Not valid JSON, so it can never
+# be mistaken for a plain payload.
+COMPRESSED_PREFIX = "zlib:"
+
+_COLUMNS = (
+	"name",
+	"creation",
+	"modified",
+	"modified_by",
+	"owner",
+	"docstatus",
+	"source",
+	"qbo_entity_type",
+	"qbo_id",
+	"operation",
+	"realm_id",
+	"sync_log",
+	"received_at",
+	"processed",
+	"payload",
+)
+
+_RUN_ARCHIVE: contextvars.ContextVar = contextvars.ContextVar("qbo_raw_archive", default=None)
+
+
+def encode_payload(payload, *, compress):
+	"""The ``payload`` column value for a QBO payload."""
+	text = json_dumps(payload)
+	if not compress:
+		return text
+	return COMPRESSED_PREFIX + base64.b64encode(zlib.compress(text.encode("utf-8"))).decode("ascii")
+
+
+def decode_payload(value):
+	"""The JSON text of a stored payload, compressed or not."""
+	if isinstance(value, str) and value.startswith(COMPRESSED_PREFIX):
+		return zlib.decompress(base64.b64decode(value[len(COMPRESSED_PREFIX) :])).decode("utf-8")
+	return value
+
+
+def load_payload(value, default=None):
+	"""A stored payload as a dict; ``default`` if blank or unreadable."""
+	try:
+		return json_loads(decode_payload(value), default=default)
+	except (TypeError, ValueError, zlib.error):
+		return default
+
+
+class RawPayloadArchiver:
+	"""Buffer of Raw Payload rows for one run, written in bulk on ``flush``."""
+
+	def __init__(self, *, compress):
+		self.compress = bool(compress)
+		self.rows = []
+		self.latest = {}
+		self.written = 0
+		self._last_creation = None
+
+	def add(self, source, entity_type, payload, *, sync_log=None, realm_id=None, operation=None):
+		qbo_id = payload.get("Id") if isinstance(payload, dict) else None
+		row = frappe._dict(
+			source=source,
+			qbo_entity_type=entity_type,
+			qbo_id=qbo_id,
+			operation=operation or (payload.get("operation") if isinstance(payload, dict) else None),
+			realm_id=realm_id,
+			sync_log=sync_log,
+			received_at=now_datetime(),
+			payload=encode_payload(payload, compress=self.compress),
+		)
+		self.rows.append(row)
+		if qbo_id:
+			self.latest[(entity_type, str(qbo_id))] = row
+		return row
+
+	def flush(self):
+		"""Insert every buffered row (multi-row INSERTs) and empty the buffer. Returns the count."""
+		if not self.rows:
+			return 0
+		user = frappe.session.user if getattr(frappe, "session", None) else "Administrator"
+		values = []
+		for row in self.rows:
+			creation = self._next_creation()
+			values.append(
+				(
+					frappe.generate_hash(length=10),
+					creation,
+					creation,
+					user,
+					user,
+					0,
+					row.source,
+					row.qbo_entity_type,
+					row.qbo_id,
+					row.operation,
+					row.realm_id,
+					row.sync_log,
+					row.received_at,
+					0,
+					row.payload,
+				)
+			)
+		frappe.db.bulk_insert("QuickBooks Raw Payload", _COLUMNS, values)
+		count = len(self.rows)
+		self.written += count
+		self.rows = []
+		self.latest = {}
+		return count
+
+	def _next_creation(self):
+		# Strictly increasing, so "creation asc/desc" is archive order even within one flush.
+		creation = now_datetime()
+		if self._last_creation is not None and creation <= self._last_creation:
+			creation = self._last_creation + timedelta(microseconds=1)
+		self._last_creation = creation
+		return creation
+
+
+@contextlib.contextmanager
+def archiving(settings):
+	"""Buffer ``store_raw_payload`` for the rest of the block. Re-entrant; flushes on exit."""
+	current = _RUN_ARCHIVE.get()
+	if current is not None:
+		yield current
+		return
+	archiver = RawPayloadArchiver(compress=getattr(settings, "compress_raw_payloads", 0))
+	token = _RUN_ARCHIVE.set(archiver)
+	try:
+		yield archiver
+		archiver.flush()
+	finally:
+		_RUN_ARCHIVE.reset(token)
+
+
+def active():
+	"""The run's archiver, or None outside ``archiving``."""
+	return _RUN_ARCHIVE.get()
+
+
+def flush():
+	"""Flush the run's buffer (no-op outside a run)."""
+	archiver = _RUN_ARCHIVE.get()
+	return archiver.flush() if archiver is not None else 0
+
+
+def pending(entity_type, qbo_id):
+	"""The latest not-yet-flushed row for an entity in this run, or None."""
+	archiver = _RUN_ARCHIVE.get()
+	if archiver is None:
+		return None
+	return archiver.latest.get((entity_type, str(qbo_id)))
@@ -9,11 +9,22 @@ Token storage is delegated to ``utils.set_secret``/``get_secret`` (encrypted
 Password fields on the singleton Settings doc); ``_store_tokens`` also persists
 the computed expiry and connection status. The client transparently refreshes
 on a 401 and retries the request once.
+
+Connection reuse: a sync run wraps itself in ``http_session(settings)``, which
+opens one keep-alive ``requests.Session`` (pool size and GET retry/backoff from
+Settings) and makes it the session every ``QuickBooksClient`` built during the
+run sends through. A full import is thousands of GETs to one host, and without
+it each paid its own TCP + TLS handshake. ``session_stats`` reads back how many
+requests went out and how many new connections they needed; ``sync`` writes
+that onto the run's Sync Log. Outside a run the client falls back to the
+module-level ``requests`` calls, exactly as before.
 """
 
 from __future__ import annotations
 
 import base64
+import contextlib
+import contextvars
 from urllib.parse import urlencode
 
 import frappe
@@ -23,7 +34,11 @@ from frappe.utils.synchronization import filelock
 
 from erpnext_enhancements.quickbooks_online.core.constants import (
 	AUTHORIZATION_URL,
+	DEFAULT_HTTP_BACKOFF_SECONDS,
+	DEFAULT_HTTP_MAX_RETRIES,
+	DEFAULT_HTTP_POOL_SIZE,
 	ENVIRONMENT_BASE_URLS,
+	HTTP_RETRY_STATUSES,
 	MINOR_VERSION,
 	OAUTH_SCOPE,
 	REVOKE_URL,
@@ -40,6 +55,11 @@ from erpnext_enhancements.quickbooks_online.core.utils import (
 # Lock name serializing token refreshes across workers (see refresh_access_token).
 TOKEN_REFRESH_LOCK = "quickbooks_online_token_refresh"
 
+# The pooled session of the sync run in progress on this worker, if any (see
+# http_session). A ContextVar rather than a module global so a thread that did
+# not open the run -- a prefetch thread, say -- sees none unless handed one.
+_RUN_SESSION: contextvars.ContextVar = contextvars.ContextVar("qbo_run_session", default=None)
+
 
 class QuickBooksAPIError(Exception):
 	"""Raised when a QBO token or data request returns an HTTP error (>=400)."""
@@ -47,6 +67,19 @@ class QuickBooksAPIError(Exception):
 	pass
 
 
+class QuickBooksTokenExpiredError(QuickBooksAPIError):
+	"""Raised by a ``detached_query`` callable on a 401.
+
+	A detached call runs off the main thread and so cannot refresh the token
+	itself (refreshing writes Settings). It raises this instead, carrying the
+	rejected ``access_token``, and the main thread refreshes and retries.
+	"""
+
+	def __init__(self, message, access_token=None):
+		super().__init__(message)
+		self.access_token = access_token
+
+
 class QuickBooksDisconnectedError(QuickBooksAPIError):
 	"""Raised when the OAuth grant is dead (``invalid_grant``).
 
@@ -71,16 +104,116 @@ def _error_snippet(text, limit=500):
 	return text if len(text) <= limit else text[:limit] + "… (truncated)"
 
 
+def new_session(settings=None):
+	"""Build a keep-alive ``requests.Session`` with a sized pool and GET retries.
+
+	Pool size, retry count and backoff come from the Settings fields of the same
+	names (``http_pool_size``, ``http_max_retries``, ``http_backoff_seconds``),
+	falling back to the constants when blank. Retries cover connection errors
+	and the ``HTTP_RETRY_STATUSES`` on GET only, honour ``Retry-After``, and
+	hand the final response back rather than raising, so ``request`` still turns
+	a persistent 5xx into ``QuickBooksAPIError``.
+	"""
+	from requests.adapters import HTTPAdapter
+	from urllib3.util.retry import Retry
+
+	pool_size = _positive_int(getattr(settings, "http_pool_size", None), DEFAULT_HTTP_POOL_SIZE)
+	max_retries = _positive_int(getattr(settings, "http_max_retries", None), DEFAULT_HTTP_MAX_RETRIES)
+	backoff = getattr(settings, "http_backoff_seconds", None)
+	backoff = float(backoff) if backoff not in (None, "") and float(backoff) >= 0 else DEFAULT_HTTP_BACKOFF_SECONDS
+
+	retry = Retry(
+		total=max_retries,
+		connect=max_retries,
+		read=max_retries,
+		status=max_retries,
+		backoff_factor=backoff,
+		status_forcelist=HTTP_RETRY_STATUSES,
+		allowed_methods=frozenset({"GET"}),
+		respect_retry_after_header=True,
+		raise_on_status=False,
+	)
+	adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+	session = requests.Session()
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+	return session
+
+
+def session_stats(session):
+	"""``{"requests", "new_connections", "reused_connections"}`` for a session so far.
+
+	Read from urllib3's own per-pool counters (``num_requests`` counts every
+	request sent, retries included; ``num_connections`` every socket opened, so
+	every TCP + TLS handshake). Must be called before the session is closed,
+	which drops the pools. All zeros for a session that sent nothing.
+	"""
+	sent = opened = 0
+	# One adapter is mounted for both schemes; count it once.
+	adapters = {id(adapter): adapter for adapter in getattr(session, "adapters", {}).values()}
+	for adapter in adapters.values():
+		pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+		if pools is None:
+			continue
+		for key in list(pools.keys()):
+			pool = pools.get(key)
+			sent += int(getattr(pool, "num_requests", 0) or 0)
+			opened += int(getattr(pool, "num_connections", 0) or 0)
+	return {"requests": sent, "new_connections": opened, "reused_connections": max(sent - opened, 0)}
+
+
+@contextlib.contextmanager
+def http_session(settings=None):
+	"""Make one pooled session the transport for every client built in the block.
+
+	Re-entrant: inside an outer run (``retry_failed`` -> ``run_cdc``) the outer
+	session is reused, so the whole chain shares its connections and its stats.
+	The session that opened here is closed here.
+	"""
+	current = _RUN_SESSION.get()
+	if current is not None:
+		yield current
+		return
+	session = new_session(settings)
+	token = _RUN_SESSION.set(session)
+	try:
+		yield session
+	finally:
+		_RUN_SESSION.reset(token)
+		session.close()
+
+
+def active_session():
+	"""The pooled session of the run in progress, or None outside a run."""
+	return _RUN_SESSION.get()
+
+
+def _positive_int(value, default):
+	try:
+		number = int(value or 0)
+	except (TypeError, ValueError):
+		return default
+	return number if number > 0 else default
+
+
 class QuickBooksClient:
 	"""Thin wrapper around the QBO OAuth2 + REST endpoints.
 
 	Bound to a single ``QuickBooks Online Settings`` doc (loaded lazily if not
 	passed) which supplies credentials, the realm id and the Sandbox/Production
-	environment. Construct per-operation; it is cheap and holds no connection.
+	environment. Construct per-operation; it is cheap. Sends through ``session``
+	if given, else the run's pooled session (``http_session``), else plain
+	``requests`` -- so a client built inside a sync run reuses the run's
+	connections without being told to.
 	"""
 
-	def __init__(self, settings=None):
+	def __init__(self, settings=None, *, session=None):
 		self.settings = settings or get_settings()
+		self.session = session or active_session()
+
+	def _http(self):
+		"""The transport: a pooled ``Session`` or the ``requests`` module (same ``request``/``post``)."""
+		return self.session or requests
 
 	def get_base_url(self):
 		"""Return the API host for the configured environment (defaults Sandbox)."""
@@ -273,16 +406,34 @@ class QuickBooksClient:
 		the refresh token on every pass, the very failure the serialized refresh
 		exists to prevent.
 		"""
+		access_token = self._access_token()
+		params = kwargs.pop("params", {}) or {}
+		response = self._send(access_token, method, path, params=params, **kwargs)
+		# 401 => access token expired/revoked: refresh once and retry the same call.
+		if response.status_code == 401 and not _refreshed:
+			self.refresh_access_token(previous_access_token=access_token)
+			return self.request(method, path, _refreshed=True, **kwargs, params=params)
+		if response.status_code >= 400:
+			raise QuickBooksAPIError(f"QuickBooks API request failed: {response.status_code} {_error_snippet(response.text)}")
+		return response.json() if response.text else {}
+
+	def _access_token(self):
+		"""The stored access token (a Settings read); throws if the integration is not connected."""
 		access_token = get_secret(self.settings, "access_token")
 		if not access_token:
 			frappe.throw("QuickBooks Online access token is missing. Connect the integration first.")
+		return access_token
 
-		url = f"{self.get_base_url()}{path}"
-		params = kwargs.pop("params", {}) or {}
+	def _send(self, access_token, method, path, *, params=None, base_url=None, **kwargs):
+		"""Send one authenticated call and return the raw response. HTTP only -- no Frappe state.
+
+		``base_url`` lets a detached caller pass the URL it resolved on the main thread.
+		"""
+		params = params if params is not None else {}
 		params.setdefault("minorversion", MINOR_VERSION)
-		response = requests.request(
+		return self._http().request(
 			method,
-			url,
+			f"{base_url or self.get_base_url()}{path}",
 			headers={
 				"Accept": "application/json",
 				"Authorization": f"Bearer {access_token}",
@@ -292,13 +443,39 @@ class QuickBooksClient:
 			timeout=kwargs.pop("timeout", 60),
 			**kwargs,
 		)
-		# 401 => access token expired/revoked: refresh once and retry the same call.
-		if response.status_code == 401 and not _refreshed:
-			self.refresh_access_token(previous_access_token=access_token)
-			return self.request(method, path, _refreshed=True, **kwargs, params=params)
-		if response.status_code >= 400:
-			raise QuickBooksAPIError(f"QuickBooks API request failed: {response.status_code} {_error_snippet(response.text)}")
-		return response.json() if response.text else {}
+
+	def detached_query(self):
+		"""A ``query`` callable that is safe to call from a background thread.
+
+		Resolves everything that touches Frappe -- the access token, the base URL,
+		the realm -- here, on the calling (main) thread, and returns a closure that
+		does nothing but HTTP through this client's session. ``sync.query_all``'s
+		page prefetcher runs it on a fetcher thread, where ``frappe.db`` is not
+		this worker's connection. A 401 raises ``QuickBooksTokenExpiredError``
+		instead of refreshing; the main thread refreshes and asks for a new one.
+		"""
+		access_token = self._access_token()
+		base_url = self.get_base_url()
+		path = f"/v3/company/{self.settings.realm_id}/query"
+
+		def query(statement):
+			response = self._send(
+				access_token,
+				"GET",
+				path,
+				params={"query": statement},
+				base_url=base_url,
+				content_type="text/plain",
+			)
+			if response.status_code == 401:
+				raise QuickBooksTokenExpiredError("QuickBooks API request failed: 401", access_token=access_token)
+			if response.status_code >= 400:
+				raise QuickBooksAPIError(
+					f"QuickBooks API request failed: {response.status_code} {_error_snippet(response.text)}"
+				)
+			return response.json() if response.text else {}
+
+		return query
 
 	def upload_attachable(self, *, file_bytes, file_name, mime_type, entity_type, qbo_id, _refreshed=False):
 		"""Upload a file to QBO and attach it to ``entity_type``/``qbo_id`` (a Bill
@@ -316,7 +493,7 @@ class QuickBooksClient:
 			"FileName": file_name,
 			"ContentType": mime_type,
 		}
-		response = requests.post(
+		response = self._http().post(
 			f"{self.get_base_url()}/v3/company/{self.settings.realm_id}/upload",
 			headers={"Accept": "application/json", "Authorization": f"Bearer {access_token}"},
 			files={
@@ -338,8 +515,9 @@ class QuickBooksClient:
 	def query(self, query: str):
 		"""Run a QBO SQL-like query (the ``/query`` endpoint, text/plain body).
 
-		Used by ``sync.query_all`` for paginated full imports. The query string
-		uses QBO's ``startposition``/``maxresults`` paging syntax.
+		Used by ``sync.query_all`` for paginated full imports when prefetch is off
+		(otherwise ``detached_query``). The query string uses QBO's
+		``startposition``/``maxresults`` paging syntax.
 		"""
 		return self.request(
 			"GET",
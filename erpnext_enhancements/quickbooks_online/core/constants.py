@@ -132,6 +132,31 @@ OAUTH_SCOPE = "com.intuit.quickbooks.accounting"
 # data request to lock the response schema this mapping code was written for.
 MINOR_VERSION = 75
 
+# Paging for full imports (sync.query_all). QBO returns at most 1000 rows per
+# query page; a bigger page means ten times fewer round trips than the old fixed
+# 100. Settings.import_page_size may lower it (a smaller page holds less memory
+# per queued page), never raise it past QBO's cap.
+QBO_MAX_PAGE_SIZE = 1000
+DEFAULT_IMPORT_PAGE_SIZE = 1000
+# Pages a background fetcher may hold ready ahead of the upsert loop
+# (Settings.import_prefetch_pages; 0 = fetch in turn, no thread). Each queued
+# page is up to QBO_MAX_PAGE_SIZE payloads in memory, hence the hard cap.
+DEFAULT_IMPORT_PREFETCH_PAGES = 2
+MAX_IMPORT_PREFETCH_PAGES = 8
+
+# HTTP connection pooling for a sync run (client.http_session). Defaults for the
+# Settings fields of the same names; a blank/0 field falls back to these. One
+# run talks to one host, so the pool size caps the keep-alive sockets kept open
+# to it -- more than the few threads a run uses buys nothing.
+DEFAULT_HTTP_POOL_SIZE = 10
+DEFAULT_HTTP_MAX_RETRIES = 3
+DEFAULT_HTTP_BACKOFF_SECONDS = 0.5
+# Retried with backoff (honouring Retry-After) on idempotent GETs only: 429 is
+# QBO's throttle, the 5xx are its transient gateway errors. A POST is never
+# retried by the transport -- a write that timed out may have landed, and
+# replaying it blind would duplicate a Bill or Payment in QuickBooks.
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
 # Canonical QBO entity name -> native ERPNext DocType. Used to decide whether a
 # QBO record has an ERPNext destination at all (webhooks.get_erpnext_doctype)
 # and to dispatch to the right mapper (mapping.map_qbo_to_erpnext). Several QBO
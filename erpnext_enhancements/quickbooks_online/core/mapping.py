@@ -25,6 +25,7 @@ import re
 import frappe
 from frappe.utils import cint, flt, now_datetime
 
+from erpnext_enhancements.quickbooks_online.core import archive, mapping_cache
 from erpnext_enhancements.quickbooks_online.core.constants import (
 	DEFAULT_SALES_TAX_ACCOUNT_NUMBER,
 	ENTITY_DOCTYPE_MAP,
@@ -435,7 +436,7 @@ def link_existing_record(
 		frappe.throw(f"{erpnext_doctype} {erpnext_name} does not exist.")
 
 	payload_doc = _latest_raw_payload(entity_type, qbo_id)
-	payload = json_loads(payload_doc.payload, default={}) if payload_doc else {}
+	payload = archive.load_payload(payload_doc.payload, default={}) if payload_doc else {}
 	if not payload:
 		frappe.throw("No QuickBooks raw payload is available for this entity. Sync or preview it first.")
 
@@ -486,7 +487,7 @@ def preview_existing_matches(entity_types=None, limit=100):
 	):
 		if not raw.qbo_id or get_mapping(raw.qbo_entity_type, raw.qbo_id):
 			continue
-		payload = json_loads(raw.payload, default={}) or {}
+		payload = archive.load_payload(raw.payload, default={}) or {}
 		erpnext_doctype, values = map_qbo_to_erpnext(raw.qbo_entity_type, payload, settings)
 		match = find_existing_match(raw.qbo_entity_type, payload, settings)
 		results.append(
@@ -525,12 +526,20 @@ def mark_deleted(entity_type: str, qbo_id: str, *, preview=False):
 
 
 def get_mapping(entity_type: str, qbo_id: str):
-	"""Fetch the ``QuickBooks Sync Mapping`` for (entity_type, qbo_id), or None."""
-	name = frappe.db.get_value(
-		"QuickBooks Sync Mapping",
-		{"qbo_entity_type": entity_type, "qbo_id": str(qbo_id)},
-		"name",
-	)
+	"""Fetch the ``QuickBooks Sync Mapping`` for (entity_type, qbo_id), or None.
+
+	Inside a batch run the existence check is answered by ``mapping_cache`` (so an
+	unmapped record costs no query); the doc itself is always loaded fresh.
+	"""
+	hit, row = mapping_cache.find(entity_type, qbo_id)
+	if hit:
+		name = row[0] if row else None
+	else:
+		name = frappe.db.get_value(
+			"QuickBooks Sync Mapping",
+			{"qbo_entity_type": entity_type, "qbo_id": str(qbo_id)},
+			"name",
+		)
 	return frappe.get_doc("QuickBooks Sync Mapping", name) if name else None
 
 
@@ -593,6 +602,7 @@ def save_mapping(
 		mapping.insert(ignore_permissions=True)
 	else:
 		mapping.save(ignore_permissions=True)
+	mapping_cache.remember(mapping)
 	return mapping
 
 
@@ -619,6 +629,7 @@ def save_pending_mapping(entity_type: str, qbo_id: str, payload: dict, erpnext_d
 		mapping.insert(ignore_permissions=True)
 	else:
 		mapping.save(ignore_permissions=True)
+	mapping_cache.remember(mapping)
 	return mapping
 
 
@@ -646,6 +657,7 @@ def save_manual_review_mapping(entity_type: str, qbo_id: str, payload: dict, erp
 		mapping.insert(ignore_permissions=True)
 	else:
 		mapping.save(ignore_permissions=True)
+	mapping_cache.remember(mapping)
 	return mapping
 
 
@@ -1501,14 +1513,19 @@ def _raw_payload_dict(entity_type, qbo_id):
 	doc = _latest_raw_payload(entity_type, qbo_id)
 	if not doc or not doc.payload:
 		return None
-	try:
-		return json_loads(doc.payload)
-	except (TypeError, ValueError):
-		return None
+	return archive.load_payload(doc.payload)
 
 
 def _latest_raw_payload(entity_type, qbo_id):
-	"""Return the most recent stored raw payload doc for an entity, or None."""
+	"""Return the most recent stored raw payload doc for an entity, or None.
+
+	A payload archived earlier in the current run but not yet flushed (see
+	``archive``) is the most recent one, so it is returned first. Its ``payload``
+	may be compressed either way; read it with ``archive.load_payload``.
+	"""
+	buffered = archive.pending(entity_type, qbo_id)
+	if buffered is not None:
+		return buffered
 	name = frappe.db.get_value(
 		"QuickBooks Raw Payload",
 		{"qbo_entity_type": entity_type, "qbo_id": str(qbo_id)},
@@ -2618,10 +2635,14 @@ def _linked_name(qbo_entity_type: str, erpnext_doctype: str, qbo_id: str | None)
 
 	The bridge that lets transaction mappers point at already-imported masters
 	(e.g. an Invoice's CustomerRef -> the ERPNext Customer). Returns None if the
-	referenced entity has not been mapped yet.
+	referenced entity has not been mapped yet. Served from ``mapping_cache``
+	inside a batch run.
 	"""
 	if not qbo_id:
 		return None
+	hit, row = mapping_cache.find(qbo_entity_type, qbo_id)
+	if hit:
+		return row[2] if row and row[1] == erpnext_doctype else None
 	return frappe.db.get_value(
 		"QuickBooks Sync Mapping",
 		{"qbo_entity_type": qbo_entity_type, "qbo_id": str(qbo_id), "erpnext_doctype": erpnext_doctype},
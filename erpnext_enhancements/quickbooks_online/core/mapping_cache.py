@@ -0,0 +1,149 @@
+"""Run-scoped, in-memory view of the ``QuickBooks Sync Mapping`` ledger.
+
+Every record an import upserts asks the ledger "is this QBO id already mapped?"
+(``mapping.get_mapping``), and every reference on it -- the CustomerRef, each
+line's AccountRef/ItemRef/ClassRef, the TaxCode -- asks "what did this QBO id
+become in ERPNext?" (``mapping._linked_name``). Each was a point query, so a
+2,000-line import re-read the same few hundred accounts and parties tens of
+thousands of times.
+
+``preloaded(entity_types)`` reads the ledger rows for those QBO types once, at
+the start of a batch run (``sync.import_all`` / ``preview_resync`` /
+``run_cdc``), and makes them the answer to both questions for the rest of the
+run. Because the whole type is loaded, a key that is absent really is unmapped,
+so "not mapped yet" -- the common case for the records an import creates -- is
+answered from memory too. Types not preloaded fall through to the database as
+before; those lookups are the misses. The ``save_*`` helpers in ``mapping``
+write through (``remember``), so a master created early in the run resolves for
+the transactions after it.
+
+Writes follow the run's savepoints: ``sync.safe_upsert`` rolls a failed
+record's partial writes back to ``qbo_upsert``, and calls ``rollback`` here so a
+mapping that no longer exists in the database does not survive in memory.
+``savepoint`` starts a new journal at the same point.
+
+Another worker writing the ledger mid-run (a webhook's ``sync_entity``) is not
+seen. That is safe: mapping names are ``QBO-MAP-{type}-{id}``, so an insert for
+a key that appeared behind the cache's back fails on the duplicate name and the
+record is counted Failed and retried, rather than duplicated.
+
+Outside ``preloaded`` every function here is a no-op and every lookup goes to
+the database, exactly as before. The cache lives in a ContextVar, like the
+run's HTTP session (``client.http_session``).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+
+import frappe
+
+_RUN_CACHE: contextvars.ContextVar = contextvars.ContextVar("qbo_mapping_cache", default=None)
+
+# Marks a key the journal saw absent, so rollback removes it rather than restoring a value.
+_ABSENT = object()
+
+
+class MappingCache:
+	"""``(qbo_entity_type, qbo_id) -> (mapping name, erpnext_doctype, erpnext_name)`` for whole types."""
+
+	def __init__(self, entity_types, rows):
+		self.entity_types = frozenset(entity_types)
+		self.rows = {
+			(row.qbo_entity_type, str(row.qbo_id)): (row.name, row.erpnext_doctype, row.erpnext_name)
+			for row in rows
+		}
+		self.hits = 0
+		self.misses = 0
+		self._journal = {}
+
+	def covers(self, entity_type):
+		return entity_type in self.entity_types
+
+	def lookup(self, entity_type, qbo_id):
+		"""The cached row for a key, or None. Only meaningful for a type the cache ``covers``."""
+		self.hits += 1
+		return self.rows.get((entity_type, str(qbo_id)))
+
+	def put(self, mapping):
+		key = (mapping.qbo_entity_type, str(mapping.qbo_id))
+		self._journal.setdefault(key, self.rows.get(key, _ABSENT))
+		self.rows[key] = (mapping.name, mapping.erpnext_doctype, mapping.erpnext_name)
+
+	def savepoint(self):
+		self._journal = {}
+
+	def rollback(self):
+		for key, previous in self._journal.items():
+			if previous is _ABSENT:
+				self.rows.pop(key, None)
+			else:
+				self.rows[key] = previous
+		self._journal = {}
+
+	def stats(self):
+		return {"hits": self.hits, "misses": self.misses}
+
+
+@contextlib.contextmanager
+def preloaded(entity_types):
+	"""Serve mapping lookups for ``entity_types`` from one bulk read for the rest of the block.
+
+	Re-entrant: inside an outer run the outer cache is reused as-is.
+	"""
+	current = _RUN_CACHE.get()
+	if current is not None:
+		yield current
+		return
+	entity_types = sorted(set(entity_types))
+	rows = (
+		frappe.get_all(
+			"QuickBooks Sync Mapping",
+			filters={"qbo_entity_type": ["in", entity_types]},
+			fields=["name", "qbo_entity_type", "qbo_id", "erpnext_doctype", "erpnext_name"],
+			limit_page_length=0,
+		)
+		if entity_types
+		else []
+	)
+	token = _RUN_CACHE.set(MappingCache(entity_types, rows))
+	try:
+		yield _RUN_CACHE.get()
+	finally:
+		_RUN_CACHE.reset(token)
+
+
+def active():
+	"""The run's cache, or None outside ``preloaded``."""
+	return _RUN_CACHE.get()
+
+
+def find(entity_type, qbo_id):
+	"""``(hit, row)``: ``hit`` False means the caller must ask the database (and counts a miss)."""
+	cache = _RUN_CACHE.get()
+	if cache is None:
+		return False, None
+	if not cache.covers(entity_type):
+		cache.misses += 1
+		return False, None
+	return True, cache.lookup(entity_type, qbo_id)
+
+
+def remember(mapping):
+	"""Write a just-saved mapping through to the run's cache (no-op outside a run)."""
+	cache = _RUN_CACHE.get()
+	if cache is not None and cache.covers(mapping.qbo_entity_type):
+		cache.put(mapping)
+
+
+def savepoint():
+	cache = _RUN_CACHE.get()
+	if cache is not None:
+		cache.savepoint()
+
+
+def rollback():
+	cache = _RUN_CACHE.get()
+	if cache is not None:
+		cache.rollback()
@@ -0,0 +1,82 @@
+"""Read-ahead paging for QBO queries: fetch page N+1 while page N is being written.
+
+``sync.query_all`` used to ask for a page, hand every record on it to the upsert,
+and only then ask for the next one -- so a full import spent its time alternating
+between waiting on Intuit and waiting on MariaDB, never both at once. ``pages``
+moves the fetching onto one background thread that keeps up to ``depth`` pages
+queued ahead of the consumer. Network and database time overlap, and the bounded
+queue caps how far the fetcher can run ahead (each page is up to 1000 records
+held in memory).
+
+The fetcher thread must not touch Frappe: ``frappe.db`` and ``frappe.local`` are
+bound to the worker's main thread. The ``fetch`` callable handed in does HTTP
+only (``QuickBooksClient.detached_query``); every read and write of the database
+stays with the consumer. Stdlib only.
+
+An exception from ``fetch`` is not raised on the fetcher thread -- it is queued in
+the failed page's place and re-raised to the consumer when it reaches that page,
+with every earlier page already delivered. The fetcher stops there. A consumer
+that stops early (an upsert raised, the generator was closed) stops the fetcher
+too, so an aborted run never leaves a thread paging through a company's data.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+
+# How long a blocked put waits before re-checking whether the consumer has gone.
+_POLL_SECONDS = 0.1
+
+
+class _End:
+	"""Queued after the last page."""
+
+
+def pages(fetch, *, start, page_size, depth):
+	"""Yield ``(position, records)`` for every page from ``start``, prefetched ``depth`` ahead.
+
+	``fetch(position)`` returns the records of the page starting at ``position``.
+	A page shorter than ``page_size`` is the last. ``depth`` is the most pages
+	fetched but not yet consumed (at least 1).
+	"""
+	ready = queue.Queue(maxsize=max(int(depth), 1))
+	stopped = threading.Event()
+
+	def put(item):
+		while not stopped.is_set():
+			try:
+				ready.put(item, timeout=_POLL_SECONDS)
+				return True
+			except queue.Full:
+				continue
+		return False
+
+	def produce():
+		position = start
+		while not stopped.is_set():
+			try:
+				records = fetch(position)
+			except Exception as exc:
+				put((position, exc))
+				return
+			if not put((position, records)):
+				return
+			if len(records) < page_size:
+				put((position, _End))
+				return
+			position += page_size
+
+	fetcher = threading.Thread(target=produce, name="qbo-prefetch", daemon=True)
+	fetcher.start()
+	try:
+		while True:
+			position, records = ready.get()
+			if records is _End:
+				return
+			if isinstance(records, Exception):
+				raise records
+			yield position, records
+	finally:
+		stopped.set()
+		fetcher.join()
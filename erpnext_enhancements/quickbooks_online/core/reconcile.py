@@ -25,9 +25,10 @@ from __future__ import annotations
 import frappe
 from frappe.utils import flt, getdate, today
 
+from erpnext_enhancements.quickbooks_online.core import archive
 from erpnext_enhancements.quickbooks_online.core.client import QuickBooksClient
 from erpnext_enhancements.quickbooks_online.core.constants import TRANSACTION_ENTITIES
-from erpnext_enhancements.quickbooks_online.core.utils import get_settings, json_loads
+from erpnext_enhancements.quickbooks_online.core.utils import get_settings
 
 # ERPNext field holding the comparable "total" for each transaction DocType the
 # integration creates. Journal Entries balance, so either side works -- total_debit
@@ -357,7 +358,8 @@ def _payload_total(entity_type: str, qbo_id: str) -> float | None:
 	)
 	if not name:
 		return None
-	payload = json_loads(frappe.db.get_value("QuickBooks Raw Payload", name, "payload"), default={}) or {}
+	stored = frappe.db.get_value("QuickBooks Raw Payload", name, "payload")
+	payload = archive.load_payload(stored, default={}) or {}
 	return _extract_total(entity_type, payload)
 
 
@@ -16,22 +16,41 @@ counters), archives each fetched record as a ``QuickBooks Raw Payload``, and
 funnels writes through ``mapping.upsert_entity`` (wrapped by ``safe_upsert`` so
 one bad record cannot abort an entire batch). Master entities are imported
 before transactions so reference links resolve.
+
+Each operation that talks to QBO runs inside ``client.http_session``, so all of
+its GETs share one pool of keep-alive connections; the log records how many
+requests went out and how many fresh connections (TLS handshakes) they cost.
+The batch runs (import, preview, CDC) also run inside
+``mapping_cache.preloaded``, which answers the Sync Mapping lookups of every
+upsert from one bulk read (the log records its hits and misses), and inside
+``archive.archiving``, which buffers the Raw Payload rows and bulk-inserts them
+at each commit checkpoint.
 """
 
 from __future__ import annotations
 
-import json
 from datetime import timedelta
 
 import frappe
 from frappe.utils import add_to_date, get_datetime, now_datetime
 
-from erpnext_enhancements.quickbooks_online.core.client import QuickBooksClient
+from erpnext_enhancements.quickbooks_online.core import archive, mapping_cache, prefetch
+from erpnext_enhancements.quickbooks_online.core.client import (
+	QuickBooksClient,
+	QuickBooksTokenExpiredError,
+	active_session,
+	http_session,
+	session_stats,
+)
 from erpnext_enhancements.quickbooks_online.core.constants import (
 	ACCOUNTING_ENTITIES,
 	CDC_ENTITIES,
 	CDC_MAX_LOOKBACK_DAYS,
+	DEFAULT_IMPORT_PAGE_SIZE,
+	DEFAULT_IMPORT_PREFETCH_PAGES,
 	MASTER_ENTITIES,
+	MAX_IMPORT_PREFETCH_PAGES,
+	QBO_MAX_PAGE_SIZE,
 	TRANSACTION_ENTITIES,
 )
 from erpnext_enhancements.quickbooks_online.core.mapping import (
@@ -84,47 +103,54 @@ def import_all(entity_types=None):
 	if run_in_progress("Import All"):
 		return None
 	log = start_log("Import All")
-	try:
-		settings.status = "Syncing"
-		settings.save(ignore_permissions=True)
-		frappe.db.commit()
-		processed = 0
-		for entity_type in ordered_entities(entity_types):
-			for payload in query_entity_payloads(entity_type, settings=settings):
-				store_raw_payload(
-					"Import",
-					entity_type,
-					_clean_payload(payload),
-					sync_log=log.name,
-					realm_id=settings.realm_id,
-				)
-				_track_result(log, safe_upsert(entity_type, payload, settings))
-				processed += 1
-				# Commit every QBO_COMMIT_EVERY records so the shared naming-series lock
-				# (and the rows written so far) is released in seconds rather than held
-				# for the minutes a large entity takes -- otherwise one big batch briefly
-				# blocks record creation elsewhere on the site. Counters stay live and a
-				# late failure keeps committed progress (the upsert is idempotent).
-				if processed % QBO_COMMIT_EVERY == 0:
-					log.save(ignore_permissions=True)
-					frappe.db.commit()
-			# Flush this entity's tail (the < QBO_COMMIT_EVERY records since the last
-			# commit) before moving on, so progress is durable at every entity boundary.
-			log.save(ignore_permissions=True)
+	with (
+		http_session(settings),
+		mapping_cache.preloaded(_preload_types(entity_types)),
+		archive.archiving(settings),
+	):
+		try:
+			settings.status = "Syncing"
+			settings.save(ignore_permissions=True)
 			frappe.db.commit()
-		finish_log(log)
-		# Write the end-of-run status with set_value, not a save of the Settings doc we
-		# loaded at the start: a long import spans the hourly token refresh, which modifies
-		# Settings, so a stale-doc save would TimestampMismatch and fail the whole run here.
-		_record_settings_status(
-			"Failed" if log.status == "Failed" else "Connected",
-			_status_message(log, "Full import completed."),
-			{"last_full_import": now_datetime()} if log.status == "Completed" else None,
-		)
-		return log.name
-	except Exception as exc:
-		fail_log(log, exc)
-		raise
+			processed = 0
+			for entity_type in ordered_entities(entity_types):
+				for payload in query_entity_payloads(entity_type, settings=settings):
+					store_raw_payload(
+						"Import",
+						entity_type,
+						_clean_payload(payload),
+						sync_log=log.name,
+						realm_id=settings.realm_id,
+					)
+					_track_result(log, safe_upsert(entity_type, payload, settings))
+					processed += 1
+					# Commit every QBO_COMMIT_EVERY records so the shared naming-series lock
+					# (and the rows written so far) is released in seconds rather than held
+					# for the minutes a large entity takes -- otherwise one big batch briefly
+					# blocks record creation elsewhere on the site. Counters stay live and a
+					# late failure keeps committed progress (the upsert is idempotent).
+					if processed % QBO_COMMIT_EVERY == 0:
+						archive.flush()
+						log.save(ignore_permissions=True)
+						frappe.db.commit()
+				# Flush this entity's tail (the < QBO_COMMIT_EVERY records since the last
+				# commit) before moving on, so progress is durable at every entity boundary.
+				archive.flush()
+				log.save(ignore_permissions=True)
+				frappe.db.commit()
+			finish_log(log)
+			# Write the end-of-run status with set_value, not a save of the Settings doc we
+			# loaded at the start: a long import spans the hourly token refresh, which modifies
+			# Settings, so a stale-doc save would TimestampMismatch and fail the whole run here.
+			_record_settings_status(
+				"Failed" if log.status == "Failed" else "Connected",
+				_status_message(log, "Full import completed."),
+				{"last_full_import": now_datetime()} if log.status == "Completed" else None,
+			)
+			return log.name
+		except Exception as exc:
+			fail_log(log, exc)
+			raise
 
 
 def preview_resync(entity_types=None, log_name=None):
@@ -145,37 +171,44 @@ def preview_resync(entity_types=None, log_name=None):
 	ensure_connected(settings)
 	log = _resume_or_start_log(log_name, "Preview Resync")
 	preview = []
-	try:
-		processed = 0
-		for entity_type in ordered_entities(entity_types):
-			for payload in query_entity_payloads(entity_type, settings=settings):
-				store_raw_payload(
-					"Resync",
-					entity_type,
-					_clean_payload(payload),
-					sync_log=log.name,
-					realm_id=settings.realm_id,
-				)
-				result = safe_upsert(entity_type, payload, settings, preview=True)
-				_track_result(log, result)
-				preview.append({"entity_type": entity_type, "qbo_id": payload.get("Id"), **result})
-				processed += 1
-				# Commit every QBO_COMMIT_EVERY records so this long dry run releases the
-				# shared naming-series lock (it still writes raw payloads, which run_resync
-				# later reads back) in seconds rather than holding it for the whole pass.
-				if processed % QBO_COMMIT_EVERY == 0:
-					log.save(ignore_permissions=True)
-					frappe.db.commit()
-			# Flush this entity's tail before moving on.
-			log.save(ignore_permissions=True)
+	with (
+		http_session(settings),
+		mapping_cache.preloaded(_preload_types(entity_types)),
+		archive.archiving(settings),
+	):
+		try:
+			processed = 0
+			for entity_type in ordered_entities(entity_types):
+				for payload in query_entity_payloads(entity_type, settings=settings):
+					store_raw_payload(
+						"Resync",
+						entity_type,
+						_clean_payload(payload),
+						sync_log=log.name,
+						realm_id=settings.realm_id,
+					)
+					result = safe_upsert(entity_type, payload, settings, preview=True)
+					_track_result(log, result)
+					preview.append({"entity_type": entity_type, "qbo_id": payload.get("Id"), **result})
+					processed += 1
+					# Commit every QBO_COMMIT_EVERY records so this long dry run releases the
+					# shared naming-series lock (it still writes raw payloads, which run_resync
+					# later reads back) in seconds rather than holding it for the whole pass.
+					if processed % QBO_COMMIT_EVERY == 0:
+						archive.flush()
+						log.save(ignore_permissions=True)
+						frappe.db.commit()
+				# Flush this entity's tail before moving on.
+				archive.flush()
+				log.save(ignore_permissions=True)
+				frappe.db.commit()
+			log.preview_payload = json_dumps(preview)
+			finish_log(log)
 			frappe.db.commit()
-		log.preview_payload = json_dumps(preview)
-		finish_log(log)
-		frappe.db.commit()
-		return {"preview_id": log.name, "summary": summarize_log(log), "changes": preview}
-	except Exception as exc:
-		fail_log(log, exc)
-		raise
+			return {"preview_id": log.name, "summary": summarize_log(log), "changes": preview}
+		except Exception as exc:
+			fail_log(log, exc)
+			raise
 
 
 def run_resync(preview_id):
@@ -200,7 +233,7 @@ def run_resync(preview_id):
 			fields=["qbo_entity_type", "payload"],
 			order_by="creation asc",
 		):
-			payload = json.loads(raw.payload)
+			payload = archive.load_payload(raw.payload, default={})
 			result = safe_upsert(raw.qbo_entity_type, payload, settings, overwrite=True)
 			_track_result(log, result)
 			processed += 1
@@ -230,28 +263,29 @@ def sync_entity(entity_type, qbo_id, source="Manual"):
 	settings = get_settings()
 	ensure_connected(settings)
 	log = start_log("Entity Sync", entity_type=entity_type)
-	try:
-		response = QuickBooksClient(settings).get_entity(entity_type, qbo_id)
-		# QBO wraps single-entity GETs under a type-named key (e.g. {"Invoice": {...}}).
-		payload = response.get(entity_type) or response.get(entity_type.lower()) or response
-		store_raw_payload(source, entity_type, payload, sync_log=log.name, realm_id=settings.realm_id)
-		# Savepoint the upsert: fail_log below commits (Settings status must survive the
-		# re-raise), so a partial insert left by a failed upsert would otherwise be committed
-		# as a mapping-less document and later re-imported as a duplicate. Roll it back first,
-		# keeping the archived raw payload and the log.
-		frappe.db.savepoint("qbo_entity_upsert")
+	with http_session(settings):
 		try:
-			result = upsert_entity(entity_type, payload, settings)
-		except Exception:
-			frappe.db.rollback(save_point="qbo_entity_upsert")
+			response = QuickBooksClient(settings).get_entity(entity_type, qbo_id)
+			# QBO wraps single-entity GETs under a type-named key (e.g. {"Invoice": {...}}).
+			payload = response.get(entity_type) or response.get(entity_type.lower()) or response
+			store_raw_payload(source, entity_type, payload, sync_log=log.name, realm_id=settings.realm_id)
+			# Savepoint the upsert: fail_log below commits (Settings status must survive the
+			# re-raise), so a partial insert left by a failed upsert would otherwise be committed
+			# as a mapping-less document and later re-imported as a duplicate. Roll it back first,
+			# keeping the archived raw payload and the log.
+			frappe.db.savepoint("qbo_entity_upsert")
+			try:
+				result = upsert_entity(entity_type, payload, settings)
+			except Exception:
+				frappe.db.rollback(save_point="qbo_entity_upsert")
+				raise
+			_track_result(log, result)
+			finish_log(log)
+			frappe.db.commit()
+			return {"sync_log": log.name, "result": result}
+		except Exception as exc:
+			fail_log(log, exc)
 			raise
-		_track_result(log, result)
-		finish_log(log)
-		frappe.db.commit()
-		return {"sync_log": log.name, "result": result}
-	except Exception as exc:
-		fail_log(log, exc)
-		raise
 
 
 def run_cdc():
@@ -285,46 +319,53 @@ def run_cdc():
 	# so it silently never syncs. Back off two minutes for ERPNext↔QBO clock skew; the small
 	# re-fetch overlap next run is harmless (upserts are idempotent by mapping name).
 	next_cursor = add_to_date(now_datetime(), minutes=-2, as_datetime=True)
-	try:
-		response = QuickBooksClient(settings).cdc(CDC_ENTITIES, changed_since)
-		processed = 0
-		for cdc_response in response.get("CDCResponse", []):
-			for query_response in cdc_response.get("QueryResponse", []):
-				for entity_type, payloads in query_response.items():
-					# QueryResponse mixes entity-name keys (lists) with metadata; skip non-lists.
-					if not isinstance(payloads, list):
-						continue
-					for payload in payloads:
-						store_raw_payload(
-							"CDC", entity_type, payload, sync_log=log.name, realm_id=settings.realm_id
-						)
-						if payload.get("status") == "Deleted":
-							result = mark_deleted(entity_type, payload.get("Id"))
-						else:
-							result = safe_upsert(entity_type, payload, settings)
-						_track_result(log, result)
-						processed += 1
-						# Bound the shared naming-series lock hold on a wide catch-up
-						# window (a first poll after a long pause can be large).
-						if processed % QBO_COMMIT_EVERY == 0:
-							log.save(ignore_permissions=True)
-							frappe.db.commit()
-					# Commit each entity batch so a poll never holds its locks across
-					# the whole CDC window and progress is durable mid-run.
-					log.save(ignore_permissions=True)
-					frappe.db.commit()
-		finish_log(log)
-		# Only advance the cursor on a clean run so failures get reprocessed. Written via
-		# set_value (not a stale-doc save) for the same reason as import_all's finish.
-		_record_settings_status(
-			"Failed" if log.status == "Failed" else "Connected",
-			_status_message(log, "CDC sync completed."),
-			{"last_cdc_sync": next_cursor} if log.status == "Completed" else None,
-		)
-		return log.name
-	except Exception as exc:
-		fail_log(log, exc)
-		raise
+	with (
+		http_session(settings),
+		mapping_cache.preloaded(_preload_types(CDC_ENTITIES)),
+		archive.archiving(settings),
+	):
+		try:
+			response = QuickBooksClient(settings).cdc(CDC_ENTITIES, changed_since)
+			processed = 0
+			for cdc_response in response.get("CDCResponse", []):
+				for query_response in cdc_response.get("QueryResponse", []):
+					for entity_type, payloads in query_response.items():
+						# QueryResponse mixes entity-name keys (lists) with metadata; skip non-lists.
+						if not isinstance(payloads, list):
+							continue
+						for payload in payloads:
+							store_raw_payload(
+								"CDC", entity_type, payload, sync_log=log.name, realm_id=settings.realm_id
+							)
+							if payload.get("status") == "Deleted":
+								result = mark_deleted(entity_type, payload.get("Id"))
+							else:
+								result = safe_upsert(entity_type, payload, settings)
+							_track_result(log, result)
+							processed += 1
+							# Bound the shared naming-series lock hold on a wide catch-up
+							# window (a first poll after a long pause can be large).
+							if processed % QBO_COMMIT_EVERY == 0:
+								archive.flush()
+								log.save(ignore_permissions=True)
+								frappe.db.commit()
+						# Commit each entity batch so a poll never holds its locks across
+						# the whole CDC window and progress is durable mid-run.
+						archive.flush()
+						log.save(ignore_permissions=True)
+						frappe.db.commit()
+			finish_log(log)
+			# Only advance the cursor on a clean run so failures get reprocessed. Written via
+			# set_value (not a stale-doc save) for the same reason as import_all's finish.
+			_record_settings_status(
+				"Failed" if log.status == "Failed" else "Connected",
+				_status_message(log, "CDC sync completed."),
+				{"last_cdc_sync": next_cursor} if log.status == "Completed" else None,
+			)
+			return log.name
+		except Exception as exc:
+			fail_log(log, exc)
+			raise
 
 
 def retry_failed(log_name=None):
@@ -442,9 +483,12 @@ def _clamp_cdc_cursor(changed_since, now):
 def query_all(entity_type, settings=None):
 	"""Yield every QBO record of a type, paging through the query endpoint.
 
-	Generator that walks QBO's ``startposition``/``maxresults`` pagination (100
-	per page) until a short page signals the end. Each page is a separate HTTP
-	call via ``client.query``.
+	Walks QBO's ``startposition``/``maxresults`` pagination until a short page
+	signals the end. The page size is ``Settings.import_page_size`` (default and
+	maximum 1000, QBO's cap). With ``Settings.import_prefetch_pages`` > 0 (the
+	default) pages are fetched by a background thread that stays up to that many
+	pages ahead of the caller (``prefetch.pages``), so the next page is on the wire
+	while this one is being archived and upserted; 0 fetches strictly in turn.
 
 	Master entities add ``where Active in (true, false)`` because QBO's query
 	endpoint returns only active records by default; without it, transactions
@@ -453,21 +497,74 @@ def query_all(entity_type, settings=None):
 	"""
 	settings = settings or get_settings()
 	client = QuickBooksClient(settings)
-	start_position = 1
-	max_results = 100
+	max_results = _bounded_setting(
+		settings, "import_page_size", DEFAULT_IMPORT_PAGE_SIZE, 1, QBO_MAX_PAGE_SIZE
+	)
+	depth = _bounded_setting(
+		settings, "import_prefetch_pages", DEFAULT_IMPORT_PREFETCH_PAGES, 0, MAX_IMPORT_PREFETCH_PAGES
+	)
 	# QBO syntax: the WHERE clause precedes startposition/maxresults paging.
 	condition = " where Active in (true, false)" if entity_type in MASTER_ENTITIES else ""
-	while True:
-		response = client.query(
+
+	def statement(start_position):
+		return (
 			f"select * from {entity_type}{condition} startposition {start_position} maxresults {max_results}"
 		)
-		query_response = response.get("QueryResponse") or {}
-		records = query_response.get(entity_type) or []
-		yield from records
-		# A page smaller than the page size means we've reached the last page.
-		if len(records) < max_results:
-			break
-		start_position += max_results
+
+	def records_of(response):
+		return (response.get("QueryResponse") or {}).get(entity_type) or []
+
+	if not depth:
+		start_position = 1
+		while True:
+			records = records_of(client.query(statement(start_position)))
+			yield from records
+			# A page smaller than the page size means we've reached the last page.
+			if len(records) < max_results:
+				break
+			start_position += max_results
+		return
+
+	start_position = 1
+	refreshed_at = None
+	while True:
+		# Re-detached after a token refresh: the fetcher thread cannot refresh itself.
+		fetch = client.detached_query()
+		try:
+			for position, records in prefetch.pages(
+				lambda position: records_of(fetch(statement(position))),
+				start=start_position,
+				page_size=max_results,
+				depth=depth,
+			):
+				yield from records
+				start_position = position + max_results
+			return
+		except QuickBooksTokenExpiredError as exc:
+			# Same contract as QuickBooksClient.request: one refresh per page, so a token
+			# still rejected straight after a refresh raises instead of looping.
+			if refreshed_at == start_position:
+				raise
+			refreshed_at = start_position
+			client.refresh_access_token(previous_access_token=exc.access_token)
+
+
+def _bounded_setting(settings, fieldname, default, lowest, highest):
+	"""An Int Settings field clamped to ``[lowest, highest]``; blank means ``default``.
+
+	So does 0 when 0 is below the range: a Single saved before the field had a row
+	stores 0 for it, and ``validate`` reads that 0 as blank too.
+	"""
+	value = getattr(settings, fieldname, None)
+	if value in (None, ""):
+		return default
+	try:
+		value = int(value)
+	except (TypeError, ValueError):
+		return default
+	if value == 0 and lowest > 0:
+		return default
+	return min(max(value, lowest), highest)
 
 
 def query_entity_payloads(entity_type, settings=None):
@@ -536,22 +633,40 @@ def safe_upsert(entity_type, payload, settings, **kwargs):
 	# re-creates it (transactions are never fuzzy-matched), a silent duplicate. Rolling back
 	# to the savepoint on failure undoes only this record's partial writes, leaving the rest
 	# of the committed batch intact.
-	frappe.db.savepoint("qbo_upsert")
+	#
+	# The run's mapping cache keeps the same savepoint, so a mapping rolled back here is
+	# forgotten there too.
+	_savepoint()
 	try:
 		return upsert_entity(entity_type, payload, settings, **kwargs)
 	except frappe.exceptions.TimestampMismatchError:
-		frappe.db.rollback(save_point="qbo_upsert")
-		frappe.db.savepoint("qbo_upsert")
+		_rollback()
+		_savepoint()
 		try:
 			return upsert_entity(entity_type, payload, settings, **kwargs)
 		except Exception:
-			frappe.db.rollback(save_point="qbo_upsert")
+			_rollback()
 			return _failed_result(entity_type, payload)
 	except Exception:
-		frappe.db.rollback(save_point="qbo_upsert")
+		_rollback()
 		return _failed_result(entity_type, payload)
 
 
+def _savepoint():
+	frappe.db.savepoint("qbo_upsert")
+	mapping_cache.savepoint()
+
+
+def _rollback():
+	frappe.db.rollback(save_point="qbo_upsert")
+	mapping_cache.rollback()
+
+
+def _preload_types(entity_types):
+	"""QBO types whose mappings a run reads: what it imports, plus every master it references."""
+	return set(MASTER_ENTITIES) | set(ordered_entities(entity_types))
+
+
 def _failed_result(entity_type, payload):
 	"""Log the traceback and build the ``{"action": "failed", ...}`` result dict."""
 	frappe.log_error(
@@ -584,8 +699,17 @@ def store_raw_payload(source, entity_type, payload, *, sync_log=None, realm_id=N
 	The integration's audit trail and the data source ``run_resync`` /
 	``link_existing_record`` replay from. ``source`` is the origin
 	(Import/Resync/Webhook/CDC/Manual); the QBO id/operation are extracted from
-	the payload when it is a dict. Inserts (ignore_permissions) and returns the doc.
+	the payload when it is a dict. Inside a batch run (``archive.archiving``) the
+	row is buffered and bulk-inserted at the next checkpoint, and the buffered row
+	is returned; otherwise inserts (ignore_permissions) and returns the doc. The
+	payload is compressed when ``Settings.compress_raw_payloads`` is on -- read it
+	back with ``archive.load_payload``.
 	"""
+	archiver = archive.active()
+	if archiver is not None:
+		return archiver.add(
+			source, entity_type, payload, sync_log=sync_log, realm_id=realm_id, operation=operation
+		)
 	doc = frappe.new_doc("QuickBooks Raw Payload")
 	doc.source = source
 	doc.qbo_entity_type = entity_type
@@ -594,7 +718,10 @@ def store_raw_payload(source, entity_type, payload, *, sync_log=None, realm_id=N
 	doc.realm_id = realm_id
 	doc.sync_log = sync_log
 	doc.received_at = now_datetime()
-	doc.payload = json_dumps(payload)
+	doc.payload = archive.encode_payload(
+		payload,
+		compress=frappe.db.get_single_value("QuickBooks Online Settings", "compress_raw_payloads"),
+	)
 	doc.insert(ignore_permissions=True)
 	return doc
 
@@ -686,6 +813,8 @@ def fail_log(log, exc):
 	log.error_message = frappe.get_traceback()
 	log.finished_at = now_datetime()
 	log.failed_count = (log.failed_count or 0) + 1
+	archive.flush()
+	_record_run_stats(log)
 	log.save(ignore_permissions=True)
 	# set_value, not a doc save: the error handler must not itself raise a second
 	# TimestampMismatchError (masking the original) when Settings changed mid-run.
@@ -696,9 +825,32 @@ def finish_log(log):
 	"""Close a run: status is Failed if any per-record failures, else Completed."""
 	log.status = "Failed" if (log.failed_count or 0) else "Completed"
 	log.finished_at = now_datetime()
+	archive.flush()
+	_record_run_stats(log)
 	log.save(ignore_permissions=True)
 
 
+def _record_run_stats(log):
+	"""Copy the run's connection and mapping-cache counters onto its log.
+
+	``http_new_connections`` is the handshakes the run paid; ``http_reused_connections``
+	the requests that rode an already-open socket. A healthy full import shows a handful
+	of the former against thousands of the latter. ``mapping_cache_hits`` are ledger
+	lookups answered from memory, ``mapping_cache_misses`` the ones that still went to
+	the database. Each half is a no-op outside its run context.
+	"""
+	session = active_session()
+	if session is not None:
+		stats = session_stats(session)
+		log.http_requests = stats["requests"]
+		log.http_new_connections = stats["new_connections"]
+		log.http_reused_connections = stats["reused_connections"]
+	cache = mapping_cache.active()
+	if cache is not None:
+		log.mapping_cache_hits = cache.hits
+		log.mapping_cache_misses = cache.misses
+
+
 def _status_message(log, completed_message):
 	"""Pick the Settings status message: failure summary or the success text."""
 	if log.status == "Failed":
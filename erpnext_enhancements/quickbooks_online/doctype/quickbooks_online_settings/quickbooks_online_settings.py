@@ -4,13 +4,30 @@ This single doc is the integration's credential and state store: app
 credentials (client_id/client_secret), the webhook verifier token, OAuth state
 (encrypted access/refresh tokens, realm_id, token_expires_at), sync cursors
 (last_full_import/last_cdc_sync/last_webhook_at), connection status and tuning
-(cdc_poll_minutes, retry_limit). Secrets are stored in encrypted Password
-fields and read/written via ``utils.get_secret``/``set_secret``.
+(cdc_poll_minutes, retry_limit, import_page_size/import_prefetch_pages,
+compress_raw_payloads, http_pool_size/http_max_retries/http_backoff_seconds). Secrets are stored in
+encrypted Password fields and read/written via ``utils.get_secret``/``set_secret``.
 """
 
 import frappe
 from frappe.model.document import Document
 
+from erpnext_enhancements.quickbooks_online.core.constants import (
+	DEFAULT_IMPORT_PAGE_SIZE,
+	DEFAULT_IMPORT_PREFETCH_PAGES,
+	MAX_IMPORT_PREFETCH_PAGES,
+	QBO_MAX_PAGE_SIZE,
+)
+
+# Paging dials added after sites already had this Single. Such a site has no
+# tabSingles row for them, so they load as None, and the save that follows (any
+# save: import_all, a token refresh) would store 0. For the prefetch depth 0 is a
+# real setting ("fetch in turn"), so a missing row must get its default first.
+PAGING_DEFAULTS = {
+	"import_page_size": DEFAULT_IMPORT_PAGE_SIZE,
+	"import_prefetch_pages": DEFAULT_IMPORT_PREFETCH_PAGES,
+}
+
 
 class QuickBooksOnlineSettings(Document):
 	"""Settings singleton; only enforces basic config invariants on save."""
@@ -18,8 +35,10 @@ class QuickBooksOnlineSettings(Document):
 	def validate(self):
 		"""Guard config: require a Company before enabling sync; enforce environment.
 
-		Raises if sync is enabled without an ERPNext Company set, or if environment
-		is anything other than Sandbox/Production.
+		Raises if sync is enabled without an ERPNext Company set, if environment
+		is anything other than Sandbox/Production, or if the import paging fields
+		are outside what QBO (page size) and memory (prefetch depth) allow. A paging
+		field with no stored value gets its default before it can be saved as 0.
 		"""
 		if self.sync_enabled and not self.company:
 			frappe.throw("ERPNext Company is required before enabling QuickBooks Online sync.")
@@ -27,3 +46,13 @@ class QuickBooksOnlineSettings(Document):
 		if self.environment not in {"Sandbox", "Production"}:
 			frappe.throw("Environment must be Sandbox or Production.")
 
+		for fieldname, default in PAGING_DEFAULTS.items():
+			if self.get(fieldname) in (None, ""):
+				self.set(fieldname, default)
+
+		if not 0 < (self.import_page_size or QBO_MAX_PAGE_SIZE) <= QBO_MAX_PAGE_SIZE:
+			frappe.throw(f"Import Page Size must be between 1 and {QBO_MAX_PAGE_SIZE} (QuickBooks' maximum).")
+
+		if not 0 <= (self.import_prefetch_pages or 0) <= MAX_IMPORT_PREFETCH_PAGES:
+			frappe.throw(f"Import Prefetch Pages must be between 0 and {MAX_IMPORT_PREFETCH_PAGES}.")
+
@@ -4,14 +4,20 @@ Append-only audit log of every QBO payload the integration fetched or received,
 written by ``sync.store_raw_payload``. Stores the source (Import/Resync/Webhook/
 CDC/Manual), entity type/id, owning realm, the linked sync log and the verbatim
 JSON payload. It is also the data source replayed by ``sync.run_resync`` and
-``mapping.link_existing_record``. No custom controller logic.
+``mapping.link_existing_record``. Batch runs bulk-insert these rows and may
+store the payload compressed (see ``core/archive.py``); ``onload`` decodes it
+so the form always shows JSON.
 """
 
 from frappe.model.document import Document
 
+from erpnext_enhancements.quickbooks_online.core.archive import decode_payload
+
 
 class QuickBooksRawPayload(Document):
-	"""Stored QBO payload record; behaviour is entirely the Frappe default."""
+	"""Stored QBO payload record."""
 
-	pass
+	def onload(self):
+		"""Show a compressed payload as its JSON in the form (display only; not saved)."""
+		self.payload = decode_payload(self.payload)
 
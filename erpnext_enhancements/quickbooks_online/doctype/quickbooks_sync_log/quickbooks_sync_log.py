@@ -3,8 +3,9 @@
 One row per sync run (Import All / Preview Resync / Run Resync / Entity Sync /
 Webhook / CDC / Retry). Tracks lifecycle (status, started/finished), per-action
 counters (created/updated/linked/deleted/conflict/manual_review/failed),
-retry_count, the dry-run plan (preview_payload) and any error_message. Created
-and updated by the helpers in ``sync.py`` (``start_log``/``finish_log``/
+retry_count, the run's HTTP requests vs. new/reused connections and its
+mapping-cache hits/misses, the dry-run plan (preview_payload) and any
+error_message. Created and updated by the helpers in ``sync.py`` (``start_log``/``finish_log``/
 ``fail_log``/``_track_result``). No custom controller logic.
 """
 
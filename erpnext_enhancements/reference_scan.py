@@ -0,0 +1,363 @@
+"""Batched reverse-reference discovery: who points at ``(doctype, name)``?
+
+The shared core behind "Unlink and Delete" (:mod:`delete_utils`) and the generic
+merge tool (:mod:`document_merge`). It used to walk ``get_link_fields(doctype)``
+and the dynamic-link map issuing one ``frappe.db.get_values`` per Link field and
+one query per Dynamic Link — for a Customer or an Item that is several hundred
+round trips per preview click, a good share of them full scans on link columns
+nobody ever indexed.
+
+Two things change that:
+
+* **The link plan is cached.** Which tables/columns can point at a doctype is a
+  property of the schema, not of the data, so it is built once per doctype —
+  Link fields, the Dynamic Link fields the dynamic-link map lists for this
+  doctype (``get_dynamic_link_map().get(doctype)``, the same source the
+  per-field walk used, so a table that never holds this doctype adds no arm),
+  whether each referrer is a child table or a Single, which of those columns
+  actually exist, and which lack an index —
+  and kept in the site cache under :data:`PLAN_CACHE_KEY` until the next
+  migrate (:func:`clear_plan_cache` is an ``after_migrate`` hook). Custom Fields
+  here are fixtures, so the schema only moves on migrate anyway.
+* **The scan is batched.** Every non-Single referrer becomes one arm of a
+  ``UNION ALL`` (up to :data:`MAX_UNION_ARMS` per statement), each arm selecting
+  the same column shape; all Single referrers are answered from one read of
+  ``tabSingles``. A Customer's scan is a handful of statements instead of
+  hundreds, and it accepts several target names at once, which is what lets
+  :func:`document_merge.perform_bulk_merge` discover N duplicates in one pass.
+
+The rows returned are exactly the dicts ``discover_references`` always returned
+(see its docstring); callers did not change.
+
+MariaDB only, like the rest of this app's raw SQL (``information_schema`` and
+backtick quoting). The string columns every arm selects are converted to
+:data:`UNION_COLLATION`: arms come from many tables, and a UNION over columns of
+different collations fails with "Illegal mix of collations".
+"""
+
+import frappe
+
+# Hash of {doctype: plan}. One key, so clear_plan_cache drops every plan at once.
+PLAN_CACHE_KEY = "ee_reference_plan"
+
+# Arms per UNION ALL statement. Bounded so a doctype referenced from hundreds of
+# tables (Company, User) yields a few mid-sized statements rather than one the
+# optimizer spends longer planning than running.
+MAX_UNION_ARMS = 40
+
+# Frappe's own table collation; every arm's string columns are brought to it so the
+# UNION has one. Only the select list is converted, so each arm's WHERE keeps its index.
+UNION_COLLATION = "utf8mb4_unicode_ci"
+
+
+# ---------------------------------------------------------------------------
+# Plan (cached per doctype until migrate)
+# ---------------------------------------------------------------------------
+def reference_plan(doctype):
+	"""The cached link plan for ``doctype`` (built on first use).
+
+	``{"tables": [...], "singles": [...], "unindexed": [...] | None}`` where each
+	table entry is ``{"doctype", "istable", "links": [fieldname],
+	"dynamic": [[fieldname, doctype_field]]}``. ``unindexed`` is ``None`` when the
+	index metadata could not be read.
+	"""
+	try:
+		plan = frappe.cache().hget(PLAN_CACHE_KEY, doctype)
+	except Exception:
+		plan = None
+	if plan is None:
+		plan = _build_plan(doctype)
+		try:
+			frappe.cache().hset(PLAN_CACHE_KEY, doctype, plan)
+		except Exception:
+			pass
+	return plan
+
+
+def clear_plan_cache(*args, **kwargs):
+	"""Drop every cached plan. ``after_migrate`` hook; safe to call any time."""
+	try:
+		frappe.cache().delete_value(PLAN_CACHE_KEY)
+	except Exception:
+		pass
+
+
+def unindexed_link_columns(doctype):
+	"""``[{"doctype", "fieldname", "dynamic"}]`` — the columns that can point at
+	``doctype`` but lead no index, i.e. the arms that full-scan their table. A
+	Dynamic Link counts as indexed when an index leads with its link column, or
+	with its doctype column followed by the link column. ``None`` if unknown."""
+	return reference_plan(doctype).get("unindexed")
+
+
+def _build_plan(doctype):
+	from frappe.model.dynamic_links import get_dynamic_link_map
+	from frappe.model.rename_doc import get_link_fields
+
+	entries = {}
+
+	def entry(referrer):
+		if referrer not in entries:
+			try:
+				meta = frappe.get_meta(referrer)
+			except Exception:
+				entries[referrer] = None
+				return None
+			if getattr(meta, "is_virtual", 0):
+				entries[referrer] = None
+				return None
+			entries[referrer] = {
+				"doctype": referrer,
+				"istable": 1 if meta.istable else 0,
+				"issingle": 1 if meta.issingle else 0,
+				"links": [],
+				"dynamic": [],
+			}
+		return entries[referrer]
+
+	for lf in get_link_fields(doctype):
+		e = entry(lf["parent"])
+		if e is not None and lf["fieldname"] not in e["links"]:
+			e["links"].append(lf["fieldname"])
+
+	for df in get_dynamic_link_map().get(doctype, []):
+		e = entry(df.parent)
+		pair = [df.fieldname, df.options]
+		if e is not None and df.options and pair not in e["dynamic"]:
+			e["dynamic"].append(pair)
+
+	live = [e for e in entries.values() if e and (e["links"] or e["dynamic"])]
+	tables = [e for e in live if not e["issingle"]]
+	singles = [e for e in live if e["issingle"]]
+
+	columns, indexes = _schema_facts([e["doctype"] for e in tables])
+	if columns is not None:
+		tables = _drop_missing_columns(tables, columns)
+
+	return {
+		"tables": tables,
+		"singles": singles,
+		"unindexed": _unindexed(tables, indexes) if indexes is not None else None,
+	}
+
+
+def _schema_facts(doctypes):
+	"""One read each of ``information_schema.COLUMNS`` and ``.STATISTICS`` for
+	every referrer table. Returns ``({table: {column}}, {table: [[columns]]})``
+	with index columns in key order, or ``(None, None)`` if unreadable."""
+	if not doctypes:
+		return {}, {}
+	tables = tuple(f"tab{dt}" for dt in doctypes)
+	try:
+		column_rows = frappe.db.sql(
+			"""
+			select table_name, column_name from information_schema.COLUMNS
+			where table_schema = database() and table_name in %(tables)s
+			""",
+			{"tables": tables},
+		)
+		index_rows = frappe.db.sql(
+			"""
+			select table_name, index_name, column_name from information_schema.STATISTICS
+			where table_schema = database() and table_name in %(tables)s
+			order by table_name, index_name, seq_in_index
+			""",
+			{"tables": tables},
+		)
+	except Exception:
+		return None, None
+
+	columns = {}
+	for table, column in column_rows:
+		columns.setdefault(table[3:], set()).add(column)
+	keyed = {}
+	for table, index, column in index_rows:
+		keyed.setdefault((table[3:], index), []).append(column)
+	indexes = {}
+	for (dt, _index), cols in keyed.items():
+		indexes.setdefault(dt, []).append(cols)
+	return columns, indexes
+
+
+def _drop_missing_columns(tables, columns):
+	"""Skip arms whose table or column does not exist (a virtual/unsynced doctype,
+	a Custom Field whose column was never added) — they can hold no reference,
+	and one bad arm would fail the whole UNION."""
+	kept = []
+	for e in tables:
+		have = columns.get(e["doctype"])
+		if not have:
+			continue
+		e = dict(e)
+		e["links"] = [f for f in e["links"] if f in have]
+		e["dynamic"] = [[f, o] for f, o in e["dynamic"] if f in have and o in have]
+		if e["links"] or e["dynamic"]:
+			kept.append(e)
+	return kept
+
+
+def _unindexed(tables, indexes):
+	out = []
+	for e in tables:
+		keys = indexes.get(e["doctype"], [])
+		for fieldname in e["links"]:
+			if not any(cols[0] == fieldname for cols in keys):
+				out.append({"doctype": e["doctype"], "fieldname": fieldname, "dynamic": False})
+		for fieldname, doctype_field in e["dynamic"]:
+			if not any(
+				cols[0] == fieldname or cols[:2] == [doctype_field, fieldname] for cols in keys
+			):
+				out.append({"doctype": e["doctype"], "fieldname": fieldname, "dynamic": True})
+	return out
+
+
+# ---------------------------------------------------------------------------
+# Scan
+# ---------------------------------------------------------------------------
+def find_references(doctype, names, include_cancelled=True, ignored_doctypes=()):
+	"""``{name: [reference, ...]}`` for every name in ``names`` (each present,
+	possibly empty). Reference dicts are the ``discover_references`` shape.
+	Referrers in ``ignored_doctypes`` are skipped; cancelled referrers too unless
+	``include_cancelled``. Self-references are always skipped."""
+	names = [n for n in dict.fromkeys(names or []) if n]
+	found = {n: [] for n in names}
+	if not names:
+		return found
+
+	plan = reference_plan(doctype)
+	ignored = set(ignored_doctypes or ())
+	# MariaDB compares these columns case-insensitively, so a stored value may
+	# differ in case from the name asked for; map rows back through casefold.
+	by_fold = {str(n).casefold(): n for n in names}
+
+	arms = _arms([e for e in plan["tables"] if e["doctype"] not in ignored])
+	for start in range(0, len(arms), MAX_UNION_ARMS):
+		chunk = arms[start : start + MAX_UNION_ARMS]
+		rows = frappe.db.sql(
+			_union_sql(chunk, include_cancelled),
+			{"names": tuple(names), "doctype": doctype},
+			as_dict=True,
+		)
+		for row in rows:
+			target = by_fold.get(str(row.get("target") or "").casefold())
+			if target is None:
+				continue
+			ref = _shape_row(doctype, target, chunk[int(row["arm"])], row)
+			if ref is not None:
+				found[target].append(ref)
+
+	singles = [e for e in plan["singles"] if e["doctype"] not in ignored]
+	for target, ref in _single_references(doctype, names, singles):
+		found[target].append(ref)
+	return found
+
+
+def _arms(tables):
+	"""Flatten plan tables to ``(doctype, istable, fieldname, doctype_field)``."""
+	arms = []
+	for e in tables:
+		for fieldname in e["links"]:
+			arms.append((e["doctype"], e["istable"], fieldname, None))
+		for fieldname, doctype_field in e["dynamic"]:
+			arms.append((e["doctype"], e["istable"], fieldname, doctype_field))
+	return arms
+
+
+def _union_sql(arms, include_cancelled):
+	"""One ``UNION ALL`` statement over ``arms``. Every arm selects ``arm``,
+	``name``, ``docstatus``, ``parent``, ``parenttype``, ``idx`` and ``target``;
+	a non-table referrer selects NULL parents (v14+ parent tables have no such
+	columns). ``arm`` is the arm's position in ``arms``, so a row maps back to
+	its doctype/field without echoing identifiers as string literals.
+	Parameters: ``%(names)s`` (tuple) and ``%(doctype)s``."""
+	selects = []
+	for i, (referrer, istable, fieldname, doctype_field) in enumerate(arms):
+		parent_cols = (
+			f"{_text('parent')} as `parent`, {_text('parenttype')} as `parenttype`"
+			if istable
+			else "null as `parent`, null as `parenttype`"
+		)
+		where = [f"`{fieldname}` in %(names)s"]
+		if doctype_field:
+			where.append(f"`{doctype_field}` = %(doctype)s")
+		if not include_cancelled:
+			where.append("`docstatus` < 2")
+		selects.append(
+			f"select {i} as `arm`, {_text('name')} as `name`, `docstatus`, {parent_cols}, `idx`, "
+			f"{_text(fieldname)} as `target` "
+			f"from `tab{referrer}` where {' and '.join(where)}"
+		)
+	return "\nunion all\n".join(selects)
+
+
+def _text(column):
+	"""``column`` in :data:`UNION_COLLATION`, for a UNION select list."""
+	return f"convert(`{column}` using utf8mb4) collate {UNION_COLLATION}"
+
+
+def _shape_row(doctype, target, arm, row):
+	referrer, istable, fieldname, doctype_field = arm
+	if istable:
+		if row.get("parenttype") == doctype and row.get("parent") == target:
+			return None
+		ref = {
+			"doctype": row.get("parenttype"),
+			"name": row.get("parent"),
+			"child_doctype": referrer,
+			"child_name": row.get("name"),
+			"fieldname": fieldname,
+			"is_child": True,
+			"idx": row.get("idx"),
+			"docstatus": row.get("docstatus"),
+		}
+	else:
+		if referrer == doctype and row.get("name") == target:
+			return None
+		ref = {
+			"doctype": referrer,
+			"name": row.get("name"),
+			"fieldname": fieldname,
+			"is_child": False,
+			"docstatus": row.get("docstatus"),
+		}
+	if doctype_field:
+		ref["doctype_field"] = doctype_field
+		ref["is_dynamic"] = True
+	return ref
+
+
+def _single_references(doctype, names, singles):
+	"""Yield ``(target, reference)`` for Single referrers, from one read of
+	``tabSingles`` covering all of them."""
+	if not singles:
+		return
+	rows = frappe.db.sql(
+		"select `doctype`, `field`, `value` from `tabSingles` where `doctype` in %(doctypes)s",
+		{"doctypes": tuple(e["doctype"] for e in singles)},
+	)
+	values = {}
+	for dt, field, value in rows:
+		values.setdefault(dt, {})[field] = value
+	wanted = set(names)
+	for e in singles:
+		single = values.get(e["doctype"], {})
+		for fieldname in e["links"]:
+			if single.get(fieldname) in wanted:
+				yield single[fieldname], {
+					"doctype": e["doctype"],
+					"name": e["doctype"],
+					"fieldname": fieldname,
+					"is_child": False,
+					"is_single": True,
+				}
+		for fieldname, doctype_field in e["dynamic"]:
+			if single.get(doctype_field) == doctype and single.get(fieldname) in wanted:
+				yield single[fieldname], {
+					"doctype": e["doctype"],
+					"name": e["doctype"],
+					"fieldname": fieldname,
+					"doctype_field": doctype_field,
+					"is_child": False,
+					"is_single": True,
+					"is_dynamic": True,
+				}
@@ -0,0 +1,172 @@
+"""The approximate chat index finds what the exact one finds, and never serves a stale room. Bench-free.
+
+:mod:`chat.retrieval.ann` trades a full scan for a probe of a few IVF lists and a PQ
+estimate, then re-ranks the short list exactly. What it must not trade away:
+
+* **recall** — on a corpus with topic structure, the exact top 10 is in the short list;
+* **scope** — a room outside ``allowed_rooms`` contributes nothing, whatever its scores;
+* **freshness** — a room whose fingerprint moved, or whose codes were written under another
+  codebook, is not served;
+* **agreement** — a code the sweep stored and a code the gate encoded in-worker are the same
+  code, and probing every list with a deep re-rank is the exact ranking.
+
+The recall threshold is at a corpus size CI can afford; ``chat.testing.ann_bench`` is the
+tool for the numbers at production size.
+
+Needs ``numpy``. Plain pytest functions, so this file needs its **own**
+``python -m pytest erpnext_enhancements/tests/test_chat_ann_index.py -q`` step in CI.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from erpnext_enhancements.chat.retrieval import ann, vectors  # noqa: E402
+from erpnext_enhancements.chat.testing import ann_bench, fixtures  # noqa: E402
+
+DIM = 32
+
+
+@pytest.fixture(scope="module")
+def corpus():
+	return fixtures.synthetic_embedding_corpus(rooms=4, chunks_per_room=300, dim=DIM, topics=16, seed=3)
+
+
+@pytest.fixture(scope="module")
+def codebook(corpus):
+	return ann.train_codebook(numpy.asarray([vector for _n, _r, vector, _s in corpus]), nlist=16, seed=3)
+
+
+def _rows(corpus):
+	return [(name, room, vectors.encode_vector(vectors.normalise(vector)), DIM) for name, room, vector, _s in corpus]
+
+
+def _queries(count=10):
+	return fixtures.synthetic_queries(count=count, dim=DIM, topics=16, seed=3)
+
+
+def test_recall_at_10_against_the_exact_backend() -> None:
+	report = ann_bench.run_benchmark(
+		rooms=4, chunks_per_room=500, dim=DIM, topics=16, queries=20, nlist=16, nprobe=4, rerank_depth=100
+	)
+	assert report.recall_at_k >= 0.9, report.lines()
+
+
+def test_probing_every_list_with_a_deep_rerank_is_the_exact_ranking(corpus, codebook) -> None:
+	rows = _rows(corpus)
+	allowed = frozenset(room for _n, room, _v, _s in corpus)
+	exact = vectors.NumpyVectorBackend(candidate_loader=lambda: rows)
+	approximate = ann.IvfPqBackend(
+		codebook=codebook, candidate_loader=lambda: rows, nprobe=codebook.nlist, rerank_depth=len(rows)
+	)
+	for query in _queries(5):
+		mine = approximate.search(allowed, query, 20)
+		theirs = exact.search(allowed, query, 20)
+		assert [hit.chunk for hit in mine] == [hit.chunk for hit in theirs]
+		for a, b in zip(mine, theirs, strict=True):
+			assert a.similarity == pytest.approx(b.similarity, abs=1e-6)
+
+
+def test_a_room_outside_the_allowed_set_contributes_nothing(corpus, codebook) -> None:
+	rows = _rows(corpus)
+	backend = ann.IvfPqBackend(codebook=codebook, candidate_loader=lambda: rows)
+	hits = backend.search(frozenset({"room-001"}), _queries(1)[0], 50)
+	assert hits
+	assert {hit.room for hit in hits} == {"room-001"}
+
+
+def test_a_room_whose_fingerprint_moved_is_not_served(corpus, codebook) -> None:
+	room = corpus[0][1]
+	own = [(n, r, None, None, None, vectors.encode_vector(v), DIM, s) for n, r, v, s in corpus if r == room]
+	index = ann.RoomCodeIndex(max_bytes=0)
+	index.put(ann.pack_room_codes(room, own, fingerprint=(len(own), codebook.version), codebook=codebook))
+	query = _queries(1)[0]
+
+	current, _ = index.search(
+		frozenset({room}), query, 5, fingerprints={room: (len(own), codebook.version)}, codebook=codebook
+	)
+	moved, _ = index.search(
+		frozenset({room}), query, 5, fingerprints={room: (len(own) + 1, codebook.version)}, codebook=codebook
+	)
+	retrained, _ = index.search(
+		frozenset({room}), query, 5, fingerprints={room: (len(own), "another-codebook")}, codebook=codebook
+	)
+	assert current
+	assert moved == []
+	assert retrained == []
+
+
+def test_a_stored_code_and_an_in_worker_code_are_the_same_code(corpus, codebook) -> None:
+	room = corpus[0][1]
+	own = [(n, r, v, s) for n, r, v, s in corpus if r == room]
+	lists, codes = codebook.encode(numpy.vstack([vectors.normalise(v) for _n, _r, v, _s in own]))
+	stored = [
+		(n, r, codebook.version, int(lists[i]), codes[i].tobytes(), None, DIM, s)
+		for i, (n, r, _v, s) in enumerate(own)
+	]
+	# Half the rows carry a code from a codebook that no longer exists, so must be re-encoded.
+	encoded = []
+	for i, (n, r, v, s) in enumerate(own):
+		version = "retired" if i % 2 else codebook.version
+		encoded.append((n, r, version, int(lists[i]), codes[i].tobytes(), vectors.encode_vector(v), DIM, s))
+	a = ann.pack_room_codes(room, stored, fingerprint=(1,), codebook=codebook)
+	b = ann.pack_room_codes(room, encoded, fingerprint=(1,), codebook=codebook)
+	assert a.names.tolist() == b.names.tolist()
+	assert numpy.array_equal(a.lists, b.lists)
+	assert numpy.array_equal(a.codes, b.codes)
+
+
+def test_a_stale_code_with_no_readable_vector_is_skipped_and_recorded(codebook) -> None:
+	rows = [("orphan", "room-a", "retired", 0, b"\x00" * codebook.m, None, DIM, 1)]
+	packed = ann.pack_room_codes("room-a", rows, fingerprint=(1,), codebook=codebook)
+	assert len(packed) == 0
+	assert packed.skipped and packed.skipped[0].startswith("orphan:")
+
+
+def test_encoding_is_deterministic_and_the_codebook_round_trips(corpus, codebook) -> None:
+	matrix = numpy.vstack([vectors.normalise(v) for _n, _r, v, _s in corpus[:50]])
+	restored = ann.Codebook.from_bytes(codebook.to_bytes())
+	assert restored.version == codebook.version
+	first, second = codebook.encode(matrix), restored.encode(matrix)
+	assert numpy.array_equal(first[0], second[0])
+	assert numpy.array_equal(first[1], second[1])
+
+
+def test_training_is_reproducible_and_the_version_names_the_contents(corpus) -> None:
+	sample = numpy.asarray([vector for _n, _r, vector, _s in corpus])
+	one = ann.train_codebook(sample, nlist=8, seed=1)
+	again = ann.train_codebook(sample, nlist=8, seed=1)
+	other = ann.train_codebook(sample, nlist=8, seed=2)
+	assert one.version == again.version
+	assert one.version != other.version
+
+
+def test_a_codebook_file_that_is_not_one_is_refused() -> None:
+	with pytest.raises(vectors.VectorBackendError):
+		ann.Codebook.from_bytes(b"not an npz")
+
+
+def test_load_codebook_reads_what_save_wrote_and_none_when_absent(tmp_path, codebook) -> None:
+	path = str(tmp_path / "chat_ann" / "codebook.npz")
+	assert ann.load_codebook(path) is None
+	ann.save_codebook(codebook, path)
+	assert ann.load_codebook(path).version == codebook.version
+
+
+def test_upsert_hands_the_writer_the_code_for_the_current_codebook(corpus, codebook) -> None:
+	written = []
+	backend = ann.IvfPqBackend(
+		codebook=codebook, candidate_loader=lambda: [], writer=lambda *args: written.append(args)
+	)
+	name, _room, vector, _seq = corpus[0]
+	backend.upsert(name, vector)
+	lists, codes = codebook.encode(vectors.normalise(vector)[None, :])
+	assert written == [(name, int(lists[0]), codes[0].tobytes(), codebook.version)]
+
+
+def test_a_read_only_backend_refuses_upsert(codebook) -> None:
+	backend = ann.IvfPqBackend(codebook=codebook, candidate_loader=lambda: [])
+	with pytest.raises(vectors.VectorBackendError):
+		backend.upsert("chunk", [1.0] * DIM)
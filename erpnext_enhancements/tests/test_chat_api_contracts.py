@@ -616,6 +616,31 @@ def test_the_filter_escapes_a_quote_in_the_user_name() -> None:
 	assert "o''brien" in fragment
 
 
+def _materialised(monkeypatch, rooms: list[str]) -> str:
+	monkeypatch.setattr(permissions.frappe, "get_all", lambda *_args, **_kwargs: list(rooms))
+	return permissions.membership_filter_sql(
+		"`m`.`room`", "tester@example.com", seq_column="`m`.`seq`", materialise=True
+	)
+
+
+def test_a_materialised_filter_is_the_room_list_read_once(monkeypatch) -> None:
+	"""One membership read per call instead of one ``EXISTS`` probe per scanned row."""
+	assert _materialised(monkeypatch, ["R2", "R1"]) == "`m`.`room` in ('R1', 'R2')"
+	assert _materialised(monkeypatch, ["o'room"]) == "`m`.`room` in ('o''room')"
+
+
+def test_a_materialised_filter_with_no_rooms_denies(monkeypatch) -> None:
+	"""``room in ()`` is a syntax error; an empty set is spelled the way denial always is."""
+	assert _materialised(monkeypatch, []) == "1 = 0"
+
+
+def test_a_room_set_past_the_limit_keeps_the_correlated_probe(monkeypatch) -> None:
+	rooms = [f"R{index}" for index in range(permissions.MATERIALISED_ROOM_LIMIT + 1)]
+	fragment = _materialised(monkeypatch, rooms)
+	assert fragment.startswith("exists (")
+	assert "'tester@example.com'" in fragment
+
+
 # ---------------------------------------------------------------------------
 # Search — the endpoint most likely to leak, and its LIKE escaping
 # ---------------------------------------------------------------------------
@@ -697,6 +722,93 @@ def test_search_result_carries_the_shared_deep_link() -> None:
 	assert result["route"] == "/chat/room/R1?message=M1&thread=T1"
 
 
+def test_a_ranked_hit_without_the_phrase_centres_on_a_matched_word() -> None:
+	"""MATCH finds the words, not the phrase; the highlight must still land on one of them."""
+	row = {"name": "M1", "room": "R1", "seq": 3, "text_plain": "the impeller on the pump failed"}
+	result = search._result(row, "pump impeller", "jane@example.com", ["pump", "impeller"])
+	assert result["match_length"] == len("pump")
+	assert result["snippet"][result["match_start"] : result["match_start"] + 4] == "pump"
+
+
+def _captured_search(monkeypatch, term: str, **kwargs: Any) -> tuple[str, dict[str, Any], Any]:
+	"""Run ``_search_rows`` against a fake ``frappe.db.sql`` and return what it was handed."""
+	captured: dict[str, Any] = {}
+
+	def _sql(query: str, params: dict[str, Any], as_dict: bool = False) -> list[dict[str, Any]]:
+		captured["query"], captured["params"] = query, params
+		return []
+
+	monkeypatch.setattr(search.frappe.db, "sql", _sql)
+	monkeypatch.setattr(
+		search.permissions, "membership_filter_sql", lambda *_args, **_kwargs: "<scope>"
+	)
+	page = search._search_rows("jane@example.com", term, room=None, size=25, **kwargs)
+	return captured["query"], captured["params"], page
+
+
+def test_search_asks_the_fulltext_index_and_ranks_by_score_then_seq(monkeypatch) -> None:
+	"""The LIKE scan read every message the company ever sent; MATCH reads the matching ones."""
+	query, params, page = _captured_search(monkeypatch, "pump impeller")
+	assert page.ranked is True
+	assert "match(`text_plain`) against (%(expression)s in boolean mode)" in query
+	assert "%(pattern)s" not in query
+	assert params["expression"] == "+pump* +impeller*"
+	assert "order by `score` desc, `m`.`seq` desc" in query
+	# The membership filter is still ANDed in on this path too.
+	assert "<scope>" in query
+
+
+def test_a_short_term_narrows_the_indexed_rows_with_like(monkeypatch) -> None:
+	query, params, _page = _captured_search(monkeypatch, "PO 4412")
+	assert params["expression"] == "+4412*"
+	assert params["short_0"] == "%po%"
+	assert "like %(short_0)s" in query
+
+
+def test_a_query_of_only_short_terms_takes_the_unranked_like_scan(monkeypatch) -> None:
+	query, params, page = _captured_search(monkeypatch, "PO", before_seq="40")
+	assert page.ranked is False
+	assert "match(" not in query
+	assert params["pattern"] == "%PO%"
+	assert params["before_seq"] == 40
+	assert "order by `m`.`seq` desc" in query
+
+
+def test_the_ranked_cursor_pages_on_score_then_seq(monkeypatch) -> None:
+	query, params, _page = _captured_search(
+		monkeypatch, "pump", before_score="1.23456789", before_seq=17
+	)
+	assert "having `score` < %(before_score)s" in query
+	assert params["before_score"] == round(1.23456789, search.SCORE_PRECISION)
+	assert params["before_seq"] == 17
+
+
+def test_a_seq_only_cursor_gets_a_chronological_page_of_matches(monkeypatch) -> None:
+	"""The pre-ranking contract sent ``before_seq`` alone. Paging a score order on seq would
+	repeat page 1's rows and drop lower-scored newer ones, so that page is in seq order."""
+	query, params, page = _captured_search(monkeypatch, "pump", before_seq="17")
+	assert page.ranked is False
+	assert "match(`text_plain`) against (%(expression)s in boolean mode)" in query
+	assert "having" not in query
+	assert "`m`.`seq` < %(before_seq)s" in query
+	assert "order by `m`.`seq` desc" in query
+	assert params["before_seq"] == 17
+	assert "before_score" not in params
+
+
+def test_a_malformed_cursor_score_starts_from_the_top(monkeypatch) -> None:
+	query, params, _page = _captured_search(monkeypatch, "pump", before_score="nan-ish", before_seq=17)
+	assert "having" not in query
+	assert "before_score" not in params
+
+
+def test_next_cursor_is_the_last_row_of_the_page() -> None:
+	rows = [{"seq": 9, "score": 2.5}, {"seq": 4, "score": "1.1000004"}]
+	assert search._next_cursor(rows, True) == {"before_seq": 4, "before_score": 1.1}
+	assert search._next_cursor(rows, False) == {"before_seq": 4}
+	assert search._next_cursor([], True) is None
+
+
 # ---------------------------------------------------------------------------
 # The deep-link builder — byte-identical to the client's, because Phase 4 compares them
 # ---------------------------------------------------------------------------
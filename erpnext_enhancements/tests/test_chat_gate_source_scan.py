@@ -313,6 +313,36 @@ WRITER_ENTRY_POINTS: dict[str, dict[str, str]] = {
 			"and alerts if the summariser has stopped. No room, no body, no identifiers."
 		),
 	},
+	"chat/indexing/embedding_column.py": {
+		"ensure_embedding_column": (
+			"after_migrate and after_install backstop. Adds the raw longblob vector column by "
+			"DDL if it is missing and returns a bool. Reads only SHOW COLUMNS for that one "
+			"table, which is column metadata rather than conversation, and takes no argument."
+		),
+		"backfill_embedding_column": (
+			"The v1.346.0 patch and `bench execute` only. Rewrites legacy base64 vectors as raw "
+			"bytes in place, row for row. Reads the embedding column and nothing else of a "
+			"chunk - never the body - and returns three counts, so there is nothing a caller "
+			"could learn from it about any room."
+		),
+	},
+	"chat/indexing/ann_codes.py": {
+		"ensure_ann_columns": (
+			"after_migrate and after_install backstop, and the v1.347.0 patch. Adds the three "
+			"ANN code columns by DDL if they are missing and returns a bool. Reads only SHOW "
+			"COLUMNS for that one table and takes no argument."
+		),
+		"sweep_ann_codes": (
+			"Scheduler job, hourly. Trains the codebook from a sample of non-retired chunk "
+			"vectors, then writes a code per vector. Reads vectors only - never a body - and "
+			"returns three counts, so nothing it returns describes any room or any chunk."
+		),
+		"train_ann_codebook": (
+			"`bench execute` only, the deliberate retrain. Reads a sample of non-retired chunk "
+			"vectors and writes the codebook file; returns sizes and the codebook version, "
+			"never a chunk name and never a vector."
+		),
+	},
 	"chat/indexing/invalidate.py": {
 		"invalidate_span": (
 			"The staleness seam's writer, and the one entry point here that is NOT a "
@@ -1028,6 +1058,12 @@ class TestTheWriterPackagePaysForItsExemption(unittest.TestCase):
 			("chat/indexing/retire.py", "plan_retirement"),
 			("chat/indexing/retire.py", "set_retirement_mark"),
 			("chat/indexing/retire.py", "report"),
+			# The v1.346.0 vector conversion. Run by its patch, and by hand to resume one a
+			# deploy killed; scheduling it would be a standing job with nothing to do.
+			("chat/indexing/embedding_column.py", "backfill_embedding_column"),
+			# The v1.347.0 ANN retrain. Scheduling it would make every stored code stale on a
+			# timer; the hourly sweep trains only when there is no codebook at all.
+			("chat/indexing/ann_codes.py", "train_ann_codebook"),
 		}
 	)
 
@@ -240,6 +240,22 @@ class _FakeDB:
 			return _Dict({fieldname: row.get(fieldname)})
 		return row.get(fieldname)
 
+	def get_values(
+		self,
+		doctype: str,
+		filters: Any = None,
+		fieldname: Any = "name",
+		as_dict: bool = False,
+		for_update: bool = False,
+		**_ignored: Any,
+	) -> list[Any]:
+		"""Every matching row, for ``claim_batch``'s locking read. Filters are real here too."""
+		fields = list(fieldname) if isinstance(fieldname, list | tuple) else [fieldname]
+		matched = [row for row in self.rows(doctype) if _matches(row, filters)]
+		if as_dict:
+			return [_Dict({field: row.get(field) for field in fields}) for row in matched]
+		return [[row.get(field) for field in fields] for row in matched]
+
 	def set_value(
 		self,
 		doctype: str,
@@ -1464,6 +1480,124 @@ class TestChaos7Burst(RelayTestCase):
 		self.assertIsNone(outbound.claim_next_job("ROOM-0001"))
 
 
+class TestBatchedRelay(RelayTestCase):
+	"""``relay_batch_size`` > 1: one claim and one commit per batch, the same order and pace."""
+
+	def setUp(self) -> None:
+		super().setUp()
+		STATE["settings"]["relay_batch_size"] = 5
+
+	def burst(self, count: int) -> str:
+		space = self.make_room()
+		for index in range(1, count + 1):
+			self.make_message(name=f"MSG-{index:04d}", text=f"burst {index}", seq=index)
+			self.make_job(name=f"JOB-{index}", job_seq=index, message=f"MSG-{index:04d}")
+			self.clock.advance(200)
+		return space
+
+	def claim_writes(self) -> list[tuple[str, str, dict[str, Any], bool]]:
+		return [
+			write
+			for write in self.db.writes
+			if write[0] == "Chat Relay Job" and write[2].get("status") == "In Progress"
+		]
+
+	def test_a_burst_drains_in_order_at_the_space_rate_in_two_batches(self) -> None:
+		space = self.burst(10)
+
+		summary = outbound.drain_room("ROOM-0001")
+
+		self.assertEqual(summary["done"], 10)
+		self.assertEqual(self.relayed_texts(space), [f"burst {index}" for index in range(1, 11)])
+		self.assertGreaterEqual(self.limiter.waits_ms, 9 * 1000 - 2000)
+		# Two claims of five, one commit each for the claim and for the batch.
+		self.assertEqual(len({write[2]["lease_expires_at"] for write in self.claim_writes()}), 2)
+		self.assertEqual(self.db.commits, 4)
+
+	def test_one_job_at_a_time_commits_twice_per_job(self) -> None:
+		"""The baseline the batch is measured against, so the saving above is not assumed."""
+		STATE["settings"]["relay_batch_size"] = 1
+		self.burst(10)
+
+		outbound.drain_room("ROOM-0001")
+
+		self.assertEqual(self.db.commits, 20)
+
+	def test_the_batch_lease_covers_every_job_in_it(self) -> None:
+		self.burst(3)
+		one = outbound.lease_seconds(http_timeout=30, max_attempts=3, backoff_base=2, backoff_cap=32)
+
+		jobs = outbound.claim_batch("ROOM-0001", limit=5, settings=STATE["settings"])
+
+		self.assertEqual([job["name"] for job in jobs], ["JOB-1", "JOB-2", "JOB-3"])
+		lease = self.job("JOB-1")["lease_expires_at"] - _now()
+		self.assertGreater(lease.total_seconds(), 2 * one)
+		self.assertEqual({self.job(name)["status"] for name in ("JOB-1", "JOB-2", "JOB-3")}, {"In Progress"})
+
+	def test_the_batch_stops_at_the_first_row_that_is_not_due(self) -> None:
+		"""Rule 1: a row behind a deferred one waits for it, so the batch is a prefix or nothing."""
+		self.burst(4)
+		self.db.table("Chat Relay Job")["JOB-3"]["available_at"] = _now() + timedelta(minutes=5)
+
+		jobs = outbound.claim_batch("ROOM-0001", limit=5, settings=STATE["settings"])
+
+		self.assertEqual([job["name"] for job in jobs], ["JOB-1", "JOB-2"])
+		self.assertEqual(self.job("JOB-4")["status"], "Pending")
+
+	def test_a_retryable_failure_releases_the_tail_without_spending_its_attempts(self) -> None:
+		space = self.burst(4)
+		self.fake.fail_with_server_error("spaces.messages.create", times=9, status=503)
+
+		summary = outbound.drain_room("ROOM-0001")
+
+		self.assertEqual(summary["failed"], 1)
+		self.assertEqual(self.relayed_texts(space), [])
+		self.assertEqual(self.job("JOB-1")["attempts"], 1)
+		for name in ("JOB-2", "JOB-3", "JOB-4"):
+			job = self.job(name)
+			self.assertEqual(job["status"], "Pending")
+			self.assertEqual(job["attempts"], 0)
+			self.assertIsNone(job["lease_expires_at"])
+
+	def test_a_dead_letter_does_not_block_the_rest_of_the_batch(self) -> None:
+		space = self.burst(3)
+		self.fake.fail_with_server_error("spaces.messages.create", times=1, status=403)
+
+		summary = outbound.drain_room("ROOM-0001")
+
+		self.assertEqual(self.job("JOB-1")["status"], "Dead")
+		self.assertEqual(summary["done"], 2)
+		self.assertEqual(self.relayed_texts(space), ["burst 2", "burst 3"])
+
+	def test_pausing_mid_batch_stops_the_next_write_and_drops_nothing(self) -> None:
+		space = self.burst(4)
+		real = outbound.execute_claimed_job
+
+		def pause_after_first(job: dict[str, Any], *, settings: Any) -> str:
+			outcome = real(job, settings=settings)
+			STATE["settings"]["pause_outbound"] = 1
+			return outcome
+
+		outbound.execute_claimed_job = pause_after_first
+		try:
+			summary = outbound.drain_room("ROOM-0001")
+		finally:
+			outbound.execute_claimed_job = real
+
+		self.assertIn("paused", summary["stopped"])
+		self.assertEqual(self.relayed_texts(space), ["burst 1"])
+		for name in ("JOB-2", "JOB-3", "JOB-4"):
+			self.assertEqual(self.job(name)["status"], "Pending", "a paused batch dropped a job")
+
+	def test_the_batch_is_cut_down_until_its_lease_fits(self) -> None:
+		"""A lease the ceiling would clamp is one the sweeper could reap mid-batch."""
+		shipped = {"http_timeout": 30, "max_attempts": 5, "backoff_base": 2, "backoff_cap": 32}
+		self.assertEqual(outbound.batch_limit(50, **shipped), 9)
+		self.assertEqual(outbound.batch_limit(4, **shipped), 4)
+		self.assertEqual(outbound.batch_limit(0, **shipped), 1)
+		self.assertEqual(outbound.batch_limit(5, http_timeout=3600, max_attempts=5, backoff_base=2, backoff_cap=32), 1)
+
+
 # --------------------------------------------------------------------------------------
 # Chaos 8 — worker SIGKILL mid-relay
 # --------------------------------------------------------------------------------------
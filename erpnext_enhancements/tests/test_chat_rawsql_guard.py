@@ -337,6 +337,13 @@ FOREIGN_TABLES: dict[str, str] = {
 		"the room. What stops that becoming an escalation is the write side — "
 		"`compose._clean_mentions` drops a User mention of a non-member — not this read."
 	),
+	"Notification Settings": (
+		"Frappe's per-user notification switch, read by chat/notifications/fanout.py for a "
+		"room's members in one query (joined to `User` for the address it is keyed on). Only "
+		"`enabled` is selected. It is not chat data, the rows read are exactly the recipients "
+		"the fan-out already has, and nothing read here leaves the job — it becomes a reason "
+		"code in a debug line."
+	),
 }
 
 #: The ``(file, function, table)`` triples permitted to read a scoped table **without** the
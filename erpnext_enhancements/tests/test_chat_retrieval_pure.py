@@ -471,6 +471,13 @@ def test_terms_shorter_than_the_index_minimum_are_dropped_and_reported() -> None
 	assert lexical.dropped_terms("q4 revenue") == ["q4"]
 
 
+def test_prefix_truncates_every_term_for_the_search_box() -> None:
+	"""Message search asks for ``inv`` and expects ``invoice``; retrieval keeps exact terms."""
+	assert lexical.build_boolean_query("pump impell", prefix=True) == "+pump* +impell*"
+	assert "*" not in lexical.build_boolean_query("pump impell")
+	assert lexical.build_boolean_query("a b !!", prefix=True) == ""
+
+
 def test_a_query_with_nothing_searchable_returns_an_empty_expression() -> None:
 	"""The caller must run no lexical query at all. An empty AGAINST is a full-corpus read
 	wearing a search's clothes."""
@@ -55,11 +55,14 @@ DEFAULTS: tuple[int, int, int, int, int, int, int] = (
 )
 
 
-def _json_default(fieldname: str) -> int:
-	"""The ``default`` declared on one Chat Settings field, as an int."""
+def _json_default(fieldname: str) -> int | str:
+	"""The ``default`` declared on one Chat Settings field, as an int — or as the string it
+	is, for a Select."""
 	data = json.loads(SETTINGS_JSON.read_text(encoding="utf-8"))
 	for field in data.get("fields") or []:
 		if field.get("fieldname") == fieldname:
+			if field.get("fieldtype") == "Select":
+				return field.get("default")
 			return int(field.get("default"))
 	raise AssertionError(f"Chat Settings declares no field {fieldname!r} ({SETTINGS_JSON})")
 
@@ -324,6 +327,10 @@ def _shipped_retrieval_kwargs(**overrides) -> dict:
 		"context_token_ceiling": _json_default("context_token_ceiling"),
 		"semantic_tier_enabled": bool(_json_default("semantic_tier_enabled")),
 		"lexical_tier_enabled": bool(_json_default("lexical_tier_enabled")),
+		"semantic_index": _json_default("semantic_index"),
+		"ann_nprobe": _json_default("ann_nprobe"),
+		"ann_rerank_depth": _json_default("ann_rerank_depth"),
+		"embed_concurrency": _json_default("embed_concurrency"),
 	}
 	shipped.update(overrides)
 	return shipped
@@ -395,6 +402,38 @@ def test_a_negative_room_cap_is_refused() -> None:
 	assert any("Use 0 for no cap" in e for e in errors), errors
 
 
+def test_the_shipped_approximate_dials_are_valid_once_switched_on() -> None:
+	"""Approximate ships off; the dials beside it must not be a trap for the first person to
+	turn it on."""
+	assert rules.validate_retrieval(**_shipped_retrieval_kwargs(semantic_index="Approximate")) == []
+
+
+def test_an_approximate_rerank_shorter_than_top_k_is_refused() -> None:
+	errors = rules.validate_retrieval(
+		**_shipped_retrieval_kwargs(semantic_index="Approximate", retrieval_top_k=20, ann_rerank_depth=10)
+	)
+	assert any("ANN Rerank Depth" in e for e in errors), errors
+
+
+def test_approximate_dials_are_not_checked_while_the_index_is_exact() -> None:
+	assert rules.validate_retrieval(**_shipped_retrieval_kwargs(ann_nprobe=0, ann_rerank_depth=0)) == []
+	errors = rules.validate_retrieval(**_shipped_retrieval_kwargs(semantic_index="Approximate", ann_nprobe=0))
+	assert any("ANN Lists Probed" in e for e in errors), errors
+
+
+def test_an_embed_concurrency_outside_its_range_is_refused() -> None:
+	for value in (0, rules.MAX_EMBED_CONCURRENCY + 1):
+		errors = rules.validate_retrieval(**_shipped_retrieval_kwargs(embed_concurrency=value))
+		assert any("Embed Concurrency" in e for e in errors), (value, errors)
+
+
+def test_the_embed_concurrency_ceiling_is_the_sweeps_own() -> None:
+	"""Restated in the rules module because it imports nothing."""
+	from erpnext_enhancements.chat.indexing import embed_plan
+
+	assert rules.MAX_EMBED_CONCURRENCY == embed_plan.MAX_CONCURRENCY
+
+
 def test_the_controller_passes_every_dial_the_rule_takes() -> None:
 	"""A dial the controller forgets to pass reads as its default in the rule signature and
 	is never validated — the form would then accept an incoherent value that breaks a
@@ -101,7 +101,16 @@ TABLE_ALIAS = re.compile(r"`tab[^`]+`\s+`([a-z_][a-z0-9_]*)`")
 #: reports its perfectly real columns as unknown. Listed explicitly rather than by disabling
 #: the check on joins: a short visible list is a cost each addition has to pay, and the
 #: alternative silently stops checking the *chat* columns in the same statement.
-CORE_DOCTYPE_COLUMNS = frozenset({"enabled", "full_name", "user_image", "user_type", "file_url"})
+CORE_DOCTYPE_COLUMNS = frozenset({"email", "enabled", "full_name", "user_image", "user_type", "file_url"})
+
+#: Columns added by raw DDL, because no fieldtype maps to them, keyed by the DocType whose
+#: table carries them. ``embedding_f32`` is the ``longblob`` vector column — a DocField for it
+#: would be altered back to ``longtext`` by schema sync on every migrate; see
+#: ``chat/indexing/embedding_column.py``. Scoped to its one table, so naming it against any
+#: other is still a 1054 this scan catches.
+RAW_DDL_COLUMNS = {
+    "Chat Context Chunk": frozenset({"embedding_f32", "ann_version", "ann_list", "ann_code"}),
+}
 
 
 def _doctype_fields() -> dict[str, set[str]]:
@@ -164,6 +173,7 @@ class TestEveryColumnInChatSqlExists(unittest.TestCase):
                 known = set(STANDARD_COLUMNS) | set(CORE_DOCTYPE_COLUMNS)
                 for doctype in doctypes:
                     known |= fields.get(doctype, set())
+                    known |= RAW_DDL_COLUMNS.get(doctype, frozenset())
                 known |= set(ALIAS.findall(statement))
                 # A table's alias is a backticked lowercase token too, and is not a column.
                 known |= set(TABLE_ALIAS.findall(statement))
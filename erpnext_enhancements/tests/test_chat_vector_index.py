@@ -0,0 +1,204 @@
+"""The packed per-room vector index agrees with the exact backend. Bench-free.
+
+:class:`chat.retrieval.vectors.RoomMatrixIndex` replaces a per-row decode-and-dot loop with
+one matrix-vector product per room, and the failure it must not have is the silent one: a
+ranking that is *plausible* but not the ranking the exact backend would have produced, or a
+room served from a matrix that no longer describes it. Neither raises. So the assertions here
+are about agreement and about refusal:
+
+* the same rows produce the same order as :class:`NumpyVectorBackend`, ties included;
+* a room outside ``allowed_rooms``, or whose fingerprint moved, contributes nothing;
+* the ``max_candidate_chunks`` recency cap keeps the *recent* chunks, as the SQL cap did;
+* a row filed under another room never enters a room's matrix;
+* both stored forms — raw ``float32`` bytes and the legacy base64 — decode to the same vector.
+
+Needs ``numpy``, which the production bench has and this suite's CI step installs.
+
+Plain pytest functions, so this file needs its **own**
+``python -m pytest erpnext_enhancements/tests/test_chat_vector_index.py -q`` step in CI.
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from erpnext_enhancements.chat.retrieval import vectors  # noqa: E402
+
+
+def _corpus(rooms: int = 3, per_room: int = 40, dim: int = 16, seed: int = 7):
+	rng = random.Random(seed)
+	rows = []
+	seq = 0
+	for r in range(rooms):
+		for c in range(per_room):
+			seq += 1
+			values = [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+			rows.append(
+				(f"chunk-{r}-{c:03d}", f"room-{r}", vectors.encode_vector(vectors.normalise(values)), dim, seq)
+			)
+	return rows
+
+
+def _fingerprint(rows, room):
+	own = [row for row in rows if row[1] == room]
+	return (len(own), sum(hash(row[0]) & 0xFFFF for row in own), "2026-10-01 00:00:00")
+
+
+def _index(rows, **kwargs):
+	index = vectors.RoomMatrixIndex(**kwargs)
+	fingerprints = {}
+	for room in sorted({row[1] for row in rows}):
+		fingerprints[room] = _fingerprint(rows, room)
+		index.put(vectors.pack_room(room, rows, fingerprint=fingerprints[room]))
+	return index, fingerprints
+
+
+def test_the_packed_index_ranks_exactly_as_the_exact_backend_does() -> None:
+	rows = _corpus()
+	index, fingerprints = _index(rows)
+	allowed = frozenset({"room-0", "room-2"})
+	query = [random.Random(1).uniform(-1, 1) for _ in range(16)]
+
+	exact = vectors.NumpyVectorBackend(candidate_loader=lambda: [row[:4] for row in rows]).search(
+		allowed, query, limit=0
+	)
+	packed, considered = index.search(allowed, query, 0, fingerprints=fingerprints)
+
+	assert [hit.chunk for hit in packed] == [hit.chunk for hit in exact]
+	assert considered == 80
+	for mine, theirs in zip(packed, exact, strict=True):
+		assert mine.room == theirs.room
+		assert mine.similarity == pytest.approx(theirs.similarity, abs=1e-5)
+
+
+def test_a_limit_cuts_on_the_name_tie_break_rather_than_partition_order() -> None:
+	dim = 4
+	same = vectors.encode_vector(vectors.normalise([1.0, 0.0, 0.0, 0.0]))
+	rows = [(f"chunk-{c}", "room-a", same, dim, c + 1) for c in range(10)]
+	index, fingerprints = _index(rows)
+
+	hits, _ = index.search(frozenset({"room-a"}), [1.0, 0.0, 0.0, 0.0], 3, fingerprints=fingerprints)
+	assert [hit.chunk for hit in hits] == ["chunk-0", "chunk-1", "chunk-2"]
+
+
+def test_a_room_outside_the_allowed_set_contributes_nothing() -> None:
+	rows = _corpus()
+	index, fingerprints = _index(rows)
+	hits, considered = index.search(frozenset({"room-1"}), [1.0] * 16, 0, fingerprints=fingerprints)
+	assert {hit.room for hit in hits} == {"room-1"}
+	assert considered == 40
+
+
+def test_a_room_whose_fingerprint_moved_is_not_served_and_is_reported_stale() -> None:
+	rows = _corpus()
+	index, fingerprints = _index(rows)
+	moved = dict(fingerprints, **{"room-0": (39, 1, "2026-10-02 00:00:00")})
+
+	hits, _ = index.search(frozenset({"room-0", "room-1"}), [1.0] * 16, 0, fingerprints=moved)
+	assert {hit.room for hit in hits} == {"room-1"}
+	assert index.stale_rooms(moved) == ["room-0"]
+
+
+def test_a_room_the_gate_did_not_fingerprint_is_not_served() -> None:
+	"""No fingerprint means the filtered read found nothing to score there — not "use the cache"."""
+	rows = _corpus()
+	index, fingerprints = _index(rows)
+	del fingerprints["room-2"]
+	hits, _ = index.search(frozenset({"room-2"}), [1.0] * 16, 0, fingerprints=fingerprints)
+	assert hits == []
+
+
+def test_the_candidate_cap_keeps_the_most_recent_chunks() -> None:
+	rows = _corpus(rooms=2, per_room=30)
+	index, fingerprints = _index(rows)
+	hits, considered = index.search(
+		frozenset({"room-0", "room-1"}), [1.0] * 16, 0, fingerprints=fingerprints, candidate_cap=10
+	)
+	assert considered == 10
+	assert {hit.chunk for hit in hits} == {f"chunk-1-{c:03d}" for c in range(20, 30)}
+
+
+def test_a_row_filed_under_another_room_never_enters_the_matrix() -> None:
+	rows = _corpus(rooms=2, per_room=5)
+	packed = vectors.pack_room("room-0", rows, fingerprint=(5, 0, ""))
+	assert len(packed) == 5
+	assert set(packed.names.tolist()) == {f"chunk-0-{c:03d}" for c in range(5)}
+
+
+def test_a_malformed_or_mismatched_vector_is_skipped_and_recorded() -> None:
+	rows = [
+		("good", "room-a", vectors.encode_vector([1.0, 0.0, 0.0]), 3, 1),
+		("short", "room-a", vectors.encode_vector([1.0, 0.0]), 2, 2),
+		("garbage", "room-a", "not base64!", 3, 3),
+	]
+	packed = vectors.pack_room("room-a", rows, fingerprint=(3, 0, ""), expected_dim=3)
+	assert packed.names.tolist() == ["good"]
+	assert sorted(entry.split(":")[0] for entry in packed.skipped) == ["garbage", "short"]
+
+
+def test_an_unnormalised_stored_vector_is_scored_as_cosine() -> None:
+	rows = [("loud", "room-a", vectors.encode_vector([10.0, 0.0]), 2, 1)]
+	index, fingerprints = _index(rows)
+	hits, _ = index.search(frozenset({"room-a"}), [1.0, 0.0], 0, fingerprints=fingerprints)
+	assert hits[0].similarity == pytest.approx(1.0, abs=1e-6)
+
+
+def test_a_zero_query_matches_nothing() -> None:
+	rows = _corpus()
+	index, fingerprints = _index(rows)
+	assert index.search(frozenset({"room-0"}), [0.0] * 16, 0, fingerprints=fingerprints) == ([], 0)
+
+
+def test_the_byte_ceiling_evicts_the_least_recently_searched_room() -> None:
+	rows = _corpus(rooms=3, per_room=40, dim=16)
+	one_room = vectors.pack_room("room-0", rows, fingerprint=(0, 0, "")).nbytes
+	index, fingerprints = _index(rows, max_bytes=one_room * 2)
+	assert index.rooms() == ("room-1", "room-2")
+	assert index.nbytes <= one_room * 2
+
+
+def test_forget_drops_a_room_and_reports_what_it_held() -> None:
+	rows = _corpus()
+	index, fingerprints = _index(rows)
+	assert index.forget(["room-0", "room-9"]) == 1
+	assert index.stale_rooms(fingerprints) == ["room-0"]
+
+
+def test_the_stored_form_is_raw_little_endian_float32() -> None:
+	stored = vectors.encode_vector([1.0, -2.5, 0.25])
+	assert isinstance(stored, bytes)
+	assert len(stored) == 12
+	assert vectors.decode_vector(stored, expected_dim=3).tolist() == [1.0, -2.5, 0.25]
+
+
+def test_binary_decode_is_a_view_over_the_driver_buffer_not_a_copy() -> None:
+	buffer = bytearray(vectors.encode_vector([1.0, 2.0]))
+	decoded = vectors.decode_vector(buffer)
+	assert numpy.shares_memory(decoded, numpy.frombuffer(buffer, dtype="<f4"))
+
+
+def test_a_row_the_backfill_has_not_reached_decodes_and_ranks_the_same() -> None:
+	"""Mid-migration a room holds both forms; the index must not care which it was handed."""
+	rows = _corpus(rooms=1, per_room=20)
+	legacy = [
+		(name, room, vectors.encode_vector_base64(vectors.decode_vector(stored).tolist()), dim, seq)
+		if seq % 2
+		else (name, room, stored, dim, seq)
+		for name, room, stored, dim, seq in rows
+	]
+	query = [random.Random(3).uniform(-1, 1) for _ in range(16)]
+	binary_index, fingerprints = _index(rows)
+	mixed_index, _ = _index(legacy)
+
+	binary, _ = binary_index.search(frozenset({"room-0"}), query, 0, fingerprints=fingerprints)
+	mixed, _ = mixed_index.search(frozenset({"room-0"}), query, 0, fingerprints=fingerprints)
+	assert [hit.chunk for hit in mixed] == [hit.chunk for hit in binary]
+
+
+def test_bytes_that_are_not_whole_float32s_are_refused() -> None:
+	with pytest.raises(vectors.VectorBackendError):
+		vectors.decode_vector(b"\x00\x00\x80")
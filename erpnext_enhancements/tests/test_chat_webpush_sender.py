@@ -172,5 +172,35 @@ class AlertDeliveryTest(unittest.TestCase):
 		)
 
 
+class ConcurrentFanOutTest(unittest.TestCase):
+	"""``push_to_users`` POSTs a whole room's devices on a bounded pool. Only the POST may
+	leave the job's thread: the database connection and the site context belong to it."""
+
+	def test_the_post_touches_nothing_but_the_network(self):
+		"""``_post`` runs on a pool thread, where there is no site to read config from and no
+		connection to write to. Signing and bookkeeping belong in ``_prepare`` and the caller."""
+		src = _src("_post")
+		for forbidden in ("frappe.", "vapid.", "subscriptions."):
+			self.assertNotIn(forbidden, src, f"_post reaches for {forbidden} on a pool thread")
+
+	def test_the_pool_is_bounded_and_named(self):
+		src = _src("_post_all")
+		self.assertIn("ThreadPoolExecutor(", src)
+		self.assertIn("PUSH_CONCURRENCY", src)
+		self.assertIn('thread_name_prefix="chat-push"', src)
+
+	def test_the_room_fan_out_alerts_once_after_both_rounds(self):
+		"""Same rule as ``push_to_user``: one alert per fan-out, after the count is known —
+		which here means after the 413 retry round too."""
+		src = _src("push_to_users")
+		self.assertEqual(src.count("_alert_rate_limited("), 1)
+		self.assertLess(src.rindex("_post_all("), src.index("_alert_rate_limited("))
+
+	def test_the_room_fan_out_keeps_the_413_retry_without_the_preview(self):
+		src = _src("push_to_users")
+		self.assertIn("retry_without_preview", src)
+		self.assertIn('body=""', src)
+
+
 if __name__ == "__main__":
 	unittest.main()
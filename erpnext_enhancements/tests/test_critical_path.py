@@ -0,0 +1,232 @@
+"""Bench-free tests for the critical-path engine and its working-day calendar.
+
+The numbers are the whole feature, so most of these pin them. They cover the
+float of a task beside the critical chain, weekends and holidays that must not
+count as slack, a planned start later than the dependencies allow, and undated
+tasks. The rest check the cache: it must be reused, and dropped only by a change
+that can move the schedule. A portfolio-sized network must stay well inside a
+second.
+
+Run: python -m unittest erpnext_enhancements.tests.test_critical_path
+"""
+
+import sys
+import time
+import types
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+cpm = None
+TaskGraph = None
+WorkingCalendar = None
+
+# 2026-01-05 is a Monday.
+MON = date(2026, 1, 5)
+
+
+def setUpModule():
+	global cpm, TaskGraph, WorkingCalendar
+	from erpnext_enhancements.tests.test_assistant_tools_schema import install_stubs
+
+	install_stubs()
+	import frappe
+
+	if not hasattr(frappe, "whitelist"):
+		frappe.whitelist = lambda *a, **k: (lambda fn: fn)
+	if not hasattr(frappe.utils, "getdate"):
+		frappe.utils.getdate = lambda value=None: value
+	if not hasattr(frappe.utils, "add_to_date"):
+		frappe.utils.add_to_date = lambda value, days=0: value + timedelta(days=days)
+	for name in (
+		"erpnext_enhancements.utils.working_days",
+		"erpnext_enhancements.project_enhancements.task_graph",
+		"erpnext_enhancements.project_enhancements.critical_path",
+	):
+		sys.modules.pop(name, None)
+	from erpnext_enhancements.project_enhancements import critical_path, task_graph
+	from erpnext_enhancements.utils import working_days
+
+	cpm = critical_path
+	TaskGraph = task_graph.TaskGraph
+	WorkingCalendar = working_days.WorkingCalendar
+
+
+def _days(n):
+	return MON + timedelta(days=n)
+
+
+def _graph(tasks, links=()):
+	rows = [{"name": n, "exp_start_date": s, "exp_end_date": e} for n, (s, e) in tasks.items()]
+	return TaskGraph(rows, links)
+
+
+class WorkingCalendarTests(unittest.TestCase):
+	def test_weekends_and_holidays_share_the_next_working_index(self):
+		cal = WorkingCalendar([_days(7), _days(5)])  # next Monday, plus a Saturday
+		self.assertEqual(cal.index(_days(5)), cal.index(_days(8)), "Sat/Sun/holiday Mon -> Tue")
+		self.assertEqual(cal.index(_days(8)) - cal.index(MON), 5)
+		self.assertEqual(cal.day_at(cal.index(MON) + 5), _days(8))
+
+	def test_day_at_inverts_index_across_a_long_span(self):
+		holidays = [_days(n) for n in (0, 1, 30, 31, 32, 200, 365)]
+		cal = WorkingCalendar(holidays)
+		day = MON - timedelta(days=10)
+		for _ in range(500):
+			if cal.is_working_day(day):
+				self.assertEqual(cal.day_at(cal.index(day)), day)
+			day += timedelta(days=1)
+
+
+class ComputeTests(unittest.TestCase):
+	def setUp(self):
+		patcher = mock.patch.object(cpm, "getdate", lambda value=None: value)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		self.cal = WorkingCalendar()
+
+	def test_the_longer_branch_is_critical_and_the_shorter_has_float(self):
+		# A (Mon-Tue) -> B (Wed-Fri) -> D (next Mon); A -> C (Wed) -> D
+		graph = _graph(
+			{
+				"A": (_days(0), _days(1)),
+				"B": (_days(2), _days(4)),
+				"C": (_days(2), _days(2)),
+				"D": (_days(7), _days(7)),
+			},
+			[("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")],
+		)
+		result = cpm.compute(graph, self.cal)
+		self.assertEqual(result["critical_path"], ["A", "B", "D"])
+		c = result["tasks"]["C"]
+		self.assertEqual((c["total_float"], c["free_float"]), (2, 2), "Thu and Fri, not the weekend")
+		self.assertEqual(c["latest_start"], _days(4))
+		self.assertEqual(result["finish"], _days(7))
+		self.assertEqual(result["tasks"]["B"]["duration"], 3)
+
+	def test_a_holiday_is_not_slack(self):
+		tasks = {"A": (_days(0), _days(0)), "B": (_days(0), _days(2)), "END": (_days(3), _days(3))}
+		links = [("A", "END"), ("B", "END")]
+		plain = cpm.compute(_graph(tasks, links), self.cal)
+		self.assertEqual(plain["tasks"]["A"]["total_float"], 2)
+		with_holiday = cpm.compute(_graph(tasks, links), WorkingCalendar([_days(1)]))
+		self.assertEqual(with_holiday["tasks"]["A"]["total_float"], 1)
+		self.assertEqual(with_holiday["tasks"]["B"]["duration"], 2)
+
+	def test_a_late_planned_start_leaves_float_on_its_predecessor(self):
+		graph = _graph({"A": (_days(0), _days(0)), "B": (_days(3), _days(3))}, [("A", "B")])
+		tasks = cpm.compute(graph, self.cal)["tasks"]
+		self.assertEqual(tasks["A"]["free_float"], 2)
+		self.assertEqual(tasks["A"]["total_float"], 2)
+		self.assertTrue(tasks["B"]["critical"])
+
+	def test_a_start_earlier_than_its_predecessor_allows_is_pushed(self):
+		graph = _graph({"A": (_days(0), _days(2)), "B": (_days(1), _days(1))}, [("A", "B")])
+		b = cpm.compute(graph, self.cal)["tasks"]["B"]
+		self.assertEqual(b["earliest_start"], _days(3))
+
+	def test_undated_tasks_follow_predecessors_or_are_left_out(self):
+		graph = _graph(
+			{"A": (_days(0), _days(0)), "MILESTONE": (None, None), "LOOSE": (None, None)},
+			[("A", "MILESTONE")],
+		)
+		result = cpm.compute(graph, self.cal)
+		self.assertEqual(result["tasks"]["MILESTONE"]["duration"], 0)
+		self.assertEqual(result["tasks"]["MILESTONE"]["earliest_start"], _days(1))
+		self.assertNotIn("LOOSE", result["tasks"])
+
+	def test_cycle_members_are_reported_not_scheduled(self):
+		graph = _graph(
+			{"A": (_days(0), _days(0)), "B": (_days(1), _days(1)), "C": (_days(2), _days(2))},
+			[("B", "C"), ("C", "B")],
+		)
+		result = cpm.compute(graph, self.cal)
+		self.assertEqual(result["cyclic"], ["B", "C"])
+		self.assertEqual(list(result["tasks"]), ["A"])
+
+	def test_an_empty_project_has_no_finish(self):
+		self.assertEqual(cpm.compute(_graph({}), self.cal)["finish"], None)
+
+	def test_a_portfolio_sized_network_is_fast(self):
+		# 40 chains of 100 tasks, each chain fanning into the next task of its neighbour.
+		tasks, links = {}, []
+		for chain in range(40):
+			for step in range(100):
+				name = f"T{chain}-{step}"
+				tasks[name] = (_days(step * 2), _days(step * 2 + 1))
+				if step:
+					links.append((f"T{chain}-{step - 1}", name))
+					if chain:
+						links.append((f"T{chain - 1}-{step - 1}", name))
+		graph = _graph(tasks, links)
+		started = time.perf_counter()
+		result = cpm.compute(graph, WorkingCalendar([_days(n) for n in range(0, 400, 9)]))
+		self.assertLess(time.perf_counter() - started, 1.0)
+		self.assertEqual(len(result["tasks"]), 4000)
+
+
+class CacheTests(unittest.TestCase):
+	def setUp(self):
+		import frappe
+
+		self.store = {}
+		cache = types.SimpleNamespace(
+			get_value=self.store.get,
+			set_value=lambda key, value, expires_in_sec=None: self.store.__setitem__(key, value),
+			delete_value=lambda key: self.store.pop(key, None),
+			delete_keys=lambda prefix: [self.store.pop(k) for k in list(self.store) if k.startswith(prefix)],
+		)
+		self.loads = mock.Mock(side_effect=lambda project: _graph({"A": (MON, MON)}))
+		patches = [
+			mock.patch.object(frappe, "cache", lambda: cache, create=True),
+			mock.patch.object(
+				frappe,
+				"get_all",
+				lambda doctype, **kw: [{"name": p, "holiday_list": None, "company": None} for p in kw["filters"]["name"][1]],
+				create=True,
+			),
+			mock.patch.object(cpm.TaskGraph, "for_project", self.loads),
+			mock.patch.object(cpm, "getdate", lambda value=None: value),
+		]
+		for p in patches:
+			p.start()
+			self.addCleanup(p.stop)
+
+	def test_a_schedule_is_computed_once_and_then_served_from_cache(self):
+		first = cpm.get_schedule("PRJ-1")
+		self.assertEqual(cpm.get_schedule("PRJ-1"), first)
+		self.assertEqual(self.loads.call_count, 1)
+		self.assertEqual(first["project"], "PRJ-1")
+
+	def test_only_a_schedule_change_invalidates(self):
+		cpm.get_schedules(["PRJ-1", "PRJ-2"])
+		before = types.SimpleNamespace(exp_start_date=MON, exp_end_date=MON, project="PRJ-1", depends_on=[])
+		before.get = lambda key, default=None: getattr(before, key, default)
+
+		def task(**changes):
+			doc = types.SimpleNamespace(**{**vars(before), **changes, "get_doc_before_save": lambda: before})
+			doc.get = lambda key, default=None: getattr(doc, key, default)
+			return doc
+
+		cpm.on_task_change(task(description="words"), "on_update")
+		self.assertEqual(len(self.store), 2)
+		cpm.on_task_change(task(depends_on=[{"task": "X"}]), "on_update")
+		self.assertEqual(sorted(self.store), [cpm._key("PRJ-2")])
+		cpm.get_schedule("PRJ-1")
+		cpm.on_task_change(task(project="PRJ-2"), "on_update")
+		self.assertEqual(self.store, {}, "a move drops both projects")
+
+	def test_a_holiday_list_save_drops_every_schedule(self):
+		cpm.get_schedules(["PRJ-1", "PRJ-2"])
+		self.store["unrelated"] = 1
+		cpm.on_holiday_list_change(None)
+		self.assertEqual(list(self.store), ["unrelated"])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,142 @@
+"""Bench-free tests for the coalesced Project Dashboard realtime events.
+
+``realtime.queue`` replaced a ``publish_realtime`` per Task/Project save. The
+promises it makes are few: a transaction sends at most one event per project,
+and only after it commits. A rollback sends nothing. A Task count past the cap
+becomes "reload the project". Without a transaction to ride on, it still
+publishes. These drive it against fake ``frappe.db`` callback managers.
+
+Run: python -m unittest erpnext_enhancements.tests.test_dashboard_realtime
+"""
+
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+realtime = None
+
+
+def setUpModule():
+	global realtime
+	from erpnext_enhancements.tests.test_assistant_tools_schema import install_stubs
+
+	install_stubs()
+	import frappe
+
+	if not hasattr(frappe, "whitelist"):
+		frappe.whitelist = lambda *a, **k: (lambda fn: fn)
+	sys.modules.pop("erpnext_enhancements.project_enhancements.realtime", None)
+	from erpnext_enhancements.project_enhancements import realtime as module
+
+	realtime = module
+
+
+class _Callbacks:
+	"""``frappe.db.after_commit`` / ``after_rollback``: a set of callables run once."""
+
+	def __init__(self):
+		self.callbacks = []
+
+	def add(self, fn):
+		self.callbacks.append(fn)
+
+	def run(self):
+		callbacks, self.callbacks = self.callbacks, []
+		for fn in callbacks:
+			fn()
+
+
+class QueueTests(unittest.TestCase):
+	def setUp(self):
+		import frappe
+
+		self.after_commit = _Callbacks()
+		self.after_rollback = _Callbacks()
+		self.publish = mock.Mock()
+		self.log_error = mock.Mock()
+		patches = [
+			mock.patch.object(
+				frappe,
+				"db",
+				types.SimpleNamespace(after_commit=self.after_commit, after_rollback=self.after_rollback),
+				create=True,
+			),
+			mock.patch.object(frappe, "local", types.SimpleNamespace(), create=True),
+			mock.patch.object(frappe, "publish_realtime", self.publish, create=True),
+			mock.patch.object(frappe, "log_error", self.log_error, create=True),
+			mock.patch.object(frappe, "get_traceback", lambda *a, **k: "tb", create=True),
+		]
+		for p in patches:
+			p.start()
+			self.addCleanup(p.stop)
+
+	def _commit(self):
+		self.after_rollback.callbacks = []
+		self.after_commit.run()
+
+	def _events(self):
+		return {c.args[1]["project"]: c.args[1] for c in self.publish.call_args_list}
+
+	def test_a_burst_of_saves_sends_one_event_per_project_after_commit(self):
+		for i in range(50):
+			realtime.queue("PRJ-1", tasks=[f"TASK-{i:03d}"])
+		realtime.queue("PRJ-2", project_changed=True)
+		realtime.queue("PRJ-1", tasks=["TASK-000"])
+		self.publish.assert_not_called()
+		self.assertEqual(len(self.after_commit.callbacks), 1, "registered once per transaction")
+
+		self._commit()
+		events = self._events()
+		self.assertEqual(self.publish.call_count, 2)
+		self.assertEqual(len(events["PRJ-1"]["tasks"]), 50)
+		self.assertFalse(events["PRJ-1"]["project_changed"])
+		self.assertEqual(events["PRJ-2"]["tasks"], [])
+		self.assertTrue(events["PRJ-2"]["project_changed"])
+		self.assertEqual(self.publish.call_args.args[0], realtime.EVENT)
+
+	def test_the_next_transaction_starts_clean(self):
+		realtime.queue("PRJ-1", tasks=["A"])
+		self._commit()
+		realtime.queue("PRJ-1", tasks=["B"])
+		self._commit()
+		first, second = (c.args[1] for c in self.publish.call_args_list)
+		self.assertEqual((first["tasks"], second["tasks"]), (["A"], ["B"]))
+		self.assertGreaterEqual(second["version"], first["version"])
+
+	def test_a_rollback_sends_nothing(self):
+		realtime.queue("PRJ-1", tasks=["A"])
+		self.after_commit.callbacks = []
+		self.after_rollback.run()
+		self.assertIsNone(getattr(sys.modules["frappe"].local, realtime._PENDING))
+		self._commit()
+		self.publish.assert_not_called()
+
+	def test_too_many_tasks_means_reload_the_project(self):
+		realtime.queue("PRJ-1", tasks=[f"T{i}" for i in range(realtime.MAX_TASK_NAMES + 1)])
+		self._commit()
+		self.assertIsNone(self._events()["PRJ-1"]["tasks"])
+
+	def test_without_a_transaction_it_publishes_at_once(self):
+		import frappe
+
+		with mock.patch.object(frappe, "db", types.SimpleNamespace(), create=True):
+			realtime.queue("PRJ-1", tasks=["A", None])
+		self.assertEqual(self._events()["PRJ-1"]["tasks"], ["A"])
+
+	def test_no_project_no_event_and_a_failed_publish_is_logged(self):
+		realtime.queue(None, tasks=["A"])
+		self.assertEqual(self.after_commit.callbacks, [])
+		self.publish.side_effect = RuntimeError("redis down")
+		realtime.queue("PRJ-1")
+		self._commit()
+		self.log_error.assert_called_once()
+
+
+if __name__ == "__main__":
+	unittest.main()
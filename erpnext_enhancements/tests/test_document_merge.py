@@ -11,10 +11,17 @@ rails (self-merge, feature switch) hold.
 the now-removed "Open" status.)
 """
 
+from unittest import mock
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
-from erpnext_enhancements.document_merge import get_merge_preview, perform_merge
+from erpnext_enhancements.document_merge import (
+	execute_bulk_merge_job,
+	get_merge_preview,
+	perform_bulk_merge,
+	perform_merge,
+)
 
 SETTINGS = "ERPNext Enhancements Settings"
 
@@ -108,6 +115,7 @@ class TestDocumentMerge(FrappeTestCase):
 		preview = get_merge_preview("Project", self.survivor.name, self.loser.name)
 		self.assertGreaterEqual(preview["reference_total"], 1)
 		task_refs = [r for r in preview["hard_references"] if r["doctype"] == "Task"]
+		self.assertIn("unindexed_links", preview)
 		self.assertTrue(task_refs)
 
 	def test_self_merge_is_refused(self):
@@ -118,3 +126,45 @@ class TestDocumentMerge(FrappeTestCase):
 		frappe.db.set_single_value(SETTINGS, "document_merge_enabled", 0)
 		with self.assertRaises(frappe.ValidationError):
 			perform_merge("Project", self.survivor.name, self.loser.name)
+
+	def test_bulk_merge_folds_every_loser_into_the_survivor(self):
+		second = _make_project("DocMerge Loser Two")
+		tasks = [
+			frappe.get_doc(
+				{"doctype": "Task", "subject": f"Bulk Task {i}", "project": loser}
+			).insert(ignore_permissions=True)
+			for i, loser in enumerate((self.loser.name, second.name))
+		]
+
+		result = perform_bulk_merge("Project", self.survivor.name, [self.loser.name, second.name])
+
+		self.assertEqual(result["failed"], [])
+		self.assertEqual(len(result["merged"]), 2)
+		for loser in (self.loser.name, second.name):
+			self.assertFalse(frappe.db.exists("Project", loser))
+		for task in tasks:
+			self.assertEqual(frappe.db.get_value("Task", task.name, "project"), self.survivor.name)
+
+	def test_bulk_job_merges_the_rest_when_a_loser_is_gone(self):
+		# A loser deleted (or merged) after the job was queued fails alone.
+		with mock.patch("frappe.publish_realtime") as publish:
+			execute_bulk_merge_job(
+				"Project", self.survivor.name, [self.loser.name, "PROJ-GONE-SINCE-QUEUED"], "Administrator"
+			)
+
+		self.assertFalse(frappe.db.exists("Project", self.loser.name))
+		notice = publish.call_args.args[1]
+		self.assertFalse(notice["success"])
+		self.assertEqual(notice["failed"], ["PROJ-GONE-SINCE-QUEUED"])
+
+	def test_bulk_job_reports_a_failed_discovery(self):
+		with (
+			mock.patch("frappe.publish_realtime") as publish,
+			mock.patch("erpnext_enhancements.document_merge.find_references", side_effect=RuntimeError("db")),
+		):
+			with self.assertRaises(RuntimeError):
+				execute_bulk_merge_job("Project", self.survivor.name, [self.loser.name], "Administrator")
+
+		self.assertEqual(publish.call_args.args[0], "document_merge_done")
+		self.assertFalse(publish.call_args.args[1]["success"])
+		self.assertTrue(frappe.db.exists("Project", self.loser.name))
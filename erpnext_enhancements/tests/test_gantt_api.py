@@ -800,6 +800,49 @@ def test_happy_path_shapes_tasks_and_links(env):
 	assert calls[0][1]["limit_page_length"] == 10
 
 
+def test_critical_path_flag_stamps_float_onto_task_rows(env, monkeypatch):
+	frappe, gantt = env
+	rows = [
+		Row({"name": n, "subject": n, "exp_start_date": "2026-01-05 00:00:00", "exp_end_date": None})
+		for n in ("T1", "T2", "T3")
+	]
+	frappe.get_list = lambda doctype, **kwargs: rows if doctype == "Task" else []
+	frappe.get_all = lambda doctype, **kwargs: [
+		Row({"name": "T1", "project": "PRJ-1"}),
+		Row({"name": "T2", "project": "PRJ-1"}),
+		Row({"name": "T3", "project": None}),
+	]
+	asked = []
+
+	def get_schedules(projects):
+		asked.append(projects)
+		return {
+			"PRJ-1": {
+				"finish": "2026-01-09",
+				"tasks": {"T1": {"total_float": 0, "free_float": 0, "critical": True}},
+			}
+		}
+
+	# The package __init__ cannot import under these stubs; stand in for it.
+	package = types.ModuleType("erpnext_enhancements.project_enhancements")
+	module = types.ModuleType("erpnext_enhancements.project_enhancements.critical_path")
+	module.get_schedules = get_schedules
+	package.critical_path = module
+	monkeypatch.setitem(sys.modules, "erpnext_enhancements.project_enhancements", package)
+	monkeypatch.setitem(sys.modules, "erpnext_enhancements.project_enhancements.critical_path", module)
+
+	plain = gantt.get_gantt_data(base_config())
+	assert "critical_path" not in plain["meta"] and asked == [], "opt-in only"
+
+	out = gantt.get_gantt_data(base_config(critical_path=1))
+	by_id = {t["id"]: t for t in out["tasks"]}
+	assert (by_id["T1"]["ee_total_float"], by_id["T1"]["ee_critical"]) == (0, True)
+	assert "ee_total_float" not in by_id["T2"], "a task the schedule could not place gets nothing"
+	assert "ee_total_float" not in by_id["T3"]
+	assert asked == [["PRJ-1"]]
+	assert out["meta"]["critical_path"] == {"PRJ-1": "2026-01-09"}
+
+
 def test_config_accepts_json_string(env):
 	frappe, gantt = env
 	frappe.get_list = lambda *args, **kwargs: []
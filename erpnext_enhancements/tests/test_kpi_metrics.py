@@ -8,7 +8,7 @@ Run: python -m unittest erpnext_enhancements.tests.test_kpi_metrics
 """
 
 import unittest
-from datetime import datetime
+from datetime import date, datetime
 
 from erpnext_enhancements.kpi_dashboards import metrics
 
@@ -124,5 +124,45 @@ class TestSourceStale(unittest.TestCase):
 		)
 
 
+class TestDailyPartials(unittest.TestCase):
+	FIRST = date(2026, 6, 1)
+	LAST = date(2026, 6, 5)
+
+	def test_days_between_is_inclusive(self):
+		self.assertEqual(len(metrics.days_between(self.FIRST, self.LAST)), 5)
+		self.assertEqual(metrics.days_between(self.LAST, self.FIRST), [])
+
+	def test_first_run_computes_every_day(self):
+		self.assertEqual(
+			metrics.days_to_compute([], [], self.FIRST, self.LAST),
+			metrics.days_between(self.FIRST, self.LAST),
+		)
+
+	def test_only_new_and_dirty_days_are_recomputed(self):
+		stored = metrics.days_between(self.FIRST, date(2026, 6, 4))
+		self.assertEqual(
+			metrics.days_to_compute(stored, [date(2026, 6, 2)], self.FIRST, self.LAST),
+			[date(2026, 6, 2), date(2026, 6, 5)],
+		)
+
+	def test_dirty_days_outside_the_horizon_are_ignored(self):
+		stored = metrics.days_between(self.FIRST, self.LAST)
+		self.assertEqual(metrics.days_to_compute(stored, [date(2026, 5, 1)], self.FIRST, self.LAST), [])
+
+	def test_window_total_matches_a_full_scan(self):
+		# (posting day, amount) documents; the window is [since, until).
+		docs = [(date(2026, 6, d), 10.0 * d) for d in (1, 2, 2, 4, 5)]
+		partials = {}
+		for day, amount in docs:
+			total, rows = partials.get(day, (0.0, 0))
+			partials[day] = (total + amount, rows + 1)
+		since, until = date(2026, 6, 2), date(2026, 6, 5)
+		full = [amount for day, amount in docs if since <= day < until]
+		self.assertEqual(metrics.window_total(partials, since, until), (sum(full), len(full)))
+
+	def test_window_total_of_nothing_is_zero_rows(self):
+		self.assertEqual(metrics.window_total({}, self.FIRST, self.LAST), (0.0, 0))
+
+
 if __name__ == "__main__":
 	unittest.main()
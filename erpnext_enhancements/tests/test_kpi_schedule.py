@@ -0,0 +1,67 @@
+"""Bench-free unit tests for the KPI batch fan-out order (kpi_dashboards.schedule).
+
+The nightly batch enqueues one job per department, and Executive — which reads
+the other departments' snapshots — only once its inputs are built. Getting this
+wrong is quiet: an Executive started too early rolls up yesterday's numbers with
+no error, and one never started leaves a hole in the trend data. So:
+
+* everything without an in-batch input starts at once;
+* a dependent is released by the input that finishes last, and only then;
+* a re-drive of failed departments also rebuilds what reads them.
+
+Run: python -m unittest erpnext_enhancements.tests.test_kpi_schedule
+"""
+
+import unittest
+
+from erpnext_enhancements.kpi_dashboards import schedule
+
+ORDER = ["Finance", "Sales", "Operations", "Marketing", "HR", "Executive"]
+DEPENDS_ON = {"Executive": ("Finance", "Sales", "Operations", "HR")}
+
+
+class TestRoots(unittest.TestCase):
+	def test_independent_departments_all_start_and_executive_waits(self):
+		self.assertEqual(schedule.roots(ORDER, DEPENDS_ON), ["Finance", "Sales", "Operations", "Marketing", "HR"])
+
+	def test_a_dependent_whose_inputs_are_not_in_the_batch_starts_at_once(self):
+		self.assertEqual(schedule.roots(["Marketing", "Executive"], DEPENDS_ON), ["Marketing", "Executive"])
+
+	def test_a_dependent_waits_for_the_inputs_that_are_in_the_batch(self):
+		self.assertEqual(schedule.roots(["Finance", "Executive"], DEPENDS_ON), ["Finance"])
+
+
+class TestUnblocked(unittest.TestCase):
+	def test_executive_is_released_by_the_last_input_only(self):
+		done = set()
+		released = []
+		for dept in ["HR", "Sales", "Marketing", "Finance", "Operations"]:
+			done.add(dept)
+			released.append(schedule.unblocked(dept, ORDER, DEPENDS_ON, done))
+		self.assertEqual(released, [[], [], [], [], ["Executive"]])
+
+	def test_a_department_nobody_reads_releases_nothing(self):
+		self.assertEqual(schedule.unblocked("Marketing", ORDER, DEPENDS_ON, set(ORDER)), [])
+
+	def test_only_in_batch_inputs_are_waited_for(self):
+		# A re-drive of Finance alone: the other inputs already have today's snapshot.
+		self.assertEqual(
+			schedule.unblocked("Finance", ["Finance", "Executive"], DEPENDS_ON, {"Finance"}),
+			["Executive"],
+		)
+
+
+class TestWithDependents(unittest.TestCase):
+	def test_a_failed_input_rebuilds_executive_too(self):
+		self.assertEqual(schedule.with_dependents(["Sales"], DEPENDS_ON, ORDER), ["Sales", "Executive"])
+
+	def test_a_department_nobody_reads_is_rebuilt_alone(self):
+		self.assertEqual(schedule.with_dependents(["Marketing"], DEPENDS_ON, ORDER), ["Marketing"])
+
+	def test_dependents_are_followed_transitively_and_returned_in_order(self):
+		chain = {"B": ("A",), "C": ("B",)}
+		self.assertEqual(schedule.with_dependents(["A"], chain, ["C", "B", "A", "D"]), ["C", "B", "A"])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,402 @@
+"""Bench-free tests for the incremental offsite file store.
+
+The file tier is only as good as its bookkeeping. A blob that is skipped because
+the index *says* it exists, a manifest that names a blob holding other bytes, or a
+garbage collection that reads an unreadable manifest as "references nothing" all
+look like working backups until the day somebody restores one. So these drive
+``file_store`` against a real temporary site directory and a fake Drive that keeps
+objects in memory, and round-trip real gpg when it is installed.
+
+Stubs the Google client libraries and the few ``frappe`` names the module touches.
+
+Run: python -m unittest erpnext_enhancements.tests.test_offsite_backup_file_store
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+file_store = None
+backup = None
+drive = None
+
+
+def setUpModule():
+	global file_store, backup, drive
+	from erpnext_enhancements.tests.test_assistant_tools_schema import install_stubs
+	from erpnext_enhancements.tests.test_offsite_backup_upload import _install_stubs
+
+	install_stubs()
+	_install_stubs()
+	import frappe
+
+	utils = frappe.utils
+	utils.cint = lambda v: int(v or 0)
+	for name in ("add_to_date", "escape_html", "time_diff_in_hours"):
+		if not hasattr(utils, name):
+			setattr(utils, name, lambda *a, **k: None)
+	if not hasattr(frappe, "whitelist"):
+		frappe.whitelist = lambda *a, **k: (lambda fn: fn)
+	frappe.local = getattr(frappe, "local", None) or types.SimpleNamespace()
+	frappe.conf = getattr(frappe, "conf", None) or {}
+	for mod in (
+		"erpnext_enhancements.offsite_backup.drive",
+		"erpnext_enhancements.offsite_backup.file_store",
+		"erpnext_enhancements.offsite_backup.backup",
+	):
+		sys.modules.pop(mod, None)
+	from erpnext_enhancements.offsite_backup import backup as backup_module
+	from erpnext_enhancements.offsite_backup import drive as drive_module
+	from erpnext_enhancements.offsite_backup import file_store as store_module
+
+	file_store, backup, drive = store_module, backup_module, drive_module
+
+
+class _Settings(types.SimpleNamespace):
+	def get(self, key, default=None):
+		return getattr(self, key, default)
+
+
+class _Drive:
+	"""In-memory Drive: ``{folder: {name: {"id", "bytes", "createdTime"}}}``."""
+
+	def __init__(self):
+		self.folders = {}
+		self.uploads = []
+		self.deleted = []
+		self._ids = 0
+
+	def _id(self):
+		self._ids += 1
+		return f"id-{self._ids}"
+
+	def ensure_folder(self, service, parent, name, drive_id=None):
+		self.folders.setdefault(name, {})
+		return name
+
+	def find_folder(self, service, parent, name, drive_id=None):
+		return name if name in self.folders else None
+
+	def list_backup_files(self, service, folder, drive_id=None):
+		return [
+			{"id": obj["id"], "name": name, "createdTime": obj["createdTime"]}
+			for name, obj in self.folders[folder].items()
+		]
+
+	def upload_file(self, service, path, folder, name, chunk_size=None, digest=None):
+		with open(path, "rb") as handle:
+			data = handle.read()
+		if digest is not None:
+			digest.update(data)
+		obj = {"id": self._id(), "bytes": data, "createdTime": _drive_time(0)}
+		self.folders[folder][name] = obj
+		self.uploads.append(name)
+		return {"id": obj["id"], "size": str(len(data)), "md5Checksum": hashlib.md5(data).hexdigest()}
+
+	def download_file(self, service, file_id, local_path, chunk_size=None):
+		for objects in self.folders.values():
+			for obj in objects.values():
+				if obj["id"] == file_id:
+					with open(local_path, "wb") as handle:
+						handle.write(obj["bytes"])
+					return local_path
+		raise FileNotFoundError(file_id)
+
+	def delete_file(self, service, file_id):
+		for objects in self.folders.values():
+			for name, obj in list(objects.items()):
+				if obj["id"] == file_id:
+					del objects[name]
+					self.deleted.append(name)
+
+	def patches(self):
+		names = ("ensure_folder", "find_folder", "list_backup_files", "upload_file", "download_file", "delete_file")
+		patches = [mock.patch.object(drive, name, getattr(self, name)) for name in names]
+		patches.append(mock.patch.object(drive, "get_drive_service", lambda key: object()))
+		patches.append(mock.patch.object(drive, "check_folder", lambda service, folder: {"driveId": "drive"}))
+		return patches
+
+
+def _drive_time(days_ago):
+	return (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class _SiteTestCase(unittest.TestCase):
+	encrypt = False
+
+	def setUp(self):
+		import frappe
+
+		self.site = tempfile.mkdtemp(prefix="site-")
+		self.addCleanup(shutil.rmtree, self.site, ignore_errors=True)
+		for root in file_store.FILE_ROOTS:
+			os.makedirs(os.path.join(self.site, *root.split("/")))
+		self.write("public/files/logo.png", b"logo")
+		self.write("private/files/contract.pdf", b"contract")
+		self.write("private/files/copy-of-logo.png", b"logo")
+
+		self.drive = _Drive()
+		self.backup_passphrase = mock.Mock(return_value="s3cret")
+		clock = iter(range(1, 1000))
+		patches = [
+			*self.drive.patches(),
+			mock.patch.object(frappe, "get_site_path", lambda *p: os.path.join(self.site, *p), create=True),
+			mock.patch.object(
+				frappe, "get_system_settings", lambda key: 1 if self.encrypt else 0, create=True
+			),
+			mock.patch.object(frappe, "log_error", mock.Mock(), create=True),
+			mock.patch.object(frappe, "get_traceback", lambda *a, **k: "traceback", create=True),
+			mock.patch.object(frappe.local, "site", "test.site", create=True),
+			mock.patch.object(
+				file_store, "now_datetime", lambda: datetime(2026, 10, 18, 3, 0, next(clock))
+			),
+			mock.patch.object(file_store, "_passphrase", lambda: "s3cret" if self.encrypt else None),
+			mock.patch.object(file_store, "_backup_passphrase", self.backup_passphrase),
+		]
+		for p in patches:
+			p.start()
+			self.addCleanup(p.stop)
+
+	def write(self, relpath, data):
+		path = os.path.join(self.site, *relpath.split("/"))
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		with open(path, "wb") as handle:
+			handle.write(data)
+		return path
+
+	def run_backup(self):
+		return file_store.backup_files(
+			object(), "key", "root", "drive", {"chunk_bytes": drive.CHUNK_SIZE, "concurrency": 2}
+		)
+
+
+class IncrementalBackupTests(_SiteTestCase):
+	def test_only_new_content_is_uploaded(self):
+		first = self.run_backup()
+		self.assertEqual(first["files"], 3)
+		self.assertEqual(first["new_blobs"], 2, "identical files share one blob")
+
+		self.write("private/files/invoice.pdf", b"invoice")
+		uploads_before = len(self.drive.uploads)
+		second = self.run_backup()
+		self.assertEqual(second["new_blobs"], 1)
+		self.assertEqual(second["reused_blobs"], 2)
+		self.assertEqual(len(self.drive.uploads) - uploads_before, 2, "one blob + the manifest")
+
+	def test_the_index_skips_rehashing_unchanged_files(self):
+		self.run_backup()
+		second = self.run_backup()
+		self.assertEqual(second["hashed"], 0)
+		path = self.write("public/files/logo.png", b"new logo")
+		os.utime(path, ns=(1, 1))
+		self.assertEqual(self.run_backup()["hashed"], 1)
+
+	def test_blob_presence_is_read_from_drive_not_the_index(self):
+		self.run_backup()
+		self.drive.folders[file_store.BLOB_FOLDER].clear()
+		self.assertEqual(self.run_backup()["new_blobs"], 2)
+
+	def test_symlinks_are_skipped(self):
+		os.symlink("/etc/hostname", os.path.join(self.site, "public", "files", "link"))
+		self.assertEqual(self.run_backup()["files"], 3)
+
+	def test_a_file_changed_mid_run_is_left_out_of_the_manifest(self):
+		real = file_store._ship_blob
+
+		def racing(service, passphrase, sha, source, *args):
+			if source.endswith("contract.pdf"):
+				with open(source, "wb") as handle:
+					handle.write(b"rewritten")
+			return real(service, passphrase, sha, source, *args)
+
+		with mock.patch.object(file_store, "_ship_blob", racing):
+			result = self.run_backup()
+		self.assertEqual(result["changed_during_backup"], 1)
+		self.assertEqual(result["files"], 2)
+		blobs = self.drive.folders[file_store.BLOB_FOLDER]
+		self.assertNotIn(hashlib.sha256(b"contract").hexdigest(), blobs)
+
+	def test_a_failed_blob_fails_the_run_without_a_manifest(self):
+		real = drive.verify_upload
+
+		def flaky(name, *args):
+			if name == hashlib.sha256(b"contract").hexdigest():
+				raise RuntimeError("md5 mismatch")
+			return real(name, *args)
+
+		with mock.patch.object(drive, "verify_upload", flaky), self.assertRaises(RuntimeError):
+			self.run_backup()
+		self.assertFalse(self.drive.folders[file_store.MANIFEST_FOLDER])
+		self.assertNotIn(hashlib.sha256(b"contract").hexdigest(), self.drive.folders[file_store.BLOB_FOLDER])
+		self.assertIn(hashlib.sha256(b"logo").hexdigest(), self.drive.folders[file_store.BLOB_FOLDER])
+
+	def test_restore_rebuilds_the_tree_outside_the_live_site(self):
+		self.run_backup()
+		target = os.path.join(self.site, "restored")
+		with self._restore_settings():
+			result = file_store.restore_files(target_dir=target)
+		self.assertEqual((result["restored"], result["missing_blobs"]), (3, []))
+		with open(os.path.join(target, "private", "files", "contract.pdf"), "rb") as handle:
+			self.assertEqual(handle.read(), b"contract")
+
+	def _restore_settings(self):
+		settings = _Settings(drive_folder_id="root")
+		return mock.patch.multiple(
+			backup,
+			_settings=lambda: settings,
+			_service_account_key=lambda s: "key",
+		)
+
+	def test_a_plain_store_never_asks_for_the_passphrase(self):
+		# Looking it up used to generate a key into site_config on a site that
+		# never encrypted.
+		self.run_backup()
+		with self._restore_settings():
+			file_store.restore_files(target_dir=os.path.join(self.site, "restored"))
+		file_store.collect_garbage(object(), "root", "drive", _Settings(retention_days=30, min_keep=2))
+		self.backup_passphrase.assert_not_called()
+
+	def test_restore_refuses_paths_outside_the_store(self):
+		for bad in ("../etc/passwd", "/etc/passwd", "public/files/../../../etc/passwd", "sites.txt"):
+			with self.assertRaises(RuntimeError, msg=bad):
+				file_store._safe_join("/tmp/restore", bad)
+
+
+@unittest.skipUnless(shutil.which("gpg"), "gpg is not installed")
+class EncryptedBackupTests(_SiteTestCase):
+	encrypt = True
+
+	def test_blobs_are_ciphertext_and_restore_round_trips(self):
+		self.run_backup()
+		blobs = self.drive.folders[file_store.BLOB_FOLDER]
+		name = hashlib.sha256(b"contract").hexdigest() + file_store.GPG_SUFFIX
+		self.assertIn(name, blobs)
+		self.assertNotIn(b"contract", blobs[name]["bytes"])
+		self.assertTrue(all(n.endswith(".gpg") for n in self.drive.folders[file_store.MANIFEST_FOLDER]))
+
+		target = os.path.join(self.site, "restored")
+		settings = _Settings(drive_folder_id="root")
+		with mock.patch.multiple(backup, _settings=lambda: settings, _service_account_key=lambda s: "key"):
+			result = file_store.restore_files(target_dir=target)
+		self.assertEqual(result["restored"], 3)
+		self.assertEqual(result["hash_mismatches"], [])
+
+	def test_the_passphrase_is_not_on_the_command_line(self):
+		with mock.patch.object(file_store.subprocess, "Popen", wraps=file_store.subprocess.Popen) as popen:
+			self.run_backup()
+		for call in popen.call_args_list:
+			self.assertNotIn("s3cret", " ".join(call.args[0]))
+
+
+class BackupPassphraseTests(unittest.TestCase):
+	def test_the_passphrase_is_read_from_site_config_not_generated(self):
+		import frappe
+
+		with mock.patch.object(frappe, "conf", {}, create=True):
+			self.assertIsNone(file_store._backup_passphrase())
+		with mock.patch.object(frappe, "conf", {"backup_encryption_key": "k"}, create=True):
+			self.assertEqual(file_store._backup_passphrase(), "k")
+
+
+class GarbageCollectionTests(_SiteTestCase):
+	def setUp(self):
+		super().setUp()
+		self.settings = _Settings(retention_days=30, min_keep=2)
+
+	def backdate(self, folder, days_ago):
+		for obj in self.drive.folders[folder].values():
+			obj["createdTime"] = _drive_time(days_ago)
+
+	def collect(self):
+		return file_store.collect_garbage(object(), "root", "drive", self.settings)
+
+	def seed(self):
+		"""Three manifests 90/60/0 days old; the oldest alone references ``old.txt``."""
+		self.write("private/files/old.txt", b"old")
+		self.run_backup()
+		self.backdate(file_store.MANIFEST_FOLDER, 90)
+		os.unlink(os.path.join(self.site, "private", "files", "old.txt"))
+		self.run_backup()
+		manifests = self.drive.folders[file_store.MANIFEST_FOLDER]
+		newest = max(manifests)
+		manifests[newest]["createdTime"] = _drive_time(60)
+		self.run_backup()
+
+	def test_expired_manifests_and_their_orphans_are_collected(self):
+		self.seed()
+		count, info = self.collect()
+		self.assertEqual(count, 2, info)
+		self.assertIn(hashlib.sha256(b"old").hexdigest(), self.drive.deleted)
+		self.assertEqual(len(self.drive.folders[file_store.MANIFEST_FOLDER]), 2)
+
+	def test_the_newest_min_keep_manifests_are_never_expired(self):
+		self.seed()
+		self.settings.min_keep = 3
+		count, _info = self.collect()
+		self.assertEqual(count, 0)
+
+	def test_a_short_manifest_listing_collects_nothing(self):
+		self.run_backup()
+		self.backdate(file_store.MANIFEST_FOLDER, 90)
+		self.drive.folders[file_store.BLOB_FOLDER]["orphan"] = {"id": "x", "bytes": b"", "createdTime": _drive_time(90)}
+		count, info = self.collect()
+		self.assertEqual(count, 0)
+		self.assertIn("fewer than the min_keep floor", info["action"])
+
+	def test_an_unreadable_manifest_protects_every_blob(self):
+		self.seed()
+		real = file_store._read_manifest
+		calls = iter(range(100))
+
+		def sometimes_broken(service, item):
+			if next(calls) == 0:
+				raise RuntimeError("download failed")
+			return real(service, item)
+
+		with mock.patch.object(file_store, "_read_manifest", sometimes_broken):
+			count, info = self.collect()
+		self.assertEqual(count, 1, "the expired manifest only")
+		self.assertNotIn(hashlib.sha256(b"old").hexdigest(), self.drive.deleted)
+		self.assertIn("Blob collection skipped", info["action"])
+
+	def test_retention_off_collects_nothing(self):
+		self.seed()
+		self.settings.retention_days = 0
+		self.assertEqual(self.collect()[0], 0)
+
+
+class TopLevelPruneTests(_SiteTestCase):
+	def test_the_store_folders_are_never_pruned(self):
+		listing = [
+			{"id": "f1", "name": file_store.BLOB_FOLDER, "mimeType": drive.FOLDER_MIME_TYPE, "createdTime": _drive_time(400)},
+			{"id": "f2", "name": file_store.MANIFEST_FOLDER, "mimeType": drive.FOLDER_MIME_TYPE, "createdTime": _drive_time(400)},
+			{"id": "d1", "name": "db-1.sql.gz", "createdTime": _drive_time(90)},
+			{"id": "d2", "name": "db-2.sql.gz", "createdTime": _drive_time(1)},
+		]
+		deleted = []
+		with mock.patch.object(drive, "list_backup_files", lambda *a: listing), mock.patch.object(
+			drive, "delete_file", lambda service, file_id: deleted.append(file_id)
+		):
+			_count, info = backup._prune(object(), "root", "drive", _Settings(retention_days=30, min_keep=1))
+		self.assertEqual(deleted, ["d1"])
+		self.assertEqual(info["listed"], 2)
+
+	def test_transfer_settings_leave_the_blob_pool_uncapped_by_artefacts(self):
+		settings = _Settings(upload_concurrency=6)
+		self.assertEqual(backup._transfer_settings(settings, 1)["concurrency"], 1)
+		self.assertEqual(backup._transfer_settings(settings)["concurrency"], 6)
+
+
+if __name__ == "__main__":
+	unittest.main()
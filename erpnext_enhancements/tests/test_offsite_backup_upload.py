@@ -0,0 +1,215 @@
+"""Bench-free tests for the offsite backup upload path.
+
+Two things changed together and both fail silently if they are wrong. The MD5
+that proves a backup arrived intact is now taken from the reads the upload makes,
+not a second pass over the file — so a retried chunk that re-reads bytes must not
+be hashed twice, and nothing the upload skips may go unhashed, or every run fails
+verification (or, worse, a wrong digest matches nothing and deletes a good
+backup). And the artefacts now upload on a thread pool, where ``frappe`` has no
+site and no connection — so the pool-thread half must not reach for it.
+
+Stubs the Google client libraries (no network); ``drive.py`` imports no frappe.
+The orchestration in ``backup.py`` is checked structurally, because importing it
+needs a bench.
+
+Run: python -m unittest erpnext_enhancements.tests.test_offsite_backup_upload
+"""
+
+import ast
+import hashlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+BACKUP = REPO_ROOT / "erpnext_enhancements" / "offsite_backup" / "backup.py"
+
+drive = None
+
+
+class _Media:
+	"""Stand-in for MediaIoBaseUpload: keeps the fd and chunk size it was given."""
+
+	def __init__(self, fd, mimetype=None, chunksize=None, resumable=False):
+		self.fd = fd
+		self.chunksize = chunksize
+		fd.seek(0, os.SEEK_END)
+		self.size = fd.tell()
+
+
+def _install_stubs():
+	googleapiclient = sys.modules.get("googleapiclient") or types.ModuleType("googleapiclient")
+	errors = sys.modules.get("googleapiclient.errors") or types.ModuleType("googleapiclient.errors")
+	if not hasattr(errors, "HttpError"):
+
+		class HttpError(Exception):
+			def __init__(self, resp=None, content=b""):
+				super().__init__("http error")
+				self.resp = resp
+
+		errors.HttpError = HttpError
+	discovery = sys.modules.get("googleapiclient.discovery") or types.ModuleType("googleapiclient.discovery")
+	discovery.build = getattr(discovery, "build", lambda *a, **k: None)
+	http_mod = types.ModuleType("googleapiclient.http")
+	http_mod.MediaIoBaseUpload = _Media
+	http_mod.MediaIoBaseDownload = object
+	googleapiclient.errors = errors
+	googleapiclient.discovery = discovery
+	googleapiclient.http = http_mod
+	sys.modules["googleapiclient"] = googleapiclient
+	sys.modules["googleapiclient.errors"] = errors
+	sys.modules["googleapiclient.discovery"] = discovery
+	sys.modules["googleapiclient.http"] = http_mod
+
+	google = sys.modules.get("google") or types.ModuleType("google")
+	oauth2 = sys.modules.get("google.oauth2") or types.ModuleType("google.oauth2")
+	service_account = sys.modules.get("google.oauth2.service_account") or types.ModuleType(
+		"google.oauth2.service_account"
+	)
+	if not hasattr(service_account, "Credentials"):
+		service_account.Credentials = types.SimpleNamespace(from_service_account_info=lambda info, **k: None)
+	oauth2.service_account = service_account
+	google.oauth2 = oauth2
+	sys.modules["google"] = google
+	sys.modules["google.oauth2"] = oauth2
+	sys.modules["google.oauth2.service_account"] = service_account
+
+
+def setUpModule():
+	global drive
+	_install_stubs()
+	sys.modules.pop("erpnext_enhancements.offsite_backup.drive", None)
+	from erpnext_enhancements.offsite_backup import drive as module
+
+	drive = module
+
+
+class _Request:
+	"""A resumable session that reads the media chunk by chunk, the way the client
+	library does (seek to the committed offset, read one chunk), and can be told to
+	make Drive accept only part of a chunk — which forces a re-read."""
+
+	def __init__(self, media, partial_at=()):
+		self.media = media
+		self.offset = 0
+		self.partial_at = set(partial_at)
+		self.sent = bytearray()
+
+	def next_chunk(self):
+		self.media.fd.seek(self.offset)
+		data = self.media.fd.read(self.media.chunksize)
+		accepted = len(data)
+		if self.offset in self.partial_at:
+			self.partial_at.discard(self.offset)
+			accepted = len(data) // 3
+		self.sent += data[:accepted]
+		self.offset += accepted
+		if self.offset >= self.media.size:
+			return None, {"id": "file-1", "size": str(len(self.sent))}
+		return None, None
+
+
+class _Service:
+	def __init__(self, partial_at=()):
+		self.partial_at = partial_at
+		self.request = None
+
+	def files(self):
+		return self
+
+	def create(self, body=None, media_body=None, fields=None, supportsAllDrives=None):
+		self.request = _Request(media_body, self.partial_at)
+		return self.request
+
+
+class StreamingDigestTests(unittest.TestCase):
+	def setUp(self):
+		handle = tempfile.NamedTemporaryFile(delete=False)
+		self.payload = os.urandom(3 * drive.CHUNK_ALIGNMENT + 12345)
+		handle.write(self.payload)
+		handle.close()
+		self.path = handle.name
+		self.addCleanup(os.unlink, self.path)
+
+	def _upload(self, service):
+		digest = hashlib.md5()
+		remote = drive.upload_file(
+			service, self.path, "folder", "name", chunk_size=drive.CHUNK_ALIGNMENT, digest=digest
+		)
+		return remote, digest.hexdigest()
+
+	def test_digest_matches_the_file(self):
+		service = _Service()
+		remote, md5 = self._upload(service)
+		self.assertEqual(md5, hashlib.md5(self.payload).hexdigest())
+		self.assertEqual(int(remote["size"]), len(self.payload))
+
+	def test_a_reread_chunk_is_not_hashed_twice(self):
+		service = _Service(partial_at={drive.CHUNK_ALIGNMENT})
+		_remote, md5 = self._upload(service)
+		self.assertEqual(bytes(service.request.sent), self.payload)
+		self.assertEqual(md5, hashlib.md5(self.payload).hexdigest())
+
+	def test_a_read_past_the_mark_hashes_the_gap(self):
+		reader = drive._HashingReader(self.path, hashlib.md5())
+		self.addCleanup(reader.close)
+		reader.seek(1000)
+		reader.read(500)
+		reader.finish_digest()
+		self.assertEqual(reader._digest.hexdigest(), hashlib.md5(self.payload).hexdigest())
+
+	def test_the_file_is_closed_even_when_the_upload_fails(self):
+		class Boom(_Service):
+			def create(self, **kwargs):
+				self.media = kwargs["media_body"]
+				raise ValueError("400 misaligned")
+
+		service = Boom()
+		with self.assertRaises(ValueError):
+			self._upload(service)
+		self.assertTrue(service.media.fd.closed)
+
+	def test_chunk_size_is_aligned_to_256_kib(self):
+		self.assertEqual(drive.aligned_chunk_size(20 * 1024 * 1024), 20 * 1024 * 1024)
+		self.assertEqual(drive.aligned_chunk_size(drive.CHUNK_ALIGNMENT + 1), drive.CHUNK_ALIGNMENT)
+		self.assertEqual(drive.aligned_chunk_size(1), drive.CHUNK_ALIGNMENT)
+		self.assertEqual(drive.aligned_chunk_size(0), drive.CHUNK_SIZE)
+
+
+def _func(name):
+	for node in ast.walk(ast.parse(BACKUP.read_text(encoding="utf-8"))):
+		if isinstance(node, ast.FunctionDef) and node.name == name:
+			return node
+	raise AssertionError(f"{name}() not found in backup.py")
+
+
+class ConcurrentUploadTests(unittest.TestCase):
+	def test_the_pool_thread_touches_nothing_but_the_file_and_network(self):
+		"""``_transfer`` runs on a pool thread with no site and no connection."""
+		fn = _func("_transfer")
+		body = fn.body[1:] if isinstance(fn.body[0], ast.Expr) else fn.body
+		src = "\n".join(ast.unparse(node) for node in body)
+		self.assertNotIn("frappe", src)
+		self.assertIn("get_drive_service(", src, "each thread must build its own Drive client")
+
+	def test_the_pool_is_bounded_and_named(self):
+		src = ast.unparse(_func("_upload_all"))
+		self.assertIn("ThreadPoolExecutor(", src)
+		self.assertIn("thread_name_prefix='offsite-backup'", src)
+		self.assertIn("transfer['concurrency']", src)
+
+	def test_there_is_no_second_read_pass(self):
+		"""The digest comes from the upload; a full-file re-hash must not creep back."""
+		source = BACKUP.read_text(encoding="utf-8")
+		self.assertNotIn("_local_md5", source)
+		self.assertIn("digest=digest", ast.unparse(_func("_transfer")))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,265 @@
+"""Bench-free tests for the Phone Number Index behind caller ID.
+
+``phone_index.lookup`` replaced two ``REGEXP`` scans per incoming call. It keeps
+a few promises. A stored number is filed under keys the old regex would also
+have accepted, so an exact hit is never a new false positive. Exact matches come
+before the fuzzy fallback, which runs only for a doctype with no exact hit, and
+a miss is remembered. A save that leaves the numbers alone writes nothing. These
+drive it against a fake ``frappe.db`` holding the index rows.
+
+Run: python -m unittest erpnext_enhancements.tests.test_phone_index
+"""
+
+import re
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+phone_index = None
+
+
+def setUpModule():
+	global phone_index
+	from erpnext_enhancements.tests.test_assistant_tools_schema import install_stubs
+
+	install_stubs()
+	sys.modules.pop("erpnext_enhancements.crm_enhancements.phone_index", None)
+	from erpnext_enhancements.crm_enhancements import phone_index as module
+
+	phone_index = module
+
+
+class _Dict(dict):
+	"""``frappe._dict``: a dict with attribute access."""
+
+	__getattr__ = dict.get
+
+
+class _Site:
+	"""The index table plus the two columns the fuzzy fallback reads."""
+
+	def __init__(self, fuzzy=None):
+		self.rows = []
+		self.fuzzy = fuzzy or {}
+		self.queries = []
+		self.deletes = 0
+		self.inserts = 0
+
+	def sql(self, query, values=None, as_dict=False, **kwargs):
+		self.queries.append(query)
+		if "`suffix` = %s" in query:
+			key, doctypes = values
+			return [
+				_Dict(row) for row in self.rows if row["suffix"] == key and row["reference_doctype"] in doctypes
+			]
+		if "REGEXP" in query:
+			doctype = re.search(r"`tab(\w+)`", query).group(1)
+			pattern = values[0]
+			for name, phone in self.fuzzy.get(doctype, {}).items():
+				if re.search(pattern, phone or ""):
+					return [(name,)]
+			return []
+		if query.lstrip().startswith("UPDATE"):
+			new, doctype, old = values
+			for row in self.rows:
+				if (row["reference_doctype"], row["reference_name"]) == (doctype, old):
+					row["reference_name"] = new
+			return []
+		raise AssertionError(query)
+
+	def get_all(self, doctype, filters=None, fields=None, **kwargs):
+		return [
+			_Dict({f: row[f] for f in fields})
+			for row in self.rows
+			if (row["reference_doctype"], row["reference_name"])
+			== (filters["reference_doctype"], filters["reference_name"])
+		]
+
+	def delete(self, doctype, filters):
+		self.deletes += 1
+		names = filters["reference_name"][1]
+		self.rows = [
+			row
+			for row in self.rows
+			if not (row["reference_doctype"] == filters["reference_doctype"] and row["reference_name"] in names)
+		]
+
+	def bulk_insert(self, doctype, fields, values):
+		self.inserts += 1
+		self.rows.extend(dict(zip(fields, row, strict=True)) for row in values)
+
+
+class _Cache:
+	def __init__(self):
+		self.values = {}
+
+	def get_value(self, key):
+		return self.values.get(key)
+
+	def set_value(self, key, value, expires_in_sec=None):
+		self.values[key] = value
+
+	def delete_value(self, key):
+		self.values.pop(key, None)
+
+
+def _doc(doctype, name, **fields):
+	return types.SimpleNamespace(doctype=doctype, name=name, get=lambda f: fields.get(f), **fields)
+
+
+class PhoneIndexTests(unittest.TestCase):
+	def setUp(self):
+		import frappe
+
+		self.site = _Site(fuzzy={"Contact": {}, "Customer": {}})
+		self.cache = _Cache()
+		db = types.SimpleNamespace(
+			sql=self.site.sql,
+			delete=self.site.delete,
+			bulk_insert=self.site.bulk_insert,
+			exists=lambda *a, **k: True,
+			has_column=lambda *a, **k: True,
+		)
+		patches = [
+			mock.patch.object(frappe, "db", db, create=True),
+			mock.patch.object(frappe, "get_all", self.site.get_all, create=True),
+			mock.patch.object(frappe, "cache", lambda: self.cache, create=True),
+			mock.patch.object(frappe, "_dict", _Dict, create=True),
+			mock.patch.object(frappe, "flags", _Dict(), create=True),
+			mock.patch.object(frappe, "session", types.SimpleNamespace(user="Administrator"), create=True),
+			mock.patch.object(frappe, "generate_hash", lambda length=10: "h" * length, create=True),
+			mock.patch.object(frappe, "log_error", mock.Mock(), create=True),
+			mock.patch.object(frappe, "get_traceback", lambda *a, **k: "tb", create=True),
+			mock.patch.object(phone_index, "now", lambda: "2026-10-17 09:00:00"),
+		]
+		for p in patches:
+			p.start()
+			self.addCleanup(p.stop)
+
+	def _file(self, doc):
+		phone_index.on_party_change(doc)
+
+	def test_keys_are_the_last_ten_and_every_inner_window(self):
+		self.assertEqual(phone_index.index_keys("(801) 555-1212"), ["8015551212"])
+		self.assertEqual(phone_index.index_keys("555-1212"), ["5551212"])
+		self.assertEqual(phone_index.index_keys("+1 801-555-1212"), ["8015551212", "1801555121"])
+		keys = phone_index.index_keys("801-555-1212 x4")
+		self.assertEqual(keys[0], "0155512124")
+		self.assertIn("8015551212", keys)
+		self.assertEqual(phone_index.index_keys("1" * 9 + "8015551212"), ["8015551212"], "too long to window")
+		self.assertEqual(phone_index.index_keys(None), [])
+		self.assertEqual(phone_index.caller_key("+1 (801) 555-1212"), "8015551212")
+
+	def test_every_key_is_also_a_fuzzy_match(self):
+		for stored in ("801-555-1212 x4", "+1 801-555-1212", "(801) 555-1212"):
+			for key in phone_index.index_keys(stored):
+				with self.subTest(stored=stored, key=key):
+					self.assertRegex(stored, ".*".join(key))
+
+	def test_child_table_numbers_are_filed(self):
+		doc = _doc(
+			"Contact",
+			"C-1",
+			custom_phone_number="801-555-1212",
+			phone_nos=[{"phone": "801-555-9999"}, {"phone": ""}],
+		)
+		entries = phone_index.entries_for(doc)
+		self.assertEqual(
+			[(field, key) for field, _phone, _digits, key in entries],
+			[("custom_phone_number", "8015551212"), ("phone_nos.phone", "8015559999")],
+		)
+
+	def test_exact_matches_come_first_in_doctype_then_field_order(self):
+		self._file(_doc("Lead", "LEAD-1", phone="801-555-1212"))
+		self._file(_doc("Contact", "C-2", custom_phone_number="", phone_nos=[{"phone": "8015551212"}]))
+		self._file(_doc("Contact", "C-1", custom_phone_number="801-555-1212 x4", phone_nos=[]))
+		self._file(_doc("Contact", "C-3", custom_phone_number="801-555-1212", phone_nos=[]))
+		matches = phone_index.lookup("+1 801 555 1212", ["Contact", "Lead"])
+		self.assertEqual(
+			[(m.doctype, m.name, m.exact) for m in matches],
+			[("Contact", "C-3", True), ("Contact", "C-2", True), ("Contact", "C-1", True), ("Lead", "LEAD-1", True)],
+		)
+		self.assertFalse(any("REGEXP" in q for q in self.site.queries), "no scan when every doctype hit")
+
+	def test_fuzzy_fallback_runs_per_doctype_and_remembers_a_miss(self):
+		self.site.fuzzy["Customer"]["CUST-1"] = "801.555.12.12 ext 4 (cell)"
+		self._file(_doc("Contact", "C-1", custom_phone_number="801-555-1212", phone_nos=[]))
+		matches = phone_index.lookup("8015551212", ["Contact", "Customer"])
+		self.assertEqual(
+			[(m.doctype, m.name, m.exact) for m in matches],
+			[("Contact", "C-1", True), ("Customer", "CUST-1", False)],
+		)
+
+		self.assertEqual(phone_index.lookup("8015550000", ["Contact"]), [])
+		scans = sum("REGEXP" in q for q in self.site.queries)
+		self.assertEqual(phone_index.lookup("8015550000", ["Contact"]), [])
+		self.assertEqual(sum("REGEXP" in q for q in self.site.queries), scans, "second miss is cached")
+
+		self._file(_doc("Contact", "C-9", custom_phone_number="801-555-0000", phone_nos=[]))
+		self.assertEqual([m.name for m in phone_index.lookup("8015550000", ["Contact"])], ["C-9"])
+
+	def test_an_unchanged_save_writes_nothing(self):
+		doc = _doc("Employee", "EMP-1", cell_number="801-555-1212")
+		self._file(doc)
+		writes = (self.site.deletes, self.site.inserts)
+		self._file(doc)
+		self.assertEqual((self.site.deletes, self.site.inserts), writes)
+		self._file(_doc("Employee", "EMP-1", cell_number="801-555-3434"))
+		self.assertEqual([m.name for m in phone_index.lookup("8015553434", ["Employee"])], ["EMP-1"])
+		self.assertEqual(phone_index.lookup("8015551212", ["Employee"]), [])
+
+	def test_rename_delete_and_merge(self):
+		import frappe
+
+		self._file(_doc("Lead", "LEAD-1", phone="801-555-1212"))
+		phone_index.on_party_rename(_doc("Lead", "LEAD-2"), "after_rename", "LEAD-1", "LEAD-2", False)
+		self.assertEqual([m.name for m in phone_index.lookup("8015551212", ["Lead"])], ["LEAD-2"])
+
+		self._file(_doc("Lead", "LEAD-3", mobile_no="801-555-7777"))
+		survivor = _doc("Lead", "LEAD-2", phone="801-555-1212", mobile_no="801-555-7777")
+		with mock.patch.object(frappe, "get_doc", lambda doctype, name: survivor, create=True):
+			phone_index.on_party_rename(_doc("Lead", "LEAD-2"), "after_rename", "LEAD-3", "LEAD-2", True)
+		self.assertEqual([m.name for m in phone_index.lookup("8015557777", ["Lead"])], ["LEAD-2"])
+
+		phone_index.on_party_delete(_doc("Lead", "LEAD-2"))
+		self.assertEqual(self.site.rows, [])
+
+	def test_deleting_an_indexed_contact_succeeds(self):
+		# Frappe's delete refuses while a Link to the doctype, or any Dynamic Link,
+		# still points at the record (check_if_doc_is_linked /
+		# check_if_doc_is_dynamically_linked). The index must offer neither, so the
+		# delete goes through and after_delete can clear the rows.
+		import json
+
+		path = REPO_ROOT / "erpnext_enhancements/crm_enhancements/doctype/phone_number_index/phone_number_index.json"
+		fields = json.loads(path.read_text())["fields"]
+		blocking = [
+			f["fieldname"]
+			for f in fields
+			if f["fieldtype"] == "Dynamic Link"
+			or (f["fieldtype"] == "Link" and f.get("options") in phone_index.SOURCES)
+		]
+		self.assertEqual(blocking, [])
+
+		self._file(_doc("Contact", "C-1", custom_phone_number="801-555-1212", phone_nos=[]))
+		phone_index.on_party_delete(_doc("Contact", "C-1"))
+		self.assertEqual(self.site.rows, [])
+		self.assertEqual(phone_index.lookup("8015551212", ["Contact"]), [])
+
+	def test_a_failed_write_never_fails_the_save(self):
+		import frappe
+
+		self.site.bulk_insert = mock.Mock(side_effect=RuntimeError("db down"))
+		frappe.db.bulk_insert = self.site.bulk_insert
+		self._file(_doc("Lead", "LEAD-1", phone="801-555-1212"))
+		frappe.log_error.assert_called_once()
+
+
+if __name__ == "__main__":
+	unittest.main()
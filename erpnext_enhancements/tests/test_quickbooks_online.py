@@ -1228,14 +1228,17 @@ def test_query_all_includes_inactive_for_master_entities(monkeypatch):
 			captured.append(query)
 			return {"QueryResponse": {}}
 
+		def detached_query(self):
+			return self.query
+
 	monkeypatch.setattr(sync, "QuickBooksClient", FakeClient)
 
 	list(sync.query_all("Account", settings=types.SimpleNamespace()))
 	list(sync.query_all("Invoice", settings=types.SimpleNamespace()))
 
-	assert "from Account where Active in (true, false) startposition 1 maxresults 100" in captured[0]
+	assert "from Account where Active in (true, false) startposition 1 maxresults 1000" in captured[0]
 	assert "where Active" not in captured[1]
-	assert "from Invoice startposition 1 maxresults 100" in captured[1]
+	assert "from Invoice startposition 1 maxresults 1000" in captured[1]
 
 
 # ---------------------------------------------------------------------------
@@ -4987,3 +4990,754 @@ def test_erpnext_item_precisions_fall_back_to_erpnext_defaults():
 		"float_precision": 4,
 	}.get(fieldname)
 	assert _erpnext_item_precisions() == (3, 4)
+
+
+# ---------------------------------------------------------------------------
+# Pooled HTTP session per sync run. Every QBO call used a fresh module-level
+# requests.request, so a full import paid a TCP + TLS handshake per page. A run
+# now shares one keep-alive session (client.http_session), GETs retry 429/5xx
+# with backoff, and the log records requests vs. new connections. These run the
+# real requests/urllib3 stack against a loopback HTTP/1.1 server.
+# ---------------------------------------------------------------------------
+
+
+@contextlib.contextmanager
+def _loopback_qbo(statuses=()):
+	"""A keep-alive HTTP/1.1 server on 127.0.0.1 answering ``{}``; yields its base URL.
+
+	``statuses`` is consumed one per request (then 200), to script 503s and the like.
+	"""
+	import threading
+	from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+	queue = list(statuses)
+
+	class Handler(BaseHTTPRequestHandler):
+		protocol_version = "HTTP/1.1"
+
+		def _answer(self):
+			length = int(self.headers.get("Content-Length") or 0)
+			if length:
+				self.rfile.read(length)
+			status = queue.pop(0) if queue else 200
+			body = b"{}"
+			self.send_response(status)
+			self.send_header("Content-Type", "application/json")
+			self.send_header("Content-Length", str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		do_GET = do_POST = _answer
+
+		def log_message(self, *args):
+			pass
+
+	server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	try:
+		yield f"http://127.0.0.1:{server.server_address[1]}"
+	finally:
+		server.shutdown()
+		server.server_close()
+
+
+def _real_requests_client(monkeypatch):
+	"""Import the client against the real ``requests`` rather than the stub module."""
+	import importlib
+
+	import pytest
+
+	install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import client as client_mod
+
+	if not hasattr(sys.modules.get("requests"), "Session"):
+		monkeypatch.delitem(sys.modules, "requests")
+		try:
+			real = importlib.import_module("requests")
+		except ImportError:
+			pytest.skip("requests is not installed")
+		if not hasattr(real, "Session"):
+			pytest.skip("requests is not installed")
+		monkeypatch.setattr(client_mod, "requests", real)
+	monkeypatch.setattr(client_mod, "get_secret", lambda settings, key: "tok")
+	return client_mod
+
+
+def _loopback_settings(**overrides):
+	values = {"realm_id": "42", "environment": "Production", "http_backoff_seconds": 0}
+	values.update(overrides)
+	return types.SimpleNamespace(**values)
+
+
+def test_a_sync_run_reuses_one_connection_for_every_request(monkeypatch):
+	"""Twenty GETs inside one run open one connection; the other nineteen reuse it."""
+	client_mod = _real_requests_client(monkeypatch)
+	settings = _loopback_settings()
+
+	with _loopback_qbo() as base_url:
+		monkeypatch.setattr(client_mod.QuickBooksClient, "get_base_url", lambda self: base_url)
+		with client_mod.http_session(settings) as session:
+			for _ in range(20):
+				# A fresh client per call, as sync.py builds them -- they still share the run's pool.
+				assert client_mod.QuickBooksClient(settings).request("GET", "/v3/company/42/query") == {}
+			stats = client_mod.session_stats(session)
+
+	assert stats == {"requests": 20, "new_connections": 1, "reused_connections": 19}
+	assert client_mod.active_session() is None
+
+
+def test_http_session_is_reentrant_and_shares_the_outer_pool(monkeypatch):
+	"""retry_failed -> run_cdc nests runs; the inner one must not open a second pool."""
+	client_mod = _real_requests_client(monkeypatch)
+	settings = _loopback_settings()
+
+	with client_mod.http_session(settings) as outer:
+		with client_mod.http_session(settings) as inner:
+			assert inner is outer
+			assert client_mod.QuickBooksClient(settings).session is outer
+		assert client_mod.active_session() is outer
+	assert client_mod.active_session() is None
+	assert client_mod.QuickBooksClient(settings).session is None
+
+
+def test_a_throttled_get_is_retried_but_a_post_is_not(monkeypatch):
+	"""503s on a read are retried with backoff; a write is sent exactly once.
+
+	A POST that timed out or 503'd may still have landed in QuickBooks, so replaying it
+	at the transport layer could duplicate a Bill or Payment.
+	"""
+	import pytest
+
+	client_mod = _real_requests_client(monkeypatch)
+	settings = _loopback_settings(http_max_retries=3)
+
+	with _loopback_qbo(statuses=(503, 503)) as base_url:
+		monkeypatch.setattr(client_mod.QuickBooksClient, "get_base_url", lambda self: base_url)
+		with client_mod.http_session(settings) as session:
+			assert client_mod.QuickBooksClient(settings).request("GET", "/v3/company/42/query") == {}
+			assert client_mod.session_stats(session)["requests"] == 3
+
+	with _loopback_qbo(statuses=(503,)) as base_url:
+		monkeypatch.setattr(client_mod.QuickBooksClient, "get_base_url", lambda self: base_url)
+		with client_mod.http_session(settings) as session:
+			with pytest.raises(client_mod.QuickBooksAPIError):
+				client_mod.QuickBooksClient(settings).request("POST", "/v3/company/42/bill", data="{}")
+			assert client_mod.session_stats(session)["requests"] == 1
+
+
+def test_session_pool_and_retry_come_from_settings_with_defaults(monkeypatch):
+	"""Blank Settings fields fall back to the constants; set ones are honoured."""
+	client_mod = _real_requests_client(monkeypatch)
+	from erpnext_enhancements.quickbooks_online.core import constants
+
+	default = client_mod.new_session(types.SimpleNamespace())
+	adapter = default.get_adapter("https://quickbooks.api.intuit.com")
+	assert adapter._pool_maxsize == constants.DEFAULT_HTTP_POOL_SIZE
+	assert adapter.max_retries.total == constants.DEFAULT_HTTP_MAX_RETRIES
+	assert adapter.max_retries.backoff_factor == constants.DEFAULT_HTTP_BACKOFF_SECONDS
+	assert "POST" not in adapter.max_retries.allowed_methods
+
+	tuned = client_mod.new_session(_loopback_settings(http_pool_size=4, http_max_retries=0, http_backoff_seconds=2))
+	adapter = tuned.get_adapter("https://quickbooks.api.intuit.com")
+	assert adapter._pool_maxsize == 4
+	assert adapter.max_retries.total == constants.DEFAULT_HTTP_MAX_RETRIES
+	assert adapter.max_retries.backoff_factor == 2.0
+
+
+def test_finish_log_stamps_the_runs_connection_counters(monkeypatch):
+	"""The Sync Log carries requests / new / reused for the run that wrote it."""
+	client_mod = _real_requests_client(monkeypatch)
+	from erpnext_enhancements.quickbooks_online.core import sync
+
+	settings = _loopback_settings()
+	log = types.SimpleNamespace(failed_count=0, save=lambda **kwargs: None)
+
+	with _loopback_qbo() as base_url:
+		monkeypatch.setattr(client_mod.QuickBooksClient, "get_base_url", lambda self: base_url)
+		with client_mod.http_session(settings):
+			for _ in range(5):
+				client_mod.QuickBooksClient(settings).request("GET", "/v3/company/42/query")
+			sync.finish_log(log)
+
+	assert (log.http_requests, log.http_new_connections, log.http_reused_connections) == (5, 1, 4)
+
+	# Outside a run there is nothing to count, and nothing is written.
+	bare = types.SimpleNamespace(failed_count=0, save=lambda **kwargs: None)
+	sync.finish_log(bare)
+	assert not hasattr(bare, "http_requests")
+
+
+# ---------------------------------------------------------------------------
+# Import paging: pages of up to 1000 (QBO's cap, was a fixed 100) fetched by a
+# background thread into a bounded queue while the main thread upserts, so
+# network and database time overlap instead of adding up.
+# ---------------------------------------------------------------------------
+
+
+def _paged_source(total, page_size, *, delay=0.0, log=None):
+	"""``fetch(position)`` over ``total`` numbered records, optionally slow and logged."""
+	import time
+
+	def fetch(position):
+		if log is not None:
+			log.append(position)
+		if delay:
+			time.sleep(delay)
+		return list(range(position, min(position + page_size, total + 1)))
+
+	return fetch
+
+
+def test_prefetch_yields_every_page_in_order_and_stops_on_a_short_page():
+	"""Pages arrive in order; the short last page ends the stream with no extra fetch."""
+	from erpnext_enhancements.quickbooks_online.core import prefetch
+
+	fetched = []
+	pages = list(prefetch.pages(_paged_source(25, 10, log=fetched), start=1, page_size=10, depth=2))
+	assert [position for position, _ in pages] == [1, 11, 21]
+	assert [record for _, records in pages for record in records] == list(range(1, 26))
+	assert fetched == [1, 11, 21]
+
+
+def test_prefetch_overlaps_fetching_with_the_consumers_writes():
+	"""Eight pages of 50 ms fetch + 50 ms write take ~450 ms prefetched, ~800 ms in turn."""
+	import time
+
+	from erpnext_enhancements.quickbooks_online.core import prefetch
+
+	def run(consume):
+		started = time.perf_counter()
+		for _records in consume():
+			time.sleep(0.05)
+		return time.perf_counter() - started
+
+	source = _paged_source(80, 10, delay=0.05)
+
+	def in_turn():
+		position = 1
+		while True:
+			records = source(position)
+			yield records
+			if len(records) < 10:
+				return
+			position += 10
+
+	def ahead():
+		for _position, records in prefetch.pages(source, start=1, page_size=10, depth=2):
+			yield records
+
+	serial, overlapped = run(in_turn), run(ahead)
+	# Asserted well short of the ideal ~1.8x so a loaded CI runner does not make this flaky.
+	assert serial / overlapped >= 1.4
+
+
+def test_prefetch_never_runs_more_than_depth_pages_ahead():
+	"""The bounded queue caps the pages held in memory ahead of the consumer."""
+	import time
+
+	from erpnext_enhancements.quickbooks_online.core import prefetch
+
+	fetched = []
+	consumed = 0
+	ahead = 0
+	for _position, _records in prefetch.pages(_paged_source(200, 10, log=fetched), start=1, page_size=10, depth=3):
+		consumed += 1
+		time.sleep(0.01)
+		ahead = max(ahead, len(fetched) - consumed)
+	# ``depth`` queued, plus at most one fetched page blocked waiting for room.
+	assert ahead <= 3 + 1
+
+
+def test_prefetch_raises_a_fetch_error_at_its_page_after_the_earlier_ones():
+	"""A failed page surfaces in its place; nothing after it is fetched or yielded."""
+	import pytest
+
+	from erpnext_enhancements.quickbooks_online.core import prefetch
+
+	fetched = []
+
+	def fetch(position):
+		fetched.append(position)
+		if position == 21:
+			raise RuntimeError("HTTP 503")
+		return list(range(10))
+
+	seen = []
+	with pytest.raises(RuntimeError, match="503"):
+		for position, _records in prefetch.pages(fetch, start=1, page_size=10, depth=4):
+			seen.append(position)
+	assert seen == [1, 11]
+	assert fetched == [1, 11, 21]
+
+
+def test_prefetch_stops_its_fetcher_when_the_consumer_stops():
+	"""An aborted import must not leave a thread paging through the company's data."""
+	import threading
+
+	from erpnext_enhancements.quickbooks_online.core import prefetch
+
+	stream = prefetch.pages(_paged_source(10_000, 10), start=1, page_size=10, depth=2)
+	next(stream)
+	stream.close()
+	assert not [thread for thread in threading.enumerate() if thread.name == "qbo-prefetch"]
+
+
+def test_query_all_refreshes_an_expired_token_on_the_main_thread_and_resumes(monkeypatch):
+	"""A 401 mid-import refreshes once and resumes at the rejected page, with no gap or repeat."""
+	install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import sync
+	from erpnext_enhancements.quickbooks_online.core.client import QuickBooksTokenExpiredError
+
+	refreshes = []
+
+	class FakeClient:
+		token = "old"
+
+		def __init__(self, settings=None):
+			pass
+
+		def detached_query(self):
+			token = FakeClient.token
+
+			def query(statement):
+				position = int(statement.split("startposition ")[1].split()[0])
+				if position == 3 and token == "old":
+					raise QuickBooksTokenExpiredError("401", access_token=token)
+				rows = [{"Id": str(n)} for n in range(position, min(position + 2, 6))]
+				return {"QueryResponse": {"Purchase": rows}}
+
+			return query
+
+		def refresh_access_token(self, previous_access_token=None):
+			refreshes.append(previous_access_token)
+			FakeClient.token = "new"
+
+	monkeypatch.setattr(sync, "QuickBooksClient", FakeClient)
+	settings = types.SimpleNamespace(import_page_size=2, import_prefetch_pages=2)
+
+	ids = [payload["Id"] for payload in sync.query_all("Purchase", settings=settings)]
+	assert ids == ["1", "2", "3", "4", "5"]
+	assert refreshes == ["old"]
+
+
+def test_query_all_page_size_and_prefetch_come_from_settings_within_bounds(monkeypatch):
+	"""QBO caps a page at 1000; 0 prefetch pages fetches in turn without a thread."""
+	install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import sync
+
+	captured = []
+
+	class FakeClient:
+		def __init__(self, settings=None):
+			pass
+
+		def query(self, statement):
+			captured.append(("query", statement))
+			return {"QueryResponse": {}}
+
+		def detached_query(self):
+			return lambda statement: captured.append(("detached", statement)) or {"QueryResponse": {}}
+
+	monkeypatch.setattr(sync, "QuickBooksClient", FakeClient)
+
+	list(sync.query_all("Bill", settings=types.SimpleNamespace(import_page_size=5000)))
+	list(sync.query_all("Bill", settings=types.SimpleNamespace(import_page_size=250, import_prefetch_pages=0)))
+
+	assert captured[0] == ("detached", "select * from Bill startposition 1 maxresults 1000")
+	assert captured[1] == ("query", "select * from Bill startposition 1 maxresults 250")
+
+
+def test_query_all_reads_a_stored_zero_page_size_as_the_default(monkeypatch):
+	"""A Single saved before the field had a row stores 0; that is not a 1-row page."""
+	install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import sync
+
+	captured = []
+
+	class FakeClient:
+		def __init__(self, settings=None):
+			pass
+
+		def query(self, statement):
+			captured.append(("query", statement))
+			return {"QueryResponse": {}}
+
+		def detached_query(self):
+			return lambda statement: captured.append(("detached", statement)) or {"QueryResponse": {}}
+
+	monkeypatch.setattr(sync, "QuickBooksClient", FakeClient)
+
+	list(sync.query_all("Bill", settings=types.SimpleNamespace(import_page_size=0, import_prefetch_pages=0)))
+	list(sync.query_all("Bill", settings=types.SimpleNamespace(import_page_size=0, import_prefetch_pages=None)))
+
+	# A deliberate 0 prefetch still fetches in turn; a missing one prefetches.
+	assert captured == [
+		("query", "select * from Bill startposition 1 maxresults 1000"),
+		("detached", "select * from Bill startposition 1 maxresults 1000"),
+	]
+
+
+def test_settings_save_gives_missing_paging_fields_their_defaults(monkeypatch):
+	"""Without this the first save of an existing site stores 0 and turns prefetch off."""
+	install_frappe_stub()
+	document = types.ModuleType("frappe.model.document")
+
+	class Document(types.SimpleNamespace):
+		def get(self, key, default=None):
+			return getattr(self, key, default)
+
+		def set(self, key, value):
+			setattr(self, key, value)
+
+	document.Document = Document
+	monkeypatch.setitem(sys.modules, "frappe.model", types.ModuleType("frappe.model"))
+	monkeypatch.setitem(sys.modules, "frappe.model.document", document)
+	monkeypatch.delitem(
+		sys.modules,
+		"erpnext_enhancements.quickbooks_online.doctype.quickbooks_online_settings.quickbooks_online_settings",
+		raising=False,
+	)
+	from erpnext_enhancements.quickbooks_online.core.constants import (
+		DEFAULT_IMPORT_PAGE_SIZE,
+		DEFAULT_IMPORT_PREFETCH_PAGES,
+	)
+	from erpnext_enhancements.quickbooks_online.doctype.quickbooks_online_settings.quickbooks_online_settings import (
+		QuickBooksOnlineSettings,
+	)
+
+	fresh = QuickBooksOnlineSettings(sync_enabled=0, environment="Sandbox")
+	fresh.validate()
+	assert (fresh.import_page_size, fresh.import_prefetch_pages) == (
+		DEFAULT_IMPORT_PAGE_SIZE,
+		DEFAULT_IMPORT_PREFETCH_PAGES,
+	)
+
+	chosen = QuickBooksOnlineSettings(
+		sync_enabled=0, environment="Sandbox", import_page_size=250, import_prefetch_pages=0
+	)
+	chosen.validate()
+	assert (chosen.import_page_size, chosen.import_prefetch_pages) == (250, 0)
+
+
+def test_a_detached_query_reports_a_401_instead_of_refreshing(monkeypatch):
+	"""The fetcher thread cannot write Settings, so a 401 comes back for the main thread."""
+	import pytest
+
+	client_mod = _real_requests_client(monkeypatch)
+	settings = _loopback_settings()
+
+	with _loopback_qbo(statuses=(401,)) as base_url:
+		monkeypatch.setattr(client_mod.QuickBooksClient, "get_base_url", lambda self: base_url)
+		client = client_mod.QuickBooksClient(settings)
+		monkeypatch.setattr(client, "refresh_access_token", lambda **kwargs: pytest.fail("refreshed off-thread"))
+		query = client.detached_query()
+		with pytest.raises(client_mod.QuickBooksTokenExpiredError) as raised:
+			query("select * from Bill startposition 1 maxresults 1000")
+		assert raised.value.access_token == "tok"
+		assert query("select * from Bill startposition 1 maxresults 1000") == {}
+
+
+# ---------------------------------------------------------------------------
+# Run-scoped Sync Mapping cache. Every upsert asked the ledger about itself and
+# each of its references with a point query; a batch run now preloads the
+# ledger for the types it touches, answers from memory, writes through on
+# save_mapping, and follows safe_upsert's savepoint rollback.
+# ---------------------------------------------------------------------------
+
+
+def _mapping_row(entity_type, qbo_id, erpnext_doctype, erpnext_name):
+	return types.SimpleNamespace(
+		name=f"QBO-MAP-{entity_type}-{qbo_id}",
+		qbo_entity_type=entity_type,
+		qbo_id=qbo_id,
+		erpnext_doctype=erpnext_doctype,
+		erpnext_name=erpnext_name,
+	)
+
+
+def _preloadable_ledger(monkeypatch, frappe, rows):
+	"""Serve ``rows`` to the bulk read and fail any point query for a preloaded type."""
+	reads = []
+
+	def get_all(doctype, filters=None, fields=None, limit_page_length=None, **kwargs):
+		assert doctype == "QuickBooks Sync Mapping"
+		reads.append(sorted(filters["qbo_entity_type"][1]))
+		wanted = set(filters["qbo_entity_type"][1])
+		return [row for row in rows if row.qbo_entity_type in wanted]
+
+	point_queries = []
+
+	def get_value(doctype, filters=None, fieldname=None, **kwargs):
+		point_queries.append(filters)
+		return None
+
+	monkeypatch.setattr(frappe, "get_all", get_all)
+	monkeypatch.setattr(frappe.db, "get_value", get_value)
+	monkeypatch.setattr(
+		frappe, "get_doc", lambda doctype, name: types.SimpleNamespace(name=name), raising=False
+	)
+	return reads, point_queries
+
+
+def test_preloaded_ledger_answers_lookups_without_point_queries(monkeypatch):
+	"""References and the record's own mapping resolve from one bulk read."""
+	frappe = install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import mapping, mapping_cache
+
+	rows = [
+		_mapping_row("Account", "7", "Account", "Sales - DC"),
+		_mapping_row("Customer", "1", "Customer", "Acme Supply"),
+		_mapping_row("Customer", "9", "Project", "PRJ-0009"),
+	]
+	reads, point_queries = _preloadable_ledger(monkeypatch, frappe, rows)
+
+	with mapping_cache.preloaded({"Account", "Customer", "Invoice"}) as cache:
+		for _ in range(50):
+			assert mapping._linked_name("Account", "Account", "7") == "Sales - DC"
+		assert mapping._linked_name("Customer", "Customer", "9") is None
+		assert mapping._linked_name("Customer", "Project", "9") == "PRJ-0009"
+		assert mapping.get_mapping("Customer", "1").name == "QBO-MAP-Customer-1"
+		# Absent from a preloaded type means unmapped: no query needed to say so.
+		assert mapping.get_mapping("Invoice", "123") is None
+		assert point_queries == []
+		# A type the run did not preload still goes to the database.
+		assert mapping._linked_name("Vendor", "Supplier", "4") is None
+		assert len(point_queries) == 1
+		assert cache.stats() == {"hits": 54, "misses": 1}
+
+	assert reads == [["Account", "Customer", "Invoice"]]
+	assert mapping_cache.active() is None
+
+
+def test_save_mapping_writes_through_and_a_rolled_back_upsert_is_forgotten(monkeypatch):
+	"""A master created early in the run resolves later; a failed record leaves no trace."""
+	frappe = install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import mapping, mapping_cache, sync
+
+	_preloadable_ledger(monkeypatch, frappe, [])
+
+	def created(entity_type, qbo_id, erpnext_doctype, erpnext_name):
+		row = _mapping_row(entity_type, qbo_id, erpnext_doctype, erpnext_name)
+		mapping_cache.remember(row)
+		return row
+
+	def upsert(entity_type, payload, settings, **kwargs):
+		created(entity_type, payload["Id"], "Customer", payload["DisplayName"])
+		if payload.get("explode"):
+			raise ValueError("insert failed after save_mapping")
+		return {"action": "created"}
+
+	monkeypatch.setattr(sync, "upsert_entity", upsert)
+	monkeypatch.setattr(sync, "_failed_result", lambda entity_type, payload: {"action": "failed"})
+
+	with mapping_cache.preloaded({"Customer"}):
+		assert sync.safe_upsert("Customer", {"Id": "1", "DisplayName": "Acme"}, None) == {"action": "created"}
+		assert sync.safe_upsert("Customer", {"Id": "2", "DisplayName": "Bust", "explode": True}, None) == {
+			"action": "failed"
+		}
+		assert mapping._linked_name("Customer", "Customer", "1") == "Acme"
+		assert mapping._linked_name("Customer", "Customer", "2") is None
+
+
+def test_mapping_cache_rollback_restores_a_relinked_row():
+	"""A rolled-back relink restores the previous target, not an empty slot."""
+	install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core.mapping_cache import MappingCache
+
+	cache = MappingCache({"Customer"}, [_mapping_row("Customer", "9", "Customer", "Acme")])
+	cache.savepoint()
+	cache.put(_mapping_row("Customer", "9", "Project", "PRJ-0009"))
+	cache.put(_mapping_row("Customer", "9", "Project", "PRJ-0010"))
+	cache.rollback()
+	assert cache.lookup("Customer", "9") == ("QBO-MAP-Customer-9", "Customer", "Acme")
+
+
+def test_outside_a_run_lookups_go_to_the_database_as_before():
+	"""No preload, no cache: the existing point query is the answer."""
+	install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import mapping, mapping_cache
+
+	assert mapping_cache.active() is None
+	assert mapping._linked_name("Customer", "Customer", "1") == "Acme Supply"
+
+
+def test_finish_log_stamps_mapping_cache_hits_and_misses(monkeypatch):
+	"""The Sync Log carries the run's cache effectiveness."""
+	frappe = install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import mapping, mapping_cache, sync
+
+	_preloadable_ledger(monkeypatch, frappe, [_mapping_row("Account", "7", "Account", "Sales - DC")])
+	log = types.SimpleNamespace(failed_count=0, save=lambda **kwargs: None)
+
+	with mapping_cache.preloaded(sync._preload_types(["Invoice"])):
+		mapping._linked_name("Account", "Account", "7")
+		mapping._linked_name("Employee", "Employee", "3")
+		sync.finish_log(log)
+
+	assert (log.mapping_cache_hits, log.mapping_cache_misses) == (1, 1)
+
+
+def test_a_run_preloads_every_master_and_the_types_it_imports():
+	"""Transactions reference masters, so those are always loaded alongside the selection."""
+	install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import sync
+	from erpnext_enhancements.quickbooks_online.core.constants import MASTER_ENTITIES
+
+	assert sync._preload_types(["Purchase"]) == set(MASTER_ENTITIES) | {"Purchase"}
+
+
+# ---------------------------------------------------------------------------
+# Buffered raw-payload archive. Each fetched record was archived with its own
+# full-lifecycle insert; a batch run now buffers the rows and bulk-inserts
+# them at each commit checkpoint, optionally zlib-compressed, and every reader
+# decodes both forms (and sees a row archived earlier in the run but not yet
+# flushed).
+# ---------------------------------------------------------------------------
+
+
+class _AttrDict(dict):
+	__getattr__ = dict.get
+
+
+def _archive_stub(monkeypatch, frappe):
+	"""Give the stub what the archiver uses; record every bulk insert."""
+	import itertools
+
+	inserts = []
+	counter = itertools.count()
+	monkeypatch.setattr(frappe, "_dict", _AttrDict, raising=False)
+	monkeypatch.setattr(frappe, "generate_hash", lambda length=10: f"h{next(counter):09d}", raising=False)
+	monkeypatch.setattr(frappe, "session", types.SimpleNamespace(user="sync@example.com"), raising=False)
+	monkeypatch.setattr(
+		frappe.db,
+		"bulk_insert",
+		lambda doctype, fields, values, **kwargs: inserts.append((doctype, tuple(fields), list(values))),
+		raising=False,
+	)
+	from erpnext_enhancements.quickbooks_online.core import archive
+
+	# One fixed clock: flush must still hand out strictly increasing creation stamps.
+	monkeypatch.setattr(archive, "now_datetime", lambda: datetime(2026, 10, 17, 12, 0, 0))
+	return inserts
+
+
+def _purchase(qbo_id):
+	lines = [
+		{
+			"Amount": 12.5,
+			"DetailType": "AccountBasedExpenseLineDetail",
+			"AccountRef": {"value": "7", "name": "Supplies"},
+		}
+		for _ in range(20)
+	]
+	return {"Id": str(qbo_id), "SyncToken": "0", "TotalAmt": 250.0, "Line": lines}
+
+
+def test_compressed_and_plain_payloads_read_back_the_same():
+	"""load_payload accepts rows written before, and with either setting of, compression."""
+	install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import archive
+	from erpnext_enhancements.quickbooks_online.core.utils import json_dumps
+
+	payload = _purchase(1)
+	plain = archive.encode_payload(payload, compress=False)
+	packed = archive.encode_payload(payload, compress=True)
+
+	assert plain == json_dumps(payload)
+	assert packed.startswith(archive.COMPRESSED_PREFIX)
+	assert len(packed) * 3 < len(plain)
+	assert archive.load_payload(plain) == archive.load_payload(packed) == payload
+	assert archive.decode_payload(packed) == plain
+	assert archive.load_payload(archive.COMPRESSED_PREFIX + "not-base64!", default={}) == {}
+	assert archive.load_payload(None, default={}) == {}
+
+
+def _fail_per_record():
+	import pytest
+
+	pytest.fail("store_raw_payload inserted a document inside a batch run")
+
+
+def test_a_run_archives_in_bulk_at_its_checkpoint_not_per_record(monkeypatch):
+	"""Nothing is written per record; one flush writes every row, in archive order."""
+	frappe = install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import archive, sync
+
+	inserts = _archive_stub(monkeypatch, frappe)
+	monkeypatch.setattr(frappe, "new_doc", lambda doctype: _fail_per_record(), raising=False)
+
+	with archive.archiving(types.SimpleNamespace(compress_raw_payloads=1)) as archiver:
+		for qbo_id in range(1, 251):
+			sync.store_raw_payload(
+				"Import", "Purchase", _purchase(qbo_id), sync_log="QBO-SYNC-1", realm_id="42"
+			)
+		assert inserts == []
+		assert archive.flush() == 250
+		assert archive.flush() == 0
+
+	((doctype, fields, rows),) = inserts
+	assert doctype == "QuickBooks Raw Payload"
+	assert len(rows) == 250
+	assert archiver.written == 250
+	by_field = [dict(zip(fields, row, strict=True)) for row in rows]
+	assert [row["qbo_id"] for row in by_field] == [str(n) for n in range(1, 251)]
+	assert len({row["name"] for row in by_field}) == 250
+	# Strictly increasing creation keeps "creation asc" (run_resync's replay order) intact.
+	creations = [row["creation"] for row in by_field]
+	assert all(a < b for a, b in zip(creations, creations[1:], strict=False))
+	assert archive.load_payload(by_field[0]["payload"]) == _purchase(1)
+	assert {row["sync_log"] for row in by_field} == {"QBO-SYNC-1"}
+
+
+def test_a_buffered_payload_is_visible_to_readers_before_it_is_flushed(monkeypatch):
+	"""A job resolving its parent Customer's payload finds it even within the same page."""
+	frappe = install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import archive, mapping, sync
+
+	_archive_stub(monkeypatch, frappe)
+	monkeypatch.setattr(frappe.db, "get_value", lambda *args, **kwargs: None)
+
+	with archive.archiving(types.SimpleNamespace(compress_raw_payloads=1)):
+		sync.store_raw_payload("Import", "Customer", {"Id": "5", "DisplayName": "Old"})
+		sync.store_raw_payload("Import", "Customer", {"Id": "5", "DisplayName": "Acme"})
+		assert mapping._raw_payload_dict("Customer", "5") == {"Id": "5", "DisplayName": "Acme"}
+		archive.flush()
+		# Flushed rows are the database's to answer again.
+		assert mapping._raw_payload_dict("Customer", "5") is None
+	assert mapping._raw_payload_dict("Customer", "5") is None
+
+
+def test_finish_log_flushes_the_runs_tail(monkeypatch):
+	"""The records since the last checkpoint are written before the run's final commit."""
+	frappe = install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import archive, sync
+
+	inserts = _archive_stub(monkeypatch, frappe)
+	log = types.SimpleNamespace(failed_count=0, save=lambda **kwargs: None)
+
+	with archive.archiving(types.SimpleNamespace(compress_raw_payloads=0)):
+		sync.store_raw_payload("CDC", "Bill", {"Id": "9"})
+		sync.finish_log(log)
+		assert len(inserts) == 1
+	assert len(inserts) == 1
+
+
+def test_outside_a_run_a_payload_is_inserted_at_once_compressed_per_settings(monkeypatch):
+	"""Webhooks archive one notification at a time; the compression setting still applies."""
+	frappe = install_frappe_stub()
+	from erpnext_enhancements.quickbooks_online.core import archive, sync
+
+	inserted = []
+
+	class Doc(types.SimpleNamespace):
+		def insert(self, **kwargs):
+			inserted.append(self)
+
+	monkeypatch.setattr(frappe, "new_doc", lambda doctype: Doc(), raising=False)
+	monkeypatch.setattr(frappe.db, "get_single_value", lambda doctype, fieldname: 1)
+
+	sync.store_raw_payload("Webhook", "WebhookNotification", {"eventNotifications": []}, realm_id="42")
+
+	assert inserted[0].payload.startswith(archive.COMPRESSED_PREFIX)
+	assert archive.load_payload(inserted[0].payload) == {"eventNotifications": []}
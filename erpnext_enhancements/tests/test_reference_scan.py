@@ -0,0 +1,239 @@
+"""Bench-free tests for the batched reverse-reference scan.
+
+``reference_scan`` replaced one query per Link field with a cached per-doctype
+plan run as ``UNION ALL`` batches. What can go wrong is all in the bookkeeping
+between the two — a row mapped back to the wrong arm, a self-reference kept, a
+cancelled referrer offered for unlinking, a plan rebuilt on every call — so
+these drive it against a fake ``frappe.db.sql`` that answers per arm and count
+the statements it was sent. The SQL itself is covered by the bench merge tests.
+
+Run: python -m unittest erpnext_enhancements.tests.test_reference_scan
+"""
+
+import re
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+scan = None
+
+
+def setUpModule():
+	global scan
+	from erpnext_enhancements.tests.test_assistant_tools_schema import install_stubs
+
+	install_stubs()
+	for mod in ("frappe.model", "frappe.model.dynamic_links", "frappe.model.rename_doc"):
+		sys.modules.setdefault(mod, types.ModuleType(mod))
+	from erpnext_enhancements import reference_scan
+
+	scan = reference_scan
+
+
+class _Cache:
+	def __init__(self):
+		self.store = {}
+
+	def hget(self, key, field):
+		return self.store.get(key, {}).get(field)
+
+	def hset(self, key, field, value):
+		self.store.setdefault(key, {})[field] = value
+
+	def delete_value(self, key):
+		self.store.pop(key, None)
+
+
+class _Meta:
+	def __init__(self, istable=0, issingle=0):
+		self.istable = istable
+		self.issingle = issingle
+
+
+class _Row(dict):
+	__getattr__ = dict.get
+
+
+# Referrers of "Customer": a parent Link (Sales Order.customer), a child-table
+# Link (Order Line.customer), a self Link on Customer, a Dynamic Link child
+# table, and a Single.
+_META = {
+	"Sales Order": _Meta(),
+	"Order Line": _Meta(istable=1),
+	"Customer": _Meta(),
+	"Dynamic Link": _Meta(istable=1),
+	"Selling Settings": _Meta(issingle=1),
+}
+_LINK_FIELDS = [
+	{"parent": "Sales Order", "fieldname": "customer", "issingle": 0},
+	{"parent": "Order Line", "fieldname": "customer", "issingle": 0},
+	{"parent": "Customer", "fieldname": "parent_customer", "issingle": 0},
+	{"parent": "Selling Settings", "fieldname": "default_customer", "issingle": 1},
+]
+_DYNAMIC = [_Row(parent="Dynamic Link", fieldname="link_name", options="link_doctype")]
+# get_dynamic_link_map(): only the tables that can hold each doctype. "Comment" never
+# holds a Customer, so it must add no arm to a Customer scan.
+_DYNAMIC_MAP = {
+	"Customer": _DYNAMIC,
+	"Supplier": [_Row(parent="Comment", fieldname="reference_name", options="reference_doctype")],
+}
+_COLUMNS = {
+	"Sales Order": {"name", "customer"},
+	"Order Line": {"name", "customer"},
+	"Customer": {"name", "parent_customer"},
+	"Dynamic Link": {"name", "link_doctype", "link_name"},
+}
+_INDEXES = {
+	"Sales Order": [["customer"]],
+	"Dynamic Link": [["link_doctype", "link_name"]],
+}
+# Rows each (table, column) holds, as the union arm would return them.
+_DATA = {
+	("Sales Order", "customer"): [
+		{"name": "SO-1", "docstatus": 1, "target": "CUST-A"},
+		{"name": "SO-2", "docstatus": 2, "target": "cust-b"},
+	],
+	("Order Line", "customer"): [
+		{"name": "row1", "docstatus": 0, "parent": "SO-9", "parenttype": "Sales Order", "idx": 3, "target": "CUST-A"},
+	],
+	("Customer", "parent_customer"): [
+		{"name": "CUST-A", "docstatus": 0, "target": "CUST-A"},
+		{"name": "CUST-C", "docstatus": 0, "target": "CUST-A"},
+	],
+	("Dynamic Link", "link_name"): [
+		{"name": "dl1", "docstatus": 0, "parent": "ADDR-1", "parenttype": "Address", "idx": 1, "target": "CUST-B"},
+	],
+}
+_ARM = re.compile(r"select (\d+) as `arm`.*? from `tab([^`]+)` where `([^`]+)` in %\(names\)s(.*?)(?=\nunion all\n|$)", re.S)
+
+
+class ReferenceScanTests(unittest.TestCase):
+	def setUp(self):
+		import frappe
+
+		self.cache = _Cache()
+		self.statements = []
+
+		def sql(query, values=None, as_dict=False):
+			self.statements.append(query)
+			if "information_schema.COLUMNS" in query:
+				return [(f"tab{dt}", c) for dt, cols in _COLUMNS.items() for c in sorted(cols)]
+			if "information_schema.STATISTICS" in query:
+				return [
+					(f"tab{dt}", f"idx{i}", c)
+					for dt, keys in _INDEXES.items()
+					for i, cols in enumerate(keys)
+					for c in cols
+				]
+			if "`tabSingles`" in query:
+				return [("Selling Settings", "default_customer", "CUST-A")]
+			wanted = {n.casefold() for n in values["names"]}
+			out = []
+			for arm, table, field, rest in _ARM.findall(query):
+				for row in _DATA.get((table, field), []):
+					if row["target"].casefold() not in wanted:
+						continue
+					if "`docstatus` < 2" in rest and row["docstatus"] == 2:
+						continue
+					out.append(_Row({"arm": int(arm), "parent": None, "parenttype": None, "idx": 0, **row}))
+			return out
+
+		db = types.SimpleNamespace(sql=sql)
+		patches = [
+			mock.patch.object(frappe, "cache", lambda: self.cache, create=True),
+			mock.patch.object(frappe, "db", db, create=True),
+			mock.patch.object(frappe, "get_meta", lambda dt: _META[dt], create=True),
+			mock.patch.object(
+				sys.modules["frappe.model.rename_doc"], "get_link_fields", lambda _dt: _LINK_FIELDS, create=True
+			),
+			mock.patch.object(
+				sys.modules["frappe.model.dynamic_links"],
+				"get_dynamic_link_map",
+				lambda: _DYNAMIC_MAP,
+				create=True,
+			),
+		]
+		for p in patches:
+			p.start()
+			self.addCleanup(p.stop)
+
+	def test_one_statement_covers_every_table(self):
+		scan.find_references("Customer", ["CUST-A"])
+		unions = [s for s in self.statements if "union all" in s]
+		self.assertEqual(len(unions), 1)
+		self.assertEqual(unions[0].count("select "), 4)
+
+	def test_only_dynamic_links_that_can_hold_the_doctype_add_arms(self):
+		scan.find_references("Customer", ["CUST-A"])
+		union = [s for s in self.statements if "union all" in s][0]
+		self.assertNotIn("`tabComment`", union)
+		self.assertIn("`tabDynamic Link`", union)
+
+	def test_every_arm_selects_its_strings_in_one_collation(self):
+		scan.find_references("Customer", ["CUST-A"])
+		union = [s for s in self.statements if "union all" in s][0]
+		collated = f"using utf8mb4) collate {scan.UNION_COLLATION} as `target`"
+		self.assertEqual(union.count(collated), 4)
+		self.assertEqual(union.count(f"collate {scan.UNION_COLLATION} as `name`"), 4)
+		# The WHERE still reads the raw column, so its index applies.
+		self.assertIn("where `customer` in %(names)s", union)
+
+	def test_rows_map_back_to_their_arm_and_shape(self):
+		refs = scan.find_references("Customer", ["CUST-A"])["CUST-A"]
+		by_name = {r["name"]: r for r in refs}
+		self.assertEqual(by_name["SO-1"]["fieldname"], "customer")
+		self.assertFalse(by_name["SO-1"]["is_child"])
+		child = by_name["SO-9"]
+		self.assertTrue(child["is_child"])
+		self.assertEqual((child["child_doctype"], child["child_name"], child["idx"]), ("Order Line", "row1", 3))
+		self.assertTrue(by_name["Selling Settings"]["is_single"])
+
+	def test_self_reference_is_skipped(self):
+		refs = scan.find_references("Customer", ["CUST-A"])["CUST-A"]
+		customers = [r["name"] for r in refs if r["doctype"] == "Customer"]
+		self.assertEqual(customers, ["CUST-C"])
+
+	def test_several_names_in_one_pass_with_case_folding(self):
+		found = scan.find_references("Customer", ["CUST-A", "CUST-B"])
+		self.assertEqual({r["name"] for r in found["CUST-B"]}, {"SO-2", "ADDR-1"})
+		dynamic = [r for r in found["CUST-B"] if r.get("is_dynamic")][0]
+		self.assertEqual(dynamic["doctype_field"], "link_doctype")
+		self.assertEqual(len([s for s in self.statements if "union all" in s]), 1)
+
+	def test_cancelled_referrers_are_excluded_on_request(self):
+		found = scan.find_references("Customer", ["CUST-B"], include_cancelled=False)
+		self.assertNotIn("SO-2", {r["name"] for r in found["CUST-B"]})
+
+	def test_ignored_doctypes_drop_their_arms(self):
+		scan.find_references("Customer", ["CUST-A"], ignored_doctypes=["Sales Order"])
+		union = [s for s in self.statements if "union all" in s][-1]
+		self.assertNotIn("`tabSales Order`", union)
+
+	def test_the_plan_is_built_once(self):
+		scan.find_references("Customer", ["CUST-A"])
+		scan.find_references("Customer", ["CUST-B"])
+		schema_reads = [s for s in self.statements if "information_schema" in s]
+		self.assertEqual(len(schema_reads), 2)
+		scan.clear_plan_cache()
+		scan.find_references("Customer", ["CUST-A"])
+		self.assertEqual(len([s for s in self.statements if "information_schema" in s]), 4)
+
+	def test_unindexed_columns_are_reported(self):
+		unindexed = {(r["doctype"], r["fieldname"]) for r in scan.unindexed_link_columns("Customer")}
+		self.assertEqual(unindexed, {("Order Line", "customer"), ("Customer", "parent_customer")})
+
+	def test_arms_are_split_past_the_cap(self):
+		with mock.patch.object(scan, "MAX_UNION_ARMS", 2):
+			refs = scan.find_references("Customer", ["CUST-A"])["CUST-A"]
+		self.assertEqual(len([s for s in self.statements if "from `tab" in s and "Singles" not in s]), 2)
+		self.assertEqual({r["name"] for r in refs}, {"SO-1", "SO-9", "CUST-C", "Selling Settings"})
+
+
+if __name__ == "__main__":
+	unittest.main()
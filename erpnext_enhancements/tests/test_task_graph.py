@@ -0,0 +1,157 @@
+"""Bench-free tests for the in-memory task dependency graph.
+
+``TaskGraph`` replaced recursive per-task queries and per-successor saves in the
+Gantt endpoints. The behaviour it had to keep is narrow: every downstream task
+moves by the same number of days, exactly once, and empty dates stay empty. The
+cycle check has to give the old answer. On top of that, a cycle left in legacy
+data must not hang it, and a drag must cost a fixed number of queries.
+
+Run: python -m unittest erpnext_enhancements.tests.test_task_graph
+"""
+
+import sys
+import types
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+task_graph = None
+
+
+def setUpModule():
+	global task_graph
+	from erpnext_enhancements.tests.test_assistant_tools_schema import install_stubs
+
+	install_stubs()
+	import frappe
+
+	if not hasattr(frappe, "whitelist"):
+		frappe.whitelist = lambda *a, **k: (lambda fn: fn)
+	if not hasattr(frappe.utils, "getdate"):
+		frappe.utils.getdate = lambda value=None: value
+	sys.modules.pop("erpnext_enhancements.project_enhancements.task_graph", None)
+	from erpnext_enhancements.project_enhancements import task_graph as module
+
+	task_graph = module
+
+
+def _graph(links, dates=None):
+	names = {n for link in links for n in link} | set(dates or {})
+	dates = dates or {}
+	tasks = [
+		{"name": n, "exp_start_date": dates.get(n, (None, None))[0], "exp_end_date": dates.get(n, (None, None))[1]}
+		for n in sorted(names)
+	]
+	return task_graph.TaskGraph(tasks, links)
+
+
+class TaskGraphTests(unittest.TestCase):
+	def setUp(self):
+		patcher = mock.patch.object(task_graph, "getdate", lambda value=None: value)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_shift_moves_every_downstream_task_once(self):
+		# A -> B -> D, A -> C -> D: D is reachable twice but must move once.
+		d = date(2026, 3, 1)
+		graph = _graph(
+			[("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")],
+			{"A": (d, d), "B": (d, d), "C": (d, None), "D": (None, d), "E": (d, d)},
+		)
+		moved = graph.shifted("A", 3)
+		self.assertEqual(list(moved), ["B", "C", "D"], "predecessors before successors")
+		self.assertEqual(moved["B"], {"exp_start_date": date(2026, 3, 4), "exp_end_date": date(2026, 3, 4)})
+		self.assertEqual(moved["C"]["exp_end_date"], None, "an empty date stays empty")
+		self.assertEqual(moved["D"]["exp_end_date"], date(2026, 3, 4))
+		self.assertNotIn("E", moved)
+
+	def test_no_shift_without_a_day_difference(self):
+		self.assertEqual(_graph([("A", "B")]).shifted("A", 0), {})
+
+	def test_a_legacy_cycle_is_visited_once_and_never_moves_the_origin(self):
+		d = date(2026, 3, 1)
+		graph = _graph([("A", "B"), ("B", "C"), ("C", "B"), ("C", "A")], {n: (d, d) for n in "ABC"})
+		moved = graph.shifted("A", -2)
+		self.assertEqual(sorted(moved), ["B", "C"])
+		self.assertEqual(moved["B"]["exp_start_date"], date(2026, 2, 27))
+		ordered, cyclic = graph.topological_order()
+		self.assertEqual((ordered, cyclic), ([], ["A", "B", "C"]))
+
+	def test_cycle_check_follows_predecessors_transitively(self):
+		graph = _graph([("A", "B"), ("B", "C")])
+		self.assertTrue(graph.depends_on("C", "A"))
+		self.assertFalse(graph.depends_on("A", "C"))
+		self.assertFalse(graph.depends_on("B", "B"))
+
+	def test_links_outside_the_project_and_self_links_are_dropped(self):
+		graph = task_graph.TaskGraph(
+			[{"name": "A"}, {"name": "B"}], [("A", "B"), ("A", "B"), ("A", "A"), ("X", "A"), ("B", "Y")]
+		)
+		self.assertEqual(dict(graph.successors), {"A": ["B"]})
+		self.assertEqual(dict(graph.predecessors), {"B": ["A"]})
+
+	def test_topological_order_ignores_links_from_outside_the_subset(self):
+		graph = _graph([("A", "B"), ("B", "C"), ("X", "C")])
+		self.assertEqual(graph.topological_order({"B", "C"}), (["B", "C"], []))
+
+
+class LoadAndWriteTests(unittest.TestCase):
+	def setUp(self):
+		import frappe
+
+		self.sql = mock.Mock(return_value=[("A", "B")])
+		self.get_all = mock.Mock(return_value=[{"name": "A"}, {"name": "B"}])
+		self.clear = mock.Mock()
+		for name, value in {
+			"db": types.SimpleNamespace(sql=self.sql),
+			"get_all": self.get_all,
+			"session": types.SimpleNamespace(user="pm@example.com"),
+			"clear_document_cache": self.clear,
+		}.items():
+			patcher = mock.patch.object(frappe, name, value, create=True)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+		stamp = mock.patch.object(task_graph, "now_datetime", lambda: datetime(2026, 10, 17, 9, 0))
+		stamp.start()
+		self.addCleanup(stamp.stop)
+
+	def test_a_project_loads_in_two_queries(self):
+		graph = task_graph.TaskGraph.for_project("PRJ-1")
+		self.assertEqual(self.get_all.call_count + self.sql.call_count, 2)
+		self.assertEqual(self.get_all.call_args.kwargs["filters"], {"project": "PRJ-1"})
+		self.assertEqual(dict(graph.successors), {"A": ["B"]})
+
+	def test_dates_are_written_in_batched_case_updates(self):
+		changes = {
+			f"T{i}": {"exp_start_date": date(2026, 1, 1), "exp_end_date": None} for i in range(5)
+		}
+		with mock.patch.object(task_graph, "WRITE_BATCH", 2):
+			self.assertEqual(task_graph.write_task_dates(changes), 5)
+		self.assertEqual(self.sql.call_count, 3)
+		query, values = self.sql.call_args_list[0].args
+		self.assertIn("`exp_start_date` = CASE `name` WHEN %s THEN %s WHEN %s THEN %s", query)
+		self.assertEqual(values[:4], ("T0", date(2026, 1, 1), "T1", date(2026, 1, 1)))
+		self.assertEqual(values[-3:], (datetime(2026, 10, 17, 9, 0), "pm@example.com", ("T0", "T1")))
+		self.assertEqual(query.count("%s"), len(values))
+		self.clear.assert_called_once_with("Task")
+
+	def test_bookkeeping_columns_are_written_without_touching_modified(self):
+		task_graph.write_task_fields({"T0": {"lft": 3, "rgt": 4}}, ("lft", "rgt"), touch=False)
+		query, values = self.sql.call_args.args
+		self.assertNotIn("`modified`", query)
+		self.assertEqual(values, ("T0", 3, "T0", 4, ("T0",)))
+		self.clear.assert_not_called()
+
+	def test_nothing_to_write_touches_nothing(self):
+		self.assertEqual(task_graph.write_task_dates({}), 0)
+		self.sql.assert_not_called()
+		self.clear.assert_not_called()
+
+
+if __name__ == "__main__":
+	unittest.main()
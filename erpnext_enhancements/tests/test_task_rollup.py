@@ -0,0 +1,301 @@
+"""Bench-free tests for the Project Task Rollup maintenance.
+
+The rollup replaced per-load aggregation with a table kept current by hooks, so
+what can go wrong is drift: a Task moved between projects that only re-counts
+one of them, a Project save that wipes a completed-on date, a backfill that runs
+the Version scan for projects that are already dated, a read that writes. These
+drive ``task_rollup`` against an in-memory fake of the handful of ``frappe``
+calls it makes.
+
+Run: python -m unittest erpnext_enhancements.tests.test_task_rollup
+"""
+
+import sys
+import types
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+rollup = None
+
+TODAY = date(2026, 10, 17)
+
+
+def setUpModule():
+	global rollup
+	from erpnext_enhancements.tests.test_assistant_tools_schema import install_stubs
+
+	install_stubs()
+	import frappe
+
+	if not hasattr(frappe, "whitelist"):
+		frappe.whitelist = lambda *a, **k: (lambda fn: fn)
+	if not hasattr(frappe.utils, "getdate"):
+		frappe.utils.getdate = lambda value=None: value.date() if isinstance(value, datetime) else value
+	sys.modules.pop("erpnext_enhancements.project_enhancements.task_rollup", None)
+	from erpnext_enhancements.project_enhancements import task_rollup
+
+	rollup = task_rollup
+
+
+class _Duplicate(Exception):
+	pass
+
+
+class _Site:
+	"""Tasks, ToDos, Users, Projects, Versions and the rollup table, in dicts."""
+
+	def __init__(self):
+		self.projects = {
+			"P1": {"is_active": "Yes", "modified": datetime(2026, 9, 1, 8, 0)},
+			"P2": {"is_active": "No", "modified": datetime(2026, 8, 1, 8, 0)},
+			"P3": {"is_active": "No", "modified": datetime(2026, 7, 1, 8, 0)},
+		}
+		self.tasks = [
+			{"project": "P1", "status": "Open"},
+			{"project": "P1", "status": "Completed"},
+			{"project": "P1", "status": "Completed"},
+			{"project": "P2", "status": "Working"},
+		]
+		self.todos = [
+			{"reference_type": "Project", "reference_name": "P1", "allocated_to": "a@x.com", "status": "Open"},
+			{"reference_type": "Project", "reference_name": "P1", "allocated_to": "a@x.com", "status": "Open"},
+			{"reference_type": "Project", "reference_name": "P1", "allocated_to": "b@x.com", "status": "Cancelled"},
+		]
+		self.users = {"a@x.com": "Ann", "b@x.com": "Bob"}
+		self.versions = {"P2": date(2026, 7, 30)}
+		self.rows = {}
+		self.sql = []
+
+	# -- frappe.get_all ------------------------------------------------------
+
+	def get_all(self, doctype, filters=None, fields=None, pluck=None, order_by=None):
+		filters = filters or {}
+		if doctype == "Project":
+			source = [{"name": n, **v} for n, v in self.projects.items()]
+		elif doctype == rollup.ROLLUP_DOCTYPE:
+			source = [{"name": n, **v} for n, v in self.rows.items()]
+		elif doctype == "ToDo":
+			source = [t for t in self.todos if t["status"] == filters.get("status", t["status"])]
+			wanted = set(filters["reference_name"][1])
+			source = [t for t in source if t["reference_name"] in wanted]
+		elif doctype == "User":
+			source = [{"email": e, "full_name": n} for e, n in self.users.items() if e in filters["email"][1]]
+		else:
+			raise AssertionError(doctype)
+		if "name" in filters:
+			op, values = filters["name"]
+			source = [r for r in source if (r["name"] in values) == (op == "in")]
+		if pluck:
+			return [r[pluck] for r in source]
+		return [dict(r) for r in source]
+
+	# -- frappe.db -----------------------------------------------------------
+
+	def db_sql(self, query, values=None, as_dict=False):
+		self.sql.append(query)
+		names = values[0]
+		if "`tabTask`" in query:
+			counts = {}
+			for task in self.tasks:
+				if task["project"] in names:
+					key = (task["project"], task["status"])
+					counts[key] = counts.get(key, 0) + 1
+			return [{"project": p, "status": s, "count": c} for (p, s), c in counts.items()]
+		if "`tabVersion`" in query:
+			return [{"docname": n, "completed_on": d} for n, d in self.versions.items() if n in names]
+		raise AssertionError(query)
+
+	def set_value(self, doctype, name, values, update_modified=True):
+		self.rows[name].update(values)
+
+	def delete(self, doctype, filters):
+		for name in filters["name"][1]:
+			self.rows.pop(name, None)
+
+	def get_value(self, doctype, name, field):
+		return (self.rows.get(name) or {}).get(field)
+
+	def get_doc(self, data):
+		site = self
+
+		class _Doc:
+			def insert(self, ignore_permissions=False):
+				if data["project"] in site.rows:
+					raise _Duplicate
+				values = {k: v for k, v in data.items() if k not in ("doctype", "project")}
+				site.rows[data["project"]] = values
+				return self
+
+		return _Doc()
+
+
+class _TaskDoc(types.SimpleNamespace):
+	doctype = "Task"
+
+	def get(self, key, default=None):
+		return getattr(self, key, default)
+
+	def get_doc_before_save(self):
+		return self.before
+
+
+class _ProjectDoc(types.SimpleNamespace):
+	doctype = "Project"
+
+	def get(self, key, default=None):
+		return getattr(self, key, default)
+
+	def has_value_changed(self, field):
+		return self.changed
+
+
+class TaskRollupTests(unittest.TestCase):
+	def setUp(self):
+		import frappe
+
+		self.site = _Site()
+		db = types.SimpleNamespace(
+			sql=self.site.db_sql,
+			set_value=self.site.set_value,
+			delete=self.site.delete,
+			get_value=self.site.get_value,
+			exists=lambda doctype, name=None: True,
+			commit=lambda: None,
+		)
+		self.log_error = mock.Mock()
+		patches = [
+			mock.patch.object(frappe, "db", db, create=True),
+			mock.patch.object(frappe, "get_all", self.site.get_all, create=True),
+			mock.patch.object(frappe, "get_doc", self.site.get_doc, create=True),
+			mock.patch.object(
+				frappe,
+				"flags",
+				types.SimpleNamespace(in_migrate=False, in_install=False, in_patch=False, in_import=False),
+				create=True,
+			),
+			mock.patch.object(frappe, "DuplicateEntryError", _Duplicate, create=True),
+			mock.patch.object(frappe, "log_error", self.log_error, create=True),
+			mock.patch.object(frappe, "get_traceback", lambda *a, **k: "tb", create=True),
+			mock.patch.object(rollup, "nowdate", lambda: TODAY),
+			mock.patch.object(rollup, "getdate", lambda v=None: v.date() if isinstance(v, datetime) else v),
+			mock.patch.object(rollup, "now_datetime", lambda: datetime(2026, 10, 17, 12, 0)),
+		]
+		for p in patches:
+			p.start()
+			self.addCleanup(p.stop)
+
+	def test_a_refresh_counts_by_status_and_dedupes_assignees(self):
+		rollup.refresh_projects(["P1"])
+		row = self.site.rows["P1"]
+		self.assertEqual((row["total_tasks"], row["completed_tasks"]), (3, 2))
+		self.assertEqual(row["status_counts"], '{"Completed": 2, "Open": 1}')
+		self.assertEqual(row["assignees"], '[{"email": "a@x.com", "full_name": "Ann"}]')
+
+	def test_a_save_that_changes_no_count_is_free(self):
+		before = _TaskDoc(project="P1", status="Open")
+		rollup.on_task_change(_TaskDoc(project="P1", status="Open", before=before), "on_update")
+		self.assertEqual(self.site.rows, {})
+		self.assertEqual(self.site.sql, [])
+
+	def test_a_moved_task_recounts_both_projects(self):
+		self.site.tasks[0]["project"] = "P2"
+		before = _TaskDoc(project="P1", status="Open")
+		rollup.on_task_change(_TaskDoc(project="P2", status="Open", before=before), "on_update")
+		self.assertEqual(self.site.rows["P1"]["total_tasks"], 2)
+		self.assertEqual(self.site.rows["P2"]["total_tasks"], 2)
+
+	def test_is_active_flips_stamp_and_clear_completed_on(self):
+		rollup.on_project_update(_ProjectDoc(name="P1", is_active="No", changed=True))
+		self.assertEqual(self.site.rows["P1"]["completed_on"], TODAY)
+		rollup.on_project_update(_ProjectDoc(name="P1", is_active="No", changed=False))
+		self.assertEqual(self.site.rows["P1"]["completed_on"], TODAY)
+		rollup.on_project_update(_ProjectDoc(name="P1", is_active="Yes", changed=True))
+		self.assertIsNone(self.site.rows["P1"]["completed_on"])
+
+	def test_an_is_active_set_without_a_save_stamps_completed_on(self):
+		# The dashboard's batch update writes is_active with db.set_value.
+		rollup.is_active_set_quietly("P1", "No")
+		self.assertEqual(self.site.rows["P1"]["completed_on"], TODAY)
+		rollup.refresh_quietly(["P1"])
+		self.assertEqual(self.site.rows["P1"]["completed_on"], TODAY)
+		rollup.is_active_set_quietly("P1", "Yes")
+		self.assertIsNone(self.site.rows["P1"]["completed_on"])
+
+	def test_a_deleted_project_loses_its_row(self):
+		rollup.refresh_projects(["P1"])
+		del self.site.projects["P1"]
+		rollup.refresh_projects(["P1"])
+		self.assertNotIn("P1", self.site.rows)
+
+	def test_deleting_a_project_is_not_blocked_and_drops_its_row(self):
+		# Frappe refuses the delete while a Link to Project still points at it
+		# (check_if_doc_is_linked), which would leave after_delete dead.
+		import json
+
+		path = REPO_ROOT / "erpnext_enhancements/project_enhancements/doctype/project_task_rollup/project_task_rollup.json"
+		fields = json.loads(path.read_text())["fields"]
+		self.assertEqual(
+			[f["fieldname"] for f in fields if f["fieldtype"] in ("Link", "Dynamic Link") and f.get("options") != "DocType"],
+			[],
+		)
+		rollup.refresh_projects(["P1"])
+		rollup.on_project_delete(_ProjectDoc(name="P1"))
+		self.assertNotIn("P1", self.site.rows)
+
+	def test_a_merging_rename_keeps_the_survivors_row_and_date(self):
+		# rename_doc leaves a Data field alone, so nothing collides before
+		# after_rename moves the row; no field may be unique besides the name.
+		import json
+
+		path = REPO_ROOT / "erpnext_enhancements/project_enhancements/doctype/project_task_rollup/project_task_rollup.json"
+		self.assertFalse([f["fieldname"] for f in json.loads(path.read_text())["fields"] if f.get("unique")])
+		self.site.rows["P2"] = {"completed_on": date(2026, 7, 30)}
+		self.site.rows["P3"] = {"completed_on": date(2026, 6, 30)}
+		self.site.tasks.append({"project": "P2", "status": "Open"})
+		rollup.on_project_rename(_ProjectDoc(name="P2"), "after_rename", "P3", "P2", True)
+		self.assertNotIn("P3", self.site.rows)
+		self.assertEqual(self.site.rows["P2"]["total_tasks"], 2)
+		self.assertEqual(self.site.rows["P2"]["completed_on"], date(2026, 7, 30), "the survivor's date stands")
+
+	def test_rebuild_backfills_only_undated_inactive_projects(self):
+		self.site.rows["P3"] = {"completed_on": date(2026, 6, 30)}
+		self.site.rows["GONE"] = {"completed_on": None}
+		result = rollup.rebuild()
+		self.assertEqual(result, {"projects": 3, "backfilled_completed_on": 1})
+		self.assertEqual(self.site.rows["P2"]["completed_on"], date(2026, 7, 30))
+		self.assertEqual(self.site.rows["P3"]["completed_on"], date(2026, 6, 30), "a stamped date is kept")
+		self.assertIsNone(self.site.rows["P1"]["completed_on"])
+		self.assertNotIn("GONE", self.site.rows)
+		version_scan = [q for q in self.site.sql if "`tabVersion`" in q]
+		self.assertEqual(len(version_scan), 1)
+
+	def test_rebuild_falls_back_to_modified_without_a_recorded_flip(self):
+		self.site.versions = {}
+		rollup.rebuild(["P2"])
+		self.assertEqual(self.site.rows["P2"]["completed_on"], date(2026, 8, 1))
+
+	def test_a_read_never_writes(self):
+		rollup.refresh_projects(["P1"])
+		rollups = rollup.get_rollups(["P1", "P2"])
+		self.assertEqual(rollups["P1"]["assignees"], [{"email": "a@x.com", "full_name": "Ann"}])
+		self.assertEqual((rollups["P2"]["total_tasks"], rollups["P2"]["completed_on"]), (1, None))
+		self.assertNotIn("P2", self.site.rows)
+
+	def test_a_failing_refresh_never_fails_the_save(self):
+		with mock.patch.object(rollup, "_measure", side_effect=RuntimeError("db gone")):
+			rollup.on_task_change(_TaskDoc(project="P1", status="Open", before=None), "on_update")
+		self.log_error.assert_called_once()
+
+	def test_non_project_todos_are_ignored(self):
+		rollup.on_todo_change(types.SimpleNamespace(get={"reference_type": "Task"}.get))
+		self.assertEqual(self.site.sql, [])
+
+
+if __name__ == "__main__":
+	unittest.main()
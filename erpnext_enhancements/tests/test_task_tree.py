@@ -0,0 +1,248 @@
+"""Bench-free tests for the bulk task-tree reorder behind ``update_task_structure``.
+
+``task_tree.reorder`` replaced a ``save()`` per submitted row. Writing in bulk
+means nothing else re-checks the tree row by row, so the validation has to see
+the whole tree: foreign parents, a task dropped under its own subtask, and a
+move that closes a ``depends_on`` cycle (alone or with another move in the same
+drop) must all be refused before anything is written. The nested set must still
+be a valid nesting afterwards. It is renumbered in place when the project owns
+its range, and moved past the end when it does not. Unchanged rows must cost
+nothing.
+
+Run: python -m unittest erpnext_enhancements.tests.test_task_tree
+"""
+
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+	sys.path.insert(0, str(REPO_ROOT))
+
+task_tree = None
+
+
+def setUpModule():
+	global task_tree
+	from erpnext_enhancements.tests.test_assistant_tools_schema import install_stubs
+
+	install_stubs()
+	import frappe
+
+	if not hasattr(frappe, "whitelist"):
+		frappe.whitelist = lambda *a, **k: (lambda fn: fn)
+	if not hasattr(frappe.utils, "getdate"):
+		frappe.utils.getdate = lambda value=None: value
+	if not hasattr(frappe.utils, "cint"):
+		frappe.utils.cint = lambda value=0, *a, **k: int(value or 0)
+	for name in (
+		"erpnext_enhancements.project_enhancements.task_graph",
+		"erpnext_enhancements.project_enhancements.task_tree",
+	):
+		sys.modules.pop(name, None)
+	from erpnext_enhancements.project_enhancements import task_tree as module
+
+	task_tree = module
+
+
+class _Invalid(Exception):
+	pass
+
+
+def _throw(message, *args, **kwargs):
+	raise _Invalid(message)
+
+
+class _Site:
+	"""One project's tasks plus whatever else ``tabTask`` holds, as far as the SQL asks."""
+
+	def __init__(self, tasks, links=(), foreign_children=(), foreign_in_range=False, max_rgt=None):
+		self.tasks = {name: {"name": name, "subject": name.title(), **row} for name, row in tasks.items()}
+		self.links = list(links)
+		self.foreign_children = list(foreign_children)
+		self.foreign_in_range = foreign_in_range
+		self.max_rgt = max_rgt
+		self.writes = []
+		self.promoted = []
+		self.inserted = []
+		self.saved = []
+
+	def graph(self, project, fields=()):
+		return task_tree.TaskGraph([dict(row) for row in self.tasks.values()], self.links)
+
+	def write(self, changes, fields, touch=True):
+		self.writes.append((tuple(fields), touch, dict(changes)))
+		for name, values in changes.items():
+			for field in fields:
+				self.tasks[name][field] = values.get(field)
+		return len(changes)
+
+	def sql(self, query, values=None, *args, **kwargs):
+		if "`parent_task` IN" in query:
+			return [(name,) for name in self.foreign_children]
+		if "BETWEEN" in query:
+			return [("OTHER",)] if self.foreign_in_range else []
+		if "MAX(`rgt`)" in query:
+			return [(self.max_rgt,)]
+		if "MAX(`idx`)" in query:
+			return [("P", 3)]
+		if "`is_group` = 1" in query:
+			self.promoted.extend(values[-1])
+			return []
+		raise AssertionError(query)
+
+	def bulk_insert(self, doctype, fields, values):
+		self.inserted.extend(dict(zip(fields, row, strict=True)) for row in values)
+
+	def get_doc(self, doctype, name):
+		site = self
+
+		class _Doc(types.SimpleNamespace):
+			def save(self, ignore_permissions=False):
+				site.saved.append(self.name)
+
+		return _Doc(name=name)
+
+	def assert_valid_nesting(self, test):
+		"""Every child's bounds sit strictly inside its parent's; siblings never overlap."""
+		bounds = {name: (row["lft"], row["rgt"]) for name, row in self.tasks.items()}
+		for name, row in self.tasks.items():
+			lft, rgt = bounds[name]
+			test.assertLess(lft, rgt, name)
+			if row.get("parent_task"):
+				plft, prgt = bounds[row["parent_task"]]
+				test.assertTrue(plft < lft and rgt < prgt, f"{name} inside {row['parent_task']}")
+		values = sorted(v for pair in bounds.values() for v in pair)
+		test.assertEqual(len(values), len(set(values)))
+
+
+def _tree():
+	"""P (1-8) with children A (2-5, holding A1 3-4) and B (6-7); C is a root (9-10)."""
+	return {
+		"P": {"parent_task": None, "custom_subtask_order": 1, "is_group": 1, "lft": 1, "rgt": 8},
+		"A": {"parent_task": "P", "custom_subtask_order": 1, "is_group": 1, "lft": 2, "rgt": 5},
+		"A1": {"parent_task": "A", "custom_subtask_order": 1, "is_group": 0, "lft": 3, "rgt": 4},
+		"B": {"parent_task": "P", "custom_subtask_order": 2, "is_group": 0, "lft": 6, "rgt": 7},
+		"C": {"parent_task": None, "custom_subtask_order": 2, "is_group": 0, "lft": 9, "rgt": 10},
+	}
+
+
+def _rows(site, **moves):
+	"""The whole tree as the client submits it, with ``moves`` = {name: (parent, order)}."""
+	rows = []
+	for name, row in site.tasks.items():
+		parent, order = moves.get(name, (row["parent_task"], row["custom_subtask_order"]))
+		rows.append({"name": name, "parent_task": parent or "", "custom_subtask_order": order})
+	return rows
+
+
+class TaskTreeTests(unittest.TestCase):
+	def _use(self, site):
+		import frappe
+
+		self.site = site
+		patches = [
+			mock.patch.object(task_tree.TaskGraph, "for_project", site.graph),
+			mock.patch.object(task_tree, "write_task_fields", site.write),
+			mock.patch.object(task_tree, "now_datetime", lambda: "2026-10-17 09:00:00"),
+			mock.patch.object(task_tree, "cint", lambda value=0: int(value or 0)),
+			mock.patch.object(
+				frappe,
+				"db",
+				types.SimpleNamespace(sql=site.sql, bulk_insert=site.bulk_insert),
+				create=True,
+			),
+			mock.patch.object(frappe, "throw", _throw, create=True),
+			mock.patch.object(frappe, "get_doc", site.get_doc, create=True),
+			mock.patch.object(frappe, "session", types.SimpleNamespace(user="pm@example.com"), create=True),
+			mock.patch.object(frappe, "generate_hash", lambda length=10: "h" * length, create=True),
+			mock.patch.object(frappe, "clear_document_cache", mock.Mock(), create=True),
+			mock.patch.object(task_tree, "_", lambda text: text),
+		]
+		for p in patches:
+			p.start()
+			self.addCleanup(p.stop)
+		return site
+
+	def test_number_tree_nests_and_orders_siblings(self):
+		numbers = task_tree.number_tree(
+			{"R": None, "X": "R", "Y": "R", "X1": "X", "S": None},
+			{"R": 1, "X": 2, "Y": 1, "X1": 1, "S": 2},
+		)
+		self.assertEqual(numbers, {"R": (1, 8), "Y": (2, 3), "X": (4, 7), "X1": (5, 6), "S": (9, 10)})
+
+	def test_resubmitting_the_same_tree_writes_nothing(self):
+		site = self._use(_Site(_tree()))
+		self.assertEqual(task_tree.reorder("PRJ-1", _rows(site)), [])
+		self.assertEqual((site.writes, site.promoted, site.inserted), ([], [], []))
+
+	def test_a_sibling_swap_is_one_write_and_no_renumbering(self):
+		site = self._use(_Site(_tree()))
+		changed = task_tree.reorder("PRJ-1", _rows(site, A=("P", 2), B=("P", 1)))
+		self.assertEqual(sorted(changed), ["A", "B"])
+		self.assertEqual(len(site.writes), 1)
+		self.assertEqual(site.writes[0][0], task_tree.TREE_FIELDS)
+
+	def test_a_move_renumbers_in_place_promotes_and_adds_the_dependency(self):
+		site = self._use(_Site(_tree()))
+		changed = task_tree.reorder("PRJ-1", _rows(site, C=("B", 1)))
+		self.assertEqual(changed, ["C"])
+		self.assertEqual(site.tasks["C"]["old_parent"], "B")
+		fields, touch, numbers = site.writes[1]
+		self.assertEqual((fields, touch), (task_tree.NESTED_SET_FIELDS, False))
+		self.assertNotIn("A1", numbers, "unmoved bounds are not rewritten")
+		site.assert_valid_nesting(self)
+		self.assertEqual(min(row["lft"] for row in site.tasks.values()), 1, "in place")
+		self.assertEqual(site.promoted, ["B"])
+		self.assertEqual(
+			[(row["parent"], row["task"], row["idx"]) for row in site.inserted], [("B", "C", 1)]
+		)
+
+	def test_a_project_sharing_its_range_moves_past_the_end(self):
+		site = self._use(_Site(_tree(), foreign_in_range=True, max_rgt=40))
+		task_tree.reorder("PRJ-1", _rows(site, B=(None, 3)))
+		site.assert_valid_nesting(self)
+		self.assertEqual(min(row["lft"] for row in site.tasks.values()), 41)
+
+	def test_an_existing_dependency_row_is_not_duplicated(self):
+		site = self._use(_Site(_tree(), links=[("C", "B")]))
+		task_tree.reorder("PRJ-1", _rows(site, C=("B", 1)))
+		self.assertEqual(site.inserted, [])
+
+	def test_invalid_trees_are_refused_before_any_write(self):
+		cases = {
+			"foreign parent": lambda s: _rows(s, C=("ELSEWHERE", 1)),
+			"under its own subtask": lambda s: _rows(s, A=("A1", 1)),
+			"own parent": lambda s: _rows(s, B=("B", 1)),
+			"duplicate": lambda s: _rows(s) + [{"name": "B", "parent_task": "P"}],
+			"unknown task": lambda s: _rows(s) + [{"name": "NOPE", "parent_task": ""}],
+		}
+		for label, rows in cases.items():
+			with self.subTest(label):
+				site = self._use(_Site(_tree()))
+				with self.assertRaises(_Invalid):
+					task_tree.reorder("PRJ-1", rows(site))
+				self.assertEqual(site.writes, [])
+
+	def test_a_dependency_cycle_is_refused_alone_or_across_two_moves(self):
+		# B already depends on C; B under C would make C depend on B as well.
+		site = self._use(_Site(_tree(), links=[("C", "B")]))
+		with self.assertRaises(_Invalid):
+			task_tree.reorder("PRJ-1", _rows(site, B=("C", 1)))
+		# Neither move alone is a cycle; together C -> B -> A1 -> C is.
+		site = self._use(_Site(_tree(), links=[("A1", "C")]))
+		with self.assertRaises(_Invalid):
+			task_tree.reorder("PRJ-1", _rows(site, C=("B", 1), B=("A1", 1)))
+		self.assertEqual(site.writes, [])
+
+	def test_a_tree_crossing_projects_falls_back_to_saves(self):
+		site = self._use(_Site(_tree(), foreign_children=["OTHER-1"]))
+		changed = task_tree.reorder("PRJ-1", _rows(site, C=("B", 1)))
+		self.assertEqual((changed, site.saved, site.writes), (["C"], ["C"], []))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -145,5 +145,94 @@ class CompletionTests(unittest.TestCase):
         self.assertEqual(wfd.compute_completion_percent(full), 100.0)
 
 
+class _Cache:
+    def __init__(self):
+        self.store = {}
+
+    def get_value(self, key):
+        return self.store.get(key)
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.store[key] = value
+
+    def delete_value(self, key):
+        self.store.pop(key, None)
+
+
+class _Meta:
+    def has_field(self, _fieldname):
+        return True
+
+
+class PumpCatalogCacheTests(unittest.TestCase):
+    """The catalog is read once and served from the cache until a pump Item changes."""
+
+    def setUp(self):
+        from unittest import mock
+
+        import frappe
+
+        from erpnext_enhancements.water_engineering import pump_catalog
+
+        self.catalog = pump_catalog
+        self.cache = _Cache()
+        self.reads = []
+
+        def get_all(doctype, **kwargs):
+            self.reads.append(doctype)
+            if doctype == "Item":
+                return [{"item_code": "P-1", "item_name": "Pump 1", "custom_rated_gpm": 60}]
+            return [{"parent": "P-1", "flow_gpm": 0, "head_ft": 40, "efficiency_pct": 0},
+                    {"parent": "P-1", "flow_gpm": 60, "head_ft": 20, "efficiency_pct": 62}]
+
+        for name, value in (("cache", lambda: self.cache), ("get_all", get_all), ("get_meta", lambda _dt: _Meta())):
+            patcher = mock.patch.object(frappe, name, value, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_second_read_is_served_from_the_cache(self):
+        first = self.catalog.catalog_candidates()
+        self.assertEqual(self.reads, ["Item", "Pump Curve Point"])
+        second = self.catalog.catalog_candidates()
+        self.assertEqual(self.reads, ["Item", "Pump Curve Point"])
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["curve"][1], {"flow_gpm": 60, "head_ft": 20, "efficiency_pct": 62})
+
+    def test_callers_cannot_mutate_the_cached_catalog(self):
+        self.catalog.catalog_candidates()[0]["curve"].clear()
+        self.assertTrue(self.catalog.catalog_candidates()[0]["curve"])
+
+    def test_only_a_pump_item_invalidates(self):
+        self.catalog.catalog_candidates()
+        self.catalog.invalidate(FakeDoc(item_group="Fittings"))
+        self.assertIn(self.catalog.CACHE_KEY, self.cache.store)
+        self.catalog.invalidate(FakeDoc(item_group="Pumps"))
+        self.assertNotIn(self.catalog.CACHE_KEY, self.cache.store)
+
+    def test_an_item_leaving_the_pump_group_invalidates(self):
+        self.catalog.catalog_candidates()
+        moved = FakeDoc(item_group="Fittings")
+        moved.get_doc_before_save = lambda: FakeDoc(item_group="Pumps")
+        self.catalog.invalidate(moved)
+        self.assertNotIn(self.catalog.CACHE_KEY, self.cache.store)
+
+    def test_an_unreadable_catalog_is_not_cached(self):
+        from unittest import mock
+
+        import frappe
+
+        def boom(*_a, **_k):
+            raise RuntimeError("Unknown column")
+
+        with mock.patch.object(frappe, "get_all", boom):
+            self.assertEqual(self.catalog.catalog_candidates(), [])
+        self.assertNotIn(self.catalog.CACHE_KEY, self.cache.store)
+
+    def test_the_controller_reads_the_cached_catalog(self):
+        wfd._engine_inputs(FakeDoc(pipe_material="SCH40 PVC"))
+        wfd._engine_inputs(FakeDoc(pipe_material="SCH40 PVC"))
+        self.assertEqual(self.reads.count("Item"), 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -42,6 +42,8 @@ from erpnext_enhancements.water_engineering.engine import (
     nozzle_flow,
     npsh_available,
     open_channel_flow,
+    operating_points,
+    optimise_design,
     overflow_check,
     ozone_sidestream,
     pipe_pressure_check,
@@ -54,6 +56,7 @@ from erpnext_enhancements.water_engineering.engine import (
     size_pipe,
     suction_outlet_vgb,
     surge_basin_volume,
+    system_curve,
     tiered_fountain_flow,
     total_dynamic_head,
     turnover_gpm,
@@ -71,6 +74,11 @@ from erpnext_enhancements.water_engineering.engine.data.pipe_specs import (
     get_pipe_id,
 )
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover - installed on the bench and in CI
+    numpy = None
+
 
 class BasinTests(unittest.TestCase):
     def test_rectangular_volume(self):
@@ -635,6 +643,191 @@ class TreatmentTests(unittest.TestCase):
         self.assertAlmostEqual(filtration_area(90, "sand").value, 30.0, places=1)
 
 
+@unittest.skipIf(numpy is None, "optimise_design needs numpy")
+class OptimiserTests(unittest.TestCase):
+    SEGMENTS = [
+        {"label": "suction", "line_type": "Suction", "length_ft": 20, "fittings": [{"type": "90 Elbow", "qty": 2}]},
+        {"label": "discharge", "line_type": "Discharge", "length_ft": 120},
+        {"label": "return", "line_type": "Discharge", "length_ft": 60},
+    ]
+    PIPE_COSTS = {
+        "SCH40 PVC": {'1-1/2"': 1.2, '2"': 1.6, '2-1/2"': 2.6, '3"': 3.4, '4"': 5.5},
+        "SCH80 PVC": {'2"': 2.4, '2-1/2"': 3.8, '3"': 5.0},
+    }
+    PUMPS = [
+        {"item_code": f"P{i}", "rated_gpm": 80, "rated_tdh_ft": 12 + 6 * i, "price": 500 + 120 * i,
+         "pump_eff": 0.55 + 0.03 * i}
+        for i in range(6)
+    ]
+
+    def _run(self, **kw):
+        return optimise_design(
+            self.SEGMENTS, kw.pop("pumps", self.PUMPS), kw.pop("costs", self.PIPE_COSTS),
+            flow_gpm=60, static_lift_ft=5, **kw,
+        )
+
+    def _brute_force(self):
+        """Every design through the scalar engine, one at a time."""
+        import itertools
+
+        designs = []
+        for material, prices in self.PIPE_COSTS.items():
+            per_seg = []
+            for seg in self.SEGMENTS:
+                r = size_pipe(60, seg["length_ft"], material, seg["line_type"].lower())
+                per_seg.append([o.key for o in r.options
+                                if o.key in prices and o.detail["status"] in ("Okay", "Below Self-Cleaning")])
+            for sizes in itertools.product(*per_seg):
+                segs = [{**s, "flow_gpm": 60, "nominal_size": z, "material": material}
+                        for s, z in zip(self.SEGMENTS, sizes, strict=True)]
+                tdh = total_dynamic_head(segs, 5).value
+                psi = min((pipe_pressure_rating(material, z).value for s, z in zip(self.SEGMENTS, sizes, strict=True)
+                           if s["line_type"] == "Discharge"), default=float("inf"))
+                for p in self.PUMPS:
+                    if p["rated_tdh_ft"] < tdh or psi < tdh / 2.31:
+                        continue
+                    first = sum(prices[z] * s["length_ft"] for s, z in zip(self.SEGMENTS, sizes, strict=True)) + p["price"]
+                    energy = 10 * electric_cost(60, tdh, pump_eff=p["pump_eff"]).value
+                    designs.append((first, energy, (material, sizes, p["item_code"])))
+        return designs
+
+    def test_front_matches_brute_force(self):
+        designs = self._brute_force()
+        front = {d[2] for d in designs
+                 if not any(o[0] <= d[0] and o[1] <= d[1] and (o[0] < d[0] or o[1] < d[1]) for o in designs)}
+        r = self._run()
+        got = {(o.value["material"], tuple(o.value["sizes"]), o.value["pump"]) for o in r.options}
+        self.assertEqual(got, front)
+
+    def test_front_is_sorted_and_non_dominated(self):
+        r = self._run()
+        firsts = [o.detail["first_cost"] for o in r.options]
+        energies = [o.detail["energy_cost"] for o in r.options]
+        self.assertEqual(firsts, sorted(firsts))
+        self.assertEqual(energies, sorted(energies, reverse=True))
+        self.assertGreater(len(r.options), 1)  # a real trade-off, not one greedy answer
+
+    def test_front_numbers_are_the_scalar_engine(self):
+        r = self._run()
+        for o in r.options:
+            segs = [{**s, "flow_gpm": 60, "nominal_size": z, "material": o.value["material"]}
+                    for s, z in zip(self.SEGMENTS, o.value["sizes"], strict=True)]
+            tdh = total_dynamic_head(segs, 5).value
+            pump = next(p for p in self.PUMPS if p["item_code"] == o.value["pump"])
+            self.assertAlmostEqual(o.detail["tdh_ft"], round(tdh, 3), places=6)
+            self.assertEqual(o.detail["energy_cost_yr"], electric_cost(60, tdh, pump_eff=pump["pump_eff"]).value)
+            self.assertGreaterEqual(o.detail["pump_head_ft"], tdh)
+
+    def test_recommends_lowest_lifecycle_cost(self):
+        r = self._run()
+        rec = [o for o in r.options if o.recommended]
+        self.assertEqual(len(rec), 1)
+        self.assertEqual(rec[0].detail["lifecycle_cost"], min(o.detail["lifecycle_cost"] for o in r.options))
+        self.assertEqual(r.value, rec[0].key)
+
+    def test_unpriced_and_unchecked_pumps_are_left_out_with_warnings(self):
+        pumps = self.PUMPS + [{"item_code": "NOPRICE", "rated_gpm": 80, "rated_tdh_ft": 99},
+                              {"item_code": "GPH-ONLY", "rated_gpm": 80, "price": 1}]
+        r = self._run(pumps=pumps)
+        self.assertNotIn("NOPRICE", {o.value["pump"] for o in r.options})
+        self.assertNotIn("GPH-ONLY", {o.value["pump"] for o in r.options})
+        self.assertTrue(any("NOPRICE" in w for w in r.warnings))
+        self.assertTrue(any("GPH-ONLY" in w for w in r.warnings))
+
+    def test_no_adequate_pump_yields_no_front(self):
+        r = self._run(pumps=[{"item_code": "WEAK", "rated_gpm": 80, "rated_tdh_ft": 1, "price": 100}])
+        self.assertIsNone(r.value)
+        self.assertEqual(r.options, [])
+        self.assertTrue(r.warnings)
+
+    def test_oversized_space_is_refused_not_attempted(self):
+        from erpnext_enhancements.water_engineering.engine import optimise
+
+        original = optimise.MAX_DESIGN_POINTS
+        optimise.MAX_DESIGN_POINTS = 10
+        try:
+            r = self._run()
+        finally:
+            optimise.MAX_DESIGN_POINTS = original
+        self.assertIsNone(r.value)
+        self.assertTrue(any("narrow" in w for w in r.warnings))
+
+
+class OperatingPointTests(unittest.TestCase):
+    SEGMENTS = [{"flow_gpm": 40, "id_in": 2.067, "length_ft": 100}]
+    BIG = {"item_code": "P-BIG", "curve": [
+        {"flow_gpm": 0, "head_ft": 60, "efficiency_pct": 0},
+        {"flow_gpm": 40, "head_ft": 45, "efficiency_pct": 55},
+        {"flow_gpm": 120, "head_ft": 10, "efficiency_pct": 60},
+    ]}
+
+    def test_system_curve_is_the_tdh_rollup_at_scaled_flow(self):
+        curve = system_curve(self.SEGMENTS, 80, static_lift_ft=5, points=4)
+        self.assertEqual([p["flow_gpm"] for p in curve], [0, 20, 40, 60, 80])
+        self.assertEqual(curve[0]["head_ft"], 5)
+        self.assertAlmostEqual(curve[2]["head_ft"], total_dynamic_head(self.SEGMENTS, 5).value, places=9)
+
+    def test_operating_point_is_where_the_curves_cross(self):
+        r = operating_points([self.BIG], self.SEGMENTS, static_lift_ft=5)
+        o = r.options[0]
+        flow, head = o.detail["operating_flow_gpm"], o.detail["operating_head_ft"]
+        # A pump that clears TDH at the design flow runs further out its curve.
+        self.assertGreater(flow, 40)
+        self.assertAlmostEqual(head, head_at_flow(self.BIG["curve"], flow), delta=0.02)
+        system = total_dynamic_head([{**self.SEGMENTS[0], "flow_gpm": flow}], 5).value
+        self.assertAlmostEqual(head, system, delta=0.05)
+        self.assertGreater(o.detail["efficiency_pct"], 55)
+        self.assertLess(o.detail["efficiency_pct"], 60)
+        self.assertEqual(o.detail["status"], "Okay")
+
+    def test_pump_short_of_design_flow_is_flagged(self):
+        weak = {"item_code": "P-WEAK", "curve": [{"flow_gpm": 0, "head_ft": 12}, {"flow_gpm": 60, "head_ft": 2}]}
+        o = operating_points([weak], self.SEGMENTS, static_lift_ft=5).options[0]
+        self.assertLess(o.detail["flow_vs_design_pct"], 100)
+        self.assertEqual(o.detail["status"], "Below Design Flow")
+
+    def test_shutoff_below_static_and_runout_are_reported(self):
+        low = {"item_code": "LOW", "curve": [{"flow_gpm": 0, "head_ft": 3}, {"flow_gpm": 10, "head_ft": 1}]}
+        stub = {"item_code": "STUB", "curve": [{"flow_gpm": 0, "head_ft": 80}, {"flow_gpm": 20, "head_ft": 70}]}
+        r = operating_points([low, stub], self.SEGMENTS, static_lift_ft=5)
+        status = {o.key: o.detail["status"] for o in r.options}
+        self.assertEqual(status, {"LOW": "Cannot Overcome System", "STUB": "Beyond Published Curve"})
+        self.assertEqual(r.value, 0)
+        self.assertEqual(len(r.warnings), 2)
+
+    def test_rated_only_pumps_are_not_solved(self):
+        r = operating_points([{"item_code": "RATED", "rated_gpm": 60, "rated_tdh_ft": 40}], self.SEGMENTS)
+        self.assertEqual(r.options, [])
+        self.assertTrue(r.warnings)
+
+    def test_a_segment_without_a_diameter_refuses_the_solve(self):
+        # Skipped by every TDH roll-up, it would flatten the system curve into a bogus duty point.
+        segments = self.SEGMENTS + [{"flow_gpm": 40, "length_ft": 200}]
+        r = operating_points([self.BIG], segments, static_lift_ft=5)
+        self.assertEqual(r.options, [])
+        self.assertIsNone(r.value)
+        self.assertTrue(any("[1]" in w for w in r.warnings))
+
+    def test_tdh_warnings_reach_the_operating_points_once(self):
+        segments = [{**self.SEGMENTS[0], "fittings": [{"type": "mystery bend", "qty": 1}]}]
+        tdh_warnings = total_dynamic_head(segments, 5).warnings
+        self.assertTrue(tdh_warnings)
+        r = operating_points([self.BIG], segments, static_lift_ft=5)
+        for w in tdh_warnings:
+            self.assertEqual(r.warnings.count(w), 1)
+        self.assertEqual(r.options[0].detail["status"], "Okay")
+
+    def test_run_spine_reports_operating_points(self):
+        out = run_spine({
+            "pipe_segments": [{"flow_gpm": 40, "id_in": 2.067, "length_ft": 100}],
+            "features": [{"feature_type": "array", "nozzle_count": 4, "gpm_each": 10}],
+            "static_lift_ft": 5,
+            "pump_candidates": [self.BIG, {"item_code": "RATED", "rated_gpm": 60, "rated_tdh_ft": 40}],
+        })
+        self.assertEqual([p["key"] for p in out["pump_operating_points"]], ["P-BIG"])
+        self.assertIn("operating_points", [r["calc"] for r in out["results"]])
+
+
 class CorrectnessGuardTests(unittest.TestCase):
     def test_spine_defaults_blank_segment_flow_to_design(self):
         # a segment with no flow should carry the design flow, so friction (and
@@ -7,8 +7,9 @@ Extracted so the fountain-move intake matcher and any future party-resolution
 code agree on what "the same number" means, instead of each re-deriving it.
 
 **This is deliberately NOT the algorithm ``api.telephony._get_caller_info`` uses.**
-That function builds a fuzzy regex (``".*".join(digits)``) which matches a
-10-digit suffix scattered anywhere across the stored value. That is the right
+That function asks ``crm_enhancements.phone_index.lookup``, which tries an exact
+indexed match first and then falls back to a fuzzy regex (``".*".join(digits)``)
+matching a 10-digit suffix scattered anywhere across the stored value. That is the right
 trade for "who might be calling?" — a wrong guess costs a mislabelled ringing
 screen, and a near miss is worse than a loose match. It is the wrong trade for
 "which account do we write to?", where a false positive silently merges two
@@ -9,8 +9,17 @@ No new dependency: the holidays are read from the standard ERPNext "Holiday List
 (always present in this app's stack), loaded once per call into a set, so the
 weekday/holiday checks are local and cheap. A missing/misconfigured list degrades
 to weekend-only skipping rather than ever breaking a save.
+
+:class:`WorkingCalendar` is the same calendar for schedule arithmetic (the
+critical-path engine, ``project_enhancements/critical_path.py``). It numbers the
+working days consecutively, so "how many working days between" is a subtraction
+and "the Nth working day" is a lookup. There is no day-by-day loop, which matters
+across a few thousand tasks.
 """
 
+from bisect import bisect_left
+from datetime import date
+
 import frappe
 from frappe.utils import add_to_date, get_datetime, getdate
 
@@ -54,11 +63,19 @@ def _holiday_checker(holiday_list):
 	Loads the list's holiday dates once. A blank list (or any load failure)
 	yields a checker that's always False, i.e. weekend-only skipping.
 	"""
-	if not holiday_list:
+	holidays = _holiday_dates(holiday_list)
+	if not holidays:
 		return lambda dt: False
+	return lambda dt: getdate(dt) in holidays
+
+
+def _holiday_dates(holiday_list):
+	"""The list's holiday dates as a set; empty when blank or unreadable."""
+	if not holiday_list:
+		return set()
 
 	try:
-		holidays = {
+		return {
 			getdate(row.holiday_date)
 			for row in frappe.get_all(
 				"Holiday",
@@ -69,6 +86,54 @@ def _holiday_checker(holiday_list):
 	except Exception:
 		# A missing/misconfigured Holiday List must never break due-date math.
 		frappe.log_error(frappe.get_traceback(), "add_working_days: holiday list load failed")
-		return lambda dt: False
+		return set()
 
-	return lambda dt: getdate(dt) in holidays
+
+class WorkingCalendar:
+	"""Mon-Fri minus a Holiday List, with the working days numbered.
+
+	``index(day)`` is the number of working days before ``day``. On a working day
+	that is its position; a weekend or holiday shares the index of the next
+	working day. ``day_at(index)`` is the inverse and always returns a working
+	day. The working days in ``[start, end]`` are therefore
+	``index(end + 1 day) - index(start)``.
+
+	Both directions are arithmetic on ordinals plus a bisect over the sorted
+	holidays: O(log holidays), whatever the span.
+	"""
+
+	def __init__(self, holidays=()):
+		# Weekend holidays are already non-working; counting them twice would
+		# shift every later index.
+		self._holidays = sorted({getdate(d).toordinal() for d in holidays if getdate(d).weekday() < 5})
+		self._holiday_set = set(self._holidays)
+
+	@classmethod
+	def for_holiday_list(cls, holiday_list):
+		"""The calendar for a Holiday List name (weekend-only when blank/unreadable)."""
+		return cls(_holiday_dates(holiday_list))
+
+	def index(self, day):
+		ordinal = getdate(day).toordinal()
+		# date(1, 1, 1) is a Monday, ordinal 1.
+		weeks, weekday = divmod(ordinal - 1, 7)
+		return weeks * 5 + min(weekday, 5) - bisect_left(self._holidays, ordinal)
+
+	def day_at(self, index):
+		# Guess the weekday as if there were no holidays, then push it forward
+		# by the holidays that fall before it until the count settles.
+		skipped = 0
+		while True:
+			weeks, weekday = divmod(index + skipped, 5)
+			ordinal = weeks * 7 + weekday + 1
+			before = bisect_left(self._holidays, ordinal)
+			if before > skipped:
+				skipped = before
+			elif ordinal in self._holiday_set:
+				skipped += 1
+			else:
+				return date.fromordinal(ordinal)
+
+	def is_working_day(self, day):
+		day = getdate(day)
+		return day.weekday() < 5 and day.toordinal() not in self._holiday_set
@@ -40,6 +40,7 @@ from erpnext_enhancements.water_engineering.engine import (
     nozzle_flow,
     npsh_available,
     open_channel_flow,
+    optimise_design,
     overflow_check,
     ozone_sidestream,
     pipe_pressure_check,
@@ -58,6 +59,7 @@ from erpnext_enhancements.water_engineering.engine import (
     water_hammer,
     weir_flow,
 )
+from erpnext_enhancements.water_engineering.pump_catalog import catalog_candidates, curve_for
 
 DESIGN_DOCTYPE = "Water Feature Design"
 CONTROL_DOCTYPE = "Control Panel Design"
@@ -141,27 +143,6 @@ def nozzle_profile_params(profile_name):
     }
 
 
-def pump_curves(item_codes):
-    """{item_code: [{flow_gpm, head_ft}, ...]} performance-curve points for the
-    given pump Items. Empty if the Pump Curve Point table isn't migrated yet."""
-    codes = [c for c in (item_codes or []) if c]
-    if not codes:
-        return {}
-    try:
-        rows = frappe.get_all(
-            "Pump Curve Point",
-            filters={"parent": ["in", codes], "parenttype": "Item", "parentfield": "custom_pump_curve"},
-            fields=["parent", "flow_gpm", "head_ft"],
-            order_by="parent asc, idx asc",
-        )
-    except Exception:
-        return {}
-    out = {}
-    for r in rows:
-        out.setdefault(r["parent"], []).append({"flow_gpm": r["flow_gpm"], "head_ft": r["head_ft"]})
-    return out
-
-
 def _canvas_state(doc):
     """The fountain-design "canvas" state — everything the shared SVG renderer
     (window.WaterFountain / the Triton chat) needs to draw the design. Built once
@@ -201,7 +182,7 @@ def _canvas_state(doc):
         if head > 0:
             jet = max(jet, 0.9 * head)
 
-    curve = pump_curves([doc.selected_pump]).get(doc.selected_pump) if doc.selected_pump else []
+    curve = curve_for(doc.selected_pump)
     features = doc.get("features") or []
     # The schematic draws the primary (first) feature's kind.
     kind = feature_visual_kind(features[0].feature_type) if features else None
@@ -283,6 +264,19 @@ def _run_calc(calc, inputs):
         )
     elif calc == "select_pump":
         r = select_pump(i.get("flow_gpm", 0), i.get("tdh_ft", 0), i.get("candidates"))
+    elif calc == "optimise_design":
+        r = optimise_design(
+            i.get("segments") or [],
+            i.get("candidates"),
+            i.get("pipe_costs"),
+            flow_gpm=i.get("flow_gpm", 0),
+            static_lift_ft=i.get("static_lift_ft", 0),
+            materials=i.get("materials"),
+            c=i.get("hazen_williams_c") or 130,
+            years=i.get("years", 10),
+            hours_per_day=i.get("hours_per_day", 6.0),
+            rate_per_kwh=i.get("rate_per_kwh", 0.17),
+        )
     elif calc == "chlorinator_feed":
         r = chlorinator_feed(i.get("volume_gal", 0), i.get("chlorine_pct", 10))
     elif calc == "chemistry_targets":
@@ -788,37 +782,7 @@ def get_pump_candidates(gpm=0, tdh_ft=0):
     fed to the engine's selector. Rating custom fields are optional — absent
     ratings yield candidates the engineer confirms manually."""
     _require("read")
-    fields = ["item_code", "item_name"]
-    meta = frappe.get_meta("Item")
-    for cf in (
-        "custom_rated_gpm",
-        "custom_rated_tdh_ft",
-        "custom_pump_hp",
-        "custom_pump_phase",
-        "custom_pump_voltage",
-    ):
-        if meta.has_field(cf):
-            fields.append(cf)
-    try:
-        items = frappe.get_all("Item", filters={"item_group": "Pumps", "disabled": 0}, fields=fields)
-    except Exception:
-        items = []
-    candidates = [
-        {
-            "item_code": it.get("item_code"),
-            "description": it.get("item_name"),
-            "rated_gpm": it.get("custom_rated_gpm"),
-            "rated_tdh_ft": it.get("custom_rated_tdh_ft"),
-            "hp": it.get("custom_pump_hp"),
-            "phase": it.get("custom_pump_phase"),
-            "voltage": it.get("custom_pump_voltage"),
-        }
-        for it in items
-    ]
-    curves = pump_curves([c["item_code"] for c in candidates])
-    for c in candidates:
-        if curves.get(c["item_code"]):
-            c["curve"] = curves[c["item_code"]]
+    candidates = catalog_candidates()
     return select_pump(float(gpm or 0), float(tdh_ft or 0), candidates).to_dict()
 
 
@@ -22,7 +22,8 @@ from frappe.model.document import Document
 from frappe.utils import cint, flt
 
 from erpnext_enhancements.water_engineering import issues as design_issues
-from erpnext_enhancements.water_engineering.api.water_design import nozzle_profile_params, pump_curves
+from erpnext_enhancements.water_engineering import pump_catalog
+from erpnext_enhancements.water_engineering.api.water_design import nozzle_profile_params
 from erpnext_enhancements.water_engineering.engine import (
 	basin_volume,
 	chemistry_targets,
@@ -494,36 +495,10 @@ def _engine_inputs(doc):
 
 def _catalog_pump_candidates():
 	"""Pump candidates from the Items catalog (item_group 'Pumps') with the
-	pump-spec custom fields. Empty if the fields/items aren't set up yet (the
-	get_all raises on an unknown column before migrate creates them)."""
-	try:
-		items = frappe.get_all(
-			"Item",
-			filters={"item_group": "Pumps", "disabled": 0},
-			fields=[
-				"item_code", "item_name", "custom_rated_gpm", "custom_rated_tdh_ft",
-				"custom_pump_hp", "custom_pump_phase", "custom_pump_voltage",
-			],
-		)
-	except Exception:
-		return []
-	candidates = [
-		{
-			"item_code": it.get("item_code"),
-			"description": it.get("item_name"),
-			"rated_gpm": it.get("custom_rated_gpm"),
-			"rated_tdh_ft": it.get("custom_rated_tdh_ft"),
-			"hp": it.get("custom_pump_hp"),
-			"phase": it.get("custom_pump_phase"),
-			"voltage": it.get("custom_pump_voltage"),
-		}
-		for it in items
-	]
-	curves = pump_curves([c["item_code"] for c in candidates])
-	for c in candidates:
-		if curves.get(c["item_code"]):
-			c["curve"] = curves[c["item_code"]]
-	return candidates
+	pump-spec custom fields and curves — served from the site cache that the
+	Item doc events clear (see ``water_engineering.pump_catalog``), so a save
+	no longer re-reads the catalog. Empty if the fields/items aren't set up yet."""
+	return pump_catalog.catalog_candidates()
 
 
 def compute_completion_percent(doc):
@@ -23,6 +23,7 @@ from .feature import (
     tiered_fountain_flow,
     weir_flow,
 )
+from .optimise import optimise_design
 from .pipe import (
     hazen_williams_loss,
     pipe_pressure_check,
@@ -32,7 +33,7 @@ from .pipe import (
     velocity_status,
 )
 from .pipeline import run_spine
-from .pump import electrical_load, head_at_flow, select_pump
+from .pump import electrical_load, head_at_flow, operating_points, select_pump, system_curve
 from .safety import npsh_available, suction_outlet_vgb, water_hammer
 from .tdh import component_loss, fitting_minor_loss, total_dynamic_head
 from .treatment import (
@@ -86,6 +87,8 @@ __all__ = [
     "nozzle_flow",
     "npsh_available",
     "open_channel_flow",
+    "operating_points",
+    "optimise_design",
     "overflow_check",
     "ozone_sidestream",
     "pipe_pressure_check",
@@ -98,6 +101,7 @@ __all__ = [
     "size_pipe",
     "suction_outlet_vgb",
     "surge_basin_volume",
+    "system_curve",
     "tiered_fountain_flow",
     "total_dynamic_head",
     "turnover_gpm",
@@ -0,0 +1,364 @@
+"""Design-space optimiser: every pipe size per segment x catalog pump x material,
+ranked as a Pareto front of first cost against lifetime energy cost.
+
+:func:`~.pipe.size_pipe` and :func:`~.pump.select_pump` are greedy — each picks
+the smallest option that passes for one segment or one duty point, and
+:func:`~.pipeline.run_spine` evaluates that single chain. The smallest pipe is
+the cheapest to buy and the most expensive to run, so the greedy answer is one
+corner of a trade-off the designer never gets to see. :func:`optimise_design`
+evaluates the whole space and returns the non-dominated designs instead.
+
+How it stays fast without forking the math:
+
+* The expensive part is per segment, not per combination. Each segment's loss
+  at each candidate size is computed ONCE through :func:`~.tdh.total_dynamic_head`
+  (which runs :func:`~.pipe.hazen_williams_loss` + fitting + component loss), so
+  a segment table is ``segments x sizes`` scalar calls — tens, not millions.
+* TDH is additive across segments, so the TDH of every combination is an outer
+  sum of those tables; first cost and the weakest discharge pressure rating
+  combine the same way. ``numpy`` broadcasts them, then against every pump.
+* Annual energy is linear in TDH for a fixed flow and pump, so the grid uses
+  :func:`~.workbook.electric_cost`'s chain (WHP -> BHP -> HP -> kW -> $) as one
+  coefficient per pump.
+* Only the front is re-derived through the scalar functions, so every number a
+  designer sees is exactly what ``total_dynamic_head`` / ``electric_cost`` say
+  for that design — the batch ranks, the envelope explains.
+
+Costs are the caller's: the engine never queries the DB, so pipe $/ft comes in
+as ``pipe_costs`` and pump first cost as each candidate's ``price``. Anything
+without a price cannot be ranked on first cost and is left out with a warning.
+Energy is undiscounted ``years`` x the annual ``electric_cost`` at the duty point.
+
+``numpy`` is imported at call time (it is installed on the production bench,
+and already used by the chat retrieval code), so the rest of the engine stays
+stdlib-only and importable without it.
+"""
+
+from __future__ import annotations
+
+from .constants import (
+    CIT_ELEC,
+    CIT_PIPE,
+    CIT_TDH,
+    DAYS_PER_YEAR,
+    DEFAULT_KWH_RATE,
+    DEFAULT_MOTOR_EFF,
+    DEFAULT_PUMP_EFF,
+    DEFAULT_PUMP_HOURS_DAY,
+    FT_PER_PSI,
+    HP_TO_KW,
+    HW_C_PVC,
+    VELOCITY_COEFF,
+    WHP_DIVISOR,
+)
+from .data.pipe_specs import PIPE_SPECS
+from .envelope import CalcOption, CalcResult, make_input
+from .pipe import STATUS_OKAY, STATUS_SETTLING, pipe_pressure_rating, velocity_status
+from .pump import head_at_flow
+from .tdh import total_dynamic_head
+from .workbook import electric_cost
+
+# Energy horizon (years) the front trades first cost against.
+DEFAULT_ENERGY_YEARS = 10
+
+# Upper bound on designs (size combinations x pumps, summed over materials) one
+# call will evaluate. Three float64 grids of this size are ~50 MB; past it the
+# caller should narrow a segment's ``sizes`` or the pump list.
+MAX_DESIGN_POINTS = 2_000_000
+
+# Velocity bands a size may run in. "Increase Size" / "Exceeds Legal Limit" are
+# never offered — size_pipe would not recommend them either.
+_RUNNABLE = (STATUS_OKAY, STATUS_SETTLING)
+
+_CITATIONS = [CIT_PIPE, CIT_TDH, CIT_ELEC]
+
+_FORMULA = (
+    "for every material x size-per-segment x pump: TDH = static + Sum(segment loss); "
+    "first $ = Sum(L * $/ft) + pump price; energy $ = years * electric_cost(Q, TDH); "
+    "keep designs no other design beats on both"
+)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - numpy is installed on every bench
+        return None
+    return numpy
+
+
+def _empty(inputs: dict, warnings: list[str], steps: list[str] | None = None) -> CalcResult:
+    return CalcResult(
+        calc="optimise_design",
+        unit="design",
+        inputs=inputs,
+        formula=_FORMULA,
+        steps=steps or [],
+        citations=list(_CITATIONS),
+        warnings=warnings,
+    )
+
+
+def _pump_head(candidate: dict, flow_gpm: float) -> tuple[float | None, str]:
+    """Head (ft) a pump delivers at the duty flow, and the basis — the same
+    evidence order as select_pump: curve, then rated envelope. ``None`` when the
+    pump cannot be checked (flow-only) or cannot deliver the flow at all."""
+    if candidate.get("curve"):
+        return head_at_flow(candidate["curve"], flow_gpm), "curve"
+    head = float(candidate.get("rated_tdh_ft") or 0)
+    if not head:
+        return None, "flow-only"
+    if float(candidate.get("rated_gpm") or 0) < flow_gpm:
+        return None, "rating"
+    return head, "rating"
+
+
+def _pump_key(candidate: dict) -> str:
+    return str(candidate.get("item_code") or candidate.get("part_number") or candidate.get("label") or "?")
+
+
+def _segment_table(
+    seg: dict,
+    material: str,
+    prices: dict,
+    c: float,
+) -> tuple[list[str], list[float], list[float], list[float]]:
+    """Runnable priced sizes for one segment in one material, with each size's
+    loss (ft), pipe cost ($) and pressure rating (psi; inf when the segment is
+    suction or the size has no rating on file)."""
+    specs = PIPE_SPECS.get(material) or {}
+    allowed = seg.get("sizes")
+    line = (seg.get("line_type") or "Discharge").lower()
+    flow = float(seg.get("flow_gpm") or 0)
+    length_ft = float(seg.get("length_ft") or 0)
+    sizes, losses, costs, psis = [], [], [], []
+    for size, spec in specs.items():
+        if allowed and size not in allowed:
+            continue
+        price = prices.get(size)
+        if price is None:
+            continue
+        v = flow * VELOCITY_COEFF / spec["id_in"] ** 2
+        status = velocity_status(
+            v, line, spec["max_suction_fps"], spec["max_discharge_fps"], spec["legal_fps"]
+        )
+        if status not in _RUNNABLE:
+            continue
+        loss = total_dynamic_head([{**seg, "nominal_size": size, "material": material, "id_in": None}], 0.0, c)
+        rated = pipe_pressure_rating(material, size).value if line.startswith("dis") else None
+        sizes.append(size)
+        losses.append(loss.value)
+        costs.append(float(price) * length_ft)
+        psis.append(float(rated) if rated is not None else float("inf"))
+    return sizes, losses, costs, psis
+
+
+def optimise_design(
+    segments: list[dict],
+    pump_candidates: list[dict] | None = None,
+    pipe_costs: dict[str, dict[str, float]] | None = None,
+    *,
+    flow_gpm: float = 0.0,
+    static_lift_ft: float = 0.0,
+    materials: list[str] | None = None,
+    c: float = HW_C_PVC,
+    years: float = DEFAULT_ENERGY_YEARS,
+    hours_per_day: float = DEFAULT_PUMP_HOURS_DAY,
+    rate_per_kwh: float = DEFAULT_KWH_RATE,
+) -> CalcResult:
+    """Pareto front of first cost vs ``years`` of energy cost over every design.
+
+    ``segments`` are TDH segments (``{label, flow_gpm, length_ft, line_type,
+    fittings, components}``, optional ``sizes`` allow-list); a segment with no
+    flow carries ``flow_gpm``, the pump's duty flow. ``pump_candidates`` are
+    select_pump candidates plus ``price`` (and optionally ``pump_eff`` /
+    ``motor_eff``). ``pipe_costs`` is ``{material: {nominal size: $/ft}}``;
+    ``materials`` defaults to every priced material. Each option is one design
+    on the front, cheapest first; the one with the lowest first + energy total
+    is ``recommended``.
+    """
+    segments = [dict(s) for s in (segments or [])]
+    pump_candidates = pump_candidates or []
+    pipe_costs = pipe_costs or {}
+    static_lift_ft = float(static_lift_ft or 0)
+    years = float(years)
+    flow_gpm = float(flow_gpm or 0) or max((float(s.get("flow_gpm") or 0) for s in segments), default=0.0)
+    for s in segments:
+        if not float(s.get("flow_gpm") or 0):
+            s["flow_gpm"] = flow_gpm
+    materials = [m for m in (materials or list(pipe_costs)) if m]
+    inputs = {
+        "design_flow": make_input(flow_gpm, "GPM", "prior_calc"),
+        "static_lift": make_input(static_lift_ft, "ft", "user"),
+        "segments": make_input(len(segments), "count", "user"),
+        "pumps": make_input(len(pump_candidates), "count", "user"),
+        "materials": make_input(materials, "", "user"),
+        "c": make_input(c, "", "default", "PVC = 130"),
+        "years": make_input(years, "yr", "default"),
+        "hours_per_day": make_input(hours_per_day, "hr", "user"),
+        "rate_per_kwh": make_input(rate_per_kwh, "$/kWh", "user"),
+    }
+
+    np = _numpy()
+    if np is None:
+        return _empty(inputs, ["The design optimiser needs numpy, which is not installed here."])
+    if not segments or not flow_gpm:
+        return _empty(inputs, ["Give at least one pipe segment and a design flow to optimise."])
+    if not materials:
+        return _empty(inputs, ["No pipe prices supplied — pass pipe_costs as {material: {size: $/ft}}."])
+
+    warnings: list[str] = []
+    steps: list[str] = [f"duty flow = {flow_gpm:g} GPM, static lift = {static_lift_ft:g} ft"]
+
+    # Pumps: head at the duty flow, price, and the $/yr per ft of TDH coefficient.
+    pumps, heads, prices, coeffs = [], [], [], []
+    unpriced, unchecked = [], []
+    for cand in pump_candidates:
+        key = _pump_key(cand)
+        if cand.get("price") in (None, ""):
+            unpriced.append(key)
+            continue
+        head, basis = _pump_head(cand, flow_gpm)
+        if basis == "flow-only":
+            unchecked.append(key)
+            continue
+        if head is None:
+            continue
+        pump_eff = float(cand.get("pump_eff") or DEFAULT_PUMP_EFF)
+        motor_eff = float(cand.get("motor_eff") or DEFAULT_MOTOR_EFF)
+        pumps.append((key, cand, basis, pump_eff, motor_eff))
+        heads.append(head)
+        prices.append(float(cand["price"]))
+        # electric_cost's chain with TDH = 1 ft, unrounded: $/yr per ft of head.
+        coeffs.append(
+            flow_gpm / WHP_DIVISOR / pump_eff / motor_eff * HP_TO_KW
+            * rate_per_kwh * hours_per_day * DAYS_PER_YEAR
+        )
+    if unpriced:
+        warnings.append(f"Pump(s) without a price were left out: {unpriced}.")
+    if unchecked:
+        warnings.append(
+            f"Pump(s) with no head rating or curve were left out (head at the duty point cannot be checked): "
+            f"{unchecked}."
+        )
+    if not pumps:
+        warnings.append(f"No priced pump delivers {flow_gpm:g} GPM; nothing to optimise.")
+        return _empty(inputs, warnings, steps)
+    heads_a, prices_a, coeffs_a = np.asarray(heads), np.asarray(prices), np.asarray(coeffs)
+
+    # Size tables per material, then the outer sums over segments.
+    grids = []
+    total_points = 0
+    for material in materials:
+        if material not in PIPE_SPECS:
+            warnings.append(f"Unknown pipe material {material!r} skipped. Known: {list(PIPE_SPECS)}.")
+            continue
+        tables = [_segment_table(s, material, pipe_costs.get(material) or {}, c) for s in segments]
+        empty = [s.get("label") or f"segment[{i}]" for i, (s, t) in enumerate(zip(segments, tables, strict=True)) if not t[0]]
+        if empty:
+            warnings.append(f"{material}: no priced size runs within the velocity limits for {empty}.")
+            continue
+        shape = tuple(len(t[0]) for t in tables)
+        points = int(np.prod(shape)) * len(pumps)
+        total_points += points
+        if total_points > MAX_DESIGN_POINTS:
+            warnings.append(
+                f"Design space exceeds {MAX_DESIGN_POINTS:,} designs at {material}; narrow a segment's "
+                "sizes or the pump list."
+            )
+            return _empty(inputs, warnings, steps)
+        tdh = np.full(1, static_lift_ft)
+        cost = np.zeros(1)
+        psi = np.full(1, np.inf)
+        for _sizes, losses, costs, psis in tables:
+            tdh = np.add.outer(tdh, np.asarray(losses)).ravel()
+            cost = np.add.outer(cost, np.asarray(costs)).ravel()
+            psi = np.minimum.outer(psi, np.asarray(psis)).ravel()
+        grids.append((material, tables, shape, tdh, cost, psi))
+        steps.append(
+            f"{material}: {' x '.join(str(n) for n in shape)} sizes x {len(pumps)} pumps = {points:,} designs"
+        )
+
+    if not grids:
+        return _empty(inputs, warnings, steps)
+
+    # Every (combination, pump) at once: feasible, first cost, lifetime energy.
+    mat_idx, combo_idx, pump_idx, first_all, energy_all = [], [], [], [], []
+    for g, (_material, _tables, _shape, tdh, cost, psi) in enumerate(grids):
+        ok = (heads_a[None, :] >= tdh[:, None]) & (psi >= tdh / FT_PER_PSI)[:, None]
+        combo, pump = np.nonzero(ok)
+        mat_idx.append(np.full(combo.size, g))
+        combo_idx.append(combo)
+        pump_idx.append(pump)
+        first_all.append(cost[combo] + prices_a[pump])
+        energy_all.append(years * tdh[combo] * coeffs_a[pump])
+    mat_a, combo_a, pump_a = np.concatenate(mat_idx), np.concatenate(combo_idx), np.concatenate(pump_idx)
+    first_a, energy_a = np.concatenate(first_all), np.concatenate(energy_all)
+    steps.append(f"feasible designs (pump head >= TDH, pipe rating >= TDH/2.31 psi) = {first_a.size:,}")
+    if not first_a.size:
+        warnings.append("No combination of the supplied pumps and pipe sizes meets the duty point.")
+        return _empty(inputs, warnings, steps)
+
+    # Pareto front: sort by first cost (energy breaks ties); keep each design
+    # that runs cheaper than everything cheaper to buy.
+    order = np.lexsort((energy_a, first_a))
+    energy_sorted = energy_a[order]
+    best_before = np.concatenate(([np.inf], np.minimum.accumulate(energy_sorted)[:-1]))
+    front = order[energy_sorted < best_before]
+    steps.append(f"Pareto front = {front.size} design(s)")
+
+    options: list[CalcOption] = []
+    for i in front:
+        material, tables, shape, *_grid = grids[int(mat_a[i])]
+        picks = np.unravel_index(int(combo_a[i]), shape)
+        sizes = [tables[s][0][int(k)] for s, k in enumerate(picks)]
+        key, cand, basis, pump_eff, motor_eff = pumps[int(pump_a[i])]
+        # Re-derive the design through the scalar engine so the numbers shown are
+        # exactly what total_dynamic_head / electric_cost report for it.
+        sized = [{**s, "nominal_size": z, "material": material, "id_in": None} for s, z in zip(segments, sizes, strict=True)]
+        tdh_ft = total_dynamic_head(sized, static_lift_ft, c).value
+        annual = electric_cost(
+            flow_gpm, tdh_ft, hours_per_day=hours_per_day, rate_per_kwh=rate_per_kwh,
+            pump_eff=pump_eff, motor_eff=motor_eff,
+        ).value
+        pipe_cost = sum(float(pipe_costs[material][z]) * float(s.get("length_ft") or 0) for s, z in zip(segments, sizes, strict=True))
+        pump_cost = float(cand["price"])
+        energy = annual * years
+        options.append(
+            CalcOption(
+                key=f"{material} | {', '.join(sizes)} | {key}",
+                label=f"{material} {' / '.join(sizes)} + {cand.get('description') or key}",
+                value={"material": material, "sizes": sizes, "pump": key},
+                detail={
+                    "material": material,
+                    "sizes": {s.get("label") or f"segment[{n}]": z for n, (s, z) in enumerate(zip(segments, sizes, strict=True))},
+                    "pump": key,
+                    "head_basis": basis,
+                    "pump_head_ft": round(heads[int(pump_a[i])], 2),
+                    "tdh_ft": round(tdh_ft, 3),
+                    "pipe_cost": round(pipe_cost, 2),
+                    "pump_cost": round(pump_cost, 2),
+                    "first_cost": round(pipe_cost + pump_cost, 2),
+                    "energy_cost_yr": annual,
+                    "energy_cost": round(energy, 2),
+                    "lifecycle_cost": round(pipe_cost + pump_cost + energy, 2),
+                },
+            )
+        )
+    best = min(options, key=lambda o: o.detail["lifecycle_cost"])
+    best.recommended = True
+    steps.append(
+        f"lowest {years:g}-yr total: {best.key} = ${best.detail['first_cost']:,.2f} first + "
+        f"${best.detail['energy_cost']:,.2f} energy"
+    )
+    return CalcResult(
+        calc="optimise_design",
+        value=best.key,
+        unit="design",
+        inputs=inputs,
+        formula=_FORMULA,
+        steps=steps,
+        citations=list(_CITATIONS),
+        options=options,
+        warnings=warnings,
+    )
@@ -5,7 +5,8 @@
 reports ``next_inputs_needed`` (what's still missing) so the desk wizard and the
 AI know what to ask next. It is tolerant of partial input — give it a basin and
 it computes volume + turnover; add features, segments, and a pump catalog and it
-goes all the way to a pump recommendation.
+goes all the way to a pump recommendation, and — for pumps with a curve — the
+flow and head each one would actually run at on this piping.
 """
 
 from __future__ import annotations
@@ -22,7 +23,7 @@ from .feature import (
     weir_flow,
 )
 from .pipe import pipe_pressure_check
-from .pump import select_pump
+from .pump import operating_points, select_pump
 from .tdh import segment_loss_results, total_dynamic_head
 
 
@@ -162,6 +163,19 @@ def run_spine(inputs: dict[str, Any] | None = None) -> dict[str, Any]:
     else:
         needed.append("pump sizing (needs design flow + TDH)")
 
+    # 6) Operating points: where each curve-bearing candidate actually runs on
+    #    this piping, not just whether it clears TDH at the design flow.
+    operating: list[dict] = []
+    candidates = inputs.get("pump_candidates") or []
+    if design_flow and segments and any(c.get("curve") for c in candidates):
+        r = operating_points(
+            candidates, segments, static_lift_ft=inputs.get("static_lift_ft", 0.0), c=hw_c,
+            design_flow_gpm=design_flow,
+        )
+        results.append(r.to_dict())
+        warnings += r.warnings
+        operating = [o.to_dict() for o in r.options]
+
     return {
         "results": results,
         "total_basin_gallons": total_gal or None,
@@ -171,6 +185,7 @@ def run_spine(inputs: dict[str, Any] | None = None) -> dict[str, Any]:
         "tdh_ft": tdh_ft,
         "selected_pump": selected_pump,
         "pump_options": pump_options,
+        "pump_operating_points": operating,
         "next_inputs_needed": needed,
         "warnings": warnings,
     }
@@ -10,6 +10,12 @@ rule, or VFD-vs-starter logic in the sheets. So:
 * :func:`electrical_load` applies the 125%-FLA continuous-duty rule
   (NEC 430.52). This is a business rule, not a source-document formula — it is
   flagged in ``warnings`` for the engineer to confirm.
+* :func:`operating_points` is where a curve actually earns its keep. The
+  selector only asks "is the head at the design flow >= TDH?"; a pump that
+  clears it by 20 ft does not run at the design flow, it runs further out its
+  curve until the piping's losses eat the surplus. :func:`system_curve` builds
+  the piping's head-vs-flow curve from the same segments the TDH roll-up sums,
+  and each pump's operating point is where its curve crosses it.
 """
 
 from __future__ import annotations
@@ -17,12 +23,25 @@ from __future__ import annotations
 import math
 from itertools import pairwise
 
-from .constants import BREAKER_CONTINUOUS_FACTOR
+from .constants import BREAKER_CONTINUOUS_FACTOR, CIT_TDH, HW_C_PVC
 from .envelope import CalcOption, CalcResult, make_input
+from .tdh import _segment_id, total_dynamic_head
 
 # Standard inverse-time breaker ampere ratings (NEC 240.6) for rounding up.
 _STD_BREAKERS = [15, 20, 25, 30, 35, 40, 45, 50, 60, 70, 80, 90, 100, 110, 125, 150, 175, 200]
 
+# Points the system curve is sampled at, evenly from 0 to the widest candidate
+# curve's max flow. Between samples the system curve is near-linear (Q^1.85), so
+# 64 keeps the intersection within a few hundredths of a GPM of a re-solve while
+# costing one TDH roll-up per point for the whole catalog, not per pump.
+SYSTEM_CURVE_POINTS = 64
+
+# Operating-point bands, by operating flow as a fraction of the design flow.
+OP_STATUS_OK = "Okay"
+OP_STATUS_SHORT = "Below Design Flow"
+OP_STATUS_SHUTOFF = "Cannot Overcome System"
+OP_STATUS_RUNOUT = "Beyond Published Curve"
+
 
 def head_at_flow(curve, flow_gpm):
     """Linear-interpolate a pump performance curve's head (ft) at a flow (GPM).
@@ -151,6 +170,194 @@ def select_pump(flow_gpm: float, tdh_ft: float, candidates: list[dict] | None =
     )
 
 
+def _curve_points(curve, key="head_ft"):
+    """Sorted ``(flow, value)`` pairs from curve rows that carry ``key``."""
+    return sorted(
+        (float(p.get("flow_gpm") or 0), float(p[key]))
+        for p in (curve or [])
+        if p.get(key) not in (None, "")
+    )
+
+
+def _interp(pts, flow):
+    """Linear interpolation on sorted ``(flow, value)`` pairs, clamped at both ends."""
+    if not pts:
+        return None
+    if flow <= pts[0][0]:
+        return pts[0][1]
+    for (f0, v0), (f1, v1) in pairwise(pts):
+        if flow <= f1:
+            return v0 + (v1 - v0) * (flow - f0) / (f1 - f0) if f1 > f0 else v1
+    return pts[-1][1]
+
+
+def system_curve(
+    segments: list[dict],
+    max_flow_gpm: float,
+    static_lift_ft: float = 0.0,
+    c: float = HW_C_PVC,
+    design_flow_gpm: float | None = None,
+    points: int = SYSTEM_CURVE_POINTS,
+) -> list[dict]:
+    """The piping's head (ft) at flows from 0 to ``max_flow_gpm``:
+    ``[{flow_gpm, head_ft}, ...]``.
+
+    Each point is a :func:`~.tdh.total_dynamic_head` roll-up with every
+    segment's flow scaled by ``Q / design_flow`` — a segment carrying half the
+    design flow carries half of any other system flow too. ``design_flow_gpm``
+    defaults to the largest segment flow. The roll-ups' warnings are in
+    :func:`_sample_system_curve`."""
+    return _sample_system_curve(segments, max_flow_gpm, static_lift_ft, c, design_flow_gpm, points)[0]
+
+
+def _sample_system_curve(segments, max_flow_gpm, static_lift_ft, c, design_flow_gpm, points):
+    """:func:`system_curve` plus the TDH roll-ups' warnings, deduplicated in order."""
+    segments = list(segments or [])
+    design = float(design_flow_gpm or 0) or max((float(s.get("flow_gpm") or 0) for s in segments), default=0.0)
+    max_flow_gpm = float(max_flow_gpm or 0)
+    if not design or max_flow_gpm <= 0:
+        return [], []
+    out = []
+    warnings: list[str] = []
+    for n in range(points + 1):
+        q = max_flow_gpm * n / points
+        scaled = [{**s, "flow_gpm": float(s.get("flow_gpm") or design) * q / design} for s in segments]
+        tdh = total_dynamic_head(scaled, static_lift_ft, c)
+        out.append({"flow_gpm": q, "head_ft": tdh.value})
+        warnings += [w for w in tdh.warnings if w not in warnings]
+    return out, warnings
+
+
+def _intersect(pump_pts, sys_pts):
+    """First crossing of a pump curve and the system curve, both piecewise
+    linear: ``(flow, head, status)``. Between merged breakpoints the difference
+    is linear, so the root in the bracketing interval is exact."""
+    lo, hi = pump_pts[0][0], pump_pts[-1][0]
+    flows = sorted({f for f, _h in pump_pts} | {f for f, _h in sys_pts if lo <= f <= hi})
+
+    def diff(q):
+        return _interp(pump_pts, q) - _interp(sys_pts, q)
+
+    prev_q, prev_d = flows[0], diff(flows[0])
+    if prev_d < 0:
+        return None, None, OP_STATUS_SHUTOFF
+    if prev_d == 0:
+        return prev_q, _interp(pump_pts, prev_q), OP_STATUS_OK
+    for q in flows[1:]:
+        d = diff(q)
+        if d <= 0:
+            root = prev_q + (q - prev_q) * prev_d / (prev_d - d) if prev_d != d else q
+            return root, _interp(pump_pts, root), OP_STATUS_OK
+        prev_q, prev_d = q, d
+    return None, None, OP_STATUS_RUNOUT
+
+
+def operating_points(
+    candidates: list[dict] | None,
+    segments: list[dict],
+    static_lift_ft: float = 0.0,
+    c: float = HW_C_PVC,
+    design_flow_gpm: float | None = None,
+) -> CalcResult:
+    """Where each candidate pump's curve meets the system curve.
+
+    Only candidates with a performance ``curve`` are solved — a rated max
+    flow/head pair is not a curve and has no operating point. Each option is one
+    pump: its operating flow and head, the efficiency at that flow when its
+    curve points carry ``efficiency_pct``, and the flow as a share of the
+    design flow. The system curve is sampled once for the whole catalog, and its
+    TDH warnings are carried into this result's. A segment with no pipe diameter
+    would drop out of every roll-up and flatten the curve, so any such segment
+    refuses the solve rather than reporting a duty point it does not support."""
+    segments = list(segments or [])
+    design = float(design_flow_gpm or 0) or max((float(s.get("flow_gpm") or 0) for s in segments), default=0.0)
+    static_lift_ft = float(static_lift_ft or 0)
+    curved = [(cand, _curve_points(cand.get("curve"))) for cand in (candidates or []) if cand.get("curve")]
+    curved = [(cand, pts) for cand, pts in curved if len(pts) >= 2]
+    inputs = {
+        "design_flow": make_input(design, "GPM", "prior_calc"),
+        "static_lift": make_input(static_lift_ft, "ft", "user"),
+        "segments": make_input(len(segments), "count", "user"),
+        "pumps": make_input(len(curved), "curves", "lookup", "Item > Pump Curve"),
+    }
+    formula = "solve pump_head(Q) = static + Sum(segment loss at Q) on each pump curve"
+    if not curved or not segments or not design:
+        return CalcResult(
+            calc="operating_points", unit="GPM", inputs=inputs, formula=formula,
+            citations=[CIT_TDH, "Pump manufacturer curves"],
+            warnings=["Operating points need pipe segments, a design flow, and at least one pump curve."],
+        )
+    no_diameter = [i for i, seg in enumerate(segments) if not _segment_id(seg)]
+    if no_diameter:
+        return CalcResult(
+            calc="operating_points", unit="GPM", inputs=inputs, formula=formula,
+            citations=[CIT_TDH, "Pump manufacturer curves"],
+            warnings=[
+                f"Operating points need a pipe diameter on every segment; segment(s) {no_diameter} "
+                "have none, so the system curve would leave out their losses."
+            ],
+        )
+
+    sys_curve, curve_warnings = _sample_system_curve(
+        segments, max(pts[-1][0] for _cand, pts in curved), static_lift_ft, c, design, SYSTEM_CURVE_POINTS
+    )
+    sys_pts = [(p["flow_gpm"], p["head_ft"]) for p in sys_curve]
+    options: list[CalcOption] = []
+    steps = [
+        f"system curve: {len(sys_pts)} points, {sys_pts[0][1]:.2f} ft @ 0 GPM -> "
+        f"{sys_pts[-1][1]:.2f} ft @ {sys_pts[-1][0]:g} GPM"
+    ]
+    for cand, pts in curved:
+        key = str(cand.get("item_code") or cand.get("part_number") or cand.get("label") or "?")
+        flow, head, status = _intersect(pts, sys_pts)
+        eff = _interp(_curve_points(cand["curve"], "efficiency_pct"), flow) if flow is not None else None
+        share = flow / design if flow is not None else None
+        if status == OP_STATUS_OK and share < 1:
+            status = OP_STATUS_SHORT
+        options.append(
+            CalcOption(
+                key=key,
+                label=str(cand.get("description") or key),
+                value=round(flow, 2) if flow is not None else None,
+                detail={
+                    "operating_flow_gpm": round(flow, 2) if flow is not None else None,
+                    "operating_head_ft": round(head, 2) if head is not None else None,
+                    "efficiency_pct": round(eff, 1) if eff is not None else None,
+                    "flow_vs_design_pct": round(share * 100, 1) if share is not None else None,
+                    "status": status,
+                },
+            )
+        )
+        if flow is None:
+            steps.append(f"{key}: {status}")
+        else:
+            steps.append(
+                f"{key}: {flow:.2f} GPM @ {head:.2f} ft ({share * 100:.0f}% of design)"
+                + (f", {eff:.1f}% eff" if eff is not None else "")
+            )
+    warnings = list(curve_warnings)
+    shutoff = [o.key for o in options if o.detail["status"] == OP_STATUS_SHUTOFF]
+    runout = [o.key for o in options if o.detail["status"] == OP_STATUS_RUNOUT]
+    if shutoff:
+        warnings.append(f"Pump(s) whose shutoff head is below the static lift + losses (no flow): {shutoff}.")
+    if runout:
+        warnings.append(
+            f"Pump(s) still above the system curve at the end of their published curve — they run out "
+            f"past it; confirm against the full manufacturer curve: {runout}."
+        )
+    return CalcResult(
+        calc="operating_points",
+        value=len([o for o in options if o.value is not None]),
+        unit="pumps solved",
+        inputs=inputs,
+        formula=formula,
+        steps=steps,
+        citations=[CIT_TDH, "Pump manufacturer curves"],
+        options=options,
+        warnings=warnings,
+    )
+
+
 def electrical_load(fla_amps: float, hp: float = 0.0, phase: int = 1, voltage: int = 0) -> CalcResult:
     """Branch-circuit breaker sizing from full-load amps (125% FLA, rounded up to
     the next standard breaker). Flagged as a business rule, not a source formula."""
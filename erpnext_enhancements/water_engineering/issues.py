@@ -82,6 +82,7 @@ _CALC_SECTION = {
     "pipe_pressure_check": "piping",
     "pipe_pressure_rating": "piping",
     "select_pump": "pump",
+    "operating_points": "pump",
     "chlorinator_feed": "chemistry",
     "chemistry_targets": "chemistry",
     "ozone_sidestream": "chemistry",
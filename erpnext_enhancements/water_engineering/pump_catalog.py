@@ -0,0 +1,157 @@
+# Copyright (c) 2026, Sapphire Fountains and contributors
+# For license information, please see license.txt
+
+"""The "Pumps" Item catalog as engine candidates — parsed once, cached, and
+dropped when a pump Item changes.
+
+Every ``WaterFeatureDesign.recompute()`` without explicit pump rows used to read
+every enabled ``Pumps`` Item plus every ``Pump Curve Point`` under them, then
+rebuild the same candidate dicts — on each save, preview and wizard step, for a
+catalog that changes a few times a year. The operating-point solver made that
+worse, not better: it wants every curve, every time.
+
+So the parsed list lives in the site cache under :data:`CACHE_KEY`. It is
+invalidated from the ``Item`` doc events (``on_update`` / ``on_trash`` /
+``after_rename``) whenever the Item is — or, before this save, was — in the
+"Pumps" group; curve rows are a child table of the Item, so editing a curve is
+an Item save and lands there too. :data:`CACHE_TTL_SEC` is the backstop for the
+writes that bypass doc events (``db.set_value``, raw SQL), not the mechanism.
+
+Callers get a deep copy: the engine annotates candidates, and a mutation of the
+cached object would leak into the next design's recompute in the same worker.
+"""
+
+from __future__ import annotations
+
+import copy
+
+import frappe
+
+PUMP_ITEM_GROUP = "Pumps"
+
+CACHE_KEY = "water_engineering:pump_catalog"
+
+# A day. Doc events clear the key on every real change; this only bounds how
+# long a write that skipped them (db.set_value, a patch) can go unseen.
+CACHE_TTL_SEC = 24 * 60 * 60
+
+_ITEM_FIELDS = (
+    "custom_rated_gpm",
+    "custom_rated_tdh_ft",
+    "custom_pump_hp",
+    "custom_pump_phase",
+    "custom_pump_voltage",
+)
+
+
+def catalog_candidates():
+    """Every enabled pump Item as a ``select_pump`` candidate (with ``curve``
+    when it has one). Served from the cache; empty if the pump fields / items
+    aren't set up yet."""
+    try:
+        cached = frappe.cache().get_value(CACHE_KEY)
+    except Exception:
+        cached = None
+    if cached is None:
+        cached = _load()
+        if cached is None:
+            # Not migrated yet — answer empty, but don't pin that for a day.
+            return []
+        try:
+            frappe.cache().set_value(CACHE_KEY, cached, expires_in_sec=CACHE_TTL_SEC)
+        except Exception:
+            pass
+    return copy.deepcopy(cached)
+
+
+def curve_for(item_code):
+    """One pump's curve points, from the cached catalog when it is a catalog
+    pump, else straight from the Item."""
+    if not item_code:
+        return []
+    for candidate in catalog_candidates():
+        if candidate.get("item_code") == item_code:
+            return candidate.get("curve") or []
+    return pump_curves([item_code]).get(item_code) or []
+
+
+def pump_curves(item_codes):
+    """{item_code: [{flow_gpm, head_ft[, efficiency_pct]}, ...]} performance-curve
+    points for the given pump Items. Empty if the Pump Curve Point table isn't
+    migrated yet."""
+    codes = [c for c in (item_codes or []) if c]
+    if not codes:
+        return {}
+    fields = ["parent", "flow_gpm", "head_ft"]
+    try:
+        if frappe.get_meta("Pump Curve Point").has_field("efficiency_pct"):
+            fields.append("efficiency_pct")
+        rows = frappe.get_all(
+            "Pump Curve Point",
+            filters={"parent": ["in", codes], "parenttype": "Item", "parentfield": "custom_pump_curve"},
+            fields=fields,
+            order_by="parent asc, idx asc",
+        )
+    except Exception:
+        return {}
+    out = {}
+    for r in rows:
+        point = {"flow_gpm": r["flow_gpm"], "head_ft": r["head_ft"]}
+        if r.get("efficiency_pct"):
+            point["efficiency_pct"] = r["efficiency_pct"]
+        out.setdefault(r["parent"], []).append(point)
+    return out
+
+
+def invalidate(doc=None, method=None, *args, **kwargs):
+    """Item doc-event hook: drop the cached catalog when a pump Item changes.
+
+    Called with no document it always clears (setup / seed use it after
+    writing pump Items). An Item that just left the "Pumps" group still
+    clears, so a re-grouped pump stops being offered."""
+    if doc is not None and not _is_or_was_pump(doc):
+        return
+    try:
+        frappe.cache().delete_value(CACHE_KEY)
+    except Exception:
+        pass
+
+
+def _is_or_was_pump(doc):
+    if doc.get("item_group") == PUMP_ITEM_GROUP:
+        return True
+    before_save = getattr(doc, "get_doc_before_save", None)
+    before = before_save() if callable(before_save) else None
+    return bool(before and before.get("item_group") == PUMP_ITEM_GROUP)
+
+
+def _load():
+    """Read and parse the catalog; ``None`` if Item can't be read yet. Rating
+    fields that aren't migrated are skipped rather than failing the read —
+    absent ratings yield candidates the engineer confirms manually."""
+    try:
+        meta = frappe.get_meta("Item")
+        items = frappe.get_all(
+            "Item",
+            filters={"item_group": PUMP_ITEM_GROUP, "disabled": 0},
+            fields=["item_code", "item_name", *(f for f in _ITEM_FIELDS if meta.has_field(f))],
+        )
+    except Exception:
+        return None
+    candidates = [
+        {
+            "item_code": it.get("item_code"),
+            "description": it.get("item_name"),
+            "rated_gpm": it.get("custom_rated_gpm"),
+            "rated_tdh_ft": it.get("custom_rated_tdh_ft"),
+            "hp": it.get("custom_pump_hp"),
+            "phase": it.get("custom_pump_phase"),
+            "voltage": it.get("custom_pump_voltage"),
+        }
+        for it in items
+    ]
+    curves = pump_curves([c["item_code"] for c in candidates])
+    for c in candidates:
+        if curves.get(c["item_code"]):
+            c["curve"] = curves[c["item_code"]]
+    return candidates
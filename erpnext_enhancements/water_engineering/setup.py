@@ -23,6 +23,8 @@ left blank and the selector matches on flow + flags a pump-curve check.
 import frappe
 from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
 
+from erpnext_enhancements.water_engineering import pump_catalog
+
 # DOC-0028 "Part Numbers", Category == Pump. Flow is the GPH in the description.
 PUMP_CATALOG = [
 	{"item_code": "500014", "item_name": "Pump, Aquasurge 2000", "gph": 2000, "vendor": "Aquascape", "vendor_no": "AQU-98125"},
@@ -169,6 +171,8 @@ def ensure_pump_catalog():
 			frappe.logger().info(f"[water_engineering] seeded pumps: {result['created']}")
 	except Exception:
 		frappe.log_error(frappe.get_traceback(), "Water Engineering pump catalog seed")
+	# New pump fields (or a Pump Curve Point column) change what a candidate carries.
+	pump_catalog.invalidate()
 
 
 # Generic starter Nozzle Profiles (Cd + orifice area). These are the same generic